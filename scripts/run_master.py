@@ -25,6 +25,16 @@ from common.logger import setup_global_logging
 setup_global_logging(os.getenv("MASTER_LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
+# Módulos que cada trabajador del pool importa al arrancar (lógica de las tareas)
+WORKER_PRELOAD_MODULES = [
+    "riesgos.riesgos_task",
+    "brass.brass_task",
+    "expedientes.expedientes_task",
+    "no_conformidades.no_conformidades_task",
+    "agedys.agedys_task",
+    "email_services.email_task",
+]
+
 
 ############################################################
 # MODO SIMPLE (Nueva arquitectura de tareas - ejecución única)
@@ -51,8 +61,8 @@ class SimpleMasterTaskRunner:
                 self.logger.info("🚀 Iniciando Simple Master Task Runner (nueva arquitectura) - modo simple (dry)")
                 self.logger.info("📊 resumen (modo simple): 0 tareas registradas")
             else:
-                from common.task_registry import TaskRegistry
-                self.task_registry = TaskRegistry()
+                from common.task_registry import get_task_registry
+                self.task_registry = get_task_registry()
                 self.daily_tasks = self.task_registry.get_daily_tasks()
                 self.continuous_tasks = self.task_registry.get_continuous_tasks()
         except Exception as e:
@@ -78,24 +88,31 @@ class SimpleMasterTaskRunner:
         if not es_laborable(_date.today()):
             self.logger.info("📅 Hoy no es día laborable, omitiendo tareas diarias")
             return 0, len(self.daily_tasks)
-        ejecutadas = 0
-        total = len(self.daily_tasks)
-        for task in self.daily_tasks:
-            try:
-                self.logger.info(f"🔍 Verificando tarea: {task.name}")
-                if task.debe_ejecutarse():
-                    self.logger.info(f"▶️  Ejecutando tarea: {task.name}")
-                    if task.ejecutar():
-                        self.logger.info(f"✅ Tarea {task.name} ejecutada exitosamente")
-                        task.marcar_como_completada()
-                        ejecutadas += 1
-                    else:
-                        self.logger.error(f"❌ Error ejecutando tarea: {task.name}")
-                else:
-                    self.logger.info(f"⏭️  Tarea {task.name} no necesita ejecutarse")
-            except Exception as e:  # pragma: no cover - defensivo
-                self.logger.error(f"💥 Error procesando tarea {task.name}: {e}")
-        return ejecutadas, total
+        from common.schedule_cache import schedule_cycle
+        from common.task_scheduler import DailyTaskScheduler, db_limits_from_env
+
+        def run_one(task) -> bool:
+            self.logger.info(f"🔍 Verificando tarea: {task.name}")
+            if not task.debe_ejecutarse():
+                self.logger.info(f"⏭️  Tarea {task.name} no necesita ejecutarse")
+                return False
+            self.logger.info(f"▶️  Ejecutando tarea: {task.name}")
+            if task.ejecutar():
+                self.logger.info(f"✅ Tarea {task.name} ejecutada exitosamente")
+                task.marcar_como_completada()
+                return True
+            self.logger.error(f"❌ Error ejecutando tarea: {task.name}")
+            return False
+
+        scheduler = DailyTaskScheduler(
+            int(os.getenv("MASTER_MAX_WORKERS", "1")), db_limits_from_env()
+        )
+        with schedule_cycle():
+            runs = scheduler.run(self.daily_tasks, run_one)
+        for run in runs:
+            if run.error is not None:  # pragma: no cover - defensivo
+                self.logger.error(f"💥 Error procesando tarea {run.name}: {run.error}")
+        return sum(1 for run in runs if run.result is True), len(self.daily_tasks)
 
     def run_continuous_tasks(self) -> tuple[int, int]:
         self.logger.info("🔄 Ejecutando tareas continuas...")
@@ -181,8 +198,14 @@ class MasterRunner:
         self.total_scripts_executed = 0
         self.successful_scripts = 0
         self.failed_scripts = 0
-        # Concurrencia eliminada; conservamos el parámetro para logs/reportes
-        self.max_workers = int(os.getenv("MASTER_MAX_WORKERS", "3"))
+        # Tareas diarias en paralelo (ver common.task_scheduler)
+        self.max_workers = int(os.getenv("MASTER_MAX_WORKERS", "1"))
+        # Inicio/fin por tarea de la última ejecución de diarias (archivo de estado)
+        self.daily_task_runs: dict[str, any] = {}
+        # Procesos precalentados para tareas aisladas (ver common.task_workers)
+        self.worker_pool = None
+        # Registro de tareas compartido entre ciclos (ver _get_task_registry)
+        self.task_registry = None
         # Cargar configuración necesaria
         self._load_config()
         # Señales de parada limpia
@@ -256,8 +279,20 @@ class MasterRunner:
         """Actualiza el contexto del ciclo (placeholder para compatibilidad)."""
         return
 
+    def _get_task_registry(self):
+        """Registro de tareas del proceso; las tareas se construyen una sola vez."""
+        if self.task_registry is None:
+            from common.task_registry import get_task_registry
+
+            self.task_registry = get_task_registry()
+        return self.task_registry
+
     def ejecutar_tareas_diarias(self) -> dict[str, any]:
-        """Ejecuta las tareas diarias de forma secuencial, siguiendo la lógica de SimpleMasterTaskRunner.run_daily_tasks."""
+        """Ejecuta las tareas diarias en paralelo (``MASTER_MAX_WORKERS`` hilos) con límite por BD.
+
+        Sigue la lógica de SimpleMasterTaskRunner.run_daily_tasks; los tiempos
+        de cada tarea quedan en ``daily_task_runs`` (archivo de estado).
+        """
         # Atajo de dry-run para tests rápidos
         if os.getenv("MASTER_DRY_SUBPROCESS") == "1":
             if self.verbose_mode:
@@ -273,46 +308,62 @@ class MasterRunner:
         src_path = Path(__file__).parent.parent / "src"
         if str(src_path) not in sys.path:
             sys.path.insert(0, str(src_path))
+        registry_start = time.perf_counter()
         try:
-            from common.task_registry import TaskRegistry
-            task_instances = TaskRegistry().get_daily_tasks()
+            task_instances = self._get_task_registry().get_daily_tasks()
         except Exception as e:
             self.logger_adapter.warning(
                 f"No se pudo importar task_registry: {e}. Saltando tareas diarias."
             )
             return {}
 
+        # Tiempo en obtener las tareas este ciclo (~0 salvo en la primera construcción)
+        tiempo_registro = time.perf_counter() - registry_start
         ejecutadas = 0
         total = len(task_instances)
         tiempo_inicio = datetime.now()
         resultados = {}
 
-        for task in task_instances:
-            try:
-                self.logger_adapter.info(f"🔍 Verificando tarea: {task.name}")
-                if task.debe_ejecutarse():
-                    self.logger_adapter.info(f"▶️  Ejecutando tarea: {task.name}")
-                    resultado = task.ejecutar()
-                    resultados[task.name] = resultado
-                    if resultado and resultado.get("success"):
-                        self.logger_adapter.info(f"✅ Tarea {task.name} ejecutada exitosamente")
-                        task.marcar_como_completada()
-                        ejecutadas += 1
-                    else:
-                        self.logger_adapter.error(f"❌ Error ejecutando tarea: {task.name}")
-                else:
-                    self.logger_adapter.info(f"⏭️  Tarea {task.name} no necesita ejecutarse")
-            except Exception as e:
-                self.logger_adapter.error(f"💥 Error procesando tarea {task.name}: {e}")
-                resultados[task.name] = {
+        from common.schedule_cache import schedule_cycle
+        from common.task_scheduler import DailyTaskScheduler, db_limits_from_env
+
+        scheduler = DailyTaskScheduler(self.max_workers, db_limits_from_env())
+        # Una sola consulta a TbTareas para todas las comprobaciones del ciclo
+        with schedule_cycle() as schedule_cache:
+            runs = scheduler.run(task_instances, self._ejecutar_tarea_diaria)
+        for run in runs:
+            if run.error is not None:
+                self.logger_adapter.error(f"💥 Error procesando tarea {run.name}: {run.error}")
+                resultados[run.name] = {
                     "success": False,
-                    "duration": 0,
+                    "duration": run.duration,
                     "output": "",
-                    "error": str(e),
+                    "error": run.error,
                     "return_code": -4,
                 }
+            elif run.result is not None:
+                resultados[run.name] = run.result
+                if run.result.get("success"):
+                    ejecutadas += 1
 
         tiempo_total = (datetime.now() - tiempo_inicio).total_seconds()
+        self.daily_task_runs = {
+            "start": tiempo_inicio.isoformat(),
+            "registry_s": round(tiempo_registro, 3),
+            "window_s": round(tiempo_total, 3),
+            "sequential_s": round(sum(run.duration for run in runs), 3),
+            "startup_saved_s": round(
+                sum(
+                    run.result.get("startup_saved") or 0.0
+                    for run in runs
+                    if isinstance(run.result, dict)
+                ),
+                3,
+            ),
+            "max_workers": scheduler.max_workers,
+            "schedule_queries": schedule_cache.queries,
+            "tasks": [run.to_dict() for run in runs],
+        }
 
         if self.verbose_mode:
             self.logger_adapter.info("🌅 RESUMEN DE TAREAS DIARIAS COMPLETADO")
@@ -335,6 +386,24 @@ class MasterRunner:
             "results": resultados,
         }
 
+    def _ejecutar_tarea_diaria(self, task) -> dict[str, any] | None:
+        """Verifica y ejecuta una tarea diaria (hilo del planificador).
+
+        Devuelve el resultado de ``task.ejecutar()`` o None si no tocaba.
+        """
+        self.logger_adapter.info(f"🔍 Verificando tarea: {task.name}")
+        if not task.debe_ejecutarse():
+            self.logger_adapter.info(f"⏭️  Tarea {task.name} no necesita ejecutarse")
+            return None
+        self.logger_adapter.info(f"▶️  Ejecutando tarea: {task.name}")
+        resultado = task.ejecutar()
+        if resultado and resultado.get("success"):
+            self.logger_adapter.info(f"✅ Tarea {task.name} ejecutada exitosamente")
+            task.marcar_como_completada()
+        else:
+            self.logger_adapter.error(f"❌ Error ejecutando tarea: {task.name}")
+        return resultado
+
     def ejecutar_tareas_continuas(self) -> dict[str, bool]:
         """
         Ejecuta todas las tareas continuas de forma secuencial, siguiendo la lógica de SimpleMasterTaskRunner.run_continuous_tasks
@@ -348,8 +417,7 @@ class MasterRunner:
         if str(src_path) not in sys.path:
             sys.path.insert(0, str(src_path))
         try:
-            from common.task_registry import TaskRegistry
-            task_instances = TaskRegistry().get_continuous_tasks()
+            task_instances = self._get_task_registry().get_continuous_tasks()
         except Exception as e:
             self.logger_adapter.warning(
                 f"No se pudo importar task_registry: {e}. Saltando tareas continuas."
@@ -447,6 +515,7 @@ class MasterRunner:
                 except Exception:
                     pass
                 return
+            self._start_worker_pool()
             while self.running:
                 self.cycle_count += 1
                 self._update_cycle_context()
@@ -668,30 +737,63 @@ class MasterRunner:
         finally:
             self.stop()
 
+    def _start_worker_pool(self) -> None:
+        """Arranca el pool de trabajadores precalentados si ``MASTER_WORKER_POOL_SIZE`` > 0.
+
+        Las tareas en modo aislado (``MASTER_TASK_MODE=isolated`` o
+        ``MASTER_ISOLATED_TASKS``) se envían a estos procesos en lugar de
+        lanzar un intérprete nuevo por tarea. Si ninguna tarea se aísla no se
+        arranca ningún proceso.
+        """
+        try:
+            from common.task_workers import (
+                isolation_configured,
+                set_task_worker_pool,
+                worker_pool_from_env,
+            )
+
+            if not isolation_configured():
+                return
+            pool = worker_pool_from_env(preload=WORKER_PRELOAD_MODULES)
+            if pool is None:
+                return
+            inicio = time.perf_counter()
+            self.worker_pool = pool.start()
+            set_task_worker_pool(self.worker_pool)
+            self.logger_adapter.info(
+                f"🧰 Pool de trabajadores listo: {pool.size} procesos en "
+                f"{time.perf_counter() - inicio:.1f}s"
+            )
+        except Exception as e:
+            self.logger_adapter.warning(
+                f"No se pudo arrancar el pool de trabajadores ({e}); se usará subproceso"
+            )
+
     def list_tasks(self) -> int:
         """Lista tareas diarias y continuas indicando si deben ejecutarse (según lógica OO)."""
         src_path = Path(__file__).parent.parent / "src"
         if str(src_path) not in sys.path:
             sys.path.insert(0, str(src_path))
         try:
-            from common.task_registry import TaskRegistry
-
-            registry = TaskRegistry()
+            registry = self._get_task_registry()
             daily = registry.get_daily_tasks()
             cont = registry.get_continuous_tasks()
         except Exception as e:
             print(f"Error importando registro de tareas: {e}")
             return 1
+        from common.schedule_cache import schedule_cycle
+
         print("TASK TYPE        SHOULD_RUN  SCRIPT")
         print("------------------------------------------")
         file_to_key = {v: k for k, v in self.available_scripts.items()}
-        for t in daily:
-            try:
-                should = t.debe_ejecutarse()
-            except Exception:
-                should = False
-            key = file_to_key.get(t.script_filename, t.script_filename)
-            print(f"DAILY {key:<12} {str(should):<11} {t.script_filename}")
+        with schedule_cycle():
+            for t in daily:
+                try:
+                    should = t.debe_ejecutarse()
+                except Exception:
+                    should = False
+                key = file_to_key.get(t.script_filename, t.script_filename)
+                print(f"DAILY {key:<12} {str(should):<11} {t.script_filename}")
         for t in cont:
             print(f"CONT  {t.name:<12} True        {t.script_filename}")
         return 0
@@ -708,6 +810,25 @@ class MasterRunner:
         )
         self.logger_adapter.info(f"   ✅ Scripts exitosos: {self.successful_scripts}")
         self.logger_adapter.info(f"   ❌ Scripts fallidos: {self.failed_scripts}")
+        if self.worker_pool is not None:
+            try:
+                from common.task_workers import set_task_worker_pool
+
+                set_task_worker_pool(None)
+                self.worker_pool.shutdown()
+            except Exception as e:  # pragma: no cover - defensivo
+                self.logger_adapter.warning(f"Error deteniendo pool de trabajadores: {e}")
+            finally:
+                self.worker_pool = None
+        try:
+            from common.db.access_connection_pool import pool_registry
+            from common.db.write_queue import write_queues
+
+            # Confirmar escrituras diferidas antes de cerrar las conexiones
+            write_queues.close_all()
+            pool_registry.close_all()
+        except Exception as e:  # pragma: no cover - defensivo
+            self.logger_adapter.warning(f"Error cerrando pools de conexiones: {e}")
 
     def _actualizar_estado(self):
         """Actualiza el archivo de estado del script maestro"""
@@ -721,6 +842,10 @@ class MasterRunner:
                 "es_noche": self.es_noche(),
                 "scripts_disponibles": list(self.available_scripts.keys()),
                 "proximo_tiempo_espera_minutos": self.get_tiempo_espera() // 60,
+                "tareas_diarias": self.daily_task_runs,
+                "registro_tareas": (
+                    self.task_registry.get_stats() if self.task_registry is not None else {}
+                ),
                 "estadisticas": {
                     "total_scripts_executed": self.total_scripts_executed,
                     "successful_scripts": self.successful_scripts,
@@ -733,6 +858,7 @@ class MasterRunner:
                 "configuracion": {
                     "cycle_times": self.cycle_times,
                     "script_timeout": self.script_timeout,
+                    "max_workers": self.max_workers,
                     "festivos_file": str(self.festivos_file),
                     "daily_scripts": self.daily_scripts,
                     "continuous_scripts": self.continuous_scripts,
@@ -0,0 +1,156 @@
+"""Job nocturno: réplica Access -> SQLite indexada (common.db.sqlite_mirror).
+
+Responsabilidad:
+  - Refrescar ``<DB_MIRROR_DIR>/<bd>.sqlite`` para cada BD de
+    ``DB_MIRROR_DATABASES`` (incremental donde hay columna de modificación)
+  - Medir las consultas de ``BENCHMARK_QUERIES`` en Access y en la réplica
+  - Escribir el informe (tiempos de construcción y speedup por consulta) en
+    ``logs/sqlite_mirror_report.json``
+
+Se programa fuera del runner maestro (p.ej. Programador de tareas a las 02:00):
+
+    python scripts/run_sqlite_mirror.py [--db riesgos] [--full] [--no-benchmark]
+
+Los managers leen de la réplica sólo con ``DB_MIRROR_ENABLED=true``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Bootstrap mínimo para poder importar módulos del proyecto antes de importarlos
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_SRC_DIR = _PROJECT_ROOT / "src"
+if str(_SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(_SRC_DIR))
+
+from common.config import Config  # type: ignore
+from common.db.database import AccessDatabase  # type: ignore
+from common.db.sqlite_mirror import MIRROR_TABLES, SQLiteMirror  # type: ignore
+from common.logger import setup_global_logging  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Consultas representativas de los informes (mismo SQL que los managers)
+BENCHMARK_QUERIES: dict[str, dict[str, str]] = {
+    "riesgos": {
+        "aceptados_pendientes_calidad": """
+            SELECT DISTINCT TbRiesgos.IDRiesgo, TbExpedientes1.Nemotecnico, TbProyectosEdiciones.Edicion,
+                TbRiesgos.CodigoRiesgo, TbRiesgos.FechaJustificacionAceptacionRiesgo,
+                TbUsuariosAplicaciones.Nombre AS ResponsableTecnico,
+                TbUsuariosAplicaciones_1.Nombre AS ResponsableCalidad
+            FROM ((((TbProyectos INNER JOIN TbExpedientes1 ON TbProyectos.IDExpediente = TbExpedientes1.IDExpediente)
+                   LEFT JOIN TbUsuariosAplicaciones AS TbUsuariosAplicaciones_1 ON TbExpedientes1.IDResponsableCalidad = TbUsuariosAplicaciones_1.Id)
+                   INNER JOIN (TbProyectosEdiciones INNER JOIN TbRiesgos ON TbProyectosEdiciones.IDEdicion = TbRiesgos.IDEdicion)
+                   ON TbProyectos.IDProyecto = TbProyectosEdiciones.IDProyecto))
+                   LEFT JOIN TbUsuariosAplicaciones ON TbRiesgos.DetectadoPor = TbUsuariosAplicaciones.UsuarioRed
+            WHERE TbRiesgos.FechaJustificacionAceptacionRiesgo IS NOT NULL
+                  AND TbProyectos.FechaCierre IS NULL
+                  AND TbProyectosEdiciones.FechaPublicacion IS NULL
+                  AND TbRiesgos.FechaAprobacionAceptacionPorCalidad IS NULL
+        """,
+        "riesgos_por_edicion": """
+            SELECT TbProyectosEdiciones.IDEdicion, Count(TbRiesgos.IDRiesgo) AS NumRiesgos
+            FROM TbProyectosEdiciones INNER JOIN TbRiesgos ON TbProyectosEdiciones.IDEdicion = TbRiesgos.IDEdicion
+            GROUP BY TbProyectosEdiciones.IDEdicion
+        """,
+    },
+    "agedys": {
+        "facturas_pendientes_visado": """
+            SELECT DISTINCT fd.NFactura, p.CODPROYECTOS, p.PETICIONARIO, e.CodExp,
+                np.IMPORTEADJUDICADO, s.Suministrador, fd.ImporteFactura
+            FROM ((TbProyectos p INNER JOIN (TbNPedido np INNER JOIN (TbFacturasDetalle fd
+                INNER JOIN TbVisadoFacturas_Nueva vf ON fd.IDFactura = vf.IDFactura)
+                ON np.NPEDIDO = fd.NPEDIDO) ON p.CODPROYECTOS = np.CODPPD)
+                INNER JOIN TbExpedientes1 e ON p.IDExpediente = e.IDExpediente)
+                INNER JOIN TbSuministradoresSAP s ON np.NAcreedorSAP = s.AcreedorSAP
+            WHERE fd.FechaAceptacion IS NULL AND vf.FVISADOTECNICO IS NULL
+        """,
+    },
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Construye las réplicas SQLite de lectura")
+    parser.add_argument(
+        "--db",
+        action="append",
+        choices=sorted(MIRROR_TABLES),
+        help="BD a replicar (repetible). Por defecto DB_MIRROR_DATABASES",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="Reconstruye todas las tablas desde cero"
+    )
+    parser.add_argument(
+        "--no-benchmark",
+        action="store_true",
+        help="No mide las consultas de referencia contra Access",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Repeticiones por consulta (mejor tiempo)"
+    )
+    return parser.parse_args(argv)
+
+
+def build_mirrors(
+    config: Config,
+    databases: list[str],
+    full: bool = False,
+    benchmark: bool = True,
+    repeat: int = 3,
+) -> list[dict]:
+    """Construye la réplica de cada BD y devuelve los informes serializables."""
+    reports = []
+    for name in databases:
+        source = AccessDatabase(config.get_db_connection_string(name))
+        mirror = SQLiteMirror(
+            source, config.get_database_mirror_path(name), MIRROR_TABLES[name]
+        )
+        try:
+            report = mirror.build(full=full, db_name=name)
+            if benchmark and BENCHMARK_QUERIES.get(name):
+                mirror_db = AccessDatabase(str(config.get_database_mirror_path(name)))
+                try:
+                    report.queries = mirror.compare_queries(
+                        BENCHMARK_QUERIES[name], mirror_db, repeat=repeat
+                    )
+                finally:
+                    mirror_db.disconnect()
+        finally:
+            source.disconnect()
+        logger.info(report.format_text())
+        reports.append(report.to_dict())
+    return reports
+
+
+def main(argv: list[str] | None = None):  # pragma: no cover
+    args = parse_args(argv)
+    setup_global_logging()
+    config = Config()
+    databases = args.db or sorted(config.db_mirror_databases & set(MIRROR_TABLES))
+    reports = build_mirrors(
+        config,
+        databases,
+        full=args.full,
+        benchmark=not args.no_benchmark,
+        repeat=args.repeat,
+    )
+    report_path = config.logs_dir / "sqlite_mirror_report.json"
+    report_path.write_text(
+        json.dumps(
+            {"generated": datetime.now().isoformat(timespec="seconds"), "mirrors": reports},
+            indent=2,
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+    logger.info(f"Informe de réplica escrito en {report_path}")
+    sys.exit(0 if all(r["ok"] for r in reports) else 1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
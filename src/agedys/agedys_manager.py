@@ -25,6 +25,7 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+from common.db.parallel import run_parallel
 from common.reporting.html_report_generator import HTMLReportGenerator
 from common.reporting.table_builder import build_table_html
 from common.reporting.table_configurations import AGEDYS_TABLE_CONFIGURATIONS  # type: ignore
@@ -81,7 +82,7 @@ class AgedysManager:
             ):  # pragma: no cover - dependiente entorno
                 try:
                     self.db_agedys = AccessDatabase(
-                        config.get_db_agedys_connection_string()
+                        config.get_db_read_connection_string("agedys")
                     )  # type: ignore[attr-defined]
                 except Exception as e:  # pragma: no cover
                     self.logger.debug(f"No se pudo crear conexión AGEDYS auto: {e}")
@@ -447,13 +448,13 @@ class AgedysManager:
             "SELECT DISTINCT u.UsuarioRed FROM (((TbProyectos p INNER JOIN TbNPedido np ON p.CODPROYECTOS = np.CODPPD) INNER JOIN TbFacturasDetalle fd ON np.NPEDIDO = fd.NPEDIDO) LEFT JOIN TbVisadoFacturas_Nueva vf ON (fd.NPEDIDO = vf.NPEDIDO AND fd.NFactura = vf.NFactura)) INNER JOIN TbUsuariosAplicaciones u ON p.PETICIONARIO = u.Nombre WHERE p.ELIMINADO=False AND fd.FechaAceptacion IS NULL AND vf.FRECHAZOTECNICO IS NULL AND vf.FVISADOTECNICO IS NULL",
         ]
         usuarios: set[str] = set()
-        for idx, sql in enumerate(subqueries, start=1):
-            try:
-                rows = self.db_agedys.execute_query(sql)
-            except Exception as e:  # pragma: no cover
-                self.logger.error(f"Error subconsulta usuarios({idx}): {e}")
-                rows = []
-            for r in rows or []:
+        # Subconsultas independientes: se reparten entre las conexiones del pool
+        run = run_parallel(self.db_agedys, subqueries, label="agedys_usuarios")
+        for idx, result in enumerate(run, start=1):
+            if not result.ok:  # pragma: no cover
+                self.logger.error(f"Error subconsulta usuarios({idx}): {result.error}")
+                continue
+            for r in result.rows or []:
                 u = r.get("UsuarioRed")
                 if u:
                     usuarios.add(u)
@@ -504,11 +505,21 @@ class AgedysManager:
         section: str,
     ) -> list[dict[str, Any]]:
         merged: dict[str, dict[str, Any]] = {}
-        for code, sql, params in queries:
-            try:
-                rows = self.db_agedys.execute_query(sql, params)
-            except Exception as e:  # pragma: no cover
-                self.logger.error(f"Error subconsulta {section} {code}: {e}")
+        # Subconsultas independientes: se reparten entre las conexiones del pool
+        # y se fusionan en el orden original
+        run = run_parallel(
+            self.db_agedys,
+            [
+                (lambda sql=sql, params=params: self.db_agedys.execute_query(sql, params))
+                for _, sql, params in queries
+            ],
+            label=section,
+        )
+        for (code, _, _), result in zip(queries, run):
+            if result.ok:
+                rows = result.rows
+            else:  # pragma: no cover
+                self.logger.error(f"Error subconsulta {section} {code}: {result.error}")
                 rows = []
             for r in rows:
                 key = "|".join(
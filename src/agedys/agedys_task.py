@@ -22,9 +22,10 @@ class AgedysTask(TareaDiaria):
             script_filename="run_agedys.py",
             task_names=["AGEDYSDiario"],
             frequency_days=int(os.getenv("AGEDYS_FRECUENCIA_DIAS", "1") or 1),
+            databases=("agedys",),
         )
         try:
-            conn_str = self.config.get_db_agedys_connection_string()
+            conn_str = self.config.get_db_read_connection_string("agedys")
             pool = get_agedys_connection_pool(conn_str)
             self.db_agedys = AccessDatabase(conn_str, pool=pool)
             self.logger.debug("Pool AGEDYS inicializado")
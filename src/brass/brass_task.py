@@ -20,11 +20,12 @@ class BrassTask(TareaDiaria):
             script_filename="run_brass.py",
             task_names=["BRASSDiario"],
             frequency_days=int(os.getenv("BRASS_FRECUENCIA_DIAS", "1") or 1),
+            databases=("brass",),
         )
         # Permite inyección en tests o futuras extensiones (DI)
         self.recipients_service_class = recipients_service_class
         try:
-            conn_str = self.config.get_db_brass_connection_string()
+            conn_str = self.config.get_db_read_connection_string("brass")
             pool = get_brass_connection_pool(conn_str)
             self.db_brass = AccessDatabase(conn_str, pool=pool)
             self.logger.debug("Pool BRASS inicializado")
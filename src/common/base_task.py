@@ -3,16 +3,93 @@ Clases base para el sistema de tareas
 Proporciona funcionalidad común para tareas diarias y continuas
 """
 
+import importlib
 import logging
+import os
 import subprocess
+import threading
+import time
 from abc import ABC, abstractmethod
-from datetime import date
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, Optional
 
 from .db.access_connection_pool import AccessConnectionPool, get_tareas_connection_pool
 from .config import Config
 from .db.database import AccessDatabase
+from .schedule_cache import MISSING, active_schedule_cache
+from .startup_costs import parse_startup_marker, record_startup_cost, spawn_environment, startup_cost
+from .task_workers import get_task_worker_pool
+
+
+# Config compartida por las tareas construidas dentro de ``use_shared_config``
+_shared_config = threading.local()
+
+
+@contextmanager
+def use_shared_config(config: Config) -> Iterator[Config]:
+    """Las tareas creadas en el bloque (en este hilo) reutilizan ``config``.
+
+    Evita un ``Config()`` (y su ``load_dotenv``) por tarea cuando el registro
+    construye todas las tareas a la vez.
+    """
+    previous = getattr(_shared_config, "value", None)
+    _shared_config.value = config
+    try:
+        yield config
+    finally:
+        _shared_config.value = previous
+
+
+def refresh_task_snapshots(task: Any, logger: Optional[logging.Logger] = None) -> None:
+    """Refresca las copias locales (modo snapshot) de las BD de ``task``.
+
+    La tarea se construye una vez por proceso; sin esto leería la copia
+    tomada al construirla durante toda la vida del maestro o del trabajador.
+    """
+    databases = getattr(task, "databases", None)
+    task_config = getattr(task, "config", None)
+    if not databases or not hasattr(task_config, "refresh_read_snapshots"):
+        return
+    try:
+        task_config.refresh_read_snapshots(databases)
+    except Exception as e:
+        (logger or logging.getLogger(__name__)).warning(
+            f"No se pudieron refrescar los snapshots de {type(task).__name__}: {e}"
+        )
+
+
+def run_task_logic(task: Any, logger: Optional[logging.Logger] = None) -> bool:
+    """Comprueba, ejecuta y marca ``task`` igual que el runner de su script.
+
+    Es la secuencia de ``execute_task_with_standard_boilerplate`` en el
+    subproceso (``debe_ejecutarse`` -> ``execute_specific_logic`` ->
+    ``marcar_como_completada``), de modo que en proceso, en un trabajador o
+    aislada la lógica consulta y registra las mismas filas de TbTareas.
+
+    Returns:
+        False si la lógica devolvió False; True si se ejecutó o no tocaba.
+        Las excepciones de la lógica se propagan.
+    """
+    log = logger or logging.getLogger(__name__)
+    check = getattr(task, "debe_ejecutarse", None)
+    if callable(check):
+        try:
+            if not check():
+                log.info(f"{type(task).__name__} no requiere ejecución hoy")
+                return True
+        except Exception as e:
+            log.warning(f"Fallo en debe_ejecutarse(): {e} (se continúa)")
+    refresh_task_snapshots(task, log)
+    if task.execute_specific_logic() is False:
+        return False
+    mark = getattr(task, "marcar_como_completada", None)
+    if callable(mark):
+        try:
+            mark()
+        except Exception as e:
+            log.warning(f"No se pudo marcar completada: {e}")
+    return True
 
 
 class BaseTask(ABC):
@@ -20,6 +97,9 @@ class BaseTask(ABC):
     Clase base abstracta para todas las tareas del sistema
     """
 
+    # "modulo:Clase" con la lógica real cuando la tarea sólo conoce su script
+    logic_class: Optional[str] = None
+
     def __init__(self, name: str, script_filename: str):
         """
         Inicializa la tarea base
@@ -31,9 +111,11 @@ class BaseTask(ABC):
         self.name = name
         self.script_filename = script_filename
         self.logger = logging.getLogger(f"Task.{name}")
+        self._logic_instance = None
 
-        # Configuración
-        self.config = Config()
+        # Configuración (compartida si se construye dentro de use_shared_config)
+        shared = getattr(_shared_config, "value", None)
+        self.config = shared if shared is not None else Config()
 
         # Conexión a base de datos de tareas
         self.db_tareas = None
@@ -71,34 +153,167 @@ class BaseTask(ABC):
         """
         pass
 
+    def execution_mode(self) -> str:
+        """Modo de ejecución: ``"inprocess"`` (por defecto) o ``"isolated"``.
+
+        ``MASTER_TASK_MODE=isolated`` lanza todas las tareas como subproceso;
+        ``MASTER_ISOLATED_TASKS`` (nombres separados por comas) aísla sólo
+        algunas. Sin lógica invocable en proceso se usa siempre el subproceso.
+        """
+        isolated = {
+            item.strip().lower()
+            for item in os.getenv("MASTER_ISOLATED_TASKS", "").split(",")
+            if item.strip()
+        }
+        mode = os.getenv("MASTER_TASK_MODE", "inprocess").lower()
+        if mode in ("isolated", "subprocess") or self.name.lower() in isolated:
+            return "isolated"
+        if self.logic_class is None and not callable(
+            getattr(self, "execute_specific_logic", None)
+        ):
+            return "isolated"
+        return "inprocess"
+
     def ejecutar(self) -> dict[str, Any]:
         """
-        Ejecuta el script asociado a la tarea
+        Ejecuta la tarea en el proceso del maestro o aislada en un subproceso
 
         Returns:
             Diccionario con el resultado de la ejecución
         """
+        if self.execution_mode() == "isolated":
+            return self._ejecutar_aislado()
+        return self._ejecutar_en_proceso()
+
+    def _logic_target(self):
+        """Objeto cuyo ``execute_specific_logic`` implementa la tarea.
+
+        Las tareas del registro que sólo conocen su script declaran
+        ``logic_class`` (``"modulo:Clase"``); se instancia una vez y se reutiliza.
+        """
+        if self.logic_class is None:
+            return self
+        if self._logic_instance is None:
+            module_name, _, class_name = self.logic_class.partition(":")
+            module = importlib.import_module(module_name)
+            with use_shared_config(self.config):
+                self._logic_instance = getattr(module, class_name)()
+        return self._logic_instance
+
+    def _ejecutar_en_proceso(self) -> dict[str, Any]:
+        """Ejecuta la lógica en el maestro reutilizando sus pools y config.
+
+        Si la lógica vive en otra clase (``logic_class``) se le aplica la misma
+        secuencia que en el subproceso (``run_task_logic``); la propia tarea ya
+        la comprueba y marca el maestro.
+
+        ``startup_saved`` es el arranque medido del modo aislado o de un
+        trabajador (``common.startup_costs``) menos lo que esta ejecución tardó
+        en resolver la lógica (el import de la primera vez); None si aún no se
+        midió ninguno.
+        """
+        self.logger.info(f"🚀 Iniciando ejecución de {self.name} (en proceso)")
+        start = time.perf_counter()
+        overhead = 0.0
+        try:
+            target = self._logic_target()
+            overhead = time.perf_counter() - start
+            if target is self:
+                refresh_task_snapshots(self, self.logger)
+                success = self.execute_specific_logic() is not False
+            else:
+                success = run_task_logic(target, self.logger)
+            error = ""
+        except Exception as e:
+            self.logger.error(f"❌ Error ejecutando {self.name}: {e}")
+            success = False
+            error = str(e)
+        duration = time.perf_counter() - start
+        isolated_startup = startup_cost(self._startup_module())
+        startup_saved = (
+            None if isolated_startup is None else max(0.0, isolated_startup - overhead)
+        )
+        if success:
+            self.logger.info(f"✅ {self.name} ejecutado exitosamente")
+        saved_text = "" if startup_saved is None else f", arranque ahorrado ~{startup_saved:.2f}s"
+        self.logger.info(
+            f"{self.name} en proceso: {duration:.2f}s{saved_text}",
+            extra={
+                "event": "task_inprocess",
+                "task": self.name,
+                "duration_s": round(duration, 3),
+                "startup_saved_s": None if startup_saved is None else round(startup_saved, 3),
+            },
+        )
+        return {
+            "success": success,
+            "return_code": 0 if success else (-2 if error else 1),
+            "output": "",
+            "error": error,
+            "duration": duration,
+            "mode": "inprocess",
+            "startup_saved": startup_saved,
+        }
+
+    def _startup_module(self) -> str:
+        """Módulo de la lógica: clave de su coste de arranque aislado."""
+        return self._worker_logic_class().partition(":")[0]
+
+    def _worker_logic_class(self) -> str:
+        """``"modulo:Clase"`` que un trabajador del pool instancia para esta tarea."""
+        if self.logic_class is not None:
+            return self.logic_class
+        module = type(self).__module__
+        module = module[4:] if module.startswith("src.") else module
+        return f"{module}:{type(self).__qualname__}"
+
+    def _ejecutar_aislado(self) -> dict[str, Any]:
+        """Ejecuta la tarea fuera del maestro (contención de fallos).
+
+        Con un pool de trabajadores activo (``common.task_workers``) se envía a
+        un proceso precalentado; si no, se lanza el script en un intérprete nuevo.
+        """
+        pool = get_task_worker_pool()
+        if pool is not None:
+            self.logger.info(f"🚀 Iniciando ejecución de {self.name} (trabajador)")
+            try:
+                resultado = pool.run(self._worker_logic_class())
+            except Exception as e:
+                self.logger.warning(f"Pool de trabajadores no disponible ({e}); se usa subproceso")
+            else:
+                if resultado["success"]:
+                    self.logger.info(f"✅ {self.name} ejecutado exitosamente")
+                else:
+                    self.logger.error(f"❌ Error en {self.name}: {resultado['error']}")
+                return resultado
+        start = time.perf_counter()
         try:
             self.logger.info(f"🚀 Iniciando ejecución de {self.name}")
 
             # Ejecutar el script
-            date.today()
             result = subprocess.run(
                 ["python", str(self.script_path)],
                 cwd=str(self.project_root),
                 capture_output=True,
                 text=True,
                 timeout=1800,  # 30 minutos timeout
+                env=spawn_environment(),
             )
 
             success = result.returncode == 0
+            # El runner informa de lo que tardó en arrancar (intérprete + imports)
+            startup = parse_startup_marker(result.stdout)
+            if startup is not None:
+                record_startup_cost(self._startup_module(), startup)
 
             resultado = {
                 "success": success,
                 "return_code": result.returncode,
                 "output": result.stdout,
                 "error": result.stderr,
-                "duration": 0,  # Se podría calcular si es necesario
+                "duration": time.perf_counter() - start,
+                "mode": "isolated",
+                "startup": startup,
             }
 
             if success:
@@ -116,6 +331,7 @@ class BaseTask(ABC):
                 "output": "",
                 "error": "Timeout después de 30 minutos",
                 "duration": 1800,
+                "mode": "isolated",
             }
         except Exception as e:
             self.logger.error(f"❌ Error ejecutando {self.name}: {e}")
@@ -124,7 +340,8 @@ class BaseTask(ABC):
                 "return_code": -2,
                 "output": "",
                 "error": str(e),
-                "duration": 0,
+                "duration": time.perf_counter() - start,
+                "mode": "isolated",
             }
 
     @abstractmethod
@@ -156,6 +373,7 @@ class TareaDiaria(BaseTask):
         script_filename: str,
         task_names: list[str],
         frequency_days: int = 1,
+        databases: tuple[str, ...] = (),
     ):
         """
         Inicializa una tarea diaria
@@ -165,10 +383,13 @@ class TareaDiaria(BaseTask):
             script_filename: Nombre del archivo de script
             task_names: Lista de nombres de tareas en la BD (puede ser una sola)
             frequency_days: Frecuencia en días para ejecutar la tarea
+            databases: BD principales que usa la tarea (claves de Config); el
+                maestro no solapa más tareas por BD que su límite de concurrencia
         """
         super().__init__(name, script_filename)
         self.task_names = task_names if isinstance(task_names, list) else [task_names]
         self.frequency_days = frequency_days
+        self.databases = tuple(databases)
 
     def __enter__(self):
         """Entrada del context manager"""
@@ -305,6 +526,9 @@ def register_task_completion(
                     inserted = False
             if not inserted:
                 return False
+        cache = active_schedule_cache()
+        if cache is not None:
+            cache.record(task_name, execution_date)
         return True
     except Exception as e:  # pragma: no cover - defensivo
         _logging.error(f"Error registrando finalización de tarea {task_name}: {e}")
@@ -312,7 +536,16 @@ def register_task_completion(
 
 
 def get_last_task_execution_date(db_connection, task_name: str) -> Optional[date]:
-    """Obtiene la última fecha de ejecución de una tarea (o None)."""
+    """Obtiene la última fecha de ejecución de una tarea (o None).
+
+    Dentro de ``schedule_cycle`` se responde desde la caché del ciclo (una
+    consulta agrupada para todas las tareas) en lugar de consultar por nombre.
+    """
+    cache = active_schedule_cache()
+    if cache is not None:
+        cached = cache.lookup(db_connection, task_name)
+        if cached is not MISSING:
+            return cached
     try:
         query = """
             SELECT MAX(COALESCE(FechaEjecucion, Fecha)) as UltimaFecha
@@ -366,4 +599,6 @@ __all__ = [
     "register_task_completion",
     "get_last_task_execution_date",
     "should_execute_task",
+    "run_task_logic",
+    "use_shared_config",
 ]
@@ -1,12 +1,18 @@
 """
 Configuración del proyecto para manejo de diferentes entornos Windows con Access
 """
+import logging
 import os
 import warnings
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
+# Réplicas SQLite ausentes ya avisadas (una vez por ruta, no por consulta)
+_warned_missing_mirrors: set[str] = set()
+
 
 class Config:
     """Clase para manejar la configuración del proyecto.
@@ -81,10 +87,49 @@ class Config:
             },
         }
 
+        # Backend de BD: "access" (pyodbc) o "sqlite" (desarrollo/CI sin ODBC).
+        # Con sqlite cada BD lógica es <SQLITE_DB_DIR>/<nombre>.sqlite
+        self.db_backend = os.getenv("DB_BACKEND", "access").lower()
+        self.sqlite_db_dir = self.root_dir / os.getenv(
+            "SQLITE_DB_DIR", "dbs-locales/sqlite"
+        )
+
+        # Snapshot local de lectura: las BD de sólo lectura se copian a disco
+        # local (sólo si cambió tamaño/fecha) y los managers leen de la copia.
+        # Las escrituras siguen yendo al fichero maestro.
+        self.db_snapshot_enabled = (
+            os.getenv("DB_SNAPSHOT_ENABLED", "false").lower() == "true"
+        )
+        self.db_snapshot_dir = self.root_dir / os.getenv(
+            "DB_SNAPSHOT_DIR", "dbs-locales/snapshots"
+        )
+        self.db_snapshot_databases = {
+            name.strip().lower()
+            for name in os.getenv(
+                "DB_SNAPSHOT_DATABASES", "riesgos,agedys,expedientes,brass"
+            ).split(",")
+            if name.strip()
+        }
+        self._snapshot_cache = None
+
+        # Réplica SQLite indexada (job nocturno scripts/run_sqlite_mirror.py):
+        # las BD listadas se leen de <DB_MIRROR_DIR>/<nombre>.sqlite si existe
+        self.db_mirror_enabled = os.getenv("DB_MIRROR_ENABLED", "false").lower() == "true"
+        self.db_mirror_dir = self.root_dir / os.getenv(
+            "DB_MIRROR_DIR", "dbs-locales/mirror"
+        )
+        self.db_mirror_databases = {
+            name.strip().lower()
+            for name in os.getenv("DB_MIRROR_DATABASES", "riesgos,agedys").split(",")
+            if name.strip()
+        }
+
         # Construir mapa de rutas (db_paths) y exponer atributos legacy (db_<name>_path)
         self.db_paths = {}
         for name, data in self._db_definitions.items():
-            if self.environment == "local":
+            if self.db_backend == "sqlite":
+                path = self.sqlite_db_dir / f"{name}.sqlite"
+            elif self.environment == "local":
                 raw = os.getenv(data["env_local"], data["default_local"])
                 path = (
                     self.root_dir / raw if not raw.startswith("\\\\") else Path(raw)
@@ -200,7 +245,87 @@ class Config:
 
     def get_db_connection_string(self, db_type: str, with_password: bool = True) -> str:
         """Construye la cadena de conexión para una BD dada."""
+        return self._build_connection_string(
+            self.get_database_path(db_type), with_password
+        )
+
+    def get_db_read_connection_string(
+        self, db_type: str, with_password: bool = True
+    ) -> str:
+        """Cadena de conexión para consultas de sólo lectura.
+
+        Con ``DB_MIRROR_ENABLED`` y ``db_type`` en ``DB_MIRROR_DATABASES`` apunta
+        a la réplica SQLite si ya existe. Si no, con ``DB_SNAPSHOT_ENABLED`` y
+        ``db_type`` en ``DB_SNAPSHOT_DATABASES`` apunta a la copia local
+        (refrescada si el maestro cambió). En otro caso, o si la copia falla,
+        devuelve la del fichero maestro.
+        """
+        if self.db_mirror_enabled and db_type in self.db_mirror_databases:
+            mirror = self.get_database_mirror_path(db_type)
+            if mirror.exists():
+                return self._build_connection_string(mirror, with_password)
+            if str(mirror) not in _warned_missing_mirrors:
+                _warned_missing_mirrors.add(str(mirror))
+                logger.warning(
+                    f"Réplica SQLite de '{db_type}' no construida ({mirror}); se usa Access",
+                    extra={"event": "db_mirror_missing", "database": db_type},
+                )
         path = self.get_database_path(db_type)
+        info = self._ensure_snapshot(db_type)
+        if info is not None:
+            path = info.path
+        return self._build_connection_string(path, with_password)
+
+    def _ensure_snapshot(self, db_type: str):
+        """Refresca la copia local de ``db_type`` si el maestro cambió.
+
+        Antes de sustituir la copia se reciclan los pools abiertos sobre ella.
+        Devuelve el ``SnapshotInfo`` o None sin modo snapshot para ``db_type``.
+        """
+        if not (
+            self.db_snapshot_enabled
+            and db_type in self.db_snapshot_databases
+            and self.db_backend != "sqlite"
+        ):
+            return None
+        from .db.access_connection_pool import pool_registry
+
+        if self._snapshot_cache is None:
+            from .db.snapshot import SnapshotCache
+
+            self._snapshot_cache = SnapshotCache(self.db_snapshot_dir)
+        return self._snapshot_cache.ensure(
+            db_type, self.get_database_path(db_type), before_replace=pool_registry.recycle_file
+        )
+
+    def refresh_read_snapshots(self, databases=None) -> dict:
+        """Refresca las copias locales al empezar cada ejecución.
+
+        Las tareas y sus pools se construyen una vez por proceso (maestro o
+        trabajador), así que la frescura no puede comprobarse sólo al crear la
+        cadena de conexión. La ruta de la copia no cambia: los pools que
+        apuntaban al fichero anterior se reciclan y reabren sobre el nuevo.
+
+        Args:
+            databases: BD lógicas a refrescar (por defecto todas las de snapshot)
+
+        Returns:
+            ``{db_type: SnapshotInfo o None}`` de las BD en modo snapshot
+        """
+        names = self.db_snapshot_databases if databases is None else databases
+        results = {}
+        for db_type in names:
+            db_type = db_type.lower()
+            if db_type in self.db_snapshot_databases:
+                results[db_type] = self._ensure_snapshot(db_type)
+        return results
+
+    def get_database_mirror_path(self, db_type: str) -> Path:
+        """Ruta de la réplica SQLite de una BD (exista o no)."""
+        self.get_database_path(db_type)  # valida db_type
+        return self.db_mirror_dir / f"{db_type}.sqlite"
+
+    def _build_connection_string(self, path: Path, with_password: bool = True) -> str:
         if with_password and self.db_password:
             return (
                 f"Driver={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={path};"
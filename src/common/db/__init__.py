@@ -6,14 +6,24 @@ si aún existe código que lo requiera durante la transición.
 """
 
 from .database import AccessDatabase  # noqa: F401
+from .row import Row  # noqa: F401
+from .id_allocator import IdAllocator  # noqa: F401
+from .async_database import AsyncAccessDatabase  # noqa: F401
+from .parallel import run_parallel  # noqa: F401
+from .transaction import TransactionRollbackError  # noqa: F401
+from .write_queue import WriteBehindQueue, get_write_queue, write_queues  # noqa: F401
 from .access_connection_pool import (  # noqa: F401
 	AccessConnectionPool,
+	PoolRegistry,
+	QueryTimeoutError,
+	pool_registry,
 	get_tareas_connection_pool,
 	get_correos_connection_pool,
 	get_agedys_connection_pool,
 	get_expedientes_connection_pool,
 	get_nc_connection_pool,
 	get_brass_connection_pool,
+	get_riesgos_connection_pool,
 )
 
 # Backward compatibility: permitir `import common.database`.
@@ -9,6 +9,20 @@ Características:
 - Manejo de locks para operaciones críticas
 - Reutilización de conexiones
 - Timeout configurable
+- Validación en segundo plano de conexiones ociosas (sin I/O en la devolución)
+- Reciclado de conexiones por antigüedad máxima o inactividad
+- Caché LRU de cursores preparados por conexión (clave: texto SQL)
+- ``row_factory`` opcional para filas compactas (ver ``common.db.row``)
+- Registro de pools por BD lógica (``pool_registry``) configurable por entorno
+- Espera justa (FIFO) por conexiones sin bloquear el lock de estadísticas
+- ``transaction()``: varias operaciones con un único commit (ver ``transaction``)
+- Backend SQLite para desarrollo/CI si la cadena apunta a un ``.sqlite``
+- Histograma de tiempos de espera por conexión en ``get_stats()``
+- Latencia, espera y filas por huella de SQL (``get_stats()["queries"]`` y
+  eventos ``db_query`` / ``db_query_stats``)
+- Timeout por sentencia (por pool y por llamada): ``connection.timeout`` del
+  driver más un vigilante que cancela el cursor; la conexión se descarta y se
+  cuenta en ``query_timeouts``
 - Logging detallado para debugging
 
 Autor: Sistema de Automatización
@@ -16,10 +30,19 @@ Fecha: 2025
 """
 
 import logging
+import math
+import os
 import threading
+import time
+from collections import OrderedDict, deque
 from contextlib import contextmanager
-from queue import Empty, Queue
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+
+from . import sqlite_backend
+from .id_allocator import db_scope
+from .metrics import LatencyHistogram, QueryStats, fingerprint_id, fingerprint_sql
+from .row import RowFactory, row_converter
+from .transaction import UnitOfWork
 
 try:
     import pyodbc
@@ -31,6 +54,218 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------------
+# Timeout de sentencias
+# ---------------------------------------------------------------------------
+# SQLSTATE de timeout / cancelación devueltos por el driver ODBC
+_TIMEOUT_SQLSTATES = ("HYT00", "HYT01", "HY008")
+
+
+class QueryTimeoutError(TimeoutError):
+    """La sentencia superó su timeout y se canceló (la conexión se descarta)."""
+
+
+def _is_timeout_error(error: BaseException) -> bool:
+    args = getattr(error, "args", ())
+    return bool(args) and isinstance(args[0], str) and args[0] in _TIMEOUT_SQLSTATES
+
+
+class _StatementTimeout:
+    """Limita la duración de una sentencia (ejecución y lectura del resultado).
+
+    Fija ``connection.timeout`` (timeout de consulta del driver, en segundos
+    enteros) y arranca un temporizador que llama a ``cursor.cancel()`` al
+    vencer, por si el driver de Access ignora el atributo. Al salir, si venció
+    el plazo o el driver devolvió un SQLSTATE de timeout, lanza
+    ``QueryTimeoutError``.
+    """
+
+    def __init__(self, connection: Any, seconds: float, query: str = ""):
+        self.connection = connection
+        self.seconds = seconds
+        self.query = query
+        self.cursor = None
+        self.fired = False
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._previous = None
+
+    def attach(self, cursor: Any) -> None:
+        with self._lock:
+            self.cursor = cursor
+            fired = self.fired
+        if fired:
+            self._cancel_cursor(cursor)
+
+    def _cancel_cursor(self, cursor: Any) -> None:
+        try:
+            cursor.cancel()
+        except Exception as e:
+            logger.debug(f"No se pudo cancelar la sentencia: {e}")
+
+    def _expire(self) -> None:
+        with self._lock:
+            self.fired = True
+            cursor = self.cursor
+        if cursor is not None:
+            self._cancel_cursor(cursor)
+
+    def __enter__(self) -> "_StatementTimeout":
+        self._previous = getattr(self.connection, "timeout", None)
+        try:
+            self.connection.timeout = max(1, math.ceil(self.seconds))
+        except Exception:
+            pass
+        self._timer = threading.Timer(self.seconds, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._timer.cancel()
+        try:
+            self.connection.timeout = self._previous or 0
+        except Exception:
+            pass
+        if self.fired or (exc is not None and _is_timeout_error(exc)):
+            raise QueryTimeoutError(
+                f"Sentencia cancelada tras superar el timeout de {self.seconds}s"
+            ) from exc
+
+
+# ---------------------------------------------------------------------------
+# Helpers de escritura por lotes (compartidos con AccessDatabase en modo legacy)
+# ---------------------------------------------------------------------------
+def _build_insert_batches(
+    table: str, rows: list[dict[str, Any]]
+) -> list[tuple[str, list[tuple[int, tuple]]]]:
+    """Agrupa filas por conjunto de columnas para un ``INSERT`` por grupo.
+
+    Returns:
+        Lista de (sql, [(índice_original, valores), ...]) preservando el orden
+        de aparición de cada grupo.
+    """
+    batches: dict[tuple, tuple[str, list[tuple[int, tuple]]]] = {}
+    for index, row in enumerate(rows):
+        fields = tuple(row.keys())
+        if fields not in batches:
+            placeholders = ", ".join(["?"] * len(fields))
+            sql = f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({placeholders})"
+            batches[fields] = (sql, [])
+        batches[fields][1].append((index, tuple(row.values())))
+    return list(batches.values())
+
+
+def _build_update_batches(
+    table: str, rows: list[dict[str, Any]], key_fields: list[str]
+) -> list[tuple[str, list[tuple[int, tuple]]]]:
+    """Agrupa filas por columnas a actualizar para un ``UPDATE ... WHERE`` por grupo.
+
+    Cada fila debe incluir todos los ``key_fields``; el resto de columnas
+    forman la cláusula SET.
+    """
+    if not key_fields:
+        raise ValueError("key_fields es requerido para update_many")
+    batches: dict[tuple, tuple[str, list[tuple[int, tuple]]]] = {}
+    for index, row in enumerate(rows):
+        missing = [k for k in key_fields if k not in row]
+        if missing:
+            raise ValueError(f"Fila {index} sin campos clave: {missing}")
+        set_fields = tuple(f for f in row.keys() if f not in key_fields)
+        if not set_fields:
+            raise ValueError(f"Fila {index} sin campos a actualizar")
+        if set_fields not in batches:
+            set_clause = ", ".join(f"{f} = ?" for f in set_fields)
+            where_clause = " AND ".join(f"{k} = ?" for k in key_fields)
+            sql = f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
+            batches[set_fields] = (sql, [])
+        values = tuple(row[f] for f in set_fields) + tuple(row[k] for k in key_fields)
+        batches[set_fields][1].append((index, values))
+    return list(batches.values())
+
+
+def _execute_batches(
+    connection,
+    batches: list[tuple[str, list[tuple[int, tuple]]]],
+    total: int,
+    fast_executemany: bool = True,
+    owns_transaction: bool = True,
+) -> list[bool]:
+    """Ejecuta los lotes con ``executemany`` sobre una única conexión.
+
+    No hace commit: el llamador controla la transacción. Si un lote falla,
+    ``executemany`` puede haber aplicado ya parte de sus filas, así que se
+    revierte la transacción (incluidos los lotes anteriores) y se vuelven a
+    ejecutar todas las filas una a una para identificar las que fallan. Con
+    ``owns_transaction=False`` (transacción del llamador, que no se puede
+    revertir a medias) la excepción se propaga.
+
+    Returns:
+        Lista de resultados por fila (mismo orden que las filas de entrada).
+    """
+    try:
+        for sql, items in batches:
+            cursor = connection.cursor()
+            if fast_executemany and hasattr(cursor, "fast_executemany"):
+                try:
+                    cursor.fast_executemany = True
+                except Exception:  # pragma: no cover - driver sin soporte
+                    pass
+            try:
+                cursor.executemany(sql, [values for _, values in items])
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+        return [True] * total
+    except Exception as e:
+        if not owns_transaction:
+            raise
+        logger.warning(
+            f"executemany falló ({total} filas), lote revertido; reintentando fila a fila: {e}"
+        )
+        connection.rollback()
+    outcomes = [False] * total
+    cursor = connection.cursor()
+    try:
+        for sql, items in batches:
+            for index, values in items:
+                try:
+                    cursor.execute(sql, values)
+                    outcomes[index] = True
+                except Exception as e:
+                    logger.error(f"Error en fila {index} del lote: {e}")
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+    return outcomes
+
+
+def _close_quietly(cursor) -> None:
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+class _Waiter:
+    """Hilo en espera de conexión (entrada de la cola FIFO del pool).
+
+    Al liberarse capacidad se le asigna directamente una ``connection`` ociosa
+    o se le reserva un hueco (``may_create``) para abrir una nueva.
+    """
+
+    __slots__ = ("event", "connection", "may_create")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.connection = None
+        self.may_create = False
+
+
 class AccessConnectionPool:
     """
     Pool de conexiones thread-safe para bases de datos Access.
@@ -40,7 +275,16 @@ class AccessConnectionPool:
     """
 
     def __init__(
-        self, connection_string: str, max_connections: int = 3, timeout: int = 30
+        self,
+        connection_string: str,
+        max_connections: int = 3,
+        timeout: int = 30,
+        validation_interval: Optional[float] = 60,
+        max_age: Optional[float] = 3600,
+        max_idle: Optional[float] = 600,
+        statement_cache_size: int = 32,
+        row_factory: Optional[RowFactory] = None,
+        query_timeout: Optional[float] = None,
     ):
         """
         Inicializa el pool de conexiones.
@@ -49,16 +293,51 @@ class AccessConnectionPool:
             connection_string: Cadena de conexión a Access
             max_connections: Número máximo de conexiones simultáneas
             timeout: Timeout en segundos para obtener una conexión
+            validation_interval: Segundos entre pasadas del validador en segundo
+                plano sobre conexiones ociosas (None o 0 lo desactiva)
+            max_age: Antigüedad máxima en segundos antes de reciclar una conexión
+                (None desactiva el reciclado por antigüedad)
+            max_idle: Segundos de inactividad tras los que se descarta una conexión
+                ociosa (None desactiva el desalojo por inactividad)
+            statement_cache_size: Cursores preparados que se conservan por
+                conexión para consultas parametrizadas (0 desactiva la caché)
+            row_factory: Constructor de filas por defecto (p.ej. ``Row``); None
+                mantiene un dict por fila
+            query_timeout: Segundos máximos por sentencia (ejecución y lectura);
+                None o 0 sin límite. Cada llamada puede indicar su ``timeout``
         """
         self.connection_string = connection_string
         self.max_connections = max_connections
         self.timeout = timeout
-
-        # Pool de conexiones disponibles
-        self._pool = Queue(maxsize=max_connections)
+        self.validation_interval = validation_interval
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self.statement_cache_size = statement_cache_size
+        self.row_factory = row_factory
+        self.query_timeout = query_timeout
+
+        # Inventario: conexiones ociosas (pila LIFO), todas las creadas y cola
+        # FIFO de hilos en espera. Protegido por ``_cond``; el lock nunca se
+        # mantiene durante I/O ni durante la espera de un hilo.
+        self._idle: deque = deque()
         self._all_connections = []
-        self._lock = threading.RLock()  # Lock reentrante para operaciones críticas
         self._created_connections = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._cond = threading.Lock()
+        # Lock de estadísticas (sólo secciones cortas, nunca I/O)
+        self._lock = threading.RLock()
+        # Serializa las escrituras críticas (update_record / update_many)
+        self._write_lock = threading.RLock()
+        # Unidad de trabajo activa por hilo (conexión fijada por transaction())
+        self._tx_local = threading.local()
+        # Metadatos por conexión (id(conn) -> created_at / last_used, reloj monotónico)
+        self._conn_meta: dict[int, dict[str, float]] = {}
+        # Caché de cursores preparados por conexión (id(conn) -> {sql: cursor}, LRU)
+        self._stmt_cache: dict[int, OrderedDict] = {}
+
+        # Validador en segundo plano (arranque perezoso en la primera devolución)
+        self._validator_thread: Optional[threading.Thread] = None
+        self._validator_stop = threading.Event()
 
         # Estadísticas
         self._stats = {
@@ -68,86 +347,372 @@ class AccessConnectionPool:
             "operations_failed": 0,
             "concurrent_operations": 0,
             "max_concurrent": 0,
+            "validations": 0,
+            "validation_failures": 0,
+            "evictions": 0,
+            "recycled": 0,
+            "statement_cache_hits": 0,
+            "statement_cache_misses": 0,
+            "waits": 0,
+            "wait_timeouts": 0,
+            "query_timeouts": 0,
         }
+        self._wait_histogram = LatencyHistogram()
+        # Latencia/espera/filas por huella de SQL (execute_query / execute_non_query)
+        self._query_stats = QueryStats()
 
         logger.info(
             f"AccessConnectionPool inicializado - Max conexiones: {max_connections}, "
-            f"Timeout: {timeout}s"
+            f"Timeout: {timeout}s, Validación: {validation_interval}s, "
+            f"Max edad: {max_age}s, Max inactividad: {max_idle}s"
         )
 
     def _create_connection(self):
-        """Crea una nueva conexión a Access"""
-        if not PYODBC_AVAILABLE:
+        """Crea una nueva conexión a Access.
+
+        El hueco en ``_created_connections`` lo reserva el llamador antes de
+        invocar este método, fuera de cualquier lock (la apertura es I/O).
+        """
+        use_sqlite = sqlite_backend.is_sqlite_target(self.connection_string)
+        if not use_sqlite and not PYODBC_AVAILABLE:
             raise ImportError("pyodbc es requerido para conexiones Access")
 
         try:
-            connection = pyodbc.connect(self.connection_string)
+            if use_sqlite:
+                connection = sqlite_backend.connect(self.connection_string)
+            else:
+                connection = pyodbc.connect(self.connection_string)
             connection.autocommit = False  # Manejo manual de transacciones
-            self._created_connections += 1
-            self._stats["connections_created"] += 1
-            self._all_connections.append(connection)
+            now = time.monotonic()
+            with self._cond:
+                self._all_connections.append(connection)
+                self._conn_meta[id(connection)] = {"created_at": now, "last_used": now}
+                total = self._created_connections
+            with self._lock:
+                self._stats["connections_created"] += 1
 
-            logger.debug(
-                f"Nueva conexión Access creada (Total: {self._created_connections})"
-            )
+            logger.debug(f"Nueva conexión Access creada (Total: {total})")
             return connection
 
         except Exception as e:
             logger.error(f"Error creando conexión Access: {e}")
             raise
 
+    def _open_reserved_slot(self):
+        """Abre una conexión para un hueco ya reservado; lo libera si falla."""
+        try:
+            return self._create_connection()
+        except Exception:
+            with self._cond:
+                self._created_connections -= 1
+                self._grant_slot_locked()
+            raise
+
+    def _grant_slot_locked(self):
+        """Cede un hueco libre al primer hilo en espera (requiere ``_cond``)."""
+        if self._waiters and self._created_connections < self.max_connections:
+            waiter = self._waiters.popleft()
+            self._created_connections += 1
+            waiter.may_create = True
+            waiter.event.set()
+
     def _get_connection(self):
-        """Obtiene una conexión del pool o crea una nueva si es necesario"""
+        """Obtiene una conexión del pool o crea una nueva si es necesario.
+
+        Orden de intento:
+          1. Camino rápido sin lock: ``deque.pop`` es atómico, y sólo hay
+             conexiones ociosas cuando no hay nadie esperando.
+          2. Bajo ``_cond`` (sección corta): conexión ociosa, reserva de hueco
+             para crear una nueva o alta en la cola FIFO de espera.
+          3. Espera sin lock sobre el evento propio hasta que otro hilo le
+             entregue una conexión o un hueco, o venza ``timeout``.
+        """
+        start = time.monotonic()
         try:
-            # Intentar obtener una conexión existente del pool
-            connection = self._pool.get_nowait()
-            self._stats["connections_reused"] += 1
+            connection = self._idle.pop()
+        except IndexError:
+            connection = None
+        if connection is not None:
+            self._record_acquire(start, reused=True)
             logger.debug("Conexión reutilizada del pool")
             return connection
 
-        except Empty:
-            # No hay conexiones disponibles en el pool
-            with self._lock:
-                if self._created_connections < self.max_connections:
-                    # Crear nueva conexión
-                    return self._create_connection()
+        waiter = None
+        with self._cond:
+            if self._idle:
+                connection = self._idle.pop()
+            elif self._created_connections < self.max_connections:
+                self._created_connections += 1
+            else:
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+
+        if connection is not None:
+            self._record_acquire(start, reused=True)
+            return connection
+        if waiter is None:
+            connection = self._open_reserved_slot()
+            self._record_acquire(start, reused=False)
+            return connection
+
+        logger.debug(
+            f"Pool lleno, esperando conexión disponible (timeout: {self.timeout}s)"
+        )
+        if not waiter.event.wait(self.timeout):
+            with self._cond:
+                timed_out = not waiter.event.is_set()
+                if timed_out:
+                    self._waiters.remove(waiter)
+            if timed_out:
+                with self._lock:
+                    self._stats["waits"] += 1
+                    self._stats["wait_timeouts"] += 1
+                    self._wait_histogram.observe(time.monotonic() - start)
+                raise TimeoutError(
+                    f"Timeout esperando conexión después de {self.timeout}s"
+                )
+            # La entrega llegó justo al vencer el plazo: se aprovecha
+
+        if waiter.connection is not None:
+            self._record_acquire(start, reused=True, waited=True)
+            return waiter.connection
+        connection = self._open_reserved_slot()
+        self._record_acquire(start, reused=False, waited=True)
+        return connection
+
+    def _record_acquire(self, start: float, reused: bool, waited: bool = False):
+        with self._lock:
+            if reused:
+                self._stats["connections_reused"] += 1
+            if waited:
+                self._stats["waits"] += 1
+            self._wait_histogram.observe(time.monotonic() - start)
+
+    def _release(self, connection, front: bool = False):
+        """Entrega la conexión al primer hilo en espera o la deja ociosa."""
+        with self._cond:
+            # Conexión huérfana (p.ej. devuelta tras ``close_all``): se cierra
+            orphan = connection not in self._all_connections
+            if not orphan:
+                if self._waiters:
+                    waiter = self._waiters.popleft()
+                    waiter.connection = connection
+                    waiter.event.set()
+                elif front:
+                    self._idle.appendleft(connection)
                 else:
-                    # Esperar por una conexión disponible
-                    logger.debug(
-                        f"Pool lleno, esperando conexión disponible (timeout: {self.timeout}s)"
-                    )
-                    try:
-                        connection = self._pool.get(timeout=self.timeout)
-                        self._stats["connections_reused"] += 1
-                        return connection
-                    except Empty:
-                        raise TimeoutError(
-                            f"Timeout esperando conexión después de {self.timeout}s"
-                        )
-
-    def _return_connection(self, connection):
-        """Devuelve una conexión al pool"""
+                    self._idle.append(connection)
+        if orphan:
+            self._clear_statement_cache(connection)
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def _discard_connection(self, connection, reason: str = ""):
+        """Cierra una conexión y la elimina del inventario del pool."""
+        with self._cond:
+            if connection in self._all_connections:
+                self._all_connections.remove(connection)
+                self._created_connections -= 1
+            self._conn_meta.pop(id(connection), None)
+            # El hueco liberado pasa al primer hilo en espera
+            self._grant_slot_locked()
+        self._clear_statement_cache(connection)
         try:
-            # Verificar que la conexión sigue siendo válida
-            cursor = connection.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
+            connection.close()
+        except Exception:
+            pass
+        if reason:
+            logger.debug(f"Conexión descartada ({reason})")
+
+    def _is_expired(self, connection, now: float) -> bool:
+        """Indica si la conexión supera la antigüedad máxima configurada."""
+        if not self.max_age:
+            return False
+        meta = self._conn_meta.get(id(connection))
+        return meta is not None and now - meta["created_at"] >= self.max_age
 
-            # Devolver al pool
-            self._pool.put_nowait(connection)
-            logger.debug("Conexión devuelta al pool")
+    def _return_connection(self, connection, discard: bool = False):
+        """Devuelve una conexión al pool.
 
-        except Exception as e:
-            logger.warning(f"Conexión inválida descartada: {e}")
-            # Remover de la lista de conexiones
-            with self._lock:
-                if connection in self._all_connections:
-                    self._all_connections.remove(connection)
-                    self._created_connections -= 1
-                try:
-                    connection.close()
-                except Exception:
-                    pass
+        No realiza I/O: la validación, el reciclado por ``max_age`` y el desalojo
+        por inactividad los hace el validador en segundo plano sobre conexiones
+        ociosas. Sólo se descarta aquí la conexión marcada explícitamente como
+        inválida (p.ej. si falló el rollback).
+        """
+        if discard:
+            logger.warning("Conexión inválida descartada")
+            self._discard_connection(connection, "inválida")
+            return
+
+        meta = self._conn_meta.get(id(connection))
+        if meta is not None:
+            meta["last_used"] = time.monotonic()
+        self._release(connection)
+        logger.debug("Conexión devuelta al pool")
+        self._ensure_validator()
+
+    # ------------------------------------------------------------------
+    # Caché de cursores preparados
+    # ------------------------------------------------------------------
+    def _get_cursor(self, connection, query: str, cacheable: bool = True):
+        """Devuelve un cursor para ``query`` reutilizando el preparado si existe.
+
+        pyodbc conserva en cada cursor el último statement preparado, de modo que
+        reejecutar el mismo texto SQL sobre el mismo cursor evita el reparseo del
+        driver. Sólo se cachean consultas parametrizadas: el SQL con literales
+        embebidos rara vez se repite y expulsaría las entradas útiles.
+
+        pyodbc aplica ``connection.timeout`` al crear el cursor, así que un
+        cursor cacheado con otro timeout (p.ej. creado antes de que
+        ``_statement`` fijara el de la llamada) se sustituye por uno nuevo.
+        La caché y sus contadores se protegen con ``_lock`` porque
+        ``get_stats`` los recorre desde otros hilos.
+        """
+        if not cacheable or self.statement_cache_size <= 0:
+            return connection.cursor()
+        timeout = getattr(connection, "timeout", None)
+        stale = None
+        with self._lock:
+            cache = self._stmt_cache.setdefault(id(connection), OrderedDict())
+            entry = cache.get(query)
+            if entry is not None and entry[1] == timeout:
+                cache.move_to_end(query)
+                self._stats["statement_cache_hits"] += 1
+                return entry[0]
+            if entry is not None:
+                stale = cache.pop(query)[0]
+            self._stats["statement_cache_misses"] += 1
+        if stale is not None:
+            _close_quietly(stale)
+        cursor = connection.cursor()
+        evicted = []
+        with self._lock:
+            cache = self._stmt_cache.setdefault(id(connection), OrderedDict())
+            cache[query] = (cursor, timeout)
+            while len(cache) > self.statement_cache_size:
+                evicted.append(cache.popitem(last=False)[1][0])
+        for oldest in evicted:
+            _close_quietly(oldest)
+        return cursor
+
+    def _forget_cursor(self, connection, query: str):
+        """Elimina de la caché un cursor que falló (su estado no es fiable)."""
+        with self._lock:
+            cache = self._stmt_cache.get(id(connection))
+            entry = cache.pop(query, None) if cache else None
+        if entry is not None:
+            _close_quietly(entry[0])
+
+    def _clear_statement_cache(self, connection):
+        with self._lock:
+            cache = self._stmt_cache.pop(id(connection), None)
+        for cursor, _timeout in (cache or {}).values():
+            _close_quietly(cursor)
+
+    def _execute(self, connection, query: str, params: Optional[tuple], guard=None):
+        """Ejecuta ``query`` con cursor cacheado cuando hay parámetros.
+
+        ``guard`` (de ``_statement``) recibe el cursor para poder cancelarlo.
+        """
+        cursor = self._get_cursor(connection, query, cacheable=bool(params))
+        if guard is not None:
+            guard.attach(cursor)
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+        except Exception:
+            if params:
+                self._forget_cursor(connection, query)
+            raise
+        return cursor
+
+    # ------------------------------------------------------------------
+    # Validación en segundo plano
+    # ------------------------------------------------------------------
+    def _ensure_validator(self):
+        """Arranca el hilo validador si está habilitado y no está en marcha."""
+        if not self.validation_interval or self._validator_stop.is_set():
+            return
+        if self._validator_thread is not None and self._validator_thread.is_alive():
+            return
+        with self._lock:
+            if self._validator_thread is not None and self._validator_thread.is_alive():
+                return
+            self._validator_thread = threading.Thread(
+                target=self._validator_loop,
+                name="AccessPoolValidator",
+                daemon=True,
+            )
+            self._validator_thread.start()
+            logger.debug(
+                f"Validador de conexiones iniciado (intervalo: {self.validation_interval}s)"
+            )
+
+    def _validator_loop(self):
+        while not self._validator_stop.wait(self.validation_interval):
+            try:
+                self.validate_idle_connections()
+            except Exception as e:  # pragma: no cover - defensivo
+                logger.warning(f"Error en validador de conexiones: {e}")
+
+    def validate_idle_connections(self) -> dict[str, int]:
+        """Revisa una vez las conexiones ociosas del pool.
+
+        Cada conexión ociosa se saca del pool y:
+          - se recicla si supera ``max_age``
+          - se desaloja si lleva más de ``max_idle`` segundos sin uso
+          - en otro caso se valida con ``SELECT 1`` y vuelve al pool si responde
+
+        Las conexiones en uso no se tocan.
+
+        Returns:
+            Conteo de la pasada: validated, failed, evicted, recycled
+        """
+        summary = {"validated": 0, "failed": 0, "evicted": 0, "recycled": 0}
+        for _ in range(len(self._idle)):
+            # Se toma la más antigua (fondo de la pila) y vuelve al mismo sitio
+            with self._cond:
+                if not self._idle:
+                    break
+                connection = self._idle.popleft()
+
+            now = time.monotonic()
+            meta = self._conn_meta.get(id(connection))
+            if self._is_expired(connection, now):
+                summary["recycled"] += 1
+                self._discard_connection(connection, "antigüedad máxima alcanzada")
+                continue
+            if self.max_idle and meta is not None and now - meta["last_used"] >= self.max_idle:
+                summary["evicted"] += 1
+                self._discard_connection(connection, "inactividad")
+                continue
+
+            try:
+                cursor = connection.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+            except Exception as e:
+                summary["failed"] += 1
+                logger.warning(f"Conexión inválida descartada por el validador: {e}")
+                self._discard_connection(connection)
+                continue
+
+            summary["validated"] += 1
+            self._release(connection, front=True)
+
+        with self._lock:
+            self._stats["validations"] += summary["validated"] + summary["failed"]
+            self._stats["validation_failures"] += summary["failed"]
+            self._stats["evictions"] += summary["evicted"]
+            self._stats["recycled"] += summary["recycled"]
+
+        if any(summary.values()):
+            logger.debug(f"Validación de conexiones ociosas: {summary}")
+        return summary
 
     @contextmanager
     def get_connection(self):
@@ -160,7 +725,24 @@ class AccessConnectionPool:
                 cursor.execute("SELECT * FROM tabla")
                 results = cursor.fetchall()
         """
+        with self._acquire() as (connection, _wait):
+            yield connection
+
+    @contextmanager
+    def _acquire(self):
+        """Como ``get_connection`` pero entrega también la espera en segundos.
+
+        La espera incluye la cola FIFO y, si hizo falta, la apertura de una
+        conexión nueva.
+        """
+        uow = getattr(self._tx_local, "uow", None)
+        if uow is not None:
+            # Dentro de transaction(): conexión fijada, sin commit ni devolución
+            yield uow.connection, 0.0
+            return
+
         connection = None
+        discard = False
         try:
             # Actualizar estadísticas de concurrencia
             with self._lock:
@@ -168,24 +750,30 @@ class AccessConnectionPool:
                 if self._stats["concurrent_operations"] > self._stats["max_concurrent"]:
                     self._stats["max_concurrent"] = self._stats["concurrent_operations"]
 
+            wait_start = time.perf_counter()
             connection = self._get_connection()
+            wait = time.perf_counter() - wait_start
             logger.debug(
                 f"Conexión obtenida - Operaciones concurrentes: {self._stats['concurrent_operations']}"
             )
 
-            yield connection
+            yield connection, wait
 
             # Commit automático si no hubo errores
             connection.commit()
             self._stats["operations_completed"] += 1
 
         except Exception as e:
+            if isinstance(e, QueryTimeoutError):
+                # Sentencia cancelada: el estado de la conexión no es fiable
+                discard = True
             # Rollback en caso de error
             if connection:
                 try:
                     connection.rollback()
                 except Exception:
-                    pass
+                    # Si ni siquiera admite rollback la conexión no es reutilizable
+                    discard = True
 
             self._stats["operations_failed"] += 1
             logger.error(f"Error en operación de base de datos: {e}")
@@ -194,46 +782,273 @@ class AccessConnectionPool:
         finally:
             # Devolver conexión al pool y actualizar estadísticas
             if connection:
-                self._return_connection(connection)
+                self._return_connection(connection, discard=discard)
 
             with self._lock:
                 self._stats["concurrent_operations"] -= 1
 
-    def execute_query(
-        self, query: str, params: Optional[tuple] = None
+    @contextmanager
+    def transaction(self):
+        """Unidad de trabajo: fija una conexión al hilo y hace un único commit.
+
+        Las operaciones del pool dentro del bloque (desde el mismo hilo) usan
+        esa conexión sin commit intermedio. Al salir se hace commit, o rollback
+        si hubo excepción. Los bloques anidados se comportan como savepoints
+        (ver ``common.db.transaction``).
+
+        Usage:
+            with pool.transaction():
+                pool.insert_record("TbCorreosEnviados", {...})
+                pool.execute_non_query("UPDATE TbTareas SET ...", (...))
+        """
+        uow = getattr(self._tx_local, "uow", None)
+        if uow is not None:
+            with uow.savepoint() as connection:
+                yield connection
+            return
+        with self._acquire() as (connection, _wait):
+            uow = UnitOfWork(connection)
+            self._tx_local.uow = uow
+            try:
+                yield connection
+                uow.check_commit()
+            finally:
+                self._tx_local.uow = None
+
+    def in_transaction(self) -> bool:
+        """True si el hilo actual está dentro de ``transaction()``."""
+        return getattr(self._tx_local, "uow", None) is not None
+
+    @contextmanager
+    def _statement(self, connection, query: str, timeout: Optional[float] = None):
+        """Ámbito de una sentencia con el timeout efectivo (llamada o pool).
+
+        Entrega un ``_StatementTimeout`` (o None sin límite) al que se asocia
+        el cursor con ``attach`` para poder cancelarlo.
+        """
+        seconds = self.query_timeout if timeout is None else timeout
+        if not seconds or seconds <= 0:
+            yield None
+            return
+        try:
+            with _StatementTimeout(connection, seconds, query) as guard:
+                yield guard
+        except QueryTimeoutError:
+            with self._lock:
+                self._stats["query_timeouts"] += 1
+            fp_id = fingerprint_id(fingerprint_sql(query))
+            logger.warning(
+                f"Sentencia cancelada por timeout ({seconds}s) fp={fp_id}",
+                extra={"event": "db_query_timeout", "fingerprint": fp_id, "timeout_s": seconds},
+            )
+            raise
+
+    def _observe_query(
+        self, query: str, elapsed: float, wait: float, rows: Optional[int]
+    ) -> None:
+        """Agrega una ejecución a ``query_stats`` y emite el evento ``db_query``.
+
+        ``rows`` es None si la sentencia falló. El evento por sentencia se
+        emite en DEBUG para no penalizar la ejecución normal; el resumen por
+        huella sale en INFO con ``log_query_stats``.
+        """
+        with self._lock:
+            entry = self._query_stats.observe(query, elapsed, wait, rows)
+            fp_id = entry.id
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"db_query fp={fp_id} ms={elapsed * 1000:.1f} "
+                f"wait_ms={wait * 1000:.1f} rows={rows if rows is not None else -1}",
+                extra={
+                    "event": "db_query",
+                    "fingerprint": fp_id,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "wait_ms": round(wait * 1000, 3),
+                    "rows": rows,
+                    "ok": rows is not None,
+                },
+            )
+
+    def log_query_stats(
+        self, limit: Optional[int] = 20, label: str = ""
     ) -> list[dict[str, Any]]:
-        """Ejecuta una consulta SELECT de forma thread-safe"""
-        with self.get_connection() as connection:
-            cursor = connection.cursor()
+        """Emite un evento ``db_query_stats`` por huella (las más costosas primero).
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+        El mensaje va en formato ``clave=valor`` para poder extraer los campos
+        con ``| logfmt`` en Loki/Grafana.
+        """
+        with self._lock:
+            summary = self._query_stats.top(limit)
+        for item in summary:
+            logger.info(
+                f"db_query_stats pool={label or '-'} fp={item['id']} calls={item['calls']} "
+                f"errors={item['errors']} rows={item['rows']} "
+                f"total_ms={item['latency']['total_ms']} p50_ms={item['p50_ms']} "
+                f"p95_ms={item['p95_ms']} max_ms={item['latency']['max_ms']} "
+                f"wait_avg_ms={item['wait']['avg_ms']}",
+                extra={
+                    "event": "db_query_stats",
+                    "pool": label,
+                    "fingerprint": item["id"],
+                    "sql": item["sql"],
+                    "calls": item["calls"],
+                    "errors": item["errors"],
+                    "rows": item["rows"],
+                    "total_ms": item["latency"]["total_ms"],
+                    "p50_ms": item["p50_ms"],
+                    "p95_ms": item["p95_ms"],
+                    "max_ms": item["latency"]["max_ms"],
+                    "wait_avg_ms": item["wait"]["avg_ms"],
+                },
+            )
+        return summary
 
-            # Convertir resultados a lista de diccionarios
-            columns = [column[0] for column in cursor.description]
-            result = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        row_factory: Optional[RowFactory] = None,
+        timeout: Optional[float] = None,
+    ) -> list[dict[str, Any]]:
+        """Ejecuta una consulta SELECT de forma thread-safe.
+
+        ``row_factory`` sustituye para esta llamada al del pool y ``timeout``
+        (segundos) al ``query_timeout`` del pool.
 
-            logger.debug(f"Consulta ejecutada: {len(result)} filas retornadas")
+        Raises:
+            QueryTimeoutError: si se superó el timeout (conexión descartada)
+        """
+        with self._acquire() as (connection, wait):
+            started = time.perf_counter()
+            rows = None
+            try:
+                with self._statement(connection, query, timeout) as guard:
+                    cursor = self._execute(connection, query, params, guard)
+
+                    # Convertir resultados (dict por fila salvo row_factory)
+                    columns = [column[0] for column in cursor.description]
+                    convert = row_converter(columns, row_factory or self.row_factory)
+                    result = [convert(row) for row in cursor.fetchall()]
+                rows = len(result)
+            finally:
+                self._observe_query(query, time.perf_counter() - started, wait, rows)
+
+            logger.debug(f"Consulta ejecutada: {rows} filas retornadas")
             return result
 
-    def execute_non_query(self, query: str, params: Optional[tuple] = None) -> int:
-        """Ejecuta una consulta INSERT, UPDATE o DELETE de forma thread-safe"""
-        with self.get_connection() as connection:
+    def execute_query_frame(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        batch_size: int = 500,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Ejecuta una consulta SELECT y devuelve un ``pandas.DataFrame``.
+
+        Ver ``common.db.frames.frame_from_cursor``.
+        """
+        from .frames import frame_from_cursor  # pandas sólo si se usa
+
+        with self._acquire() as (connection, wait):
+            started = time.perf_counter()
+            rows = None
+            try:
+                with self._statement(connection, query, timeout) as guard:
+                    cursor = self._execute(connection, query, params, guard)
+                    frame = frame_from_cursor(cursor, batch_size)
+                rows = len(frame)
+            finally:
+                self._observe_query(query, time.perf_counter() - started, wait, rows)
+
+            logger.debug(f"Consulta ejecutada: {rows} filas retornadas (DataFrame)")
+            return frame
+
+    def execute_query_iter(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        batch_size: int = 500,
+        row_factory: Optional[RowFactory] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Ejecuta una consulta SELECT y devuelve las filas de forma perezosa.
+
+        Lee el resultado con ``fetchmany(batch_size)`` y materializa cada fila
+        al consumirla, de modo que la memoria no crece con el tamaño del
+        resultado. La conexión queda reservada mientras se itera y vuelve al
+        pool al agotar o cerrar el generador (``close()`` / salir de un ``for``
+        con ``break`` y liberar la referencia).
+
+        ``timeout`` (por defecto el ``query_timeout`` del pool) limita la
+        ejecución y cada ``fetchmany`` por separado; el tiempo que el llamador
+        tarda en consumir las filas no cuenta.
+
+        Usage:
+            for row in pool.execute_query_iter("SELECT * FROM TbFacturasDetalle"):
+                ...
+
+        Raises:
+            QueryTimeoutError: si se superó el timeout (conexión descartada)
+        """
+        with self._acquire() as (connection, _wait):
+            # Cursor propio (no cacheado): mantiene el result set abierto
             cursor = connection.cursor()
+            try:
+                with self._statement(connection, query, timeout) as guard:
+                    if guard is not None:
+                        guard.attach(cursor)
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                columns = [column[0] for column in cursor.description]
+                convert = row_converter(columns, row_factory or self.row_factory)
+                total = 0
+                while True:
+                    with self._statement(connection, query, timeout) as guard:
+                        if guard is not None:
+                            guard.attach(cursor)
+                        rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    total += len(rows)
+                    for row in rows:
+                        yield convert(row)
+                logger.debug(f"Consulta iterada: {total} filas retornadas")
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+    def execute_non_query(
+        self, query: str, params: Optional[tuple] = None, timeout: Optional[float] = None
+    ) -> int:
+        """Ejecuta una consulta INSERT, UPDATE o DELETE de forma thread-safe.
+
+        Raises:
+            QueryTimeoutError: si se superó el timeout (conexión descartada)
+        """
+        with self._acquire() as (connection, wait):
+            started = time.perf_counter()
+            rows_affected = None
+            try:
+                with self._statement(connection, query, timeout) as guard:
+                    cursor = self._execute(connection, query, params, guard)
+                    rows_affected = cursor.rowcount
+            finally:
+                self._observe_query(
+                    query, time.perf_counter() - started, wait, rows_affected
+                )
 
-            rows_affected = cursor.rowcount
             logger.debug(f"Consulta ejecutada: {rows_affected} filas afectadas")
             return rows_affected
 
     def insert_record(self, table: str, data: dict[str, Any]) -> bool:
-        """Inserta un registro usando el pool (thread-safe)."""
+        """Inserta un registro usando el pool (thread-safe).
+
+        Dentro de ``transaction()`` el error se propaga para que el bloque lo revierta.
+        """
         try:
             fields = list(data.keys())
             placeholders = ", ".join(["?"] * len(fields))
@@ -242,10 +1057,76 @@ class AccessConnectionPool:
             values = tuple(data.values())
             rows = self.execute_non_query(query, values)
             return rows > 0
-        except Exception as e:  # pragma: no cover - defensivo
+        except Exception as e:
             logger.error(f"Error insert_record pool {table}: {e}")
+            if self.in_transaction():
+                raise
             return False
 
+    def insert_many(
+        self, table: str, rows: list[dict[str, Any]], fast_executemany: bool = True
+    ) -> list[bool]:
+        """Inserta varias filas con ``executemany`` en una única transacción.
+
+        Las filas se agrupan por conjunto de columnas. Si un grupo falla se
+        revierte la transacción y se reintenta fila a fila. Dentro de
+        ``transaction()`` el error se propaga para que el bloque lo revierta.
+
+        Returns:
+            Lista de bool por fila (True si se insertó sin error).
+        """
+        if not rows:
+            return []
+        owns_transaction = not self.in_transaction()
+        try:
+            batches = _build_insert_batches(table, rows)
+            with self.get_connection() as connection:
+                outcomes = _execute_batches(
+                    connection, batches, len(rows), fast_executemany, owns_transaction
+                )
+            logger.debug(
+                f"insert_many {table}: {sum(outcomes)}/{len(rows)} filas insertadas"
+            )
+            return outcomes
+        except Exception as e:
+            logger.error(f"Error insert_many pool {table}: {e}")
+            if not owns_transaction:
+                raise
+            return [False] * len(rows)
+
+    def update_many(
+        self,
+        table: str,
+        rows: list[dict[str, Any]],
+        key_fields: list[str],
+        fast_executemany: bool = True,
+    ) -> list[bool]:
+        """Actualiza varias filas con ``executemany`` en una única transacción.
+
+        Cada fila incluye los ``key_fields`` (usados en el WHERE) y las columnas
+        a actualizar. Un resultado True indica que la sentencia se ejecutó sin
+        error; ``executemany`` no informa de filas afectadas por fila.
+        """
+        if not rows:
+            return []
+        owns_transaction = not self.in_transaction()
+        try:
+            batches = _build_update_batches(table, rows, key_fields)
+            with self._write_lock:
+                with self.get_connection() as connection:
+                    outcomes = _execute_batches(
+                        connection, batches, len(rows), fast_executemany, owns_transaction
+                    )
+            logger.info(
+                f"update_many {table}: {sum(outcomes)}/{len(rows)} filas (Thread-safe)"
+            )
+            return outcomes
+        except Exception as e:
+            logger.error(f"Error update_many pool {table}: {e}")
+            if not owns_transaction:
+                raise
+            return [False] * len(rows)
+
     def get_max_id(self, table: str, id_field: str) -> int:
         """Obtiene MAX(id_field) de forma thread-safe usando el pool."""
         try:
@@ -265,9 +1146,12 @@ class AccessConnectionPool:
         where_condition: str,
         where_params: Optional[list] = None,
     ) -> bool:
-        """Actualiza registros de forma thread-safe con lock adicional para operaciones críticas"""
+        """Actualiza registros de forma thread-safe con lock adicional para operaciones críticas.
+
+        Dentro de ``transaction()`` el error se propaga para que el bloque lo revierta.
+        """
         # Lock adicional para operaciones de escritura críticas
-        with self._lock:
+        with self._write_lock:
             try:
                 set_clauses = [f"{field} = ?" for field in data.keys()]
                 values = list(data.values())
@@ -286,53 +1170,249 @@ class AccessConnectionPool:
 
             except Exception as e:
                 logger.error(f"Error actualizando registro en {table}: {e}")
+                if self.in_transaction():
+                    raise
                 return False
 
+    def warm_up(self, count: int) -> int:
+        """Abre por adelantado hasta ``count`` conexiones y las deja ociosas.
+
+        Los fallos se registran sin propagarse: el pool sigue siendo usable y
+        abrirá conexiones bajo demanda.
+
+        Returns:
+            Número de conexiones abiertas
+        """
+        opened = 0
+        for _ in range(count):
+            with self._cond:
+                if self._created_connections >= self.max_connections:
+                    break
+                self._created_connections += 1
+            try:
+                connection = self._open_reserved_slot()
+            except Exception as e:
+                logger.warning(f"Precalentamiento del pool interrumpido: {e}")
+                break
+            self._release(connection)
+            opened += 1
+        if opened:
+            logger.debug(f"Pool precalentado con {opened} conexiones")
+        return opened
+
     def get_stats(self) -> dict[str, Any]:
         """Obtiene estadísticas del pool de conexiones"""
+        with self._cond:
+            inventory = {
+                "pool_size": len(self._idle),
+                "total_connections": self._created_connections,
+                "current_waiters": len(self._waiters),
+            }
         with self._lock:
             return {
                 **self._stats,
-                "pool_size": self._pool.qsize(),
-                "total_connections": self._created_connections,
+                **inventory,
                 "max_connections": self.max_connections,
+                "cached_statements": sum(len(c) for c in self._stmt_cache.values()),
+                "wait_time": self._wait_histogram.to_dict(),
+                "queries": self._query_stats.top(),
             }
 
     def close_all(self):
-        """Cierra todas las conexiones del pool"""
+        """Cierra todas las conexiones del pool y detiene el validador"""
+        self._validator_stop.set()
+        validator = self._validator_thread
+        if validator is not None and validator is not threading.current_thread():
+            validator.join(timeout=5)
+        self._validator_thread = None
+        # Permitir reutilizar el pool tras el cierre (el validador rearranca solo)
+        self._validator_stop.clear()
+
+        logger.info("Cerrando todas las conexiones del pool")
+        with self._cond:
+            connections = list(self._all_connections)
+            self._idle.clear()
+            self._all_connections.clear()
+            self._conn_meta.clear()
+            self._created_connections = 0
+            # Los hilos en espera pueden abrir conexiones nuevas
+            while self._waiters and self._created_connections < self.max_connections:
+                self._grant_slot_locked()
+
+        # Cerrar cursores cacheados y conexiones (fuera del lock: es I/O)
+        for connection in connections:
+            self._clear_statement_cache(connection)
+            try:
+                connection.close()
+            except Exception:
+                pass
         with self._lock:
-            logger.info("Cerrando todas las conexiones del pool")
+            self._stmt_cache.clear()
+
+        logger.info("Todas las conexiones cerradas")
+
+
+# ----------------------------- Registro de pools -----------------------------
+# Valores por defecto comunes a todas las BD (Access tolera poca concurrencia)
+DEFAULT_POOL_SETTINGS: dict[str, Any] = {
+    "max_connections": 2,
+    "timeout": 30,
+    "validation_interval": 60,
+    "max_age": 3600,
+    "max_idle": 600,
+    "warmup": 0,
+    "query_timeout": 0,
+}
+
+_POOL_SETTING_TYPES = {
+    "max_connections": int,
+    "timeout": float,
+    "validation_interval": float,
+    "max_age": float,
+    "max_idle": float,
+    "warmup": int,
+    "query_timeout": float,
+}
+
+
+def pool_settings_from_env(name: str) -> dict[str, Any]:
+    """Lee la configuración de pool para la BD lógica ``name``.
+
+    Para cada ajuste se consulta primero ``DB_POOL_<NAME>_<AJUSTE>`` y después
+    el global ``DB_POOL_<AJUSTE>``; p.ej. ``DB_POOL_BRASS_MAX_CONNECTIONS=3`` o
+    ``DB_POOL_WARMUP=1``. Valores no numéricos se ignoran con un aviso.
+    """
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    prefix = f"DB_POOL_{name.upper()}_"
+    for key, cast in _POOL_SETTING_TYPES.items():
+        env_key = key.upper()
+        raw = os.getenv(prefix + env_key, os.getenv(f"DB_POOL_{env_key}"))
+        if raw is None or raw == "":
+            continue
+        try:
+            settings[key] = cast(raw)
+        except ValueError:
+            logger.warning(f"Valor inválido para pool {name}.{key}: {raw!r}")
+    return settings
 
-            # Cerrar conexiones en el pool
-            while not self._pool.empty():
-                try:
-                    connection = self._pool.get_nowait()
-                    connection.close()
-                except Exception:
-                    pass
 
-            # Cerrar conexiones restantes
-            for connection in self._all_connections:
-                try:
-                    connection.close()
-                except Exception:
-                    pass
+class PoolRegistry:
+    """Registro de pools por nombre lógico de BD (claves de ``Config._db_definitions``).
 
-            self._all_connections.clear()
-            self._created_connections = 0
+    Cada BD obtiene su propio ``AccessConnectionPool`` con tamaño, timeout,
+    desalojo por inactividad y precalentamiento configurables por entorno
+    (``pool_settings_from_env``) o por código con ``configure()``.
+
+    Usage:
+        pool = pool_registry.get("brass", conn_str)
+        pool_registry.stats()      # {"brass": {...}, "tareas": {...}}
+        pool_registry.close_all()
+    """
+
+    def __init__(self):
+        self._pools: dict[str, AccessConnectionPool] = {}
+        self._overrides: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
 
-            logger.info("Todas las conexiones cerradas")
+    def configure(self, name: str, **settings: Any) -> None:
+        """Fija ajustes para ``name`` con prioridad sobre el entorno.
 
+        Sólo afecta a pools creados después de la llamada.
+        """
+        unknown = set(settings) - set(DEFAULT_POOL_SETTINGS)
+        if unknown:
+            raise ValueError(f"Ajustes de pool desconocidos: {sorted(unknown)}")
+        with self._lock:
+            self._overrides.setdefault(name, {}).update(settings)
+
+    def settings_for(self, name: str) -> dict[str, Any]:
+        settings = pool_settings_from_env(name)
+        settings.update(self._overrides.get(name, {}))
+        return settings
+
+    def get(self, name: str, connection_string: Optional[str] = None) -> AccessConnectionPool:
+        """Devuelve el pool de ``name``, creándolo en la primera llamada.
+
+        Raises:
+            ValueError: si el pool no existe y no se indica ``connection_string``
+        """
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is not None:
+                return pool
+            if connection_string is None:
+                raise ValueError(
+                    "connection_string es requerido para inicializar el pool"
+                )
+            settings = self.settings_for(name)
+            warmup = settings.pop("warmup")
+            pool = AccessConnectionPool(connection_string=connection_string, **settings)
+            self._pools[name] = pool
+            logger.info(
+                f"Pool de conexiones {name} inicializado "
+                f"(max: {settings['max_connections']}, timeout: {settings['timeout']}s)"
+            )
+        if warmup:
+            pool.warm_up(warmup)
+        return pool
+
+    def close(self, name: str) -> None:
+        """Cierra y olvida el pool de ``name`` (no-op si no existe)."""
+        with self._lock:
+            pool = self._pools.pop(name, None)
+        if pool is not None:
+            pool.close_all()
+            logger.info(f"Pool de conexiones {name} cerrado")
+
+    def recycle_file(self, path: Any) -> list[str]:
+        """Cierra las conexiones de los pools abiertos sobre el fichero ``path``.
+
+        Los pools siguen registrados (quien los tenga puede seguir usándolos)
+        y abren conexiones nuevas bajo demanda, ya sobre el fichero actual.
+
+        Returns:
+            Nombres de los pools reciclados
+        """
+        target = str(path).strip().lower()
+        with self._lock:
+            pools = list(self._pools.items())
+        recycled = []
+        for name, pool in pools:
+            if db_scope(pool) == target:
+                pool.close_all()
+                recycled.append(name)
+        if recycled:
+            logger.info(f"Pools reciclados por cambio de {path}: {recycled}")
+        return recycled
+
+    def close_all(self) -> None:
+        """Cierra todos los pools registrados."""
+        with self._lock:
+            pools = list(self._pools.items())
+            self._pools.clear()
+        for name, pool in pools:
+            try:
+                # Resumen por huella antes de perder las estadísticas del pool
+                pool.log_query_stats(label=name)
+                pool.close_all()
+            except Exception as e:  # pragma: no cover - defensivo
+                logger.warning(f"Error cerrando pool {name}: {e}")
+        if pools:
+            logger.info(f"Pools de conexiones cerrados: {[n for n, _ in pools]}")
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Estadísticas de cada pool registrado, por nombre de BD."""
+        with self._lock:
+            pools = list(self._pools.items())
+        return {name: pool.get_stats() for name, pool in pools}
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._pools)
 
-# Instancias globales de pools por tipo de BD
-_tareas_pool: Optional[AccessConnectionPool] = None
-_brass_pool: Optional[AccessConnectionPool] = None
-_expedientes_pool: Optional[AccessConnectionPool] = None
-_agedys_pool: Optional[AccessConnectionPool] = None
-_nc_pool: Optional[AccessConnectionPool] = None
-_riesgos_pool: Optional[AccessConnectionPool] = None
-_correos_pool: Optional[AccessConnectionPool] = None
-_pool_lock = threading.Lock()
+
+# Registro global compartido por todo el proceso
+pool_registry = PoolRegistry()
 
 
 def get_tareas_connection_pool(connection_string: str = None) -> AccessConnectionPool:
@@ -345,77 +1425,33 @@ def get_tareas_connection_pool(connection_string: str = None) -> AccessConnectio
     Returns:
         Instancia del pool de conexiones
     """
-    global _tareas_pool
-
-    with _pool_lock:
-        if _tareas_pool is None:
-            if connection_string is None:
-                raise ValueError(
-                    "connection_string es requerido para inicializar el pool"
-                )
-
-            _tareas_pool = AccessConnectionPool(
-                connection_string=connection_string,
-                max_connections=2,  # Máximo 2 conexiones concurrentes para Access
-                timeout=30,
-            )
-            logger.info("Pool de conexiones de tareas inicializado")
-
-        return _tareas_pool
+    return pool_registry.get("tareas", connection_string)
 
 
 def close_tareas_pool():
     """Cierra el pool de conexiones global de tareas"""
-    global _tareas_pool
-
-    with _pool_lock:
-        if _tareas_pool:
-            _tareas_pool.close_all()
-            _tareas_pool = None
-            logger.info("Pool de conexiones de tareas cerrado")
-
-
-# ------------------------- Generic helpers por BD -------------------------
-def _get_pool(
-    existing_ref: Optional[AccessConnectionPool],
-    set_attr_name: str,
-    connection_string: str,
-    max_conn: int = 2,
-) -> AccessConnectionPool:
-    global _tareas_pool, _brass_pool, _expedientes_pool, _agedys_pool, _nc_pool, _riesgos_pool, _correos_pool
-    with _pool_lock:
-        if existing_ref is None:
-            pool = AccessConnectionPool(
-                connection_string=connection_string,
-                max_connections=max_conn,
-                timeout=30,
-            )
-            # asignar en el diccionario global correctamente
-            globals()[set_attr_name] = pool
-            logger.info(f"Pool de conexiones {set_attr_name} inicializado")
-            return pool
-        return existing_ref
+    pool_registry.close("tareas")
 
 
 def get_brass_connection_pool(connection_string: str) -> AccessConnectionPool:
-    return _get_pool(_brass_pool, "_brass_pool", connection_string)
+    return pool_registry.get("brass", connection_string)
 
 
 def get_expedientes_connection_pool(connection_string: str) -> AccessConnectionPool:
-    return _get_pool(_expedientes_pool, "_expedientes_pool", connection_string)
+    return pool_registry.get("expedientes", connection_string)
 
 
 def get_agedys_connection_pool(connection_string: str) -> AccessConnectionPool:
-    return _get_pool(_agedys_pool, "_agedys_pool", connection_string)
+    return pool_registry.get("agedys", connection_string)
 
 
 def get_nc_connection_pool(connection_string: str) -> AccessConnectionPool:
-    return _get_pool(_nc_pool, "_nc_pool", connection_string)
+    return pool_registry.get("no_conformidades", connection_string)
 
 
 def get_riesgos_connection_pool(connection_string: str) -> AccessConnectionPool:
-    return _get_pool(_riesgos_pool, "_riesgos_pool", connection_string)
+    return pool_registry.get("riesgos", connection_string)
 
 
 def get_correos_connection_pool(connection_string: str) -> AccessConnectionPool:
-    return _get_pool(_correos_pool, "_correos_pool", connection_string)
+    return pool_registry.get("correos", connection_string)
@@ -0,0 +1,106 @@
+"""Fachada asyncio sobre ``AccessDatabase`` / ``AccessConnectionPool``.
+
+pyodbc es bloqueante, así que cada llamada se despacha a un
+``ThreadPoolExecutor`` acotado al tamaño del pool subyacente: nunca hay más
+hilos ejecutando SQL que conexiones disponibles, y las consultas
+independientes se solapan sobre conexiones distintas.
+
+Uso:
+    async with AsyncAccessDatabase(AccessDatabase(conn_str, pool=pool)) as adb:
+        pendientes, vencidas = await asyncio.gather(
+            adb.execute_query(SQL_PENDIENTES),
+            adb.execute_query(SQL_VENCIDAS, (fecha,)),
+        )
+
+En modo legacy (``AccessDatabase`` sin pool) la conexión única no admite uso
+concurrente, por lo que el executor se limita a un hilo.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .access_connection_pool import AccessConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+def _underlying_pool(db: Any) -> Optional[AccessConnectionPool]:
+    if isinstance(db, AccessConnectionPool):
+        return db
+    return getattr(db, "pool", None)
+
+
+class AsyncAccessDatabase:
+    """Expone los métodos de acceso a datos como corrutinas.
+
+    Args:
+        db: ``AccessDatabase`` (con o sin pool) o ``AccessConnectionPool``
+        max_workers: Hilos del executor; por defecto ``max_connections`` del
+            pool (1 en modo legacy). Nunca supera el tamaño del pool.
+    """
+
+    def __init__(self, db: Any, max_workers: Optional[int] = None):
+        self.db = db
+        pool = _underlying_pool(db)
+        limit = pool.max_connections if pool is not None else 1
+        self.max_workers = max(1, min(max_workers or limit, limit))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="AccessDB"
+        )
+        logger.debug(f"AsyncAccessDatabase con {self.max_workers} hilos")
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def execute_query(
+        self, query: str, params: Optional[tuple] = None, **kwargs: Any
+    ) -> list[Any]:
+        return await self._run(self.db.execute_query, query, params, **kwargs)
+
+    async def execute_non_query(self, query: str, params: Optional[tuple] = None) -> int:
+        return await self._run(self.db.execute_non_query, query, params)
+
+    async def insert_record(self, table: str, data: dict[str, Any]) -> bool:
+        return await self._run(self.db.insert_record, table, data)
+
+    async def update_record(
+        self,
+        table: str,
+        data: dict[str, Any],
+        where_condition: str,
+        where_params: Optional[list] = None,
+    ) -> bool:
+        return await self._run(
+            self.db.update_record, table, data, where_condition, where_params
+        )
+
+    async def insert_many(self, table: str, rows: list[dict[str, Any]]) -> list[bool]:
+        return await self._run(self.db.insert_many, table, rows)
+
+    async def update_many(
+        self, table: str, rows: list[dict[str, Any]], key_fields: list[str]
+    ) -> list[bool]:
+        return await self._run(self.db.update_many, table, rows, key_fields)
+
+    async def get_max_id(self, table: str, id_field: str) -> int:
+        return await self._run(self.db.get_max_id, table, id_field)
+
+    def close(self, wait: bool = True) -> None:
+        """Detiene el executor (no cierra la BD ni el pool subyacentes)."""
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self) -> AsyncAccessDatabase:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+__all__ = ["AsyncAccessDatabase"]
@@ -8,10 +8,26 @@ Refactor:
  - Para tests se recomienda usar mocks sobre `AccessDatabase`.
 """
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Callable, Iterator, Optional, Union
 
-from .access_connection_pool import AccessConnectionPool
+from .access_connection_pool import (
+    AccessConnectionPool,
+    QueryTimeoutError,
+    _StatementTimeout,
+    _build_insert_batches,
+    _build_update_batches,
+    _execute_batches,
+)
+from . import sqlite_backend
+from .query_cache import get_query_cache, is_read_only, written_table
+from .row import RowFactory, row_converter
+from .slow_query_log import SlowQueryLog, get_slow_query_log
+from .transaction import UnitOfWork
 from ..utils import hide_password_in_connection_string
 
 logger = logging.getLogger(__name__)
@@ -32,10 +48,25 @@ class AccessDatabase:
     Diseño:
         - Si se provee un `AccessConnectionPool` se usarán conexiones del pool.
         - Si no, se abre una conexión única (modo legacy) bajo demanda.
+        - ``row_factory`` (opt-in, p.ej. ``common.db.row.Row``) cambia el tipo de
+          fila devuelto por las consultas; por defecto un dict por fila.
+        - Cadenas ``sqlite:...`` o con ``DBQ=*.sqlite`` usan el backend SQLite
+          de desarrollo (``common.db.sqlite_backend``) en lugar de pyodbc.
+        - ``execute_query(..., cache_tags=...)`` cachea el resultado en la caché
+          compartida de la BD (ver ``common.db.query_cache``); las escrituras
+          invalidan las entradas de la tabla afectada.
+        - ``with db.transaction():`` agrupa varias escrituras en un único
+          commit (ver ``common.db.transaction``).
+        - Las sentencias que superan ``DB_SLOW_QUERY_MS`` se anotan en el log
+          JSONL de consultas lentas (ver ``common.db.slow_query_log``).
     """
 
     def __init__(
-        self, connection_string: Union[str, Path], pool: Optional[AccessConnectionPool] = None
+        self,
+        connection_string: Union[str, Path],
+        pool: Optional[AccessConnectionPool] = None,
+        row_factory: Optional[RowFactory] = None,
+        slow_query_log: Optional[SlowQueryLog] = None,
     ):
         # Logger por instancia para facilitar trazabilidad en tests y producción
         self.logger = logging.getLogger(f"{__name__}.AccessDatabase")
@@ -54,13 +85,22 @@ class AccessDatabase:
             else:
                 self.connection_string = connection_string
         self.pool = pool
+        self.row_factory = row_factory
+        self.query_cache = get_query_cache(self.connection_string)
+        self.slow_query_log = slow_query_log or get_slow_query_log()
         self._connection = None  # solo en modo legacy
+        self._tx_local = threading.local()  # transacción legacy activa por hilo
+
+    @property
+    def is_sqlite(self) -> bool:
+        """True si la cadena apunta al backend SQLite (ver ``sqlite_backend``)."""
+        return sqlite_backend.is_sqlite_target(self.connection_string)
 
     def connect(self):
         """Establece conexión legacy si no hay pool. Con pool, se obtiene conexión temporal."""
         if self.pool:
             # Para compatibilidad, devolvemos un objeto conexión del pool (context-managed en uso real)
-            if not PYODBC_AVAILABLE:
+            if not PYODBC_AVAILABLE and not self.is_sqlite:
                 raise ImportError("pyodbc es requerido para conexiones Access")
             # No almacenamos; cada operación debe pedir su propia conexión via pool
             safe_conn_str = hide_password_in_connection_string(self.connection_string)
@@ -68,11 +108,16 @@ class AccessDatabase:
                 f"AccessDatabase (pool) usando connection string: {safe_conn_str}"
             )
             return None
+        if self._connection is not None and self._legacy_uow() is not None:
+            return self._connection  # conexión fijada por transaction()
         try:
-            if not PYODBC_AVAILABLE:
-                raise ImportError("pyodbc es requerido para conexiones Access")
             conn_str = str(self.connection_string)
-            self._connection = pyodbc.connect(conn_str)
+            if self.is_sqlite:
+                self._connection = sqlite_backend.connect(conn_str)
+            elif not PYODBC_AVAILABLE:
+                raise ImportError("pyodbc es requerido para conexiones Access")
+            else:
+                self._connection = pyodbc.connect(conn_str)
             safe_conn_str = hide_password_in_connection_string(self.connection_string)
             logger.info(f"Conexión establecida con Access: {safe_conn_str}")
             return self._connection
@@ -82,13 +127,89 @@ class AccessDatabase:
 
     def disconnect(self):
         """Cierra la conexión legacy. Con pool no hace nada (pool maneja)."""
-        if self.pool:
+        if self.pool or self._legacy_uow() is not None:
             return
         if self._connection:
             self._connection.close()
             self._connection = None
             logger.info("Conexión cerrada")
 
+    @contextmanager
+    def _legacy_statement(self, cursor: Any, timeout: Optional[float]):
+        """Timeout de sentencia en modo legacy (ver ``_StatementTimeout``).
+
+        Al vencer se cierra la conexión única (salvo dentro de una
+        transacción, que hará rollback) y se propaga ``QueryTimeoutError``.
+        """
+        if not timeout or timeout <= 0:
+            yield
+            return
+        try:
+            with _StatementTimeout(self._connection, timeout) as guard:
+                guard.attach(cursor)
+                yield
+        except QueryTimeoutError:
+            logger.warning(f"Sentencia cancelada por timeout ({timeout}s)")
+            if self._legacy_uow() is None and self._connection is not None:
+                try:
+                    self._connection.close()
+                except Exception:
+                    pass
+                self._connection = None
+            raise
+
+    def _legacy_uow(self) -> Optional[UnitOfWork]:
+        return getattr(self._tx_local, "uow", None)
+
+    def in_transaction(self) -> bool:
+        """True si el hilo actual está dentro de ``transaction()``."""
+        if self.pool:
+            return self.pool.in_transaction()
+        return self._legacy_uow() is not None
+
+    @contextmanager
+    def transaction(self):
+        """Unidad de trabajo: varias escrituras con un único commit al salir.
+
+        Con pool fija una conexión al hilo (``AccessConnectionPool.transaction``),
+        de modo que también participan otros usuarios del mismo pool (p.ej.
+        ``EmailManager``). En modo legacy usa la conexión única y suspende el
+        commit por sentencia. Si sale una excepción se hace rollback y se
+        vacía la caché de consultas de la BD.
+        """
+        try:
+            if self.pool:
+                with self.pool.transaction() as connection:
+                    yield connection
+                return
+            outer = self._legacy_uow()
+            if outer is not None:
+                with outer.savepoint() as connection:
+                    yield connection
+                return
+            if not self._connection:
+                self.connect()
+            connection = self._connection
+            uow = UnitOfWork(connection)
+            self._tx_local.uow = uow
+            try:
+                yield connection
+                uow.check_commit()
+                connection.commit()
+            except BaseException:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+                raise
+            finally:
+                self._tx_local.uow = None
+        except BaseException:
+            # Lo cacheado dentro de la transacción puede no haberse confirmado
+            if self.query_cache is not None:
+                self.query_cache.clear()
+            raise
+
     def get_connection(self):
         """Context manager compatible.
 
@@ -126,12 +247,74 @@ class AccessDatabase:
         return self._connection.cursor()
 
     def execute_query(
-        self, query: str, params: Optional[tuple] = None
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        cache_tags: Optional[tuple[str, ...]] = None,
+        timeout: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+    ) -> list[dict[str, Any]]:
+        """Ejecuta una consulta SELECT.
+
+        Args:
+            query: SQL a ejecutar
+            params: Parámetros posicionales
+            cache_tags: Tablas de las que depende el resultado. Si se indican
+                (y la caché está activa) el resultado se sirve desde caché
+                hasta que expire o se escriba en alguna de esas tablas.
+            timeout: Segundos máximos de la sentencia (con pool, por defecto
+                su ``query_timeout``). Al vencer se cancela, se descarta la
+                conexión y se lanza ``QueryTimeoutError``.
+            cache_ttl: Segundos de vida de esta entrada si son menos que el TTL
+                de la caché (tablas que otros procesos modifican).
+        """
+        execute = self._execute_query
+        if timeout is not None:
+            execute = partial(self._execute_query, timeout=timeout)
+        if cache_tags and self.query_cache is not None:
+            key = self.query_cache.make_key(query, params)
+            if key is not None:
+                cached = self.query_cache.get(key)
+                if cached is not None:
+                    self.logger.debug(f"Cache hit SQL: {query} | Params: {params}")
+                    return _copy_rows(cached)
+                rows = self._timed(execute, query, params)
+                self.query_cache.put(key, _copy_rows(rows), cache_tags, ttl=cache_ttl)
+                return rows
+        return self._timed(execute, query, params)
+
+    def _timed(self, func: Callable[..., Any], query: str, params: Optional[tuple]) -> Any:
+        """Ejecuta ``func`` midiendo la duración para el log de consultas lentas."""
+        if self.slow_query_log is None:
+            return func(query, params)
+        started = time.perf_counter()
+        rows = None
+        try:
+            result = func(query, params)
+            if isinstance(result, int):
+                rows = result
+            elif hasattr(result, "shape"):  # DataFrame
+                rows = len(result)
+            else:
+                rows = len(result) if isinstance(result, list) else -1
+            return result
+        finally:
+            self.slow_query_log.record(
+                query, params, time.perf_counter() - started, rows, self.connection_string
+            )
+
+    def _execute_query(
+        self, query: str, params: Optional[tuple] = None, timeout: Optional[float] = None
     ) -> list[dict[str, Any]]:
         if self.pool:
             # Log de depuración antes de delegar al pool
             self.logger.debug(f"Executing SQL: {query} | Params: {params}")
-            return self.pool.execute_query(query, params)
+            kwargs = {"timeout": timeout} if timeout is not None else {}
+            if self.row_factory is not None:
+                return self.pool.execute_query(
+                    query, params, row_factory=self.row_factory, **kwargs
+                )
+            return self.pool.execute_query(query, params, **kwargs)
         if not self._connection:
             try:
                 self.connect()
@@ -146,29 +329,136 @@ class AccessDatabase:
             cursor = self._connection.cursor()
             # Log de depuración justo antes de ejecutar la consulta real
             self.logger.debug(f"Executing SQL: {query} | Params: {params}")
+            with self._legacy_statement(cursor, timeout):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                columns = [column[0] for column in cursor.description]
+                convert = row_converter(columns, self.row_factory)
+                return [convert(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error ejecutando consulta: {e}")
+            raise
+
+    def execute_query_frame(
+        self, query: str, params: Optional[tuple] = None, batch_size: int = 500
+    ) -> Any:
+        """Ejecuta una consulta SELECT y devuelve un ``pandas.DataFrame``.
+
+        El resultado se lee por lotes directamente a columnas (ver
+        ``common.db.frames``); para columnas derivadas usar ``days_until`` /
+        ``format_dates`` sobre la columna completa.
+        """
+        return self._timed(
+            lambda q, p: self._execute_query_frame(q, p, batch_size), query, params
+        )
+
+    def _execute_query_frame(
+        self, query: str, params: Optional[tuple], batch_size: int
+    ) -> Any:
+        if self.pool:
+            self.logger.debug(f"Executing SQL (frame): {query} | Params: {params}")
+            return self.pool.execute_query_frame(query, params, batch_size)
+        from .frames import frame_from_cursor  # pandas sólo si se usa
+
+        if not self._connection:
+            self.connect()
+        cursor = self._connection.cursor()
+        try:
+            self.logger.debug(f"Executing SQL (frame): {query} | Params: {params}")
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
+            return frame_from_cursor(cursor, batch_size)
+        except Exception as e:
+            logger.error(f"Error ejecutando consulta: {e}")
+            raise
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def execute_query_iter(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        batch_size: int = 500,
+        timeout: Optional[float] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Versión perezosa de ``execute_query`` basada en ``fetchmany``.
+
+        Con pool, la conexión se devuelve al pool al agotar o cerrar el
+        generador. En modo legacy se usa la conexión única. ``timeout`` se
+        aplica a la ejecución y a cada ``fetchmany`` como en ``execute_query``.
+        """
+        if self.pool:
+            self.logger.debug(f"Executing SQL (iter): {query} | Params: {params}")
+            kwargs = {"timeout": timeout} if timeout is not None else {}
+            yield from self.pool.execute_query_iter(
+                query, params, batch_size, row_factory=self.row_factory, **kwargs
+            )
+            return
+        if not self._connection:
+            self.connect()
+        cursor = self._connection.cursor()
+        try:
+            self.logger.debug(f"Executing SQL (iter): {query} | Params: {params}")
+            with self._legacy_statement(cursor, timeout):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
             columns = [column[0] for column in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            convert = row_converter(columns, self.row_factory)
+            while True:
+                with self._legacy_statement(cursor, timeout):
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield convert(row)
         except Exception as e:
             logger.error(f"Error ejecutando consulta: {e}")
             raise
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def execute_non_query(
+        self, query: str, params: Optional[tuple] = None, timeout: Optional[float] = None
+    ) -> int:
+        execute = self._execute_non_query
+        if timeout is not None:
+            execute = partial(self._execute_non_query, timeout=timeout)
+        try:
+            return self._timed(execute, query, params)
+        finally:
+            self._invalidate_for_sql(query)
 
-    def execute_non_query(self, query: str, params: Optional[tuple] = None) -> int:
+    def _execute_non_query(
+        self, query: str, params: Optional[tuple] = None, timeout: Optional[float] = None
+    ) -> int:
         if self.pool:
+            if timeout is not None:
+                return self.pool.execute_non_query(query, params, timeout=timeout)
             return self.pool.execute_non_query(query, params)
         if not self._connection:
             self.connect()
         try:
             cursor = self._connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            with self._legacy_statement(cursor, timeout):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
             rows = cursor.rowcount
-            self._connection.commit()
+            if self._legacy_uow() is None:
+                self._connection.commit()
             return rows
         except Exception as e:
             logger.error(f"Error ejecutando consulta: {e}")
@@ -183,9 +473,30 @@ class AccessDatabase:
             return result[0]["MaxID"]
         return 0
 
+    def _invalidate_tables(self, *tables: str) -> None:
+        if self.query_cache is not None:
+            self.query_cache.invalidate(tables)
+
+    def _invalidate_for_sql(self, query: str) -> None:
+        """Invalida la caché según la tabla escrita por ``query``.
+
+        Si la sentencia no es una lectura y no se reconoce la tabla (DDL,
+        SELECT INTO...) se vacía la caché completa de la BD.
+        """
+        if self.query_cache is None:
+            return
+        table = written_table(query)
+        if table:
+            self.query_cache.invalidate((table,))
+        elif not is_read_only(query):
+            self.query_cache.clear()
+
     def insert_record(self, table: str, data: dict[str, Any]) -> bool:
         if self.pool:
-            return self.pool.insert_record(table, data)
+            try:
+                return self.pool.insert_record(table, data)
+            finally:
+                self._invalidate_tables(table)
         try:
             fields = list(data.keys())
             placeholders = ["?" for _ in fields]
@@ -196,6 +507,9 @@ class AccessDatabase:
             return True
         except Exception as e:
             logger.error(f"Error insertando registro en {table}: {e}")
+            # Dentro de transaction() el bloque debe revertirse, no confirmar sin la fila
+            if self.in_transaction():
+                raise
             return False
 
     def update_record(
@@ -206,7 +520,12 @@ class AccessDatabase:
         where_params: Optional[list] = None,
     ) -> bool:
         if self.pool:
-            return self.pool.update_record(table, data, where_condition, where_params)
+            try:
+                return self.pool.update_record(
+                    table, data, where_condition, where_params
+                )
+            finally:
+                self._invalidate_tables(table)
         try:
             set_clauses = [f"{field} = ?" for field in data.keys()]
             values = list(data.values())
@@ -221,7 +540,88 @@ class AccessDatabase:
             return rows_affected > 0
         except Exception as e:
             logger.error(f"Error actualizando registro en {table}: {e}")
+            if self.in_transaction():
+                raise
             return False
 
+    def insert_many(
+        self, table: str, rows: list[dict[str, Any]], fast_executemany: bool = True
+    ) -> list[bool]:
+        """Inserta varias filas en una única transacción (``executemany``).
+
+        Returns:
+            Lista de bool por fila, en el mismo orden que ``rows``.
+        """
+        try:
+            if self.pool:
+                return self.pool.insert_many(table, rows, fast_executemany)
+            if not rows:
+                return []
+            batches = _build_insert_batches(table, rows)
+            return self._execute_batches_legacy(batches, len(rows), fast_executemany)
+        except Exception as e:
+            logger.error(f"Error insertando registros en {table}: {e}")
+            if self.in_transaction():
+                raise
+            return [False] * len(rows)
+        finally:
+            self._invalidate_tables(table)
+
+    def update_many(
+        self,
+        table: str,
+        rows: list[dict[str, Any]],
+        key_fields: list[str],
+        fast_executemany: bool = True,
+    ) -> list[bool]:
+        """Actualiza varias filas en una única transacción (``executemany``).
+
+        Cada fila incluye los ``key_fields`` para el WHERE y las columnas a
+        actualizar.
+        """
+        try:
+            if self.pool:
+                return self.pool.update_many(table, rows, key_fields, fast_executemany)
+            if not rows:
+                return []
+            batches = _build_update_batches(table, rows, key_fields)
+            return self._execute_batches_legacy(batches, len(rows), fast_executemany)
+        except Exception as e:
+            logger.error(f"Error actualizando registros en {table}: {e}")
+            if self.in_transaction():
+                raise
+            return [False] * len(rows)
+        finally:
+            self._invalidate_tables(table)
+
+    def _execute_batches_legacy(
+        self, batches, total: int, fast_executemany: bool
+    ) -> list[bool]:
+        if not self._connection:
+            self.connect()
+        if self._legacy_uow() is not None:
+            # Dentro de transaction(): el commit/rollback lo hace el bloque
+            return _execute_batches(
+                self._connection, batches, total, fast_executemany, owns_transaction=False
+            )
+        try:
+            outcomes = _execute_batches(
+                self._connection, batches, total, fast_executemany
+            )
+            self._connection.commit()
+            logger.info(f"Lote escrito: {sum(outcomes)}/{total} filas")
+            return outcomes
+        except Exception:
+            try:
+                self._connection.rollback()
+            except Exception:
+                pass
+            raise
+
+
+def _copy_rows(rows: list) -> list:
+    """Copia superficial de filas dict para que el llamador no altere la caché."""
+    return [dict(row) if isinstance(row, dict) else row for row in rows]
+
 
 __all__ = ["AccessDatabase"]
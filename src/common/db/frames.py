@@ -0,0 +1,110 @@
+"""Resultados en columnas (pandas) y helpers vectorizados de fechas.
+
+``AccessDatabase.execute_query_frame`` construye un ``DataFrame`` leyendo el
+cursor por lotes (``fetchmany``) y acumulando por columna, sin crear un dict
+por fila. Las columnas derivadas se calculan después con una operación sobre
+el array completo en lugar de un bucle Python por fila:
+
+    df = db.execute_query_frame("SELECT IDEdicion, FechaMaxProximaPublicacion FROM ...")
+    df["Dias"] = days_until(df["FechaMaxProximaPublicacion"])
+    df["Fecha"] = format_dates(df["FechaMaxProximaPublicacion"])
+    rows = frame_to_records(df)   # vuelta a list[dict] para los informes HTML
+
+``days_until`` sigue la semántica de ``(fecha - ahora).days`` (días
+completos, redondeo hacia abajo) y devuelve 0 para valores nulos o no
+interpretables, igual que ``RiesgosManager._calculate_days_difference``.
+
+pandas es dependencia de ``requirements.txt`` pero se importa de forma
+opcional (como pyodbc): sin él sólo fallan estas funciones.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+try:
+    import numpy as np
+    import pandas as pd
+
+    PANDAS_AVAILABLE = True
+except ImportError:  # pragma: no cover - entorno sin pandas
+    np = None  # type: ignore[assignment]
+    pd = None  # type: ignore[assignment]
+    PANDAS_AVAILABLE = False
+
+
+def _require_pandas() -> None:
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas no está disponible (ver requirements.txt)")
+
+
+def frame_from_cursor(cursor: Any, batch_size: int = 500) -> "pd.DataFrame":
+    """Lee el resultado de ``cursor`` (ya ejecutado) en un ``DataFrame``.
+
+    Los lotes de ``fetchmany`` se trasponen a listas por columna, de modo que
+    no se materializa ninguna estructura intermedia por fila.
+    """
+    _require_pandas()
+    columns = [column[0] for column in cursor.description]
+    data: list[list[Any]] = [[] for _ in columns]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for values, column_values in zip(data, zip(*rows)):
+            values.extend(column_values)
+    return pd.DataFrame(
+        {name: pd.Series(values, dtype=object) for name, values in zip(columns, data)},
+        columns=columns,
+    ).infer_objects()
+
+
+def _as_datetimes(values: Any) -> "pd.Series":
+    series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, errors="coerce")
+
+
+def days_until(values: Any, reference: Optional[datetime] = None) -> "pd.Series":
+    """Días completos desde ``reference`` (def. ahora) hasta cada fecha.
+
+    Positivo si la fecha es futura y negativo si es pasada; 0 para nulos o
+    valores no interpretables como fecha.
+    """
+    _require_pandas()
+    dates = _as_datetimes(values)
+    ref = pd.Timestamp(reference if reference is not None else datetime.now())
+    days = (dates - ref).dt.days
+    return days.fillna(0).astype("int64")
+
+
+def format_dates(values: Any, fmt: str = "%d/%m/%Y", empty: str = "") -> "pd.Series":
+    """Formatea un array de fechas con ``strftime``; ``empty`` para nulos."""
+    _require_pandas()
+    return _as_datetimes(values).dt.strftime(fmt).fillna(empty)
+
+
+def frame_to_records(frame: "pd.DataFrame") -> list[dict[str, Any]]:
+    """``DataFrame`` -> ``list[dict]`` con ``None`` en nulos y ``datetime`` nativos."""
+    _require_pandas()
+    if frame.empty:
+        return []
+    clean = frame.astype(object).where(frame.notna(), None)
+    records = clean.to_dict(orient="records")
+    for record in records:
+        for key, value in record.items():
+            if isinstance(value, pd.Timestamp):
+                record[key] = value.to_pydatetime()
+            elif isinstance(value, np.generic):
+                record[key] = value.item()
+    return records
+
+
+__all__ = [
+    "PANDAS_AVAILABLE",
+    "days_until",
+    "format_dates",
+    "frame_from_cursor",
+    "frame_to_records",
+]
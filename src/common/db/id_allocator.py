@@ -0,0 +1,251 @@
+"""Asignación de IDs por bloques para tablas Access sin autonumérico.
+
+Varias tablas (``TbCorreosEnviados.IDCorreo``, ``TbNCARAvisos.ID``) se rellenan
+con ``MAX(id) + 1`` antes de cada INSERT: un recorrido completo por fila y una
+carrera entre registros concurrentes del mismo proceso. ``IdAllocator`` lee el
+máximo una vez, reserva en memoria un bloque de ``block_size`` IDs y los
+entrega en O(1) bajo un lock por tabla.
+
+Uso:
+    next_id = id_allocator.next_id_for(db, "TbCorreosEnviados", "IDCorreo")
+
+La reserva es local al proceso: los IDs no consumidos no dejan huecos (el
+siguiente proceso vuelve a partir de ``MAX``). Con tareas en subprocesos o
+trabajadores, dos procesos pueden reservar el mismo bloque desde el mismo
+``MAX`` y el INSERT del segundo choca con la clave primaria. ``insert_with_id``
+cubre ese caso: ante un error de clave duplicada descarta el bloque, relee
+``MAX`` y reintenta el INSERT hasta ``max_attempts`` veces:
+
+    id_allocator.insert_with_id_for(db, "TbCorreosEnviados", "IDCorreo",
+                                    lambda new_id: insertar(new_id))
+
+Los bloques también se renuevan pasados ``max_block_age`` segundos.
+
+Variables de entorno:
+    DB_ID_BLOCK_SIZE: IDs por bloque (def. 50)
+    DB_ID_BLOCK_MAX_AGE: segundos de vida de un bloque (def. 300)
+    DB_ID_INSERT_ATTEMPTS: intentos de INSERT ante clave duplicada (def. 5)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Textos de error de clave duplicada (Access ODBC en inglés/español, SQLite).
+# No incluye el SQLSTATE genérico 23000: también lo dan NOT NULL, claves
+# ajenas o validaciones, que no se resuelven reintentando con otro ID.
+_DUPLICATE_KEY_MARKERS = (
+    "duplicate values",
+    "duplicad",
+    "(3022)",
+    "(-1605)",
+    "unique constraint failed",
+)
+
+
+def is_duplicate_key_error(error: Optional[BaseException]) -> bool:
+    """True si ``error`` es una violación de clave primaria o índice único."""
+    if error is None:
+        return False
+    text = " ".join(str(arg) for arg in getattr(error, "args", ())) or str(error)
+    text = text.lower()
+    return any(marker in text for marker in _DUPLICATE_KEY_MARKERS)
+
+
+class _Block:
+    __slots__ = ("next", "end", "reserved_at")
+
+    def __init__(self, start: int, size: int):
+        self.next = start
+        self.end = start + size  # exclusivo
+        self.reserved_at = time.monotonic()
+
+
+class IdAllocator:
+    """Reserva bloques de IDs por (BD, tabla, campo) y los entrega en O(1)."""
+
+    def __init__(
+        self,
+        block_size: int = 50,
+        max_block_age: Optional[float] = 300,
+        max_attempts: int = 5,
+    ):
+        if block_size < 1:
+            raise ValueError("block_size debe ser >= 1")
+        self.block_size = block_size
+        self.max_block_age = max_block_age
+        self.max_attempts = max(1, max_attempts)
+        self._blocks: dict[tuple, _Block] = {}
+        self._locks: dict[tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats = {
+            "allocated": 0,
+            "blocks_reserved": 0,
+            "invalidations": 0,
+            "collisions": 0,
+        }
+
+    @staticmethod
+    def _key(scope: Hashable, table: str, id_field: str) -> tuple:
+        return (scope, table.lower(), id_field.lower())
+
+    def _lock_for(self, key: tuple) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def next_id(
+        self,
+        scope: Hashable,
+        table: str,
+        id_field: str,
+        fetch_max: Callable[[], Optional[int]],
+    ) -> int:
+        """Devuelve el siguiente ID libre para ``table.id_field``.
+
+        Args:
+            scope: Identifica la BD (ver ``db_scope``)
+            fetch_max: Devuelve el ``MAX`` actual (None si la tabla está vacía);
+                sólo se invoca al reservar un bloque nuevo
+        """
+        key = self._key(scope, table, id_field)
+        with self._lock_for(key):
+            block = self._blocks.get(key)
+            if block is None or block.next >= block.end or self._is_stale(block):
+                current_max = fetch_max() or 0
+                start = current_max + 1
+                if block is not None:
+                    # Nunca retroceder por debajo de lo ya entregado
+                    start = max(start, block.next)
+                block = self._blocks[key] = _Block(start, self.block_size)
+                self._stats["blocks_reserved"] += 1
+                logger.debug(
+                    f"Bloque de IDs reservado {table}.{id_field}: "
+                    f"{block.next}..{block.end - 1}"
+                )
+            value = block.next
+            block.next += 1
+            self._stats["allocated"] += 1
+            return value
+
+    def next_id_for(self, db: Any, table: str, id_field: str) -> int:
+        """Atajo para objetos con ``get_max_id`` (``AccessDatabase`` o pool)."""
+        return self.next_id(
+            db_scope(db), table, id_field, lambda: db.get_max_id(table, id_field)
+        )
+
+    def insert_with_id(
+        self,
+        scope: Hashable,
+        table: str,
+        id_field: str,
+        fetch_max: Callable[[], Optional[int]],
+        insert: Callable[[int], Any],
+        max_attempts: Optional[int] = None,
+    ) -> int:
+        """Ejecuta ``insert(id)`` con un ID asignado y lo devuelve.
+
+        ``insert`` debe propagar el error de la BD. Si es de clave duplicada
+        (otro proceso usó el mismo ID) se descarta el bloque, se relee ``MAX``
+        y se reintenta con un ID nuevo; cualquier otro error, o agotar los
+        intentos, se propaga tras invalidar el bloque.
+        """
+        attempts = max(1, max_attempts or self.max_attempts)
+        attempt = 1
+        while True:
+            value = self.next_id(scope, table, id_field, fetch_max)
+            try:
+                insert(value)
+                return value
+            except Exception as e:
+                self.invalidate(scope, table, id_field)
+                if not is_duplicate_key_error(e) or attempt >= attempts:
+                    raise
+                with self._locks_guard:
+                    self._stats["collisions"] += 1
+                logger.warning(
+                    f"ID {value} duplicado en {table}.{id_field} "
+                    f"(intento {attempt}/{attempts}); se relee MAX",
+                    extra={"event": "db_id_collision", "table": table, "id": value},
+                )
+                attempt += 1
+
+    def insert_with_id_for(
+        self,
+        db: Any,
+        table: str,
+        id_field: str,
+        insert: Callable[[int], Any],
+        max_attempts: Optional[int] = None,
+    ) -> int:
+        """``insert_with_id`` para objetos con ``get_max_id``."""
+        return self.insert_with_id(
+            db_scope(db),
+            table,
+            id_field,
+            lambda: db.get_max_id(table, id_field),
+            insert,
+            max_attempts,
+        )
+
+    def invalidate(self, scope: Hashable, table: str, id_field: str) -> None:
+        """Descarta el bloque abierto; el siguiente ID relee ``MAX``."""
+        key = self._key(scope, table, id_field)
+        with self._lock_for(key):
+            if self._blocks.pop(key, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def invalidate_for(self, db: Any, table: str, id_field: str) -> None:
+        self.invalidate(db_scope(db), table, id_field)
+
+    def reset(self) -> None:
+        """Olvida todos los bloques (p.ej. entre tests)."""
+        with self._locks_guard:
+            self._blocks.clear()
+            self._locks.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {**self._stats, "open_blocks": len(self._blocks)}
+
+    def _is_stale(self, block: _Block) -> bool:
+        return bool(self.max_block_age) and (
+            time.monotonic() - block.reserved_at >= self.max_block_age
+        )
+
+
+_DBQ_RE = re.compile(r"DBQ=([^;]+)", re.IGNORECASE)
+
+
+def db_scope(db: Any) -> Hashable:
+    """Clave de BD para los bloques de IDs.
+
+    Se usa la ruta ``DBQ`` de la cadena de conexión, de modo que un pool y un
+    ``AccessDatabase`` sobre el mismo fichero comparten bloques aunque sus
+    cadenas difieran (contraseña, driver...). Sin cadena se usa la identidad
+    del objeto.
+    """
+    connection_string = getattr(db, "connection_string", None)
+    if not isinstance(connection_string, str):
+        return id(db)
+    match = _DBQ_RE.search(connection_string)
+    return match.group(1).strip().lower() if match else connection_string
+
+
+# Asignador compartido por el proceso
+id_allocator = IdAllocator(
+    block_size=int(os.getenv("DB_ID_BLOCK_SIZE", "50")),
+    max_block_age=float(os.getenv("DB_ID_BLOCK_MAX_AGE", "300")),
+    max_attempts=int(os.getenv("DB_ID_INSERT_ATTEMPTS", "5")),
+)
+
+
+__all__ = ["IdAllocator", "id_allocator", "db_scope", "is_duplicate_key_error"]
@@ -0,0 +1,205 @@
+"""Métricas ligeras para la capa de base de datos.
+
+``LatencyHistogram`` acumula duraciones en cubetas fijas (milisegundos) y
+expone un resumen serializable para ``get_stats()``. ``QueryStats`` agrupa
+latencia, espera de conexión y filas por huella de SQL (``fingerprint_sql``).
+Ninguno es thread-safe por sí mismo: quien los usa debe protegerlos con su
+propio lock de estadísticas.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Sequence
+from typing import Any, Optional
+
+DEFAULT_BUCKETS_MS: tuple[float, ...] = (
+    1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+
+def _bucket_label(limit: float) -> str:
+    return f"<={limit:g}ms"
+
+
+class LatencyHistogram:
+    """Histograma de duraciones con cubetas acumulativas por límite superior."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds_ms: Optional[Sequence[float]] = None):
+        self.bounds = tuple(bounds_ms or DEFAULT_BUCKETS_MS)
+        # Una cubeta por límite más la de desbordamiento
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Registra una duración expresada en segundos."""
+        ms = seconds * 1000.0
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        for pos, limit in enumerate(self.bounds):
+            if ms <= limit:
+                self.counts[pos] += 1
+                return
+        self.counts[-1] += 1
+
+    def percentile(self, q: float) -> float:
+        """Estimación del percentil ``q`` (0-1): límite de la cubeta que lo contiene."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for limit, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= target:
+                return float(min(limit, self.max))
+        return round(self.max, 3)
+
+    def to_dict(self) -> dict[str, Any]:
+        buckets = {
+            _bucket_label(limit): n for limit, n in zip(self.bounds, self.counts)
+        }
+        buckets[f">{self.bounds[-1]:g}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_DATE_LITERAL_RE = re.compile(r"#[^#]*#")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint_sql(sql: str) -> str:
+    """Normaliza una sentencia para agrupar ejecuciones equivalentes.
+
+    Los literales (texto, ``#fecha#``, números) pasan a ``?``, las listas
+    ``IN (?, ?, ...)`` se colapsan a ``IN (?+)`` y los espacios se compactan.
+    """
+    text = _STRING_LITERAL_RE.sub("?", sql)
+    text = _DATE_LITERAL_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("(?+)", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def fingerprint_id(fingerprint: str) -> str:
+    """Identificador corto y estable de una huella (etiqueta para logs)."""
+    return hashlib.md5(fingerprint.encode("utf-8")).hexdigest()[:10]
+
+
+class _FingerprintStats:
+    __slots__ = ("id", "sql", "calls", "errors", "rows", "latency", "wait")
+
+    def __init__(self, fingerprint: str, bounds_ms: Optional[Sequence[float]]):
+        self.id = fingerprint_id(fingerprint)
+        self.sql = fingerprint
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = LatencyHistogram(bounds_ms)
+        self.wait = LatencyHistogram(bounds_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "sql": self.sql,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "p50_ms": self.latency.percentile(0.5),
+            "p95_ms": self.latency.percentile(0.95),
+            "latency": self.latency.to_dict(),
+            "wait": self.wait.to_dict(),
+        }
+
+
+class QueryStats:
+    """Latencia, espera de conexión y filas agregadas por huella de SQL.
+
+    Args:
+        max_fingerprints: Huellas distintas que se conservan; el resto se
+            acumula en ``OTHER`` para acotar la memoria con SQL dinámico.
+    """
+
+    OTHER = "<otras>"
+
+    def __init__(
+        self,
+        max_fingerprints: int = 200,
+        bounds_ms: Optional[Sequence[float]] = None,
+    ):
+        self.max_fingerprints = max_fingerprints
+        self.bounds_ms = bounds_ms
+        self._by_fingerprint: dict[str, _FingerprintStats] = {}
+        # Huellas ya calculadas por texto SQL (las sentencias se repiten)
+        self._fingerprint_cache: dict[str, str] = {}
+
+    def fingerprint(self, sql: str) -> str:
+        fingerprint = self._fingerprint_cache.get(sql)
+        if fingerprint is None:
+            fingerprint = fingerprint_sql(sql)
+            if len(self._fingerprint_cache) < self.max_fingerprints * 4:
+                self._fingerprint_cache[sql] = fingerprint
+        return fingerprint
+
+    def observe(
+        self,
+        sql: str,
+        elapsed: float,
+        wait: float = 0.0,
+        rows: Optional[int] = None,
+    ) -> _FingerprintStats:
+        """Registra una ejecución; ``rows=None`` indica que falló."""
+        fingerprint = self.fingerprint(sql)
+        entry = self._by_fingerprint.get(fingerprint)
+        if entry is None:
+            if len(self._by_fingerprint) >= self.max_fingerprints:
+                fingerprint = self.OTHER
+                entry = self._by_fingerprint.get(fingerprint)
+            if entry is None:
+                entry = self._by_fingerprint[fingerprint] = _FingerprintStats(
+                    fingerprint, self.bounds_ms
+                )
+        entry.calls += 1
+        entry.latency.observe(elapsed)
+        entry.wait.observe(wait)
+        if rows is None:
+            entry.errors += 1
+        elif isinstance(rows, int) and rows > 0:
+            entry.rows += rows
+        return entry
+
+    def top(self, limit: Optional[int] = None) -> list[dict[str, Any]]:
+        """Resumen por huella ordenado por tiempo total (las más costosas primero)."""
+        entries = sorted(
+            self._by_fingerprint.values(), key=lambda e: e.latency.total, reverse=True
+        )
+        return [e.to_dict() for e in entries[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._by_fingerprint)
+
+    def reset(self) -> None:
+        self._by_fingerprint.clear()
+        self._fingerprint_cache.clear()
+
+
+__all__ = [
+    "LatencyHistogram",
+    "QueryStats",
+    "DEFAULT_BUCKETS_MS",
+    "fingerprint_sql",
+    "fingerprint_id",
+]
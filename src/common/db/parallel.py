@@ -0,0 +1,169 @@
+"""Ejecución en paralelo de consultas independientes sobre un pool.
+
+Los informes con muchas secciones (Expedientes, AGEDYS) lanzan varias SELECT
+independientes una tras otra. ``run_parallel`` las reparte entre las
+conexiones del ``AccessConnectionPool`` subyacente, de modo que el informe
+tarda aproximadamente lo que su consulta más lenta:
+
+    run = run_parallel(db, [
+        "SELECT ... FROM TbExpedientes ...",
+        ("SELECT ... WHERE Fecha > ?", (fecha,)),
+        manager.get_hitos_a_punto_finalizar,      # callable sin argumentos
+    ], label="expedientes")
+    tsol, hitos, ... = run.rows()
+
+- El orden de los resultados es el de ``queries``.
+- Un error en una consulta se captura en su resultado y no aborta las demás.
+- ``wall_time`` frente a ``summed_time`` mide la ganancia real.
+
+Sin pool (``AccessDatabase`` en modo legacy) la conexión única no admite uso
+concurrente y las consultas se ejecutan secuencialmente en el hilo llamador.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Query = Union[str, tuple, Callable[[], Any]]
+
+
+class QueryResult:
+    """Resultado de una consulta de ``run_parallel``."""
+
+    __slots__ = ("rows", "error", "elapsed")
+
+    def __init__(self, rows: Any = None, error: Optional[BaseException] = None, elapsed: float = 0.0):
+        self.rows = rows
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"QueryResult({state}, elapsed={self.elapsed:.3f}s)"
+
+
+class ParallelRun:
+    """Resultados ordenados de ``run_parallel`` con métricas de tiempo."""
+
+    def __init__(self, results: list[QueryResult], wall_time: float, workers: int):
+        self.results = results
+        self.wall_time = wall_time
+        self.workers = workers
+
+    @property
+    def summed_time(self) -> float:
+        """Suma de los tiempos individuales (lo que costaría en serie)."""
+        return sum(r.elapsed for r in self.results)
+
+    @property
+    def speedup(self) -> float:
+        return self.summed_time / self.wall_time if self.wall_time > 0 else 1.0
+
+    @property
+    def errors(self) -> list[tuple[int, BaseException]]:
+        return [(i, r.error) for i, r in enumerate(self.results) if r.error is not None]
+
+    def rows(self, default: Any = None) -> list[Any]:
+        """Filas de cada consulta; ``default`` (``[]`` si None) para las fallidas."""
+        fallback = [] if default is None else default
+        return [r.rows if r.ok else fallback for r in self.results]
+
+    def __iter__(self) -> Iterator[QueryResult]:
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __getitem__(self, index: int) -> QueryResult:
+        return self.results[index]
+
+
+def _as_callable(db: Any, query: Query) -> Callable[[], Any]:
+    if callable(query):
+        return query
+    if isinstance(query, str):
+        return lambda: db.execute_query(query)
+    if isinstance(query, tuple) and query and isinstance(query[0], str):
+        sql, params = query[0], (query[1] if len(query) > 1 else None)
+        if params:
+            return lambda: db.execute_query(sql, params)
+        return lambda: db.execute_query(sql)
+    raise TypeError(f"Consulta no soportada en run_parallel: {query!r}")
+
+
+def _pool_size(db: Any) -> int:
+    pool = getattr(db, "pool", None)
+    if pool is None and hasattr(db, "get_connection") and hasattr(db, "max_connections"):
+        pool = db  # AccessConnectionPool directamente
+    size = getattr(pool, "max_connections", None)
+    return size if isinstance(size, int) and size > 0 else 1
+
+
+def _timed(task: Callable[[], Any]) -> QueryResult:
+    start = time.perf_counter()
+    try:
+        rows = task()
+    except Exception as e:
+        return QueryResult(error=e, elapsed=time.perf_counter() - start)
+    return QueryResult(rows=rows, elapsed=time.perf_counter() - start)
+
+
+def run_parallel(
+    db: Any,
+    queries: Sequence[Query],
+    max_workers: Optional[int] = None,
+    label: str = "",
+) -> ParallelRun:
+    """Ejecuta consultas independientes repartidas entre las conexiones del pool.
+
+    Args:
+        db: ``AccessDatabase`` (con pool para paralelizar) o ``AccessConnectionPool``
+        queries: SQL sin parámetros, tuplas ``(sql, params)`` o callables sin
+            argumentos (p.ej. métodos ``get_*`` de un manager)
+        max_workers: Límite de hilos; nunca supera ``max_connections`` del pool
+        label: Identificador para el log estructurado
+
+    Returns:
+        ``ParallelRun`` con un ``QueryResult`` por consulta, en el mismo orden
+    """
+    tasks = [_as_callable(db, q) for q in queries]
+    pool_size = _pool_size(db)
+    workers = max(1, min(max_workers or pool_size, pool_size, len(tasks)))
+
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [_timed(task) for task in tasks]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="AccessParallel"
+        ) as executor:
+            results = list(executor.map(_timed, tasks))
+    run = ParallelRun(results, time.perf_counter() - start, workers)
+
+    # Los errores individuales quedan en cada QueryResult; el llamador decide
+    logger.info(
+        f"Consultas paralelas {label}: {len(tasks)} en {run.wall_time:.3f}s "
+        f"(suma {run.summed_time:.3f}s, {workers} hilos)",
+        extra={
+            "event": "db_parallel_run",
+            "section": label,
+            "queries": len(tasks),
+            "workers": workers,
+            "wall_ms": round(run.wall_time * 1000, 1),
+            "summed_ms": round(run.summed_time * 1000, 1),
+            "errors": len(run.errors),
+        },
+    )
+    return run
+
+
+__all__ = ["run_parallel", "ParallelRun", "QueryResult"]
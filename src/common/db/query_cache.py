@@ -0,0 +1,192 @@
+"""Caché de resultados de consultas con TTL, LRU e invalidación por tabla.
+
+Pensada para tablas de referencia (``TbUsuariosAplicaciones``,
+``TbUsuariosAplicacionesPermisos``...) que se consultan muchas veces por ciclo
+y apenas cambian. Sólo se cachean las consultas que declaran ``cache_tags``:
+
+    db.execute_query(sql, params, cache_tags=("TbUsuariosAplicaciones",))
+
+Las escrituras hechas a través de ``AccessDatabase`` (``execute_non_query``,
+``insert_record``, ``update_record``, ``insert_many``, ``update_many``)
+invalidan las entradas etiquetadas con la tabla afectada. Las escrituras de
+otros procesos no se ven: para tablas que se editan fuera (p.ej. las de
+usuarios) la consulta puede pedir un TTL más corto con ``cache_ttl``.
+
+Hay una caché compartida por cadena de conexión, de modo que distintas
+instancias de ``AccessDatabase`` sobre la misma BD la reutilizan.
+
+Variables de entorno:
+    DB_QUERY_CACHE_TTL: segundos de vida de cada entrada (0 desactiva; def. 300)
+    DB_QUERY_CACHE_MAX_ENTRIES: entradas máximas por BD (def. 256)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_WRITE_TABLE_RE = re.compile(
+    r"^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+(?:\S+\s+)?FROM)\s+\[?([\w$]+)\]?",
+    re.IGNORECASE,
+)
+_READ_ONLY_RE = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """Colapsa espacios en blanco para que variantes de formato compartan clave."""
+    return " ".join(sql.split())
+
+
+def written_table(sql: str) -> Optional[str]:
+    """Tabla destino de un INSERT/UPDATE/DELETE simple, o None si no se reconoce."""
+    match = _WRITE_TABLE_RE.match(sql)
+    return match.group(1) if match else None
+
+
+class QueryCache:
+    """Caché LRU thread-safe de resultados con TTL y etiquetas de tabla."""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires_at, rows, tags)
+        self._entries: OrderedDict = OrderedDict()
+        self._tag_index: dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "expirations": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def make_key(sql: str, params: Optional[Iterable[Any]] = None) -> Optional[tuple]:
+        """Clave (SQL normalizado, params). None si los params no son hashables."""
+        key = (normalize_sql(sql), tuple(params) if params else ())
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: tuple) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, rows, _ = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return rows
+
+    def put(
+        self, key: tuple, rows: list, tags: Iterable[str], ttl: Optional[float] = None
+    ) -> None:
+        """Guarda ``rows``; ``ttl`` acorta (nunca alarga) la vida de la entrada."""
+        lifetime = self.ttl if ttl is None else min(self.ttl, ttl)
+        if lifetime <= 0:
+            return
+        tag_set = frozenset(t.lower() for t in tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + lifetime, rows, tag_set)
+            for tag in tag_set:
+                self._tag_index.setdefault(tag, set()).add(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, tables: Iterable[str]) -> int:
+        """Elimina las entradas etiquetadas con cualquiera de ``tables``."""
+        removed = 0
+        with self._lock:
+            for table in tables:
+                for key in list(self._tag_index.get(table.lower(), ())):
+                    self._remove(key)
+                    removed += 1
+            self._stats["invalidations"] += removed
+        if removed:
+            logger.debug(f"Caché de consultas: {removed} entradas invalidadas ({tables})")
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._tag_index.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "ttl": self.ttl}
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+# Cachés compartidas por cadena de conexión
+_caches: dict[str, QueryCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_cache(connection_string: str) -> Optional[QueryCache]:
+    """Devuelve la caché compartida para una BD, o None si está desactivada."""
+    ttl = float(os.getenv("DB_QUERY_CACHE_TTL", "300"))
+    if ttl <= 0:
+        return None
+    with _caches_lock:
+        cache = _caches.get(connection_string)
+        if cache is None:
+            cache = QueryCache(
+                ttl=ttl,
+                max_entries=int(os.getenv("DB_QUERY_CACHE_MAX_ENTRIES", "256")),
+            )
+            _caches[connection_string] = cache
+        return cache
+
+
+def clear_query_caches() -> None:
+    """Vacía todas las cachés de consultas (p.ej. entre ciclos o en tests)."""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
+
+
+def is_read_only(sql: str) -> bool:
+    return bool(_READ_ONLY_RE.match(sql))
+
+
+__all__ = [
+    "QueryCache",
+    "get_query_cache",
+    "clear_query_caches",
+    "normalize_sql",
+    "written_table",
+    "is_read_only",
+]
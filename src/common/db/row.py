@@ -0,0 +1,104 @@
+"""Filas compactas para resultados de consultas Access.
+
+Por defecto cada fila se materializa como ``dict(zip(columns, row))``, lo que
+replica la tabla hash de nombres de columna en cada fila. ``Row`` guarda sólo
+los valores y comparte un único índice columna -> posición por result set.
+
+Uso (opt-in):
+    db = AccessDatabase(conn_str, pool=pool, row_factory=Row)
+    for r in db.execute_query("SELECT Nombre, CorreoUsuario FROM TbUsuariosAplicaciones"):
+        r["Nombre"], r.get("CorreoUsuario"), r.Nombre
+
+``Row`` es de sólo lectura; ``to_dict()`` devuelve una copia mutable.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import Any, Callable, Optional
+
+_MISSING = object()
+
+
+class Row:
+    """Fila inmutable con acceso por clave, ``.get()`` y atributo."""
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: dict[str, int], values: Sequence[Any]):
+        self._index = index
+        self._values = values
+
+    # Acceso estilo dict
+    def __getitem__(self, key: str) -> Any:
+        if isinstance(key, int):
+            return self._values[key]
+        return self._values[self._index[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        pos = self._index.get(key)
+        return default if pos is None else self._values[pos]
+
+    def __getattr__(self, name: str) -> Any:
+        # Sólo se invoca si no existe atributo real (slots/métodos)
+        try:
+            index = object.__getattribute__(self, "_index")
+        except AttributeError:  # pragma: no cover - instancia a medio construir
+            raise AttributeError(name) from None
+        pos = index.get(name, _MISSING)
+        if pos is _MISSING:
+            raise AttributeError(name)
+        return self._values[pos]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self) -> list[Any]:
+        return [self._values[pos] for pos in self._index.values()]
+
+    def items(self) -> list[tuple[str, Any]]:
+        return [(key, self._values[pos]) for key, pos in self._index.items()]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: self._values[pos] for key, pos in self._index.items()}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Row):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Row({self.to_dict()!r})"
+
+
+RowFactory = Callable[[dict[str, int], Sequence[Any]], Any]
+
+
+def row_converter(
+    columns: Sequence[str], row_factory: Optional[RowFactory] = None
+) -> Callable[[Sequence[Any]], Any]:
+    """Devuelve la función que convierte una fila cruda del cursor.
+
+    Sin ``row_factory`` se mantiene el formato histórico (dict por fila). Con
+    ``row_factory`` se construye un único índice columna -> posición que
+    comparten todas las filas del result set.
+    """
+    if row_factory is None:
+        return lambda row: dict(zip(columns, row))
+    index = {name: pos for pos, name in enumerate(columns)}
+    return lambda row: row_factory(index, row)
+
+
+__all__ = ["Row", "RowFactory", "row_converter"]
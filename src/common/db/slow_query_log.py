@@ -0,0 +1,168 @@
+"""Registro de consultas lentas en JSONL.
+
+``AccessDatabase`` mide cada ``execute_query`` / ``execute_non_query`` y, si
+supera el umbral, añade una línea JSON al fichero de consultas lentas:
+
+    {"ts": "2025-03-04T07:12:01", "duration_ms": 1840.2, "rows": 312,
+     "fingerprint": "SELECT ... WHERE Fecha > ?", "fingerprint_id": "9f1c...",
+     "params": ["j***@empresa.com", "2025-03-01T00:00:00"],
+     "caller": "riesgos.riesgos_manager.RiesgosManager.get_editions_ready_for_publication",
+     "db": "gestion_riesgos_datos.accdb"}
+
+Así se localizan las consultas costosas sin activar el log DEBUG de SQL (que
+por sí mismo ralentiza la ejecución). Los parámetros de texto se enmascaran
+(correos, nombres...) y sólo se conservan números y fechas.
+
+Variables de entorno:
+    DB_SLOW_QUERY_MS: umbral en milisegundos (def. 1000; 0 desactiva)
+    DB_SLOW_QUERY_LOG: ruta del fichero (def. logs/slow_queries.jsonl)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .metrics import fingerprint_id, fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+_ROOT_DIR = Path(__file__).resolve().parent.parent.parent.parent
+_DB_PACKAGE_DIR = str(Path(__file__).resolve().parent)
+_EMAIL_RE = re.compile(r"^([^@\s])[^@\s]*(@[^@\s]+)$")
+_DBQ_RE = re.compile(r"DBQ=([^;]+)", re.IGNORECASE)
+
+
+def mask_param(value: Any) -> Any:
+    """Enmascara un parámetro para el log (sin datos personales).
+
+    Números, booleanos y fechas se conservan; los correos quedan como
+    ``j***@dominio`` y el resto de textos como ``<str:N>``.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        match = _EMAIL_RE.match(value.strip())
+        if match:
+            return f"{match.group(1)}***{match.group(2)}"
+        return f"<str:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def find_caller(skip_dirs: tuple[str, ...] = (_DB_PACKAGE_DIR,)) -> str:
+    """Primer método fuera de la capa de BD en la pila (``modulo.Clase.metodo``)."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(skip_dirs) and "contextlib" not in filename:
+            module = frame.f_globals.get("__name__", "?")
+            func = frame.f_code.co_name
+            owner = frame.f_locals.get("self")
+            if owner is not None:
+                return f"{module}.{type(owner).__name__}.{func}"
+            return f"{module}.{func}"
+        frame = frame.f_back
+    return "?"
+
+
+def _db_label(connection_string: str) -> str:
+    match = _DBQ_RE.search(connection_string or "")
+    raw = match.group(1) if match else (connection_string or "")
+    return re.split(r"[\\/]", raw.strip())[-1].lower()
+
+
+class SlowQueryLog:
+    """Escribe en JSONL las sentencias que superan ``threshold_ms``.
+
+    Thread-safe: cada registro es una línea completa escrita bajo lock.
+    """
+
+    def __init__(self, path: Union[str, Path], threshold_ms: float = 1000.0):
+        self.path = Path(path)
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def is_slow(self, elapsed: float) -> bool:
+        return elapsed * 1000.0 >= self.threshold_ms
+
+    def record(
+        self,
+        query: str,
+        params: Optional[Any],
+        elapsed: float,
+        rows: Optional[int],
+        connection_string: str = "",
+        caller: Optional[str] = None,
+    ) -> Optional[dict[str, Any]]:
+        """Registra la sentencia si es lenta; devuelve la entrada escrita o None."""
+        if not self.is_slow(elapsed):
+            return None
+        fingerprint = fingerprint_sql(query)
+        if params is not None and not isinstance(params, (list, tuple)):
+            params = (params,)
+        entry = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(elapsed * 1000.0, 1),
+            "rows": rows,
+            "ok": rows is not None,
+            "fingerprint": fingerprint,
+            "fingerprint_id": fingerprint_id(fingerprint),
+            "params": [mask_param(p) for p in params or ()],
+            "caller": caller or find_caller(),
+            "db": _db_label(connection_string),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+                self.recorded += 1
+        except OSError as e:
+            logger.warning(f"No se pudo escribir el log de consultas lentas: {e}")
+            return None
+        logger.info(
+            f"Consulta lenta {entry['duration_ms']}ms en {entry['caller']}",
+            extra={
+                "event": "db_slow_query",
+                "duration_ms": entry["duration_ms"],
+                "fingerprint": entry["fingerprint_id"],
+                "caller": entry["caller"],
+            },
+        )
+        return entry
+
+
+_shared: dict[tuple[Path, float], SlowQueryLog] = {}
+_shared_lock = threading.Lock()
+
+
+def get_slow_query_log() -> Optional[SlowQueryLog]:
+    """Devuelve el registro compartido según el entorno, o None si está desactivado."""
+    threshold = float(os.getenv("DB_SLOW_QUERY_MS", "1000"))
+    if threshold <= 0:
+        return None
+    path = Path(os.getenv("DB_SLOW_QUERY_LOG", "logs/slow_queries.jsonl"))
+    if not path.is_absolute():
+        path = _ROOT_DIR / path
+    key = (path, threshold)
+    with _shared_lock:
+        slow_log = _shared.get(key)
+        if slow_log is None:
+            slow_log = _shared[key] = SlowQueryLog(path, threshold)
+        return slow_log
+
+
+__all__ = ["SlowQueryLog", "get_slow_query_log", "mask_param", "find_caller"]
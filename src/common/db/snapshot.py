@@ -0,0 +1,205 @@
+"""Copias locales de lectura de BD Access en red (modo snapshot).
+
+En oficina las rutas de ``Config`` apuntan a recursos UNC (``\\\\datoste\\...``)
+y cada lectura cruza la red bajo el bloqueo de Jet. En modo snapshot las BD
+de sólo lectura (Riesgos, AGEDYS, Expedientes, BRASS) se copian a un
+directorio local y los managers consultan la copia; las escrituras siguen
+yendo al fichero maestro.
+
+La copia sólo se rehace si cambió el tamaño o la fecha de modificación del
+maestro (firma guardada en ``snapshots.json`` dentro del directorio de caché).
+La copia se escribe en un temporal y se renombra de forma atómica; si el
+maestro cambia durante la copia se reintenta y, si sigue cambiando, se usa el
+maestro para no leer un fichero a medio escribir.
+
+Variables de entorno (ver ``Config``):
+    DB_SNAPSHOT_ENABLED: activa el modo (def. false)
+    DB_SNAPSHOT_DIR: directorio local de caché (def. dbs-locales/snapshots)
+    DB_SNAPSHOT_DATABASES: BD lógicas a copiar (def. riesgos,agedys,expedientes,brass)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "snapshots.json"
+
+
+class SnapshotInfo:
+    """Resultado de ``SnapshotCache.ensure`` para una BD."""
+
+    __slots__ = ("name", "source", "path", "copied", "copy_seconds", "taken_at", "size")
+
+    def __init__(
+        self,
+        name: str,
+        source: Path,
+        path: Path,
+        copied: bool,
+        copy_seconds: float,
+        taken_at: float,
+        size: int,
+    ):
+        self.name = name
+        self.source = source
+        self.path = path
+        self.copied = copied
+        self.copy_seconds = copy_seconds
+        self.taken_at = taken_at
+        self.size = size
+
+    @property
+    def age_seconds(self) -> float:
+        """Segundos desde que se tomó la copia vigente."""
+        return max(0.0, time.time() - self.taken_at)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "db": self.name,
+            "source": str(self.source),
+            "path": str(self.path),
+            "copied": self.copied,
+            "copy_ms": round(self.copy_seconds * 1000, 1),
+            "age_s": round(self.age_seconds, 1),
+            "size": self.size,
+        }
+
+
+def _signature(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class SnapshotCache:
+    """Gestiona las copias locales de un directorio de caché.
+
+    Args:
+        cache_dir: Directorio local donde se guardan las copias
+        copy_attempts: Reintentos si el maestro cambia durante la copia
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], copy_attempts: int = 2):
+        self.cache_dir = Path(cache_dir)
+        self.copy_attempts = max(1, copy_attempts)
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.cache_dir / MANIFEST_NAME
+
+    def _load_manifest(self) -> dict[str, dict[str, Any]]:
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: dict[str, dict[str, Any]]) -> None:
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def snapshot_path(self, name: str, source: Union[str, Path]) -> Path:
+        return self.cache_dir / f"{name}{Path(source).suffix or '.accdb'}"
+
+    def ensure(
+        self,
+        name: str,
+        source: Union[str, Path],
+        before_replace: Optional[Callable[[Path], Any]] = None,
+    ) -> Optional[SnapshotInfo]:
+        """Devuelve una copia local vigente de ``source``, copiándola si cambió.
+
+        Args:
+            name: Nombre lógico de la BD
+            source: Fichero maestro
+            before_replace: Se invoca con la ruta de la copia justo antes de
+                sustituirla (p.ej. para cerrar las conexiones abiertas sobre ella)
+
+        Returns:
+            ``SnapshotInfo`` o None si no se pudo obtener una copia coherente
+            (el llamador debe usar entonces el maestro).
+        """
+        source = Path(source)
+        target = self.snapshot_path(name, source)
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            manifest = self._load_manifest()
+            entry = manifest.get(name) or {}
+            try:
+                signature = _signature(source)
+            except OSError as e:
+                logger.warning(f"Snapshot {name}: no se puede leer el maestro {source}: {e}")
+                return None
+
+            if (
+                target.exists()
+                and entry.get("source") == str(source)
+                and tuple(entry.get("signature", ())) == signature
+            ):
+                info = SnapshotInfo(
+                    name, source, target, False, 0.0, entry.get("taken_at", 0.0), signature[0]
+                )
+                self._log(info)
+                return info
+
+            started = time.perf_counter()
+            for attempt in range(1, self.copy_attempts + 1):
+                tmp = target.with_name(target.name + ".partial")
+                try:
+                    shutil.copyfile(source, tmp)
+                    after = _signature(source)
+                except OSError as e:
+                    logger.warning(f"Snapshot {name}: error copiando {source}: {e}")
+                    tmp.unlink(missing_ok=True)
+                    return None
+                if after == signature:
+                    try:
+                        if before_replace is not None and target.exists():
+                            before_replace(target)
+                        # En Windows falla si alguna conexión mantiene abierta la copia
+                        os.replace(tmp, target)
+                    except Exception as e:
+                        logger.warning(f"Snapshot {name}: no se pudo sustituir {target}: {e}")
+                        tmp.unlink(missing_ok=True)
+                        return None
+                    break
+                # El maestro cambió mientras se copiaba: la copia puede ser incoherente
+                tmp.unlink(missing_ok=True)
+                logger.info(f"Snapshot {name}: el maestro cambió durante la copia (intento {attempt})")
+                signature = after
+            else:
+                logger.warning(f"Snapshot {name}: maestro en escritura continua; se usa el original")
+                return None
+
+            info = SnapshotInfo(
+                name, source, target, True, time.perf_counter() - started, time.time(), signature[0]
+            )
+            manifest[name] = {
+                "source": str(source),
+                "signature": list(signature),
+                "taken_at": info.taken_at,
+                "copy_seconds": info.copy_seconds,
+            }
+            self._save_manifest(manifest)
+            self._log(info)
+            return info
+
+    def _log(self, info: SnapshotInfo) -> None:
+        data = info.to_dict()
+        state = "copiada" if info.copied else "vigente"
+        logger.info(
+            f"Snapshot {info.name} {state}: {data['copy_ms']}ms, "
+            f"antigüedad {data['age_s']}s, {info.size} bytes",
+            extra={"event": "db_snapshot", **data},
+        )
+
+
+__all__ = ["SnapshotCache", "SnapshotInfo"]
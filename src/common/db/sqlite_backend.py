@@ -0,0 +1,570 @@
+"""Backend SQLite que sustituye al driver Access en desarrollo y benchmarks.
+
+Permite ejecutar los managers reales (y sus consultas en dialecto Access) en
+Linux/CI sin ODBC: ``AccessConnectionPool`` y ``AccessDatabase`` detectan las
+cadenas de conexión SQLite (``is_sqlite_target``) y abren la conexión con
+``connect`` en lugar de ``pyodbc.connect``.
+
+Cadenas reconocidas:
+    sqlite:///ruta/a/tareas.sqlite
+    Driver={...};DBQ=C:\\ruta\\tareas.sqlite;PWD=...   (DBQ con .sqlite/.sqlite3/.db)
+
+Shims del dialecto Access (``translate_access_sql``, fuera de literales):
+    - ``[Campo]`` -> ``"Campo"``; ``#2024-01-31#`` -> ``'2024-01-31 00:00:00'``
+    - ``Date()`` / ``Now()`` y funciones VBA (``DateDiff``, ``DateAdd``, ``Nz``,
+      ``IIf``, ``IsNull``, ``Len``, ``Left``, ``Mid``, ``Year``...)
+    - ``= True`` / ``= False`` aceptan -1/1/``'Sí'`` y 0/``'No'``
+    - ``&`` -> ``||``, ``TOP n`` -> ``LIMIT n``, comodines ``*``/``?`` en LIKE
+    - ``Left(``/``Right(`` (reservadas en SQLite) -> ``ACCESS_LEFT(``...
+
+Las fechas se guardan como texto ISO (``YYYY-MM-DD HH:MM:SS``) y se devuelven
+como ``datetime``, igual que pyodbc. Los esquemas mínimos de cada BD viven en
+``sqlite_schemas/`` y se crean con ``create_database``.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+SCHEMA_DIR = Path(__file__).parent / "sqlite_schemas"
+
+# BD lógica -> ficheros de esquema. Las tablas de usuarios son comunes y los
+# managers también registran correos en la BD de tareas
+SCHEMA_FILES: dict[str, tuple[str, ...]] = {
+    "tareas": ("usuarios.sql", "tareas.sql", "correos.sql"),
+    "correos": ("correos.sql",),
+    "agedys": ("usuarios.sql", "agedys.sql"),
+    "brass": ("usuarios.sql", "brass.sql"),
+    "riesgos": ("usuarios.sql", "riesgos.sql"),
+    "no_conformidades": ("usuarios.sql", "no_conformidades.sql"),
+    "expedientes": ("usuarios.sql", "expedientes.sql"),
+}
+
+_DBQ_RE = re.compile(r"DBQ=([^;]+)", re.IGNORECASE)
+_ISO_DATETIME_RE = re.compile(
+    r"^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?$"
+)
+
+
+# ---------------------------------------------------------------------------
+# Detección de cadenas de conexión
+# ---------------------------------------------------------------------------
+
+
+def sqlite_path(connection_string: Union[str, Path]) -> Optional[str]:
+    """Ruta del fichero SQLite de la cadena, o None si no es una cadena SQLite."""
+    raw = str(connection_string).strip()
+    if raw.lower().startswith("sqlite:"):
+        path = raw[len("sqlite:"):]
+        if path.startswith("//"):
+            path = path[2:]
+        if re.match(r"^/[A-Za-z]:", path):  # sqlite:///C:/ruta -> C:/ruta
+            path = path[1:]
+        return path or ":memory:"
+    match = _DBQ_RE.search(raw)
+    candidate = match.group(1).strip() if match else raw
+    if candidate.lower().endswith(SQLITE_SUFFIXES):
+        return candidate
+    return None
+
+
+def is_sqlite_target(connection_string: Union[str, Path, None]) -> bool:
+    """True si la cadena de conexión apunta a una BD SQLite."""
+    if connection_string is None:
+        return False
+    return sqlite_path(connection_string) is not None
+
+
+# ---------------------------------------------------------------------------
+# Conversión de valores
+# ---------------------------------------------------------------------------
+
+
+def _format_datetime(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _adapt_param(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _format_datetime(value)
+    if isinstance(value, date):
+        return f"{value.isoformat()} 00:00:00"
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _adapt_params(params: Any) -> tuple:
+    if params is None:
+        return ()
+    if not isinstance(params, (list, tuple)):
+        params = (params,)
+    return tuple(_adapt_param(v) for v in params)
+
+
+def _convert_value(value: Any) -> Any:
+    if isinstance(value, str) and _ISO_DATETIME_RE.match(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _convert_row(row: Optional[tuple]) -> Optional[tuple]:
+    if row is None:
+        return None
+    return tuple(_convert_value(v) for v in row)
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    """Interpreta un valor como fecha al estilo de ``CDate`` de Access."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, (int, float)):
+        # Serial de fecha OLE/Access: días desde 1899-12-30
+        return datetime(1899, 12, 30) + timedelta(days=float(value))
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Funciones VBA/Access registradas en cada conexión
+# ---------------------------------------------------------------------------
+
+
+def _months_between(d1: datetime, d2: datetime) -> int:
+    return (d2.year - d1.year) * 12 + (d2.month - d1.month)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _datediff(interval: str, value1: Any, value2: Any) -> Optional[int]:
+    d1, d2 = _to_datetime(value1), _to_datetime(value2)
+    if d1 is None or d2 is None:
+        return None
+    unit = str(interval).lower()
+    if unit in ("d", "y"):
+        return (d2.date() - d1.date()).days
+    if unit == "w":
+        return (d2.date() - d1.date()).days // 7
+    if unit == "ww":
+        # Semanas naturales (cruces de domingo), como Access por defecto
+        start = d1.date() - timedelta(days=(d1.weekday() + 1) % 7)
+        end = d2.date() - timedelta(days=(d2.weekday() + 1) % 7)
+        return (end - start).days // 7
+    if unit == "m":
+        return _months_between(d1, d2)
+    if unit == "q":
+        return (d2.year - d1.year) * 4 + ((d2.month - 1) // 3 - (d1.month - 1) // 3)
+    if unit == "yyyy":
+        return d2.year - d1.year
+    # Access cuenta fronteras cruzadas: truncar a la unidad antes de restar
+    seconds = {"h": 3600, "n": 60, "s": 1}.get(unit)
+    if seconds is not None:
+        t1 = int((d1 - _EPOCH).total_seconds()) // seconds
+        t2 = int((d2 - _EPOCH).total_seconds()) // seconds
+        return t2 - t1
+    raise sqlite3.ProgrammingError(f"Intervalo DateDiff no soportado: {interval}")
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    # Ajustar al último día válido del mes (31-ene + 1 mes -> 28/29-feb)
+    day = value.day
+    while True:
+        try:
+            return value.replace(year=year, month=month, day=day)
+        except ValueError:
+            day -= 1
+
+
+def _dateadd(interval: str, number: Any, value: Any) -> Optional[str]:
+    base = _to_datetime(value)
+    if base is None or number is None:
+        return None
+    unit = str(interval).lower()
+    n = int(number)
+    if unit in ("d", "y", "w"):
+        result = base + timedelta(days=n)
+    elif unit == "ww":
+        result = base + timedelta(weeks=n)
+    elif unit == "m":
+        result = _add_months(base, n)
+    elif unit == "q":
+        result = _add_months(base, 3 * n)
+    elif unit == "yyyy":
+        result = _add_months(base, 12 * n)
+    elif unit == "h":
+        result = base + timedelta(hours=n)
+    elif unit == "n":
+        result = base + timedelta(minutes=n)
+    elif unit == "s":
+        result = base + timedelta(seconds=n)
+    else:
+        raise sqlite3.ProgrammingError(f"Intervalo DateAdd no soportado: {interval}")
+    return _format_datetime(result)
+
+
+def _date_part(attr: str):
+    def extract(value: Any) -> Optional[int]:
+        parsed = _to_datetime(value)
+        return getattr(parsed, attr) if parsed is not None else None
+
+    return extract
+
+
+def _cdate(value: Any) -> Optional[str]:
+    parsed = _to_datetime(value)
+    return _format_datetime(parsed) if parsed is not None else None
+
+
+def _datevalue(value: Any) -> Optional[str]:
+    parsed = _to_datetime(value)
+    return f"{parsed.date().isoformat()} 00:00:00" if parsed is not None else None
+
+
+def _nz(value: Any, default: Any = "") -> Any:
+    return default if value is None else value
+
+
+def _iif(condition: Any, when_true: Any, when_false: Any) -> Any:
+    return when_true if _truthy(condition) else when_false
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("sí", "si", "true", "-1", "1", "yes")
+    return bool(value)
+
+
+def _mid(value: Any, start: Any, length: Any = None) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value)
+    begin = max(int(start) - 1, 0)
+    return text[begin:] if length is None else text[begin:begin + int(length)]
+
+
+def _text_fn(func):
+    def wrapper(value: Any, *args: Any) -> Any:
+        return None if value is None else func(str(value), *args)
+
+    return wrapper
+
+
+def _cint(value: Any) -> Optional[int]:
+    # CInt/CLng redondean al par más cercano, igual que round() de Python
+    return None if value is None else int(round(float(value)))
+
+
+def _int(value: Any) -> Optional[int]:
+    return None if value is None else int(float(value) // 1)
+
+
+def _access_date() -> str:
+    return f"{date.today().isoformat()} 00:00:00"
+
+
+def _access_now() -> str:
+    return _format_datetime(datetime.now())
+
+
+_FUNCTIONS: tuple[tuple[str, int, Any], ...] = (
+    ("ACCESS_DATE", 0, _access_date),
+    ("ACCESS_NOW", 0, _access_now),
+    ("DateDiff", 3, _datediff),
+    ("DateAdd", 3, _dateadd),
+    ("DateValue", 1, _datevalue),
+    ("CDate", 1, _cdate),
+    ("Year", 1, _date_part("year")),
+    ("Month", 1, _date_part("month")),
+    ("Day", 1, _date_part("day")),
+    ("Nz", 1, _nz),
+    ("Nz", 2, _nz),
+    ("IIf", 3, _iif),
+    ("IsNull", 1, lambda value: -1 if value is None else 0),
+    ("Len", 1, _text_fn(len)),
+    ("LCase", 1, _text_fn(str.lower)),
+    ("UCase", 1, _text_fn(str.upper)),
+    ("ACCESS_LEFT", 2, _text_fn(lambda text, n: text[: int(n)])),
+    ("ACCESS_RIGHT", 2, _text_fn(lambda text, n: text[-int(n):] if int(n) else "")),
+    ("Mid", 2, _mid),
+    ("Mid", 3, _mid),
+    ("CStr", 1, _text_fn(lambda text: text)),
+    ("CInt", 1, _cint),
+    ("CLng", 1, _cint),
+    ("Int", 1, _int),
+)
+
+
+def register_access_functions(connection: sqlite3.Connection) -> None:
+    """Registra las funciones VBA/Access en una conexión ``sqlite3``."""
+    for name, n_args, func in _FUNCTIONS:
+        connection.create_function(name, n_args, func)
+
+
+# ---------------------------------------------------------------------------
+# Traducción de SQL Access -> SQLite
+# ---------------------------------------------------------------------------
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_BRACKET_RE = re.compile(r"\[([^\[\]]+)\]")
+_DATE_LITERAL_RE = re.compile(r"#([^#]+)#")
+_DATE_FN_RE = re.compile(r"\bDate\s*\(\s*\)", re.IGNORECASE)
+_NOW_FN_RE = re.compile(r"\bNow\s*\(\s*\)", re.IGNORECASE)
+_DISTINCTROW_RE = re.compile(r"\bDISTINCTROW\b", re.IGNORECASE)
+_TRUE_CMP_RE = re.compile(r"\s*(<>|=)\s*True\b", re.IGNORECASE)
+_FALSE_CMP_RE = re.compile(r"\s*(<>|=)\s*False\b", re.IGNORECASE)
+# LEFT/RIGHT son palabras reservadas en SQLite: sólo como llamada ``Left(``
+_LEFT_RIGHT_FN_RE = re.compile(r"\b(Left|Right)\(", re.IGNORECASE)
+_TOP_RE = re.compile(r"^(\s*SELECT\s+(?:DISTINCT\s+)?)TOP\s+(\d+)\s+", re.IGNORECASE)
+_LIKE_TAIL_RE = re.compile(r"\bLIKE\s*$", re.IGNORECASE)
+
+_TRUE_VALUES = "(1, -1, 'Sí', 'Si', 'True')"
+_FALSE_VALUES = "(0, 'No', 'False')"
+
+
+def _date_literal(match: re.Match) -> str:
+    parsed = _to_datetime(match.group(1))
+    if parsed is None:
+        return match.group(0)
+    return f"'{_format_datetime(parsed)}'"
+
+
+def _bool_comparison(values: str):
+    def replace(match: re.Match) -> str:
+        op = "NOT IN" if match.group(1) == "<>" else "IN"
+        return f" {op} {values}"
+
+    return replace
+
+
+def _translate_code(code: str) -> str:
+    code = _BRACKET_RE.sub(lambda m: f'"{m.group(1)}"', code)
+    code = _DATE_LITERAL_RE.sub(_date_literal, code)
+    code = _DATE_FN_RE.sub("ACCESS_DATE()", code)
+    code = _NOW_FN_RE.sub("ACCESS_NOW()", code)
+    code = _DISTINCTROW_RE.sub("DISTINCT", code)
+    code = _LEFT_RIGHT_FN_RE.sub(lambda m: f"ACCESS_{m.group(1).upper()}(", code)
+    code = _TRUE_CMP_RE.sub(_bool_comparison(_TRUE_VALUES), code)
+    code = _FALSE_CMP_RE.sub(_bool_comparison(_FALSE_VALUES), code)
+    return code.replace("&", "||")
+
+
+def _translate_like_pattern(literal: str) -> str:
+    body = literal[1:-1].replace("*", "%").replace("?", "_")
+    return f"'{body}'"
+
+
+def translate_access_sql(sql: str) -> str:
+    """Traduce los idiomas del dialecto Access a SQL ejecutable por SQLite.
+
+    Los literales de texto no se alteran salvo los patrones de ``LIKE``, cuyos
+    comodines ``*`` y ``?`` pasan a ``%`` y ``_``.
+    """
+    parts: list[str] = []
+    position = 0
+    for match in _LITERAL_RE.finditer(sql):
+        code = sql[position:match.start()]
+        parts.append(_translate_code(code))
+        literal = match.group(0)
+        if _LIKE_TAIL_RE.search(code):
+            literal = _translate_like_pattern(literal)
+        parts.append(literal)
+        position = match.end()
+    parts.append(_translate_code(sql[position:]))
+    translated = "".join(parts)
+
+    top = _TOP_RE.match(translated)
+    if top:
+        translated = top.group(1) + translated[top.end():]
+        translated = f"{translated.rstrip().rstrip(';')} LIMIT {top.group(2)}"
+    return translated
+
+
+# ---------------------------------------------------------------------------
+# Conexión/cursor con la interfaz de pyodbc usada por la capa de BD
+# ---------------------------------------------------------------------------
+
+
+class SQLiteCursor:
+    """Cursor con la API de pyodbc: traduce el SQL y convierte fechas."""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def execute(self, sql: str, *params: Any) -> SQLiteCursor:
+        # pyodbc acepta execute(sql, tupla) y execute(sql, a, b, ...)
+        values = params[0] if len(params) == 1 else params
+        self._cursor.execute(translate_access_sql(sql), _adapt_params(values))
+        return self
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> None:
+        self._cursor.executemany(
+            translate_access_sql(sql), [_adapt_params(p) for p in seq_of_params]
+        )
+
+    def fetchone(self) -> Optional[tuple]:
+        return _convert_row(self._cursor.fetchone())
+
+    def fetchmany(self, size: int = 1) -> list[tuple]:
+        return [_convert_row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self) -> list[tuple]:
+        return [_convert_row(row) for row in self._cursor.fetchall()]
+
+    def close(self) -> None:
+        self._cursor.close()
+
+    def cancel(self) -> None:
+        """Como ``pyodbc.Cursor.cancel``: interrumpe la sentencia en curso."""
+        self._cursor.connection.interrupt()
+
+    def __iter__(self):
+        return (_convert_row(row) for row in self._cursor)
+
+
+class SQLiteConnection:
+    """Conexión con la API de pyodbc (``cursor``/``commit``/``rollback``)."""
+
+    def __init__(self, connection: sqlite3.Connection, path: str):
+        self._connection = connection
+        self.path = path
+        # pyodbc expone ``autocommit``; aquí las transacciones son siempre manuales
+        self.autocommit = False
+        # Timeout de consulta de pyodbc: sin efecto en SQLite (se usa ``cancel``)
+        self.timeout = 0
+
+    def cursor(self) -> SQLiteCursor:
+        return SQLiteCursor(self._connection.cursor())
+
+    def execute(self, sql: str, *params: Any) -> SQLiteCursor:
+        return self.cursor().execute(sql, *params)
+
+    def begin(self) -> None:
+        """Abre la transacción ya (sqlite3 sólo la abre antes de un DML).
+
+        Sin ella un ``SAVEPOINT`` inicial abre su propia transacción y su
+        ``RELEASE`` confirmaría los cambios aunque el bloque externo falle.
+        """
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN")
+
+    def commit(self) -> None:
+        self._connection.commit()
+
+    def rollback(self) -> None:
+        self._connection.rollback()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        """Conexión ``sqlite3`` subyacente (p.ej. para ``executescript``)."""
+        return self._connection
+
+
+def connect(connection_string: Union[str, Path], timeout: float = 30.0) -> SQLiteConnection:
+    """Abre una conexión SQLite con los shims de Access registrados.
+
+    ``check_same_thread=False`` porque el pool entrega la conexión a distintos
+    hilos (nunca a dos a la vez).
+    """
+    path = sqlite_path(connection_string)
+    if path is None:
+        raise ValueError(f"No es una cadena de conexión SQLite: {connection_string}")
+    connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    register_access_functions(connection)
+    logger.debug(f"Conexión SQLite abierta: {path}")
+    return SQLiteConnection(connection, path)
+
+
+# ---------------------------------------------------------------------------
+# Esquemas de prueba
+# ---------------------------------------------------------------------------
+
+
+def schema_sql(db_name: str) -> str:
+    """DDL completo de la BD lógica ``db_name`` (ver ``SCHEMA_FILES``)."""
+    if db_name not in SCHEMA_FILES:
+        raise ValueError(f"Esquema SQLite no disponible para: {db_name}")
+    return "\n".join(
+        (SCHEMA_DIR / name).read_text(encoding="utf-8") for name in SCHEMA_FILES[db_name]
+    )
+
+
+def create_database(path: Union[str, Path], db_name: str, overwrite: bool = False) -> Path:
+    """Crea (o completa) un fichero SQLite con el esquema de ``db_name``.
+
+    Las sentencias usan ``CREATE TABLE IF NOT EXISTS``, por lo que se puede
+    invocar sobre una BD existente sin perder datos salvo con ``overwrite``.
+    """
+    target = Path(path)
+    if overwrite and target.exists():
+        target.unlink()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(target))
+    try:
+        connection.executescript(schema_sql(db_name))
+        connection.commit()
+    finally:
+        connection.close()
+    logger.info(f"Esquema SQLite '{db_name}' creado en {target}")
+    return target
+
+
+def create_all_databases(directory: Union[str, Path], overwrite: bool = False) -> dict[str, Path]:
+    """Crea ``<directory>/<bd>.sqlite`` para cada BD con esquema conocido."""
+    base = Path(directory)
+    return {
+        name: create_database(base / f"{name}.sqlite", name, overwrite=overwrite)
+        for name in SCHEMA_FILES
+    }
+
+
+__all__ = [
+    "is_sqlite_target",
+    "sqlite_path",
+    "connect",
+    "translate_access_sql",
+    "register_access_functions",
+    "create_database",
+    "create_all_databases",
+    "schema_sql",
+    "SQLiteConnection",
+    "SQLiteCursor",
+    "SCHEMA_FILES",
+]
@@ -0,0 +1,456 @@
+"""Réplica nocturna Access -> SQLite indexada para lecturas analíticas.
+
+Los informes de Riesgos y AGEDYS lanzan joins de 4-6 tablas que Jet resuelve
+mal sobre un fichero en red. ``SQLiteMirror`` exporta las tablas que lee cada
+manager (``MIRROR_TABLES``) a un fichero SQLite con índices sobre las columnas
+de join/filtro; con ``DB_MIRROR_ENABLED`` ``Config.get_db_read_connection_string``
+devuelve la réplica y los managers consultan SQLite con el mismo SQL gracias a
+los shims de ``sqlite_backend``.
+
+Refresco por tabla, cada una en su propia transacción SQLite (los lectores ven
+la versión anterior o la nueva, nunca una a medias):
+
+    - incremental: si la tabla tiene clave y una columna de modificación
+      (``DEFAULT_MODIFIED_COLUMNS``) y la réplica ya tiene marca de agua, sólo
+      se leen las filas con ``modificación > marca``; las filas borradas en el
+      origen se eliminan comparando las claves.
+    - completo: en la primera ejecución, con ``full=True``, sin columna de
+      modificación o si cambiaron las columnas del origen.
+
+``compare_queries`` ejecuta las mismas consultas contra el origen y la réplica
+y devuelve el speedup de cada una para el informe del job
+(``scripts/run_sqlite_mirror.py``).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from . import sqlite_backend
+
+logger = logging.getLogger(__name__)
+
+STATE_TABLE = "_mirror_state"
+DEFAULT_MODIFIED_COLUMNS = (
+    "FechaModificacion",
+    "FechaUltimaModificacion",
+    "FechaActualizacion",
+)
+
+
+class MirrorTable:
+    """Tabla a replicar: clave (para incremental) y columnas a indexar."""
+
+    __slots__ = ("name", "key", "indexes")
+
+    def __init__(self, name: str, key: Optional[str] = None, indexes: Iterable[str] = ()):
+        self.name = name
+        self.key = key
+        self.indexes = tuple(indexes)
+
+    def __repr__(self) -> str:
+        return f"MirrorTable({self.name!r}, key={self.key!r})"
+
+
+_USUARIOS = MirrorTable("TbUsuariosAplicaciones", "Id", ("UsuarioRed", "Nombre", "CorreoUsuario"))
+_PROYECTOS = MirrorTable(
+    "TbProyectos", "IDProyecto", ("IDExpediente", "CODPROYECTOS", "NAcreedorSAP")
+)
+_EXPEDIENTES1 = MirrorTable("TbExpedientes1", "IDExpediente", ("IDResponsableCalidad",))
+_EXPEDIENTES_RESPONSABLES = MirrorTable(
+    "TbExpedientesResponsables", None, ("IdExpediente", "IdUsuario")
+)
+
+# Tablas leídas por cada manager y columnas de join/filtro de sus consultas
+MIRROR_TABLES: dict[str, tuple[MirrorTable, ...]] = {
+    "riesgos": (
+        _USUARIOS,
+        _PROYECTOS,
+        _EXPEDIENTES1,
+        _EXPEDIENTES_RESPONSABLES,
+        MirrorTable("TbProyectosEdiciones", "IDEdicion", ("IDProyecto",)),
+        MirrorTable("TbRiesgos", "IDRiesgo", ("IDEdicion", "DetectadoPor")),
+        MirrorTable("TbRiesgosNC", None, ("IDRiesgo",)),
+        MirrorTable("TbRiesgosPlanMitigacionPpal", "IDMitigacion", ("IDRiesgo",)),
+        MirrorTable("TbRiesgosPlanMitigacionDetalle", None, ("IDMitigacion",)),
+        MirrorTable("TbRiesgosPlanContingenciaPpal", "IDContingencia", ("IDRiesgo",)),
+        MirrorTable("TbRiesgosPlanContingenciaDetalle", None, ("IDContingencia",)),
+    ),
+    "agedys": (
+        _USUARIOS,
+        _PROYECTOS,
+        _EXPEDIENTES1,
+        _EXPEDIENTES_RESPONSABLES,
+        MirrorTable("TbNPedido", None, ("NPEDIDO", "CODPPD", "NAcreedorSAP", "IDExpediente")),
+        MirrorTable("TbFacturasDetalle", "IDFactura", ("NPEDIDO", "NFactura")),
+        MirrorTable("TbVisadoFacturas_Nueva", None, ("IDFactura", "NPEDIDO", "IDExpediente")),
+        MirrorTable("TbSuministradoresSAP", None, ("AcreedorSAP",)),
+        MirrorTable("TbVisadosGenerales", None, ("NDPD",)),
+        MirrorTable("TbSolicitudesOfertasPrevias", None, ("DPD",)),
+    ),
+    "expedientes": (
+        _USUARIOS,
+        MirrorTable("TbExpedientes", "IDExpediente", ("IDResponsableCalidad",)),
+        MirrorTable("TbExpedientesHitos", None, ("IDExpediente",)),
+        MirrorTable("TbExpedientesConEntidades", None, ("IDExpediente",)),
+    ),
+    "brass": (
+        _USUARIOS,
+        MirrorTable("TbEquiposMedida", "IDEquipoMedida"),
+        MirrorTable("TbEquiposMedidaCalibraciones", None, ("IDEquipoMedida",)),
+    ),
+}
+
+
+def _sqlite_type(type_code: Any) -> str:
+    """Tipo declarado SQLite para el ``type_code`` de pyodbc (una clase Python)."""
+    if not isinstance(type_code, type):
+        return ""
+    if issubclass(type_code, (bool, int)):
+        return "INTEGER"
+    if issubclass(type_code, (float, Decimal)):
+        return "REAL"
+    if issubclass(type_code, (datetime, date)):
+        return "DATETIME"
+    if issubclass(type_code, (bytes, bytearray)):
+        return "BLOB"
+    return "TEXT"
+
+
+class TableResult:
+    """Resultado del refresco de una tabla."""
+
+    __slots__ = ("table", "mode", "rows", "deleted", "seconds", "error")
+
+    def __init__(self, table: str, mode: str):
+        self.table = table
+        self.mode = mode
+        self.rows = 0
+        self.deleted = 0
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "table": self.table,
+            "mode": self.mode,
+            "rows": self.rows,
+            "deleted": self.deleted,
+            "ms": round(self.seconds * 1000, 1),
+            "error": self.error,
+        }
+
+
+class MirrorReport:
+    """Informe del job: tiempos de construcción y speedup por consulta."""
+
+    def __init__(self, db_name: str, path: Path):
+        self.db_name = db_name
+        self.path = path
+        self.tables: list[TableResult] = []
+        self.seconds = 0.0
+        self.queries: list[dict[str, Any]] = []
+
+    @property
+    def ok(self) -> bool:
+        return all(t.error is None for t in self.tables)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "db": self.db_name,
+            "path": str(self.path),
+            "ok": self.ok,
+            "build_ms": round(self.seconds * 1000, 1),
+            "tables": [t.to_dict() for t in self.tables],
+            "queries": self.queries,
+        }
+
+    def format_text(self) -> str:
+        lines = [f"Réplica {self.db_name}: {self.seconds:.2f}s -> {self.path}"]
+        for t in self.tables:
+            status = f"ERROR {t.error}" if t.error else f"{t.rows} filas, {t.deleted} borradas"
+            lines.append(f"  {t.table:<34} {t.mode:<11} {t.seconds * 1000:>9.1f}ms  {status}")
+        for q in self.queries:
+            lines.append(
+                f"  consulta {q['name']:<25} access {q['source_ms']:>9.1f}ms  "
+                f"sqlite {q['mirror_ms']:>9.1f}ms  x{q['speedup']}"
+            )
+        return "\n".join(lines)
+
+
+class SQLiteMirror:
+    """Replica en ``path`` las tablas ``tables`` leídas desde ``source``.
+
+    Args:
+        source: ``AccessDatabase`` de origen (pool o legacy)
+        path: Fichero SQLite de destino
+        tables: Tablas a replicar (p.ej. ``MIRROR_TABLES["riesgos"]``)
+        modified_columns: Columnas candidatas a marca de modificación
+        batch_size: Filas por ``fetchmany`` / ``executemany``
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        path: Union[str, Path],
+        tables: Iterable[MirrorTable],
+        modified_columns: Iterable[str] = DEFAULT_MODIFIED_COLUMNS,
+        batch_size: int = 500,
+    ):
+        self.source = source
+        self.path = Path(path)
+        self.tables = tuple(tables)
+        self.modified_columns = tuple(modified_columns)
+        self.batch_size = batch_size
+
+    # --- Construcción -------------------------------------------------------
+
+    def build(self, full: bool = False, db_name: str = "") -> MirrorReport:
+        """Refresca todas las tablas; un fallo en una tabla no aborta el resto."""
+        report = MirrorReport(db_name or self.path.stem, self.path)
+        started = time.perf_counter()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        mirror = sqlite_backend.connect(self.path)
+        try:
+            mirror.raw.execute(
+                f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+                "tabla TEXT PRIMARY KEY, columnas TEXT, columna_mod TEXT, "
+                "marca TEXT, actualizado TEXT)"
+            )
+            mirror.commit()
+            for table in self.tables:
+                report.tables.append(self._refresh_table(mirror, table, full))
+        finally:
+            mirror.close()
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            f"Réplica SQLite {report.db_name} construida en {report.seconds:.2f}s "
+            f"({len(report.tables)} tablas)",
+            extra={
+                "event": "db_mirror_build",
+                "db": report.db_name,
+                "build_ms": round(report.seconds * 1000, 1),
+                "tables": len(report.tables),
+                "ok": report.ok,
+            },
+        )
+        return report
+
+    def _state(self, mirror: Any, table: str) -> Optional[tuple]:
+        return mirror.raw.execute(
+            f"SELECT columnas, columna_mod, marca FROM {STATE_TABLE} WHERE tabla = ?",
+            (table,),
+        ).fetchone()
+
+    def _refresh_table(self, mirror: Any, table: MirrorTable, full: bool) -> TableResult:
+        state = None if full or table.key is None else self._state(mirror, table.name)
+        mode = "incremental" if state and state[1] and state[2] else "full"
+        result = TableResult(table.name, mode)
+        started = time.perf_counter()
+        try:
+            # BEGIN explícito: sqlite3 no abre transacción para DROP/CREATE
+            mirror.raw.execute("BEGIN")
+            with self.source.get_connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    if mode == "incremental":
+                        done = self._incremental(mirror, cursor, table, state, result)
+                        if not done:
+                            result.mode = "full"
+                            self._full(mirror, cursor, table, result)
+                    else:
+                        self._full(mirror, cursor, table, result)
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+            mirror.commit()
+        except Exception as e:
+            mirror.rollback()
+            result.error = str(e)
+            logger.warning(f"Réplica: error refrescando {table.name}: {e}")
+        result.seconds = time.perf_counter() - started
+        logger.debug(
+            f"Réplica {table.name} ({result.mode}): {result.rows} filas en "
+            f"{result.seconds * 1000:.1f}ms"
+        )
+        return result
+
+    def _modified_column(self, columns: list[str]) -> Optional[str]:
+        lowered = {c.lower(): c for c in columns}
+        for candidate in self.modified_columns:
+            if candidate.lower() in lowered:
+                return lowered[candidate.lower()]
+        return None
+
+    def _full(self, mirror: Any, cursor: Any, table: MirrorTable, result: TableResult) -> None:
+        cursor.execute(f"SELECT * FROM [{table.name}]")
+        columns = [d[0] for d in cursor.description]
+        column_defs = ", ".join(
+            f'"{d[0]}" {_sqlite_type(d[1])}'.rstrip() for d in cursor.description
+        )
+        raw = mirror.raw
+        raw.execute(f'DROP TABLE IF EXISTS "{table.name}"')
+        raw.execute(f'CREATE TABLE "{table.name}" ({column_defs})')
+        modified = self._modified_column(columns)
+        watermark = self._copy_rows(mirror, cursor, table.name, columns, modified, result)
+        for column in table.indexes + ((table.key,) if table.key else ()):
+            if column in columns:
+                raw.execute(
+                    f'CREATE INDEX IF NOT EXISTS "ix_{table.name}_{column}" '
+                    f'ON "{table.name}" ("{column}")'
+                )
+        self._save_state(mirror, table.name, columns, modified, watermark)
+
+    def _incremental(
+        self, mirror: Any, cursor: Any, table: MirrorTable, state: tuple, result: TableResult
+    ) -> bool:
+        stored_columns, modified, mark = state
+        since = datetime.fromisoformat(mark)
+        # >=: filas escritas en el mismo instante que la marca tras la lectura
+        # anterior; sin fecha de modificación no se sabe si cambiaron
+        cursor.execute(
+            f"SELECT * FROM [{table.name}] WHERE [{modified}] >= ? OR [{modified}] IS NULL",
+            (since,),
+        )
+        columns = [d[0] for d in cursor.description]
+        if ",".join(columns) != stored_columns:
+            logger.info(f"Réplica: columnas de {table.name} cambiaron; refresco completo")
+            return False
+        key_index = columns.index(table.key)
+        changed: list[Any] = []
+
+        def _delete_previous(rows: list) -> None:
+            keys = [row[key_index] for row in rows]
+            changed.extend(keys)
+            mirror.cursor().executemany(
+                f'DELETE FROM "{table.name}" WHERE "{table.key}" = ?', [(k,) for k in keys]
+            )
+
+        watermark = self._copy_rows(
+            mirror, cursor, table.name, columns, modified, result, before_insert=_delete_previous
+        )
+        # Filas borradas en el origen: comparar claves (una sola columna)
+        cursor.execute(f"SELECT [{table.key}] FROM [{table.name}]")
+        source_keys = {row[0] for row in cursor.fetchall()}
+        mirror_keys = {
+            row[0] for row in mirror.raw.execute(f'SELECT "{table.key}" FROM "{table.name}"')
+        }
+        removed = mirror_keys - source_keys
+        if removed:
+            mirror.raw.executemany(
+                f'DELETE FROM "{table.name}" WHERE "{table.key}" = ?', [(k,) for k in removed]
+            )
+        result.deleted = len(removed)
+        self._save_state(mirror, table.name, columns, modified, watermark or since)
+        return True
+
+    def _copy_rows(
+        self,
+        mirror: Any,
+        cursor: Any,
+        table_name: str,
+        columns: list[str],
+        modified: Optional[str],
+        result: TableResult,
+        before_insert: Any = None,
+    ) -> Optional[datetime]:
+        placeholders = ", ".join("?" for _ in columns)
+        insert_sql = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
+        mod_index = columns.index(modified) if modified else None
+        watermark: Optional[datetime] = None
+        writer = mirror.cursor()
+        while True:
+            # pyodbc.Row no es tuple: normalizar para el adaptador de parámetros
+            rows = [tuple(row) for row in cursor.fetchmany(self.batch_size)]
+            if not rows:
+                break
+            if before_insert is not None:
+                before_insert(rows)
+            writer.executemany(insert_sql, rows)
+            result.rows += len(rows)
+            if mod_index is not None:
+                for row in rows:
+                    value = row[mod_index]
+                    if isinstance(value, datetime) and (watermark is None or value > watermark):
+                        watermark = value
+        return watermark
+
+    def _save_state(
+        self,
+        mirror: Any,
+        table_name: str,
+        columns: list[str],
+        modified: Optional[str],
+        watermark: Optional[datetime],
+    ) -> None:
+        mirror.raw.execute(
+            f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, ?, ?)",
+            (
+                table_name,
+                ",".join(columns),
+                modified,
+                watermark.isoformat(sep=" ") if watermark else None,
+                datetime.now().isoformat(sep=" ", timespec="seconds"),
+            ),
+        )
+
+    # --- Benchmark ----------------------------------------------------------
+
+    def compare_queries(
+        self, queries: dict[str, str], mirror_db: Any, repeat: int = 1
+    ) -> list[dict[str, Any]]:
+        """Mide cada consulta en el origen y en la réplica (mejor de ``repeat``).
+
+        Returns:
+            Lista con ``name``, ``source_ms``, ``mirror_ms``, ``rows`` y
+            ``speedup`` (origen / réplica) por consulta.
+        """
+        results = []
+        for name, sql in queries.items():
+            try:
+                source_s, rows = _best_of(self.source, sql, repeat)
+                mirror_s, mirror_rows = _best_of(mirror_db, sql, repeat)
+            except Exception as e:
+                logger.warning(f"Réplica: no se pudo comparar la consulta {name}: {e}")
+                continue
+            entry = {
+                "name": name,
+                "source_ms": round(source_s * 1000, 1),
+                "mirror_ms": round(mirror_s * 1000, 1),
+                "rows": rows,
+                "rows_match": rows == mirror_rows,
+                "speedup": round(source_s / mirror_s, 1) if mirror_s > 0 else None,
+            }
+            results.append(entry)
+            logger.info(
+                f"Consulta {name}: access {entry['source_ms']}ms, "
+                f"sqlite {entry['mirror_ms']}ms (x{entry['speedup']})",
+                extra={"event": "db_mirror_query", **entry},
+            )
+        return results
+
+
+def _best_of(db: Any, sql: str, repeat: int) -> tuple[float, int]:
+    best = None
+    rows = 0
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        rows = len(db.execute_query(sql))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+__all__ = [
+    "MIRROR_TABLES",
+    "MirrorReport",
+    "MirrorTable",
+    "SQLiteMirror",
+    "TableResult",
+]
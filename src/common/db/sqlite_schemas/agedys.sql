@@ -0,0 +1,78 @@
+-- AGEDYS_DATOS: proyectos, pedidos, facturas y visados.
+CREATE TABLE IF NOT EXISTS TbProyectos (
+    CODPROYECTOS TEXT PRIMARY KEY,
+    PETICIONARIO TEXT,
+    DESCRIPCION TEXT,
+    FECHAPETICION DATETIME,
+    EXPEDIENTE TEXT,
+    IDExpediente INTEGER,
+    ELIMINADO INTEGER DEFAULT 0,
+    CODCONTRATOGTV TEXT,
+    FechaFinAgendaTecnica DATETIME,
+    FECHARECEPCIONECONOMICA DATETIME,
+    NAcreedorSAP TEXT,
+    IMPORTESINIVA REAL
+);
+
+CREATE TABLE IF NOT EXISTS TbExpedientes1 (
+    IDExpediente INTEGER PRIMARY KEY,
+    CodExp TEXT,
+    CODIGO TEXT,
+    CODPROYECTOS TEXT,
+    Descripcion TEXT,
+    Nemotecnico TEXT,
+    AGEDYSAplica TEXT,
+    AGEDYSGenerico TEXT,
+    Pecal TEXT,
+    IDResponsableCalidad INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS TbExpedientesResponsables (
+    IdExpediente INTEGER,
+    IdUsuario INTEGER,
+    CorreoSiempre TEXT,
+    EsJefeProyecto TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbNPedido (
+    NPEDIDO TEXT PRIMARY KEY,
+    CODPPD TEXT,
+    IDExpediente INTEGER,
+    NAcreedorSAP TEXT,
+    IMPORTEADJUDICADO REAL
+);
+
+CREATE TABLE IF NOT EXISTS TbFacturasDetalle (
+    IDFactura INTEGER PRIMARY KEY,
+    NFactura TEXT,
+    NDOCUMENTO TEXT,
+    NPEDIDO TEXT,
+    FechaAceptacion DATETIME,
+    ImporteFactura REAL
+);
+
+CREATE TABLE IF NOT EXISTS TbVisadoFacturas_Nueva (
+    IDFactura INTEGER,
+    NFactura TEXT,
+    NPEDIDO TEXT,
+    IDExpediente INTEGER,
+    FRECHAZOTECNICO DATETIME,
+    FVISADOTECNICO DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbSuministradoresSAP (
+    IDSuministrador INTEGER PRIMARY KEY,
+    AcreedorSAP TEXT,
+    Suministrador TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbSolicitudesOfertasPrevias (
+    DPD TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbVisadosGenerales (
+    NDPD TEXT,
+    ROFechaRealiza DATETIME,
+    ROFechaVisado DATETIME,
+    ROFechaRechazo DATETIME
+);
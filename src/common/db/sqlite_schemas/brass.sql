@@ -0,0 +1,16 @@
+-- Gestion_Brass_Gestion_Datos: equipos de medida y sus calibraciones.
+CREATE TABLE IF NOT EXISTS TbEquiposMedida (
+    IDEquipoMedida INTEGER PRIMARY KEY,
+    NOMBRE TEXT,
+    NS TEXT,
+    PN TEXT,
+    MARCA TEXT,
+    MODELO TEXT,
+    FechaFinServicio DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbEquiposMedidaCalibraciones (
+    IDCalibracion INTEGER PRIMARY KEY,
+    IDEquipoMedida INTEGER,
+    FechaFinCalibracion DATETIME
+);
@@ -0,0 +1,15 @@
+-- correos_datos: cola de correos pendientes y enviados.
+CREATE TABLE IF NOT EXISTS TbCorreosEnviados (
+    IDCorreo INTEGER PRIMARY KEY,
+    Aplicacion TEXT,
+    Asunto TEXT,
+    Cuerpo TEXT,
+    Destinatarios TEXT,
+    DestinatariosConCopia TEXT,
+    DestinatariosConCopiaOculta TEXT,
+    URLAdjunto TEXT,
+    FechaGrabacion DATETIME,
+    FechaEnvio DATETIME,
+    Enviado INTEGER DEFAULT 0,
+    Notas TEXT
+);
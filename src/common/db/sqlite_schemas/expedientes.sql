@@ -0,0 +1,30 @@
+-- Expedientes_datos: expedientes, hitos y entidades jurídicas.
+CREATE TABLE IF NOT EXISTS TbExpedientes (
+    IDExpediente INTEGER PRIMARY KEY,
+    CodExp TEXT,
+    Nemotecnico TEXT,
+    Titulo TEXT,
+    IDResponsableCalidad INTEGER,
+    CodS4H TEXT,
+    AplicaTareaS4H TEXT,
+    Adjudicado TEXT,
+    EsBasado TEXT,
+    EsExpediente TEXT,
+    FechaInicioContrato DATETIME,
+    FECHAOFERTA DATETIME,
+    FECHAADJUDICACION DATETIME,
+    FECHAPERDIDA DATETIME,
+    FECHADESESTIMADA DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbExpedientesHitos (
+    IDHito INTEGER PRIMARY KEY,
+    IDExpediente INTEGER,
+    Descripcion TEXT,
+    FechaHito DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbExpedientesConEntidades (
+    IDExpediente INTEGER,
+    CadenaJuridicas TEXT
+);
@@ -0,0 +1,52 @@
+-- NoConformidades_Datos: no conformidades, acciones y avisos de ARAPC.
+CREATE TABLE IF NOT EXISTS TbNoConformidades (
+    IDNoConformidad INTEGER PRIMARY KEY,
+    CodigoNoConformidad TEXT,
+    IDExpediente INTEGER,
+    Nemotecnico TEXT,
+    DESCRIPCION TEXT,
+    RESPONSABLECALIDAD TEXT,
+    RESPONSABLETELEFONICA TEXT,
+    FECHAAPERTURA DATETIME,
+    FPREVCIERRE DATETIME,
+    FECHACIERRE DATETIME,
+    RequiereControlEficacia TEXT,
+    FechaPrevistaControlEficacia DATETIME,
+    FechaControlEficacia DATETIME,
+    Borrado INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS TbNCAccionCorrectivas (
+    IDAccionCorrectiva INTEGER PRIMARY KEY,
+    IDNoConformidad INTEGER,
+    AccionCorrectiva TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbNCAccionesRealizadas (
+    IDAccionRealizada INTEGER PRIMARY KEY,
+    IDAccionCorrectiva INTEGER,
+    AccionRealizada TEXT,
+    Responsable TEXT,
+    FechaInicio DATETIME,
+    FechaFinPrevista DATETIME,
+    FechaFinReal DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbNCARAvisos (
+    ID INTEGER PRIMARY KEY,
+    IDAR INTEGER,
+    IDCorreo0 INTEGER,
+    IDCorreo7 INTEGER,
+    IDCorreo15 INTEGER,
+    Fecha DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbExpedientes (
+    IDExpediente INTEGER PRIMARY KEY,
+    Nemotecnico TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbUsuarios (
+    UsuarioRed TEXT,
+    Correo TEXT
+);
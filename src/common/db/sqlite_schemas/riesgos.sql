@@ -0,0 +1,94 @@
+-- Gestion_Riesgos_Datos: proyectos, ediciones, riesgos y planes de acción.
+CREATE TABLE IF NOT EXISTS TbProyectos (
+    IDProyecto INTEGER PRIMARY KEY,
+    Proyecto TEXT,
+    NombreProyecto TEXT,
+    Juridica TEXT,
+    IDExpediente INTEGER,
+    NombreUsuarioCalidad TEXT,
+    ParaInformeAvisos TEXT,
+    FechaCierre DATETIME,
+    FechaPrevistaCierre DATETIME,
+    FechaMaxProximaPublicacion DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbProyectosEdiciones (
+    IDEdicion INTEGER PRIMARY KEY,
+    IDProyecto INTEGER,
+    Edicion INTEGER,
+    FechaEdicion DATETIME,
+    FechaMaxProximaPublicacion DATETIME,
+    FechaPreparadaParaPublicar DATETIME,
+    FechaPublicacion DATETIME,
+    PropuestaRechazadaPorCalidadFecha DATETIME,
+    PropuestaRechazadaPorCalidadMotivo TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbRiesgos (
+    IDRiesgo INTEGER PRIMARY KEY,
+    IDEdicion INTEGER,
+    CodigoRiesgo TEXT,
+    Descripcion TEXT,
+    CausaRaiz TEXT,
+    DetectadoPor TEXT,
+    Mitigacion TEXT,
+    JustificacionAceptacionRiesgo TEXT,
+    JustificacionRetiroRiesgo TEXT,
+    FechaJustificacionAceptacionRiesgo DATETIME,
+    FechaJustificacionRetiroRiesgo DATETIME,
+    FechaAprobacionAceptacionPorCalidad DATETIME,
+    FechaAprobacionRetiroPorCalidad DATETIME,
+    FechaRechazoAceptacionPorCalidad DATETIME,
+    FechaRechazoRetiroPorCalidad DATETIME,
+    FechaRetirado DATETIME,
+    FechaMaterializado DATETIME,
+    FechaRiesgoParaRetipificar DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbRiesgosNC (
+    IDRiesgo INTEGER,
+    FechaDecison DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbRiesgosPlanMitigacionPpal (
+    IDMitigacion INTEGER PRIMARY KEY,
+    IDRiesgo INTEGER,
+    DisparadorDelPlan TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbRiesgosPlanMitigacionDetalle (
+    IDAccion INTEGER PRIMARY KEY,
+    IDMitigacion INTEGER,
+    Accion TEXT,
+    FechaInicio DATETIME,
+    FechaFinPrevista DATETIME,
+    FechaFinReal DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbRiesgosPlanContingenciaPpal (
+    IDContingencia INTEGER PRIMARY KEY,
+    IDRiesgo INTEGER,
+    DisparadorDelPlan TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbRiesgosPlanContingenciaDetalle (
+    IDAccion INTEGER PRIMARY KEY,
+    IDContingencia INTEGER,
+    Accion TEXT,
+    FechaInicio DATETIME,
+    FechaFinPrevista DATETIME,
+    FechaFinReal DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS TbExpedientes1 (
+    IDExpediente INTEGER PRIMARY KEY,
+    Nemotecnico TEXT,
+    IDResponsableCalidad INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS TbExpedientesResponsables (
+    IdExpediente INTEGER,
+    IdUsuario INTEGER,
+    CorreoSiempre TEXT,
+    EsJefeProyecto TEXT
+);
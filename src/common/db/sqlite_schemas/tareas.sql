@@ -0,0 +1,7 @@
+-- Tareas_datos1: registro de ejecuciones de tareas programadas.
+CREATE TABLE IF NOT EXISTS TbTareas (
+    Tarea TEXT PRIMARY KEY,
+    Realizado TEXT,
+    Fecha DATETIME,
+    FechaEjecucion DATETIME
+);
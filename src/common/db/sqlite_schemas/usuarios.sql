@@ -0,0 +1,22 @@
+-- Tablas de usuarios comunes a las BD de aplicación (vinculadas en Access).
+CREATE TABLE IF NOT EXISTS TbUsuariosAplicaciones (
+    Id INTEGER PRIMARY KEY,
+    Nombre TEXT,
+    UsuarioRed TEXT,
+    CorreoUsuario TEXT,
+    FechaBaja DATETIME,
+    ParaTareasProgramadas INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS TbUsuariosAplicacionesPermisos (
+    CorreoUsuario TEXT,
+    IDAplicacion INTEGER,
+    EsUsuarioAdministrador TEXT,
+    EsUsuarioCalidad TEXT,
+    EsEconomia TEXT
+);
+
+CREATE TABLE IF NOT EXISTS TbUsuariosAplicacionesTareas (
+    CorreoUsuario TEXT,
+    EsEconomia TEXT
+);
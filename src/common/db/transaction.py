@@ -0,0 +1,98 @@
+"""Unidad de trabajo: varias escrituras con un único commit.
+
+``AccessConnectionPool.transaction()`` y ``AccessDatabase.transaction()`` fijan
+una conexión al hilo actual durante el bloque ``with``; todas las operaciones
+del pool/BD desde ese hilo la reutilizan sin hacer commit, y el commit (o el
+rollback si sale una excepción) se hace una sola vez al salir:
+
+    with db_tareas.transaction():
+        for tecnico in tecnicos:
+            EmailManager("tareas").register_email(...)   # mismo pool "tareas"
+        register_task_completion(db_tareas, "NoConformidadesTecnica")
+
+Anidamiento estilo savepoint: un ``transaction()`` interno abre un
+``SAVEPOINT`` si el motor lo admite (SQLite, con un ``BEGIN`` explícito antes
+para que el savepoint quede dentro de la transacción externa) y, ante una
+excepción, deshace sólo su parte. Access/Jet no admite savepoints; en ese caso un fallo interno
+marca la transacción entera para rollback y el bloque externo termina con
+``TransactionRollbackError`` aunque el llamador haya capturado el error.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionRollbackError(RuntimeError):
+    """La transacción se deshizo por un fallo en un bloque anidado."""
+
+
+class UnitOfWork:
+    """Estado de una transacción fijada a una conexión (uno por hilo)."""
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.depth = 0
+        self.rollback_only = False
+        self._savepoints: Optional[bool] = None  # None = aún no probado
+
+    def _run(self, sql: str) -> None:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def _open_savepoint(self, name: str) -> bool:
+        if self._savepoints is False:
+            return False
+        try:
+            # El savepoint debe quedar dentro de la transacción externa
+            # (SQLite; pyodbc no expone ``begin``)
+            begin = getattr(self.connection, "begin", None)
+            if callable(begin):
+                begin()
+            self._run(f"SAVEPOINT {name}")
+            self._savepoints = True
+        except Exception as e:
+            logger.debug(f"Savepoints no soportados por el driver: {e}")
+            self._savepoints = False
+        return self._savepoints
+
+    @contextmanager
+    def savepoint(self) -> Iterator[Any]:
+        """Bloque anidado: deshace sólo su parte si el motor lo permite."""
+        self.depth += 1
+        name = f"uow_sp_{self.depth}"
+        supported = self._open_savepoint(name)
+        try:
+            yield self.connection
+        except BaseException:
+            if supported:
+                self._run(f"ROLLBACK TO SAVEPOINT {name}")
+                self._run(f"RELEASE SAVEPOINT {name}")
+            else:
+                self.rollback_only = True
+            raise
+        else:
+            if supported:
+                self._run(f"RELEASE SAVEPOINT {name}")
+        finally:
+            self.depth -= 1
+
+    def check_commit(self) -> None:
+        """Se invoca antes del commit final; falla si hubo que deshacer todo."""
+        if self.rollback_only:
+            raise TransactionRollbackError(
+                "Transacción deshecha: falló un bloque anidado sin soporte de savepoints"
+            )
+
+
+__all__ = ["UnitOfWork", "TransactionRollbackError"]
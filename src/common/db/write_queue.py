@@ -0,0 +1,481 @@
+"""Cola de escrituras diferidas (write-behind) con un único escritor por BD.
+
+Access serializa las escrituras con bloqueos de página/fichero: cuando varios
+hilos insertan o actualizan a la vez, los lectores del mismo fichero esperan
+a que se liberen esos bloqueos. ``WriteBehindQueue`` canaliza las escrituras
+de una BD por un solo hilo escritor con su propia conexión dedicada:
+
+  - ``submit``/``insert``/``update`` encolan la sentencia y devuelven un
+    ``WriteFuture`` (True si se escribió sin error; en ``error`` la excepción
+    de la BD si falló)
+  - el escritor agrupa las sentencias consecutivas con el mismo SQL en un
+    ``executemany`` y hace un único commit por lote
+  - una operación con la misma ``key`` y el mismo SQL que la última
+    encolada (aún no recogida por el escritor) se fusiona con ella (gana el
+    último valor); nunca se adelanta una escritura a otra anterior: el
+    orden FIFO se conserva entre claves distintas
+  - ``flush(timeout)`` espera a que todo lo encolado hasta ese momento esté
+    confirmado, para los llamadores que necesitan durabilidad
+  - ``close(timeout)`` espera como máximo ``close_timeout`` segundos al
+    escritor y registra en el log las sentencias que se descartan
+
+Usage:
+    queue = get_write_queue("correos", conn_str)   # None si está desactivada
+    if queue is not None:
+        queue.insert("TbCorreosEnviados", {...})
+        queue.update("TbCorreosEnviados", {"FechaEnvio": ahora}, "IDCorreo = ?", [7],
+                     key=("FechaEnvio", 7))
+        queue.flush(timeout=30)
+
+Se activa con ``DB_WRITE_BEHIND_ENABLED=true`` para las BD de
+``DB_WRITE_BEHIND_DATABASES``.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Hashable, Optional, Sequence
+
+from .access_connection_pool import AccessConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class WriteFuture(Future):
+    """``Future`` de una escritura: ``result()`` es True/False y ``error`` la causa."""
+
+    def __init__(self):
+        super().__init__()
+        self.error: Optional[BaseException] = None
+
+
+class _WriteOp:
+    """Sentencia encolada; ``future`` se comparte con las fusionadas en ella."""
+
+    __slots__ = ("sql", "params", "key", "future")
+
+    def __init__(self, sql: str, params: tuple, key: Optional[Hashable]):
+        self.sql = sql
+        self.params = params
+        self.key = key
+        self.future = WriteFuture()
+
+
+class WriteBehindQueue:
+    """Escritor único por BD que agrupa y confirma las escrituras por lotes."""
+
+    def __init__(
+        self,
+        connection_string: str,
+        name: str = "",
+        max_batch: int = 500,
+        linger: float = 0.05,
+        query_timeout: Optional[float] = None,
+        close_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            connection_string: Cadena de conexión de la BD (Access o SQLite)
+            name: Nombre lógico de la BD (logs y nombre del hilo)
+            max_batch: Sentencias máximas por commit
+            linger: Segundos que el escritor espera a que se acumulen más
+                sentencias antes de confirmar un lote incompleto
+            query_timeout: Límite por sentencia de la conexión del escritor
+            close_timeout: Segundos máximos de ``close()`` sin ``timeout`` explícito
+        """
+        self.name = name or "db"
+        self.max_batch = max(1, max_batch)
+        self.linger = max(0.0, linger)
+        self.close_timeout = max(0.0, close_timeout)
+        # Conexión dedicada: pool de una sola conexión fuera del registro
+        self._writer = AccessConnectionPool(
+            connection_string,
+            max_connections=1,
+            validation_interval=None,
+            query_timeout=query_timeout,
+        )
+        self._pending: deque[_WriteOp] = deque()
+        # (key, sql) -> última operación pendiente con esa clave
+        self._keyed: dict[tuple, _WriteOp] = {}
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._done = 0
+        # Sentencias encoladas desde callbacks del propio escritor (reintentos)
+        self._followups = 0
+        self._flushing = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "statements": 0,
+            "failed": 0,
+            "max_pending": 0,
+            "flush_waits": 0,
+        }
+
+    # ------------------------------ Encolado ------------------------------
+    def submit(
+        self, sql: str, params: Sequence[Any] = (), key: Optional[Hashable] = None
+    ) -> WriteFuture:
+        """Encola una sentencia de escritura y devuelve su ``WriteFuture``.
+
+        Con ``key``, si la última operación pendiente tiene la misma clave y el
+        mismo SQL se sustituyen sus parámetros y ambos llamadores reciben el
+        mismo ``Future``. Si entre ambas se encoló otra escritura no se fusionan,
+        para no adelantar la nueva a escrituras anteriores sobre otras filas.
+
+        Raises:
+            RuntimeError: si la cola ya está cerrada
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"Cola de escritura {self.name} cerrada")
+            self._stats["submitted"] += 1
+            if key is not None:
+                op = self._keyed.get((key, sql))
+                if op is not None and self._pending and self._pending[-1] is op:
+                    op.params = tuple(params)
+                    self._stats["coalesced"] += 1
+                    return op.future
+            op = _WriteOp(sql, tuple(params), key)
+            self._pending.append(op)
+            if key is not None:
+                self._keyed[(key, sql)] = op
+            self._submitted += 1
+            if threading.current_thread() is self._thread:
+                self._followups += 1
+            if len(self._pending) > self._stats["max_pending"]:
+                self._stats["max_pending"] = len(self._pending)
+            self._ensure_writer()
+            self._cond.notify_all()
+            return op.future
+
+    def insert(
+        self, table: str, data: dict[str, Any], key: Optional[Hashable] = None
+    ) -> WriteFuture:
+        """Encola un ``INSERT`` (mismo SQL que ``AccessConnectionPool.insert_record``)."""
+        fields = list(data.keys())
+        placeholders = ", ".join(["?"] * len(fields))
+        sql = f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({placeholders})"
+        return self.submit(sql, tuple(data.values()), key)
+
+    def update(
+        self,
+        table: str,
+        data: dict[str, Any],
+        where_condition: str,
+        where_params: Optional[Sequence[Any]] = None,
+        key: Optional[Hashable] = None,
+    ) -> WriteFuture:
+        """Encola un ``UPDATE`` (mismo SQL que ``AccessConnectionPool.update_record``)."""
+        set_clause = ", ".join(f"{field} = ?" for field in data)
+        sql = f"UPDATE {table} SET {set_clause} WHERE {where_condition}"
+        params = tuple(data.values()) + tuple(where_params or ())
+        return self.submit(sql, params, key)
+
+    # ---------------------------- Durabilidad -----------------------------
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que lo encolado hasta ahora esté confirmado.
+
+        Incluye lo que el escritor vuelva a encolar mientras tanto desde los
+        callbacks de esas sentencias (p.ej. un INSERT reintentado con otro ID).
+
+        Returns:
+            False si vence ``timeout`` antes de que el escritor termine.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._submitted
+            followups = self._followups
+            if self._done >= target:
+                return True
+            self._stats["flush_waits"] += 1
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._done < target:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        logger.warning(
+                            f"flush de cola de escritura {self.name} sin completar "
+                            f"({target - self._done} pendientes)",
+                            extra={"event": "db_write_flush_timeout", "db": self.name},
+                        )
+                        return False
+                    self._cond.wait(remaining)
+                    target += self._followups - followups
+                    followups = self._followups
+                return True
+            finally:
+                self._flushing -= 1
+
+    def pending(self) -> int:
+        """Sentencias encoladas o en curso aún no confirmadas."""
+        with self._cond:
+            return self._submitted - self._done
+
+    def close(self, flush: bool = True, timeout: Optional[float] = None) -> bool:
+        """Cierra la cola (por defecto tras vaciarla) y la conexión del escritor.
+
+        Espera como máximo ``timeout`` segundos (``close_timeout`` si es None)
+        entre el vaciado y el lote en curso; lo que no llegue a escribirse se
+        descarta y queda en el log.
+
+        Returns:
+            False si quedaron sentencias sin confirmar.
+        """
+        limit = self.close_timeout if timeout is None else timeout
+        deadline = time.monotonic() + limit
+        completed = self.flush(limit) if flush else self.pending() == 0
+        with self._cond:
+            self._closed = True
+            abandoned = list(self._pending)
+            self._pending.clear()
+            self._keyed.clear()
+            self._done += len(abandoned)
+            self._cond.notify_all()
+            thread = self._thread
+        if abandoned:
+            self._log_dropped("descartadas sin escribir", [op.sql for op in abandoned])
+        for op in abandoned:
+            op.future.set_exception(
+                RuntimeError(f"Cola de escritura {self.name} cerrada sin escribir")
+            )
+        if thread is not None and thread is not threading.current_thread():
+            # Termina el lote en curso (si lo hay) antes de cerrar la conexión
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                # El escritor sigue con su conexión: no se cierra bajo sus pies
+                in_flight = self.pending()
+                logger.error(
+                    f"Cola de escritura {self.name}: el escritor no terminó en {limit}s; "
+                    f"{in_flight} sentencias en curso pueden perderse",
+                    extra={"event": "db_write_close_timeout", "db": self.name, "dropped": in_flight},
+                )
+                return False
+        self._writer.close_all()
+        return completed and not abandoned
+
+    def _log_dropped(self, reason: str, statements: list[str]) -> None:
+        counts: dict[str, int] = {}
+        for sql in statements:
+            summary = " ".join(sql.split()[:3])
+            counts[summary] = counts.get(summary, 0) + 1
+        detail = ", ".join(f"{summary} x{count}" for summary, count in counts.items())
+        logger.warning(
+            f"Cola de escritura {self.name}: {len(statements)} sentencias {reason} ({detail})",
+            extra={"event": "db_write_dropped", "db": self.name, "dropped": len(statements)},
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["pending"] = self._submitted - self._done
+        return stats
+
+    # ------------------------------ Escritor ------------------------------
+    def _ensure_writer(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"write-behind-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _take_batch(self) -> list[_WriteOp]:
+        """Recoge hasta ``max_batch`` operaciones ([] al cerrar sin pendientes)."""
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return []
+            # Esperar a que se acumulen más sentencias salvo que alguien haga flush
+            deadline = time.monotonic() + self.linger
+            while (
+                len(self._pending) < self.max_batch
+                and not self._closed
+                and not self._flushing
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                op = self._pending.popleft()
+                if op.key is not None and self._keyed.get((op.key, op.sql)) is op:
+                    del self._keyed[(op.key, op.sql)]
+                batch.append(op)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._write(batch)
+            with self._cond:
+                self._done += len(batch)
+                self._cond.notify_all()
+
+    def _write(self, batch: list[_WriteOp]) -> None:
+        # Sentencias consecutivas con el mismo SQL -> un executemany
+        runs: list[tuple[str, list[tuple]]] = []
+        for op in batch:
+            if runs and runs[-1][0] == op.sql:
+                runs[-1][1].append(op.params)
+            else:
+                runs.append((op.sql, [op.params]))
+        start = time.perf_counter()
+        try:
+            with self._writer.get_connection() as connection:
+                for sql, params in runs:
+                    _execute_run(connection, sql, params)
+            errors: list[Optional[Exception]] = [None] * len(batch)
+        except Exception as e:
+            # El lote se revirtió entero: cada sentencia en su propia transacción
+            logger.warning(
+                f"Lote de escritura {self.name} revertido ({len(batch)} sentencias), "
+                f"reintentando una a una: {e}"
+            )
+            errors = [self._write_one(op) for op in batch]
+        failed = sum(1 for error in errors if error is not None)
+        with self._cond:
+            self._stats["batches"] += 1
+            self._stats["statements"] += len(batch)
+            self._stats["failed"] += failed
+        logger.debug(
+            f"Lote de escritura {self.name}: {len(batch)} sentencias, "
+            f"{len(runs)} grupos, {failed} fallidas",
+            extra={
+                "event": "db_write_batch",
+                "db": self.name,
+                "statements": len(batch),
+                "groups": len(runs),
+                "failed": failed,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            },
+        )
+        for op, error in zip(batch, errors):
+            op.future.error = error
+            op.future.set_result(error is None)
+
+    def _write_one(self, op: _WriteOp) -> Optional[Exception]:
+        """Escribe ``op`` en su propia transacción; devuelve el error o None."""
+        try:
+            with self._writer.get_connection() as connection:
+                _execute_run(connection, op.sql, [op.params])
+            return None
+        except Exception as e:
+            logger.error(
+                f"Escritura diferida {self.name} fallida: {e}",
+                extra={"event": "db_write_error", "db": self.name},
+            )
+            return e
+
+
+def _execute_run(connection: Any, sql: str, params: list[tuple]) -> None:
+    """Ejecuta ``sql`` para cada juego de parámetros sin commit (propaga errores)."""
+    cursor = connection.cursor()
+    try:
+        if len(params) == 1:
+            cursor.execute(sql, params[0])
+            return
+        if hasattr(cursor, "fast_executemany"):
+            try:
+                cursor.fast_executemany = True
+            except Exception:  # pragma: no cover - driver sin soporte
+                pass
+        cursor.executemany(sql, params)
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+def write_behind_enabled(name: str) -> bool:
+    """True si ``DB_WRITE_BEHIND_ENABLED`` y ``name`` está en ``DB_WRITE_BEHIND_DATABASES``."""
+    if os.getenv("DB_WRITE_BEHIND_ENABLED", "false").lower() != "true":
+        return False
+    databases = os.getenv("DB_WRITE_BEHIND_DATABASES", "correos,tareas")
+    return name in {db.strip().lower() for db in databases.split(",") if db.strip()}
+
+
+class WriteQueueRegistry:
+    """Una ``WriteBehindQueue`` por nombre lógico de BD (como ``PoolRegistry``).
+
+    Las colas se vacían al cerrar el proceso (``atexit``) o con ``close_all``.
+    """
+
+    def __init__(self):
+        self._queues: dict[str, WriteBehindQueue] = {}
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def get(self, name: str, connection_string: str) -> WriteBehindQueue:
+        with self._lock:
+            queue = self._queues.get(name)
+            if queue is None:
+                queue = WriteBehindQueue(
+                    connection_string,
+                    name=name,
+                    max_batch=int(os.getenv("DB_WRITE_BEHIND_MAX_BATCH", "500")),
+                    linger=float(os.getenv("DB_WRITE_BEHIND_LINGER_MS", "50")) / 1000,
+                    close_timeout=float(os.getenv("DB_WRITE_BEHIND_CLOSE_TIMEOUT", "30")),
+                )
+                self._queues[name] = queue
+                if not self._atexit_registered:
+                    atexit.register(self.close_all)
+                    self._atexit_registered = True
+                logger.info(f"Cola de escritura diferida {name} inicializada")
+            return queue
+
+    def flush_all(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            queues = list(self._queues.values())
+        return all([queue.flush(timeout) for queue in queues])
+
+    def close_all(self, timeout: Optional[float] = None) -> None:
+        """Vacía y cierra todas las colas registradas."""
+        with self._lock:
+            queues = list(self._queues.items())
+            self._queues.clear()
+        for name, queue in queues:
+            try:
+                if not queue.close(timeout=timeout):
+                    logger.warning(f"Cola de escritura {name} cerrada con pendientes")
+            except Exception as e:  # pragma: no cover - defensivo
+                logger.warning(f"Error cerrando cola de escritura {name}: {e}")
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            queues = list(self._queues.items())
+        return {name: queue.get_stats() for name, queue in queues}
+
+
+# Registro global compartido por todo el proceso
+write_queues = WriteQueueRegistry()
+
+
+def get_write_queue(name: str, connection_string: str) -> Optional[WriteBehindQueue]:
+    """Devuelve la cola compartida de ``name``, o None si está desactivada."""
+    if not write_behind_enabled(name):
+        return None
+    return write_queues.get(name, connection_string)
+
+
+__all__ = [
+    "WriteBehindQueue",
+    "WriteFuture",
+    "WriteQueueRegistry",
+    "get_write_queue",
+    "write_behind_enabled",
+    "write_queues",
+]
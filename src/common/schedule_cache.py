@@ -0,0 +1,153 @@
+"""Caché por ciclo de las últimas ejecuciones registradas en TbTareas.
+
+``TareaDiaria.debe_ejecutarse`` llama a ``should_execute_task`` una vez por
+nombre de tarea y cada llamada lanzaba un ``SELECT MAX(...) ... WHERE Tarea = ?``
+(tres para Riesgos, dos para NoConformidades, en cada ciclo). Durante un ciclo
+activo (``schedule_cycle``) ``get_last_task_execution_date`` lee de una
+``ScheduleCache`` que carga todas las fechas con una única consulta agrupada;
+``register_task_completion`` la actualiza en el momento, de modo que las
+comprobaciones posteriores del mismo ciclo ven la ejecución recién registrada.
+
+Usage:
+    with schedule_cycle():
+        for task in tasks:
+            task.debe_ejecutarse()      # 1 consulta en total, no 1 por nombre
+
+Fuera de un ciclo el comportamiento es el de siempre (consulta por nombre).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+LAST_EXECUTIONS_QUERY = """
+    SELECT Tarea, MAX(COALESCE(FechaEjecucion, Fecha)) AS UltimaFecha
+    FROM TbTareas
+    GROUP BY Tarea
+"""
+
+# Resultado de ``lookup`` cuando la caché no puede responder (usar la consulta directa)
+MISSING = object()
+
+
+def _as_date(value: Any) -> Any:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _task_key(task_name: Any) -> str:
+    # Access compara texto sin distinguir mayúsculas: "riesgosdiario" = "RiesgosDiario"
+    return str(task_name).casefold()
+
+
+def _latest(current: Any, value: Any) -> Any:
+    if current is None:
+        return value
+    try:
+        return value if value is not None and value > current else current
+    except TypeError:  # tipos no comparables (p.ej. texto de otro driver)
+        return current
+
+
+def _source_key(db_connection: Any) -> Any:
+    return getattr(db_connection, "connection_string", None) or id(db_connection)
+
+
+class ScheduleCache:
+    """Últimas fechas de ejecución de todas las tareas (una consulta por ciclo)."""
+
+    def __init__(self):
+        self._dates: dict[str, Any] = {}
+        self._source: Any = None
+        self._loaded = False
+        self._failed = False
+        self._lock = threading.Lock()
+        self.queries = 0
+
+    def _load(self, db_connection: Any) -> None:
+        self.queries += 1
+        try:
+            rows = db_connection.execute_query(LAST_EXECUTIONS_QUERY) or []
+        except Exception as e:
+            # Sin caché este ciclo: cada tarea vuelve a su consulta individual
+            self._failed = True
+            logger.warning(f"No se pudo cargar la caché de planificación: {e}")
+            return
+        dates: dict[str, Any] = {}
+        for row in rows:
+            if row.get("Tarea"):
+                key = _task_key(row["Tarea"])
+                dates[key] = _latest(dates.get(key), _as_date(row.get("UltimaFecha")))
+        self._dates = dates
+        self._source = _source_key(db_connection)
+        self._loaded = True
+        logger.debug(
+            f"Caché de planificación cargada: {len(self._dates)} tareas",
+            extra={"event": "schedule_cache_loaded", "tasks": len(self._dates)},
+        )
+
+    def lookup(self, db_connection: Any, task_name: str) -> Any:
+        """Última fecha de ``task_name`` (None si nunca se ejecutó) o ``MISSING``.
+
+        La primera llamada del ciclo carga la caché desde ``db_connection``;
+        con otra BD o si la carga falló devuelve ``MISSING``.
+        """
+        if db_connection is None:
+            return MISSING
+        with self._lock:
+            if not self._loaded and not self._failed:
+                self._load(db_connection)
+            if not self._loaded or self._source != _source_key(db_connection):
+                return MISSING
+            return self._dates.get(_task_key(task_name))
+
+    def record(self, task_name: str, execution_date: Optional[date] = None) -> None:
+        """Refleja en la caché una ejecución recién registrada."""
+        value = _as_date(execution_date or date.today())
+        with self._lock:
+            if not self._loaded:
+                return
+            key = _task_key(task_name)
+            current = self._dates.get(key)
+            try:
+                if current is not None and current >= value:
+                    return
+            except TypeError:  # tipos no comparables (p.ej. texto de otro driver)
+                pass
+            self._dates[key] = value
+
+
+_active: Optional[ScheduleCache] = None
+_active_lock = threading.Lock()
+
+
+def active_schedule_cache() -> Optional[ScheduleCache]:
+    """Caché del ciclo en curso, o None fuera de ``schedule_cycle``."""
+    return _active
+
+
+@contextmanager
+def schedule_cycle() -> Iterator[ScheduleCache]:
+    """Activa una caché nueva durante el bloque (un ciclo del maestro)."""
+    global _active
+    cache = ScheduleCache()
+    with _active_lock:
+        previous, _active = _active, cache
+    try:
+        yield cache
+    finally:
+        with _active_lock:
+            _active = previous
+
+
+__all__ = [
+    "LAST_EXECUTIONS_QUERY",
+    "MISSING",
+    "ScheduleCache",
+    "active_schedule_cache",
+    "schedule_cycle",
+]
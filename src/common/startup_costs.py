@@ -0,0 +1,98 @@
+"""Coste de arranque de las tareas ejecutadas fuera del maestro.
+
+El modo aislado paga en cada tarea un intérprete nuevo, los imports de
+``common`` y del módulo de la tarea y la carga de ``Config``; un trabajador de
+``TaskWorkerPool`` lo paga una vez al arrancar. Ese coste se mide cuando
+ocurre, sin lanzar procesos de prueba:
+
+  - ``BaseTask`` pasa al subproceso la hora de lanzamiento (``TASK_SPAWN_TIME``)
+    y el runner, al llegar a la lógica, escribe ``TASK_STARTUP_S=<segundos>``
+    en su salida (``emit_startup_marker``)
+  - ``TaskWorkerPool`` mide lo que tarda cada trabajador en estar listo
+
+El modo en proceso informa del arranque ahorrado por tarea con la última
+medición de su módulo (o, si no la hay, la del arranque de un trabajador).
+
+Usage:
+    record_startup_cost("brass.brass_task", 2.4)
+    startup_cost("brass.brass_task")        # 2.4 (None si nunca se midió)
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+import time
+from typing import Optional
+
+SPAWN_TIME_ENV = "TASK_SPAWN_TIME"
+STARTUP_MARKER = "TASK_STARTUP_S="
+# Clave de las mediciones de arranque de los trabajadores del pool
+WORKER_KEY = "worker"
+
+_MARKER_RE = re.compile(rf"^{STARTUP_MARKER}([0-9.]+)\s*$", re.MULTILINE)
+
+_costs: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def record_startup_cost(key: str, seconds: float) -> None:
+    """Guarda la última medición de arranque de ``key`` (módulo o ``WORKER_KEY``)."""
+    if seconds < 0:
+        return
+    with _lock:
+        _costs[key] = seconds
+
+
+def startup_cost(key: str) -> Optional[float]:
+    """Arranque medido para ``key``; si no hay, el de un trabajador, o None."""
+    with _lock:
+        cost = _costs.get(key)
+        return cost if cost is not None else _costs.get(WORKER_KEY)
+
+
+def reset_startup_costs() -> None:
+    with _lock:
+        _costs.clear()
+
+
+def spawn_environment() -> dict[str, str]:
+    """Entorno para lanzar un runner aislado con la hora de lanzamiento."""
+    return {**os.environ, SPAWN_TIME_ENV: repr(time.time())}
+
+
+def emit_startup_marker(stream=None) -> Optional[float]:
+    """En el subproceso: escribe cuánto tardó en llegar hasta aquí.
+
+    No hace nada si el proceso no se lanzó con ``spawn_environment``.
+    """
+    raw = os.environ.get(SPAWN_TIME_ENV)
+    if not raw:
+        return None
+    try:
+        elapsed = max(0.0, time.time() - float(raw))
+    except ValueError:
+        return None
+    out = stream or sys.stdout
+    print(f"{STARTUP_MARKER}{elapsed:.3f}", file=out, flush=True)
+    return elapsed
+
+
+def parse_startup_marker(output: Optional[str]) -> Optional[float]:
+    """Segundos de arranque informados por el subproceso en ``output``."""
+    match = _MARKER_RE.search(output or "")
+    return float(match.group(1)) if match else None
+
+
+__all__ = [
+    "SPAWN_TIME_ENV",
+    "STARTUP_MARKER",
+    "WORKER_KEY",
+    "emit_startup_marker",
+    "parse_startup_marker",
+    "record_startup_cost",
+    "reset_startup_costs",
+    "spawn_environment",
+    "startup_cost",
+]
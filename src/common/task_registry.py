@@ -2,13 +2,19 @@
 Define las tareas específicas que heredan de las clases base
 """
 
+import logging
 import os
 import sys
-from collections.abc import Sequence
+import threading
+import time
+from collections.abc import Callable, Sequence
 from pathlib import Path
 from typing import Any, Optional
 
-from .base_task import TareaContinua, TareaDiaria
+from .base_task import TareaContinua, TareaDiaria, use_shared_config
+from .config import Config
+
+logger = logging.getLogger(__name__)
 
 # Asegurar que raíz del proyecto y 'src' están en sys.path para ejecuciones de test
 _here = Path(__file__).resolve()
@@ -51,12 +57,15 @@ if 'RiesgosTask' in globals() and RiesgosTask is None:
                 script_filename="run_riesgos.py",
                 task_names=["RiesgosDiario"],
                 frequency_days=1,
+                databases=("riesgos",),
             )
 
 
 class BrassTask(TareaDiaria):
     """Tarea para procesamiento de datos BRASS"""
 
+    logic_class = "brass.brass_task:BrassTask"
+
     def __init__(self):
         frequency = int(os.getenv("BRASS_FRECUENCIA_DIAS", "1"))
         super().__init__(
@@ -64,12 +73,15 @@ class BrassTask(TareaDiaria):
             script_filename="run_brass.py",
             task_names=["BRASSDiario"],
             frequency_days=frequency,
+            databases=("brass",),
         )
 
 
 class ExpedientesTask(TareaDiaria):
     """Tarea para procesamiento de expedientes"""
 
+    logic_class = "expedientes.expedientes_task:ExpedientesTask"
+
     def __init__(self):
         frequency = int(os.getenv("EXPEDIENTES_FRECUENCIA_DIAS", "1"))
         super().__init__(
@@ -77,12 +89,15 @@ class ExpedientesTask(TareaDiaria):
             script_filename="run_expedientes.py",
             task_names=["ExpedientesDiario"],
             frequency_days=frequency,
+            databases=("expedientes",),
         )
 
 
 class NoConformidadesTask(TareaDiaria):
     """Tarea para procesamiento de no conformidades (calidad y técnica)"""
 
+    logic_class = "no_conformidades.no_conformidades_task:NoConformidadesTask"
+
     def __init__(self):
         freq_calidad = int(os.getenv("NO_CONFORMIDADES_DIAS_TAREA_CALIDAD", "1"))
         freq_tecnica = int(os.getenv("NO_CONFORMIDADES_DIAS_TAREA_TECNICA", "7"))
@@ -92,6 +107,7 @@ class NoConformidadesTask(TareaDiaria):
             script_filename="run_no_conformidades.py",
             task_names=["NoConformidadesCalidad", "NoConformidadesTecnica"],
             frequency_days=1,  # Se verifica individualmente cada subtarea
+            databases=("no_conformidades",),
         )
 
         # Frecuencias específicas por subtarea
@@ -133,6 +149,8 @@ class NoConformidadesTask(TareaDiaria):
 class AgedysTask(TareaDiaria):
     """Tarea para sincronización con AGEDYS"""
 
+    logic_class = "agedys.agedys_task:AgedysTask"
+
     def __init__(self):
         frequency = int(os.getenv("AGEDYS_FRECUENCIA_DIAS", "1"))
         super().__init__(
@@ -140,6 +158,7 @@ class AgedysTask(TareaDiaria):
             script_filename="run_agedys.py",  # runner vive ahora en scripts/
             task_names=["AGEDYSDiario"],
             frequency_days=frequency,
+            databases=("agedys",),
         )
 
 
@@ -150,6 +169,9 @@ class EmailServicesRegistryTask(TareaContinua):
     a la implementación concreta y facilitar futuras extensiones (p.ej. división).
     """
 
+    # En modo en proceso el maestro ejecuta la tarea real (no el no-op delegado)
+    logic_class = "email_services.email_task:EmailServicesTask"
+
     def __init__(self):
         super().__init__(name="EmailServices", script_filename="run_email_services.py")
 
@@ -186,6 +208,11 @@ class TaskRegistry:
       - Inyección de dependencias futuras (p.ej. pools, config) al construir tareas
       - Tests: se puede instanciar un registro reducido / falso
       - Extensibilidad: permitir filtrado dinámico, plugins, etc.
+
+    Las tareas se construyen la primera vez que se piden (diarias y continuas
+    por separado) y todas comparten ``self.config``; el maestro mantiene un
+    único registro entre ciclos (``get_task_registry``). ``build_time`` acumula
+    los segundos dedicados a construirlas.
     """
 
     def __init__(
@@ -194,66 +221,141 @@ class TaskRegistry:
         include_continuous: bool = True,
         extra_daily: Optional[Sequence[TareaDiaria]] = None,
         extra_continuous: Optional[Sequence[TareaContinua]] = None,
+        config: Optional[Config] = None,
     ):
-        self._daily_tasks: list[TareaDiaria] = []
-        self._continuous_tasks: list[TareaContinua] = []
+        self.include_daily = include_daily
+        self.include_continuous = include_continuous
+        self._extra_daily = list(extra_daily or [])
+        self._extra_continuous = list(extra_continuous or [])
+        self.config = config if config is not None else Config()
+        self._daily_tasks: Optional[list[TareaDiaria]] = None
+        self._continuous_tasks: Optional[list[TareaContinua]] = None
+        self._lock = threading.Lock()
+        self.build_time = 0.0
+        self.builds = 0
+
+    def _build(self, kind: str, factory: Callable[[], list]) -> list:
+        start = time.perf_counter()
+        with use_shared_config(self.config):
+            tasks = factory()
+        elapsed = time.perf_counter() - start
+        self.build_time += elapsed
+        self.builds += 1
+        logger.info(
+            f"Registro de tareas: {len(tasks)} tareas {kind} construidas en {elapsed:.3f}s",
+            extra={
+                "event": "task_registry_built",
+                "kind": kind,
+                "tasks": len(tasks),
+                "build_s": round(elapsed, 3),
+            },
+        )
+        return tasks
 
-        if include_daily:
-            base_daily = [BrassTask(), ExpedientesTask(), NoConformidadesTask(), AgedysTask()]
+    def _create_daily(self) -> list[TareaDiaria]:
+        tasks: list[TareaDiaria] = []
+        if self.include_daily:
+            tasks = [BrassTask(), ExpedientesTask(), NoConformidadesTask(), AgedysTask()]
             if 'RiesgosTask' in globals() and RiesgosTask is not None:  # type: ignore
                 try:
-                    base_daily.insert(0, RiesgosTask())  # Riesgos primero como antes
+                    tasks.insert(0, RiesgosTask())  # Riesgos primero como antes
                 except Exception:
                     pass
-            self._daily_tasks.extend(base_daily)
-        if include_continuous:
-            self._continuous_tasks.extend([EmailServicesRegistryTask()])
-        if extra_daily:
-            self._daily_tasks.extend(extra_daily)
-        if extra_continuous:
-            self._continuous_tasks.extend(extra_continuous)
+        return tasks + self._extra_daily
+
+    def _create_continuous(self) -> list[TareaContinua]:
+        tasks: list[TareaContinua] = []
+        if self.include_continuous:
+            tasks = [EmailServicesRegistryTask()]
+        return tasks + self._extra_continuous
+
+    @property
+    def _daily(self) -> list[TareaDiaria]:
+        with self._lock:
+            if self._daily_tasks is None:
+                self._daily_tasks = self._build("diarias", self._create_daily)
+            return self._daily_tasks
+
+    @property
+    def _continuous(self) -> list[TareaContinua]:
+        with self._lock:
+            if self._continuous_tasks is None:
+                self._continuous_tasks = self._build("continuas", self._create_continuous)
+            return self._continuous_tasks
 
     # API pública
     def get_daily_tasks(self) -> list[TareaDiaria]:
-        return list(self._daily_tasks)
+        return list(self._daily)
 
     def get_continuous_tasks(self) -> list[TareaContinua]:
-        return list(self._continuous_tasks)
+        return list(self._continuous)
 
     def get_all_tasks(self) -> list:
         return self.get_daily_tasks() + self.get_continuous_tasks()
 
     # Métodos auxiliares potenciales (extensión futura)
     def filter_daily(self, predicate) -> list[TareaDiaria]:
-        return [t for t in self._daily_tasks if predicate(t)]
+        return [t for t in self._daily if predicate(t)]
 
     def filter_continuous(self, predicate) -> list[TareaContinua]:
-        return [t for t in self._continuous_tasks if predicate(t)]
+        return [t for t in self._continuous if predicate(t)]
 
     def summary(self) -> dict[str, Any]:
         return {
-            "daily_count": len(self._daily_tasks),
-            "continuous_count": len(self._continuous_tasks),
-            "daily_names": [t.name for t in self._daily_tasks],
-            "continuous_names": [t.name for t in self._continuous_tasks],
+            "daily_count": len(self._daily),
+            "continuous_count": len(self._continuous),
+            "daily_names": [t.name for t in self._daily],
+            "continuous_names": [t.name for t in self._continuous],
         }
 
+    def get_stats(self) -> dict[str, Any]:
+        """Tiempo de construcción acumulado y qué listas están ya construidas."""
+        return {
+            "build_s": round(self.build_time, 3),
+            "builds": self.builds,
+            "daily_built": self._daily_tasks is not None,
+            "continuous_built": self._continuous_tasks is not None,
+        }
+
+
+# Registro compartido por el maestro entre ciclos
+_task_registry: Optional[TaskRegistry] = None
+_task_registry_lock = threading.Lock()
+
+
+def get_task_registry() -> TaskRegistry:
+    """Registro de tareas del proceso (se crea la primera vez)."""
+    global _task_registry
+    with _task_registry_lock:
+        if _task_registry is None:
+            _task_registry = TaskRegistry()
+        return _task_registry
+
+
+def reset_task_registry() -> None:
+    """Descarta el registro compartido (p.ej. para recargar la configuración)."""
+    global _task_registry
+    with _task_registry_lock:
+        _task_registry = None
+
 
 # Backwards compatibility exports (para código legado que aún importe las funciones)
 def get_all_daily_tasks() -> list[TareaDiaria]:  # pragma: no cover - compat
-    return TaskRegistry().get_daily_tasks()
+    return get_task_registry().get_daily_tasks()
 
 
 def get_all_continuous_tasks() -> list[TareaContinua]:  # pragma: no cover - compat
-    return TaskRegistry().get_continuous_tasks()
+    return get_task_registry().get_continuous_tasks()
 
 
 def get_all_tasks() -> list:  # pragma: no cover - compat
-    return TaskRegistry().get_all_tasks()
+    return get_task_registry().get_all_tasks()
 
 
 __all__ = [
     "TaskRegistry",
+    "get_task_registry",
+    "reset_task_registry",
     "get_all_daily_tasks",
     "get_all_continuous_tasks",
     "get_all_tasks",
@@ -0,0 +1,189 @@
+"""Planificador de tareas diarias en paralelo con límites por base de datos.
+
+El maestro ejecutaba Riesgos, BRASS, Expedientes, NoConformidades y AGEDYS una
+detrás de otra, de modo que la ventana diaria era la suma de sus duraciones.
+``DailyTaskScheduler`` las reparte entre ``max_workers`` hilos respetando un
+semáforo por BD: cada tarea declara en ``task.databases`` las BD principales
+que usa y sólo arranca cuando todas tienen hueco. Todas escriben además en la
+BD de tareas (TbTareas y los correos en TbCorreosEnviados); por defecto no se
+limita, así que tareas que sólo la comparten se solapan y la ventana tiende a
+la duración de la más larga. Los choques de IDs de esos INSERT concurrentes se
+reintentan (``IdAllocator.insert_with_id``); con ``tareas=1`` en
+``MASTER_DB_CONCURRENCY`` se serializan todas las tareas sobre ella.
+
+Usage:
+    scheduler = DailyTaskScheduler(max_workers=3, db_limits={"riesgos": 1})
+    runs = scheduler.run(tasks, lambda task: task.ejecutar())
+    [run.to_dict() for run in runs]   # inicio/fin/duración por tarea
+
+Límites por BD desde entorno: ``MASTER_DB_CONCURRENCY="riesgos=1,agedys=2"``
+(por defecto 1 por BD). El paralelismo es opcional: ``MASTER_MAX_WORKERS``
+vale 1 por defecto.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# BD que usan todas las tareas (TbTareas y registro de correos); sólo limita
+# el solapamiento si tiene límite explícito en ``db_limits``
+SHARED_DATABASES = frozenset({"tareas"})
+
+
+class TaskRun:
+    """Resultado y tiempos de una tarea ejecutada por el planificador."""
+
+    __slots__ = ("name", "databases", "started", "finished", "result", "error")
+
+    def __init__(self, name: str, databases: tuple[str, ...]):
+        self.name = name
+        self.databases = databases
+        self.started: Optional[datetime] = None
+        self.finished: Optional[datetime] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return (self.finished - self.started).total_seconds()
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {
+            "task": self.name,
+            "databases": list(self.databases),
+            "start": self.started.isoformat() if self.started else None,
+            "end": self.finished.isoformat() if self.finished else None,
+            "duration_s": round(self.duration, 3),
+            "error": self.error,
+        }
+        if isinstance(self.result, dict) and "mode" in self.result:
+            # Resultado de BaseTask.ejecutar: en proceso, trabajador o aislada
+            data["mode"] = self.result["mode"]
+            if self.result.get("startup_saved") is not None:
+                data["startup_saved_s"] = round(self.result["startup_saved"], 3)
+        return data
+
+
+def db_limits_from_env(value: Optional[str] = None) -> dict[str, int]:
+    """Parsea ``MASTER_DB_CONCURRENCY`` (``bd=n`` separados por comas)."""
+    raw = os.getenv("MASTER_DB_CONCURRENCY", "") if value is None else value
+    limits: dict[str, int] = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, _, number = item.partition("=")
+        try:
+            limits[name.strip().lower()] = max(1, int(number))
+        except ValueError:
+            logger.warning(f"Límite de concurrencia inválido para {name.strip()}: {number!r}")
+    return limits
+
+
+def task_databases(task: Any) -> tuple[str, ...]:
+    """BD limitadas de una tarea (``task.databases`` sin las compartidas)."""
+    databases = getattr(task, "databases", None) or ()
+    return tuple(sorted({db.lower() for db in databases} - SHARED_DATABASES))
+
+
+class DailyTaskScheduler:
+    """Ejecuta tareas en paralelo con ``max_workers`` y un semáforo por BD.
+
+    El orden de la lista es la prioridad: en cada hueco libre arranca la
+    primera tarea pendiente cuyas BD estén por debajo de su límite.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        db_limits: Optional[dict[str, int]] = None,
+        default_db_limit: int = 1,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.db_limits = dict(db_limits or {})
+        self.default_db_limit = max(1, default_db_limit)
+
+    def _limit(self, database: str) -> int:
+        return self.db_limits.get(database, self.default_db_limit)
+
+    def _databases(self, task: Any) -> tuple[str, ...]:
+        """BD limitadas de ``task``: las suyas más las compartidas con límite."""
+        shared = {db for db in SHARED_DATABASES if db in self.db_limits}
+        return tuple(sorted(set(task_databases(task)) | shared))
+
+    def run(self, tasks: Sequence[Any], run_one: Callable[[Any], Any]) -> list[TaskRun]:
+        """Ejecuta ``run_one(task)`` para cada tarea y devuelve sus ``TaskRun``.
+
+        Las excepciones de ``run_one`` se recogen en ``TaskRun.error`` sin
+        detener al resto. La lista devuelta conserva el orden de ``tasks``.
+        """
+        runs = [TaskRun(getattr(t, "name", str(t)), self._databases(t)) for t in tasks]
+        if not runs:
+            return runs
+        pending = list(range(len(runs)))
+        in_use: dict[str, int] = {}
+        window_start = time.perf_counter()
+
+        def execute(index: int) -> None:
+            run = runs[index]
+            run.started = datetime.now()
+            try:
+                run.result = run_one(tasks[index])
+            except Exception as e:
+                run.error = str(e)
+                logger.error(f"Error ejecutando tarea {run.name}: {e}")
+            finally:
+                run.finished = datetime.now()
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="daily-task"
+        ) as executor:
+            running: dict[Any, int] = {}
+            while pending or running:
+                # Arrancar todas las tareas que caben ahora mismo (en orden)
+                for index in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    databases = runs[index].databases
+                    if any(in_use.get(db, 0) >= self._limit(db) for db in databases):
+                        continue
+                    for db in databases:
+                        in_use[db] = in_use.get(db, 0) + 1
+                    pending.remove(index)
+                    running[executor.submit(execute, index)] = index
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    for db in runs[index].databases:
+                        in_use[db] -= 1
+
+        window = time.perf_counter() - window_start
+        total = sum(run.duration for run in runs)
+        logger.info(
+            f"Tareas diarias: {len(runs)} en {window:.1f}s "
+            f"(secuencial {total:.1f}s, {self.max_workers} hilos)",
+            extra={
+                "event": "daily_tasks_window",
+                "tasks": len(runs),
+                "window_s": round(window, 3),
+                "sequential_s": round(total, 3),
+                "max_workers": self.max_workers,
+            },
+        )
+        return runs
+
+
+__all__ = [
+    "DailyTaskScheduler",
+    "SHARED_DATABASES",
+    "TaskRun",
+    "db_limits_from_env",
+    "task_databases",
+]
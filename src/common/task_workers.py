@@ -0,0 +1,422 @@
+"""Pool de procesos trabajadores precalentados para tareas aisladas.
+
+El modo aislado de ``BaseTask`` lanzaba ``python scripts/run_<tarea>.py`` en
+cada ciclo: intérprete nuevo, imports de ``common`` y de los managers, carga
+de ``.env`` y conexiones Access en frío. ``TaskWorkerPool`` mantiene unos
+pocos procesos de larga vida, arrancados por ``run_master.py``, que ya tienen
+todo eso importado y conectado; las tareas se les envían por un ``Pipe``:
+
+  - cada trabajador instancia una vez la clase de lógica de cada tarea
+    (``"modulo:Clase"``) y la reutiliza, con sus pools ya abiertos
+  - se recicla tras ``max_tasks`` tareas o si su memoria residente supera
+    ``max_memory_mb`` (psutil si está instalado; si no ``/proc/self/statm`` en
+    Linux y, en último caso, el pico de ``resource`` en POSIX)
+  - una tarea que supera ``timeout`` mata al trabajador y se sustituye por uno
+    nuevo, en lugar del límite fijo de 1800 s de ``subprocess.run``
+
+Usage:
+    pool = TaskWorkerPool(size=2, preload=["riesgos.riesgos_task"])
+    pool.start()
+    set_task_worker_pool(pool)          # BaseTask aislada usa el pool
+    pool.run("brass.brass_task:BrassTask", timeout=600)
+    pool.shutdown()
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from .startup_costs import WORKER_KEY, record_startup_cost
+
+try:  # pragma: no cover - dependencia opcional
+    import psutil  # type: ignore
+
+    PSUTIL_AVAILABLE = True
+except ImportError:  # pragma: no cover - entorno sin psutil
+    psutil = None  # type: ignore[assignment]
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_SRC_DIR = Path(__file__).resolve().parent.parent
+_STATM_PATH = "/proc/self/statm"
+
+
+def _memory_mb() -> Optional[float]:
+    """Memoria residente del proceso actual en MB (None si no se puede medir).
+
+    Sin psutil ni ``/proc`` (macOS) devuelve el pico (``ru_maxrss``), que no
+    baja al liberar memoria: el trabajador se reciclará en cuanto lo supere.
+    """
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open(_STATM_PATH, encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows sin psutil
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _resolve(instances: dict[str, Any], logic_class: str) -> Any:
+    instance = instances.get(logic_class)
+    if instance is None:
+        module_name, _, class_name = logic_class.partition(":")
+        module = importlib.import_module(module_name)
+        instance = getattr(module, class_name)()
+        instances[logic_class] = instance
+    return instance
+
+
+def _worker_main(connection, preload: Sequence[str], paths: Sequence[str]) -> None:
+    """Bucle del proceso trabajador: recibe ``logic_class`` y devuelve el resultado."""
+    for path in reversed(paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    try:
+        from common.logger import setup_global_logging
+
+        setup_global_logging(os.getenv("MASTER_LOG_LEVEL", "INFO"))
+    except Exception:  # pragma: no cover - defensivo
+        pass
+    worker_logger = logging.getLogger(f"{__name__}.worker")
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            worker_logger.warning(f"No se pudo precargar {module}: {e}")
+    try:
+        # Pool de la BD de tareas abierto antes de la primera tarea
+        from common.config import config
+        from common.db.access_connection_pool import get_tareas_connection_pool
+
+        get_tareas_connection_pool(config.get_db_tareas_connection_string()).warm_up(1)
+    except Exception as e:  # pragma: no cover - sin driver / sin BD
+        worker_logger.debug(f"Precalentamiento del pool de tareas omitido: {e}")
+
+    # Misma secuencia que el runner del script: comprobar, ejecutar y marcar
+    from common.base_task import run_task_logic
+
+    instances: dict[str, Any] = {}
+    connection.send(("ready", os.getpid()))
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        start = time.perf_counter()
+        error = ""
+        try:
+            success = run_task_logic(_resolve(instances, message), worker_logger)
+        except Exception as e:
+            success = False
+            error = f"{type(e).__name__}: {e}"
+        connection.send(
+            ("done", success, error, time.perf_counter() - start, _memory_mb())
+        )
+    try:
+        from common.db.access_connection_pool import pool_registry
+
+        pool_registry.close_all()
+    except Exception:  # pragma: no cover - defensivo
+        pass
+
+
+class _Worker:
+    """Proceso trabajador con su extremo del ``Pipe`` y contadores."""
+
+    __slots__ = ("process", "connection", "tasks", "memory_mb", "started")
+
+    def __init__(self, process, connection):
+        self.process = process
+        self.connection = connection
+        self.tasks = 0
+        self.memory_mb: Optional[float] = None
+        self.started = time.monotonic()
+
+
+class TaskWorkerPool:
+    """Procesos de larga vida que ejecutan la lógica de tareas por encargo."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_tasks: int = 20,
+        max_memory_mb: Optional[float] = 1024,
+        timeout: float = 1800,
+        preload: Sequence[str] = (),
+        start_timeout: float = 120,
+    ):
+        """
+        Args:
+            size: Procesos trabajadores simultáneos
+            max_tasks: Tareas tras las que se recicla un trabajador (0 sin límite)
+            max_memory_mb: Memoria residente que fuerza el reciclado (None sin límite)
+            timeout: Segundos por tarea antes de matar y sustituir al trabajador
+            preload: Módulos a importar al arrancar cada trabajador
+            start_timeout: Segundos máximos de arranque de un trabajador
+        """
+        self.size = max(1, size)
+        self.max_tasks = max_tasks
+        self.max_memory_mb = max_memory_mb
+        self.timeout = timeout
+        self.preload = list(preload)
+        self.start_timeout = start_timeout
+        # spawn en todas las plataformas: mismo comportamiento que en Windows
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: deque[_Worker] = deque()
+        self._workers: list[_Worker] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "started": 0,
+            "tasks": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "recycled": 0,
+            "startup_s": None,
+        }
+
+    # ------------------------------ Ciclo de vida ------------------------------
+    def _spawn(self) -> _Worker:
+        spawn_start = time.perf_counter()
+        parent, child = self._context.Pipe()
+        paths = [str(_SRC_DIR), str(_SRC_DIR.parent)]
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child, self.preload, paths),
+            name="task-worker",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        try:
+            if not parent.poll(self.start_timeout):
+                raise RuntimeError("El trabajador no arrancó a tiempo")
+            parent.recv()  # ("ready", pid)
+        except BaseException:
+            # Sin trabajador válido: no dejar el proceso ni el Pipe abiertos
+            parent.close()
+            process.terminate()
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+                process.join(5)
+            raise
+        worker = _Worker(process, parent)
+        # Intérprete + imports + pool de tareas: lo que ahorra el modo en proceso
+        startup = time.perf_counter() - spawn_start
+        record_startup_cost(WORKER_KEY, startup)
+        with self._cond:
+            self._stats["started"] += 1
+            self._stats["startup_s"] = round(startup, 3)
+        logger.info(
+            f"Trabajador de tareas {process.pid} listo en {startup:.2f}s",
+            extra={"event": "task_worker_started", "pid": process.pid, "startup_s": round(startup, 3)},
+        )
+        return worker
+
+    def start(self) -> "TaskWorkerPool":
+        """Arranca los ``size`` trabajadores (imports y conexiones en frío aquí)."""
+        for _ in range(self.size - len(self._workers)):
+            worker = self._spawn()
+            with self._cond:
+                self._workers.append(worker)
+                self._idle.append(worker)
+                self._cond.notify()
+        return self
+
+    def _stop(self, worker: _Worker, kill: bool = False) -> None:
+        try:
+            if kill:
+                worker.process.kill()
+            else:
+                worker.connection.send(None)
+                worker.process.join(10)
+                if worker.process.is_alive():
+                    worker.process.kill()
+            worker.process.join(5)
+        except Exception:  # pragma: no cover - defensivo
+            pass
+        finally:
+            try:
+                worker.connection.close()
+            except Exception:
+                pass
+
+    def _replace(self, worker: _Worker, kill: bool, reason: str) -> None:
+        """Sustituye ``worker`` por un proceso nuevo (o lo retira si el pool cerró)."""
+        self._stop(worker, kill=kill)
+        logger.info(
+            f"Trabajador {worker.process.pid} sustituido: {reason}",
+            extra={"event": "task_worker_replaced", "pid": worker.process.pid, "reason": reason},
+        )
+        with self._cond:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if self._closed:
+                return
+        try:
+            fresh = self._spawn()
+        except Exception as e:
+            logger.error(f"No se pudo arrancar un trabajador de reemplazo: {e}")
+            return
+        with self._cond:
+            self._workers.append(fresh)
+            self._idle.append(fresh)
+            self._cond.notify()
+
+    def shutdown(self) -> None:
+        """Detiene todos los trabajadores (espera a que terminen sus tareas)."""
+        with self._cond:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+            self._cond.notify_all()
+        for worker in workers:
+            self._stop(worker)
+
+    # -------------------------------- Ejecución --------------------------------
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while not self._idle:
+                if self._closed or not self._workers:
+                    raise RuntimeError("Pool de trabajadores cerrado")
+                self._cond.wait()
+            return self._idle.popleft()
+
+    def run(self, logic_class: str, timeout: Optional[float] = None) -> dict[str, Any]:
+        """Ejecuta ``logic_class`` en un trabajador libre.
+
+        Returns:
+            Diccionario con el formato de ``BaseTask.ejecutar`` (``mode="worker"``).
+        """
+        limit = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        start = time.perf_counter()
+        try:
+            worker.connection.send(logic_class)
+            if not worker.connection.poll(limit):
+                with self._cond:
+                    self._stats["timeouts"] += 1
+                    self._stats["failed"] += 1
+                self._replace(worker, kill=True, reason=f"timeout {limit}s en {logic_class}")
+                return self._result(False, -1, f"Timeout después de {limit}s", start)
+            _, success, error, _duration, memory = worker.connection.recv()
+        except (EOFError, OSError) as e:
+            with self._cond:
+                self._stats["crashes"] += 1
+                self._stats["failed"] += 1
+            self._replace(worker, kill=True, reason=f"proceso caído en {logic_class}")
+            return self._result(False, -3, f"Trabajador caído: {e}", start)
+
+        worker.tasks += 1
+        worker.memory_mb = memory
+        with self._cond:
+            self._stats["tasks"] += 1
+            if not success:
+                self._stats["failed"] += 1
+        reason = self._recycle_reason(worker)
+        if reason:
+            with self._cond:
+                self._stats["recycled"] += 1
+            self._replace(worker, kill=False, reason=reason)
+        else:
+            with self._cond:
+                self._idle.append(worker)
+                self._cond.notify()
+        return self._result(success, 0 if success else 1, error, start)
+
+    def _recycle_reason(self, worker: _Worker) -> str:
+        if self.max_tasks and worker.tasks >= self.max_tasks:
+            return f"{worker.tasks} tareas"
+        if (
+            self.max_memory_mb
+            and worker.memory_mb is not None
+            and worker.memory_mb > self.max_memory_mb
+        ):
+            return f"memoria {worker.memory_mb:.0f} MB"
+        return ""
+
+    @staticmethod
+    def _result(success: bool, code: int, error: str, start: float) -> dict[str, Any]:
+        return {
+            "success": success,
+            "return_code": code,
+            "output": "",
+            "error": error,
+            "duration": time.perf_counter() - start,
+            "mode": "worker",
+        }
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["workers"] = len(self._workers)
+            stats["idle"] = len(self._idle)
+        return stats
+
+
+# Pool activo del proceso maestro (None: el modo aislado usa subprocess.run)
+_active_pool: Optional[TaskWorkerPool] = None
+
+
+def set_task_worker_pool(pool: Optional[TaskWorkerPool]) -> None:
+    global _active_pool
+    _active_pool = pool
+
+
+def get_task_worker_pool() -> Optional[TaskWorkerPool]:
+    return _active_pool
+
+
+def isolation_configured() -> bool:
+    """True si ``MASTER_TASK_MODE`` o ``MASTER_ISOLATED_TASKS`` aíslan alguna tarea."""
+    mode = os.getenv("MASTER_TASK_MODE", "inprocess").strip().lower()
+    if mode in ("isolated", "subprocess"):
+        return True
+    return any(item.strip() for item in os.getenv("MASTER_ISOLATED_TASKS", "").split(","))
+
+
+def worker_pool_from_env(preload: Sequence[str] = ()) -> Optional[TaskWorkerPool]:
+    """Crea el pool según ``MASTER_WORKER_POOL_SIZE`` (0 o vacío lo desactiva)."""
+    size = int(os.getenv("MASTER_WORKER_POOL_SIZE", "0") or 0)
+    if size <= 0:
+        return None
+    memory = float(os.getenv("MASTER_WORKER_MAX_MEMORY_MB", "1024") or 0)
+    return TaskWorkerPool(
+        size=size,
+        max_tasks=int(os.getenv("MASTER_WORKER_MAX_TASKS", "20") or 0),
+        max_memory_mb=memory or None,
+        timeout=float(os.getenv("MASTER_WORKER_TASK_TIMEOUT", "1800")),
+        preload=preload,
+    )
+
+
+__all__ = [
+    "PSUTIL_AVAILABLE",
+    "TaskWorkerPool",
+    "get_task_worker_pool",
+    "isolation_configured",
+    "set_task_worker_pool",
+    "worker_pool_from_env",
+]
@@ -4,6 +4,20 @@ Este módulo proporciona funciones alternativas que usan TbUsuariosAplicacionesP
 """
 
 import logging
+import os
+
+# Tablas de referencia de usuarios: sus consultas se cachean por BD (ver
+# common.db.query_cache) y se invalidan al escribir en ellas.
+USER_TABLES = ("TbUsuariosAplicaciones", "TbUsuariosAplicacionesPermisos")
+
+
+def user_cache_ttl() -> float:
+    """Vida en caché de las listas de usuarios (``DB_USER_CACHE_TTL``, def. 60 s).
+
+    Las altas y bajas se hacen desde otras aplicaciones, cuyas escrituras no
+    invalidan la caché de este proceso: sólo las acota este TTL.
+    """
+    return float(os.getenv("DB_USER_CACHE_TTL", "60"))
 
 
 def get_admin_users_alternative(db_connection) -> list[dict[str, str]]:
@@ -67,7 +81,9 @@ def get_technical_users_alternative(
             AND uap.CorreoUsuario IS NULL
         """
 
-        result = db_connection.execute_query(query)
+        result = db_connection.execute_query(
+            query, cache_tags=USER_TABLES, cache_ttl=user_cache_ttl()
+        )
         return result
     except Exception as e:
         logger.error(
@@ -123,7 +139,9 @@ def get_quality_users_alternative(app_id: str, config, logger) -> list[dict[str,
     selected_rows = []
     for sql, mode in attempts:
         try:
-            res = db_connection.execute_query(sql)
+            res = db_connection.execute_query(
+                sql, cache_tags=USER_TABLES, cache_ttl=user_cache_ttl()
+            )
             logger.info(
                 f"Intento usuarios calidad modo={mode} filas={len(res)}",
                 extra={
@@ -209,7 +227,9 @@ def get_economy_users_alternative(config, logger) -> list[dict[str, str]]:
             AND uap.IDAplicacion = {app_id_int}
         """
 
-        result = db_connection.execute_query(query)
+        result = db_connection.execute_query(
+            query, cache_tags=USER_TABLES, cache_ttl=user_cache_ttl()
+        )
         return result
 
     except Exception as e:
@@ -286,7 +306,12 @@ def get_user_email(username: str, config, logger=None) -> str:
             FROM TbUsuariosAplicaciones
             WHERE UsuarioRed = ?
         """
-        result = db_connection.execute_query(query, [username])
+        result = db_connection.execute_query(
+            query,
+            [username],
+            cache_tags=("TbUsuariosAplicaciones",),
+            cache_ttl=user_cache_ttl(),
+        )
         if result and len(result) > 0:
             email = result[0].get("CorreoUsuario", "")
             return email or ""
@@ -582,6 +582,7 @@ def get_economy_users(config, logger) -> list[dict[str, str]]:
     """
     try:
         from .db.database import AccessDatabase
+        from .user_adapter import user_cache_ttl
 
         # Usar la conexión de tareas para obtener usuarios (como en el script original)
         db_connection = AccessDatabase(config.get_db_tareas_connection_string())
@@ -596,7 +597,11 @@ def get_economy_users(config, logger) -> list[dict[str, str]]:
             AND TbUsuariosAplicacionesTareas.EsEconomia = 'Sí'
         """
 
-        result = db_connection.execute_query(query)
+        result = db_connection.execute_query(
+            query,
+            cache_tags=("TbUsuariosAplicaciones", "TbUsuariosAplicacionesTareas"),
+            cache_ttl=user_cache_ttl(),
+        )
         return result
 
     except Exception as e:
@@ -660,6 +665,10 @@ def execute_task_with_standard_boilerplate(
                 return getattr(obj, attr)
         raise AttributeError("No se encontró método de ejecución en la tarea")
 
+    # Lanzada aislada por el maestro: informa del coste de arranque
+    from .startup_costs import emit_startup_marker
+
+    emit_startup_marker()
     exit_code = 0
     task_logger.info(f"=== INICIO TAREA {upper} ===")
     try:
@@ -20,6 +20,8 @@ from common.db.access_connection_pool import (
     get_tareas_connection_pool,
 )
 from common.config import config
+from common.db.id_allocator import id_allocator, is_duplicate_key_error
+from common.db.write_queue import get_write_queue
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +59,8 @@ class EmailManager:
         else:  # tareas
             conn_str = config.get_db_connection_string("tareas")
             self.db_pool = get_tareas_connection_pool(conn_str)
+        # Escrituras diferidas por el escritor único de la BD (opcional)
+        self.write_queue = get_write_queue(self.email_source, conn_str)
 
     # ---------------------- API pública ----------------------
     def process_pending_emails(self) -> int:
@@ -65,6 +69,8 @@ class EmailManager:
         Retorna el número de correos enviados.
         """
         enviados = 0
+        # Los correos registrados en diferido deben ser visibles antes de leer
+        self.flush_writes()
         try:
             query = "SELECT * FROM TbCorreosEnviados WHERE FechaEnvio IS NULL"
             rows = self.db_pool.execute_query(query)
@@ -96,6 +102,7 @@ class EmailManager:
                         "Error procesando correo ID %s: %s", correo.get("IDCorreo"), e
                     )
                     self._marcar_correo_no_enviado(correo.get("IDCorreo", -1), str(e))
+            self.flush_writes()
             return enviados
         except Exception as e:
             logger.error(
@@ -103,6 +110,26 @@ class EmailManager:
             )
             return enviados
 
+    def flush_writes(self, timeout: float | None = None) -> bool:
+        """Espera a que las escrituras diferidas de este gestor estén confirmadas.
+
+        Sin cola de escritura (``DB_WRITE_BEHIND_ENABLED=false``) no hace nada.
+        """
+        if self.write_queue is None:
+            return True
+        return self.write_queue.flush(timeout)
+
+    def _deferred(self) -> bool:
+        """True si la escritura va a la cola diferida.
+
+        Dentro de ``transaction()`` se escribe en la conexión fijada al hilo:
+        la cola usa su propia conexión y el rollback del bloque no la alcanzaría.
+        """
+        if self.write_queue is None:
+            return False
+        in_transaction = getattr(self.db_pool, "in_transaction", None)
+        return not (callable(in_transaction) and in_transaction())
+
     # ------------------ Lógica interna ------------------
     def _enviar_correo_individual(self, correo: dict[str, Any]) -> bool:
         """Devuelve True si enviado, False si fallo definitivo, o levanta TransientEmailSendError."""
@@ -206,6 +233,15 @@ class EmailManager:
     def _marcar_correo_enviado(self, id_correo: int, fecha_envio: datetime):
         try:
             update_data = {"FechaEnvio": fecha_envio}
+            if self._deferred():
+                self.write_queue.update(
+                    "TbCorreosEnviados",
+                    update_data,
+                    "IDCorreo = ?",
+                    [id_correo],
+                    key=("FechaEnvio", id_correo),
+                )
+                return
             where_clause = f"IDCorreo = {id_correo}"
             self.db_pool.update_record("TbCorreosEnviados", update_data, where_clause)
         except Exception as e:  # pragma: no cover
@@ -214,6 +250,15 @@ class EmailManager:
     def _marcar_correo_no_enviado(self, id_correo: int, motivo: str):
         try:
             update_data = {"Notas": f"Fallo envío: {motivo}", "Enviado": False}
+            if self._deferred():
+                self.write_queue.update(
+                    "TbCorreosEnviados",
+                    update_data,
+                    "IDCorreo = ?",
+                    [id_correo],
+                    key=("Notas", id_correo),
+                )
+                return
             where_clause = f"IDCorreo = {id_correo}"
             self.db_pool.update_record("TbCorreosEnviados", update_data, where_clause)
         except Exception as e:  # pragma: no cover
@@ -233,27 +278,80 @@ class EmailManager:
         Sustituye a common.utils.register_email_in_database.
         Usa el pool de conexiones interno según email_source.
         """
+        email_data = {
+            "IDCorreo": None,
+            "Aplicacion": application,
+            "Asunto": subject,
+            "Cuerpo": body,
+            "Destinatarios": recipients if "@" in recipients else "",
+            "DestinatariosConCopiaOculta": admin_emails,
+            "FechaGrabacion": datetime.now(),
+        }
         try:
-            next_id = self.db_pool.get_max_id("TbCorreosEnviados", "IDCorreo") + 1
-            email_data = {
-                "IDCorreo": next_id,
-                "Aplicacion": application,
-                "Asunto": subject,
-                "Cuerpo": body,
-                "Destinatarios": recipients if "@" in recipients else "",
-                "DestinatariosConCopiaOculta": admin_emails,
-                "FechaGrabacion": datetime.now(),
-            }
-            success = self.db_pool.insert_record("TbCorreosEnviados", email_data)
-            if success:
-                logger.info(
-                    "Correo registrado", extra={"event": "email_registered", "app": application}
-                )
-            else:
-                logger.error(
-                    "Error registrando correo", extra={"event": "email_register_error", "app": application}
-                )
-            return success
-        except Exception as e:  # pragma: no cover
-            logger.error("Fallo registrando correo: %s", e)
+            if self._deferred():
+                # Registro diferido: el resultado se conoce al confirmar el lote
+                self._submit_email(email_data, application, attempt=1)
+                return True
+            fields = list(email_data)
+            insert_query = (
+                f"INSERT INTO TbCorreosEnviados ({', '.join(fields)}) "
+                f"VALUES ({', '.join(['?'] * len(fields))})"
+            )
+
+            def insert(email_id: int) -> None:
+                email_data["IDCorreo"] = email_id
+                self.db_pool.execute_non_query(insert_query, tuple(email_data.values()))
+
+            # Reintenta con un ID nuevo si otro proceso ya usó el asignado
+            id_allocator.insert_with_id_for(
+                self.db_pool, "TbCorreosEnviados", "IDCorreo", insert
+            )
+            logger.info(
+                "Correo registrado", extra={"event": "email_registered", "app": application}
+            )
+            return True
+        except Exception as e:
+            logger.error(
+                f"Error registrando correo: {e}",
+                extra={"event": "email_register_error", "app": application},
+            )
             return False
+
+    def _submit_email(self, email_data: dict[str, Any], application: str, attempt: int) -> None:
+        email_data["IDCorreo"] = id_allocator.next_id_for(
+            self.db_pool, "TbCorreosEnviados", "IDCorreo"
+        )
+        future = self.write_queue.insert("TbCorreosEnviados", dict(email_data))
+        future.add_done_callback(
+            lambda f: self._on_email_written(f, application, email_data, attempt)
+        )
+
+    def _on_email_written(
+        self, future, application: str, email_data: dict[str, Any], attempt: int
+    ) -> None:
+        """Resultado de un registro diferido (se ejecuta en el hilo escritor).
+
+        Si el ID chocó con el de otro proceso se relee ``MAX`` y se vuelve a
+        encolar con un ID nuevo, hasta ``id_allocator.max_attempts`` veces.
+        """
+        if future.exception() is None and future.result():
+            logger.info(
+                "Correo registrado", extra={"event": "email_registered", "app": application}
+            )
+            return
+        id_allocator.invalidate_for(self.db_pool, "TbCorreosEnviados", "IDCorreo")
+        error = future.exception() or getattr(future, "error", None)
+        if is_duplicate_key_error(error) and attempt < id_allocator.max_attempts:
+            logger.warning(
+                f"IDCorreo {email_data['IDCorreo']} duplicado; reintentando registro",
+                extra={"event": "email_register_retry", "app": application},
+            )
+            try:
+                self._submit_email(email_data, application, attempt + 1)
+                return
+            except Exception as e:  # cola cerrada durante la parada
+                error = e
+        logger.error(
+            f"Error registrando correo: {error}",
+            extra={"event": "email_register_error", "app": application},
+        )
@@ -10,6 +10,7 @@ import logging
 from datetime import datetime
 
 from common.db.database import AccessDatabase
+from common.db.parallel import run_parallel
 from common.reporting.html_report_generator import HTMLReportGenerator
 from common.reporting.table_builder import build_table_html
 
@@ -326,29 +327,39 @@ class ExpedientesManager:
                 "Inicio generación reporte Expedientes",
                 extra={"event": "expedientes_report_start", "app": "EXPEDIENTES"},
             )
-            sections = [
+            section_getters = [
                 (
                     "Expedientes TSOL adjudicados sin código S4H",
-                    self.get_expedientes_tsol_sin_cod_s4h(),
+                    self.get_expedientes_tsol_sin_cod_s4h,
                 ),
                 (
                     "Expedientes a punto de finalizar",
-                    self.get_expedientes_a_punto_finalizar(),
+                    self.get_expedientes_a_punto_finalizar,
                 ),
-                ("Hitos a punto de finalizar", self.get_hitos_a_punto_finalizar()),
+                ("Hitos a punto de finalizar", self.get_hitos_a_punto_finalizar),
                 (
                     "Expedientes con estado desconocido",
-                    self.get_expedientes_estado_desconocido(),
+                    self.get_expedientes_estado_desconocido,
                 ),
                 (
                     "Expedientes adjudicados sin contrato",
-                    self.get_expedientes_adjudicados_sin_contrato(),
+                    self.get_expedientes_adjudicados_sin_contrato,
                 ),
                 (
                     "Expedientes en fase oferta > 45 días",
-                    self.get_expedientes_fase_oferta_mucho_tiempo(),
+                    self.get_expedientes_fase_oferta_mucho_tiempo,
                 ),
             ]
+            # Secciones independientes: se reparten entre las conexiones del pool
+            run = run_parallel(
+                self.db_expedientes,
+                [getter for _, getter in section_getters],
+                label="expedientes_report",
+            )
+            sections = [
+                (title, rows)
+                for (title, _), rows in zip(section_getters, run.rows())
+            ]
             non_empty = [s for s in sections if s[1]]
             if not non_empty:
                 self.logger.info(
@@ -19,10 +19,11 @@ class ExpedientesTask(TareaDiaria):
             script_filename="run_expedientes.py",
             task_names=["ExpedientesDiario"],
             frequency_days=1,
+            databases=("expedientes",),
         )
         # Conexión específica expedientes
         try:
-            conn_str = self.config.get_db_expedientes_connection_string()
+            conn_str = self.config.get_db_read_connection_string("expedientes")
             pool = get_expedientes_connection_pool(conn_str)
             self.db_expedientes = AccessDatabase(conn_str, pool=pool)
             self.logger.debug("Pool Expedientes inicializado")
@@ -24,6 +24,7 @@ if src_dir not in os.sys.path:
 
 from common.config import config
 from common.db.database import AccessDatabase
+from common.db.id_allocator import db_scope, id_allocator
 from common.reporting.html_report_generator import HTMLReportGenerator
 from common.user_adapter import get_users_with_fallback
 # --- TypedDicts integrados (antes en types.py) ---
@@ -190,29 +191,39 @@ class NoConformidadesManager:
         """
         try:
             db = self.db_tareas  # Conexión inicializada perezosamente en el manager
-            next_id = db.get_max_id("TbCorreosEnviados", "IDCorreo") + 1
             fecha_actual = datetime.now()
             insert_query = (
                 "INSERT INTO TbCorreosEnviados "
                 "(IDCorreo, Aplicacion, Asunto, Cuerpo, Destinatarios, DestinatariosConCopia, DestinatariosConCopiaOculta, FechaGrabacion) "
                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
             )
-            with db.get_connection() as conn:
-                cur = conn.cursor()
-                cur.execute(
-                    insert_query,
-                    [
-                        next_id,
-                        application,
-                        subject,
-                        body.strip(),
-                        recipients,
-                        admin_emails,
-                        "",  # BCC
-                        fecha_actual,
-                    ],
-                )
-                conn.commit()
+
+            def insert(email_id: int) -> None:
+                with db.get_connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(
+                        insert_query,
+                        [
+                            email_id,
+                            application,
+                            subject,
+                            body.strip(),
+                            recipients,
+                            admin_emails,
+                            "",  # BCC
+                            fecha_actual,
+                        ],
+                    )
+                    conn.commit()
+
+            # Si otro proceso ya usó el ID se relee MAX y se reintenta
+            next_id = id_allocator.insert_with_id(
+                db_scope(db),
+                "TbCorreosEnviados",
+                "IDCorreo",
+                lambda: db.get_max_id("TbCorreosEnviados", "IDCorreo"),
+                insert,
+            )
             self.logger.info(
                 f"Email registrado en TbCorreosEnviados con ID: {next_id}",
                 extra={"event": "nc_email_registered", "id_correo": next_id},
@@ -230,22 +241,30 @@ class NoConformidadesManager:
             db_path = config.get_database_path("no_conformidades")
             conn_str = f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={db_path};PWD=dpddpd;"
             aux_db = AccessDatabase(conn_str)
+            id_scope = db_scope(aux_db)
             with aux_db.get_connection() as conn:
                 cur = conn.cursor()
 
-                def get_next_id():
+                def fetch_max():
                     try:
                         cur.execute("SELECT Max(TbNCARAvisos.ID) AS Maximo FROM TbNCARAvisos")
                         r = cur.fetchone()
-                        return (r[0] + 1) if r and r[0] is not None else 1
+                        return r[0] if r else None
                     except Exception:
-                        return 1
+                        return None
 
                 def ins(col, acc_id):
-                    next_id = get_next_id()
-                    cur.execute(
-                        f"INSERT INTO TbNCARAvisos (ID, IDAR, {col}, Fecha) VALUES (?, ?, ?, ?)",
-                        [next_id, acc_id, id_correo, datetime.now()],
+                    # Un único MAX por bloque de IDs en lugar de uno por fila; un
+                    # ID duplicado sólo revierte su sentencia y se reintenta
+                    id_allocator.insert_with_id(
+                        id_scope,
+                        "TbNCARAvisos",
+                        "ID",
+                        fetch_max,
+                        lambda next_id: cur.execute(
+                            f"INSERT INTO TbNCARAvisos (ID, IDAR, {col}, Fecha) VALUES (?, ?, ?, ?)",
+                            [next_id, acc_id, id_correo, datetime.now()],
+                        ),
                     )
 
                 for acc in arapcs_15:
@@ -796,16 +815,24 @@ class NoConformidadesManager:
                     f"{id_correo}."
                 )
             else:
-                max_id_query = "SELECT Max(TbNCARAvisos.ID) AS Maximo FROM TbNCARAvisos"
-                max_result = db_nc.execute_query(max_id_query)
-                next_id = 1
-                if max_result and max_result[0].get("Maximo") is not None:
-                    next_id = max_result[0]["Maximo"] + 1
+                def fetch_max():
+                    max_id_query = "SELECT Max(TbNCARAvisos.ID) AS Maximo FROM TbNCARAvisos"
+                    max_result = db_nc.execute_query(max_id_query)
+                    return max_result[0].get("Maximo") if max_result else None
+
                 insert_query = (
                     f"INSERT INTO TbNCARAvisos (ID, IDAR, {tipo_aviso}, Fecha) "
                     f"VALUES (?, ?, ?, Date())"
                 )
-                db_nc.execute_non_query(insert_query, (next_id, id_ar, id_correo))
+                next_id = id_allocator.insert_with_id(
+                    db_scope(db_nc),
+                    "TbNCARAvisos",
+                    "ID",
+                    fetch_max,
+                    lambda new_id: db_nc.execute_non_query(
+                        insert_query, (new_id, id_ar, id_correo)
+                    ),
+                )
                 self.logger.info(
                     f"Insertado aviso {tipo_aviso} para AR {id_ar} con ID de correo "
                     f"{id_correo} y ID {next_id}."
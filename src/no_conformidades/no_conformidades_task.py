@@ -9,6 +9,7 @@ si existen datos; el resto continúa en el manager legacy hasta completar migrac
 from __future__ import annotations
 
 import os
+from contextlib import nullcontext
 
 from common.db.access_connection_pool import get_nc_connection_pool
 from common.base_task import TareaDiaria
@@ -28,6 +29,7 @@ class NoConformidadesTask(TareaDiaria):
             script_filename="run_no_conformidades.py",
             task_names=["NCTecnico", "NCCalidad"],
             frequency_days=int(os.getenv("NC_FRECUENCIA_DIAS", "1") or 1),
+            databases=("no_conformidades",),
         )
         try:
             conn_str = self.config.get_db_no_conformidades_connection_string()
@@ -157,9 +159,31 @@ class NoConformidadesTask(TareaDiaria):
                 self.logger.info("Técnica: sin técnicos con NC activas")
                 manager_full.close_connections()
                 return True
-            exitosos = 0
-            total = 0
-            for tecnico in tecnicos:
+            try:
+                return self._registrar_correos_tecnicos(manager_full, tecnicos)
+            finally:
+                manager_full.close_connections()
+        except Exception as e:  # pragma: no cover
+            self.logger.exception(f"Error en ejecutar_logica_tecnica: {e}")
+            return False
+
+    def _registrar_correos_tecnicos(self, manager_full, tecnicos) -> bool:
+        """Prepara los correos técnicos y los registra en una transacción.
+
+        Las lecturas (datos, correo del técnico, HTML) se hacen fuera de la
+        transacción; un técnico cuya preparación falla se registra en el log y
+        se omite, como los que no tienen dirección de correo. Sólo las
+        escrituras (correos preparados y ``NoConformidadesTecnica``) van en la
+        transacción: si una falla se revierten todas y la tarea no se marca.
+
+        Returns:
+            False si algún técnico falló o si se revirtió el lote.
+        """
+        pendientes = []
+        fallidos = []
+        total = 0
+        for tecnico in tecnicos:
+            try:
                 data = manager_full.get_technical_report_data_for_user(tecnico)
                 if not any(data.values()):
                     continue
@@ -167,25 +191,51 @@ class NoConformidadesTask(TareaDiaria):
                 correo_tecnico = get_user_email(tecnico, self.config, self.logger)
                 if not correo_tecnico:
                     continue
-                cuerpo = self._render_html_tecnico(data)
-                em = EmailManager("tareas")
-                ok = em.register_email(
-                    application="NoConformidades",
-                    subject="Tareas de Acciones Correctivas a punto de caducar o caducadas (No Conformidades)",
-                    body=cuerpo,
-                    recipients=correo_tecnico,
-                    admin_emails=self._collect_responsables_calidad(manager_full, data),
+                pendientes.append(
+                    (
+                        tecnico,
+                        correo_tecnico,
+                        self._render_html_tecnico(data),
+                        self._collect_responsables_calidad(manager_full, data),
+                    )
                 )
-                if ok:
-                    exitosos += 1
-            if total:
-                self.logger.info(f"Técnica: notificaciones {exitosos}/{total}")
-                register_task_completion(self.db_tareas, "NoConformidadesTecnica")
-            manager_full.close_connections()
-            return True
-        except Exception as e:  # pragma: no cover
-            self.logger.exception(f"Error en ejecutar_logica_tecnica: {e}")
+            except Exception as e:
+                self.logger.error(f"Técnica: error preparando el correo de {tecnico}: {e}")
+                fallidos.append(tecnico)
+        if not total:
+            return not fallidos
+
+        # Un único commit para los correos y el registro de la tarea
+        em = EmailManager("tareas")
+        try:
+            with self._tareas_transaction():
+                for tecnico, correo_tecnico, cuerpo, admin_emails in pendientes:
+                    ok = em.register_email(
+                        application="NoConformidades",
+                        subject="Tareas de Acciones Correctivas a punto de caducar o caducadas (No Conformidades)",
+                        body=cuerpo,
+                        recipients=correo_tecnico,
+                        admin_emails=admin_emails,
+                    )
+                    if not ok:
+                        raise RuntimeError(f"no se registró el correo de {tecnico}")
+                if not register_task_completion(self.db_tareas, "NoConformidadesTecnica"):
+                    raise RuntimeError("no se registró la ejecución de NoConformidadesTecnica")
+        except Exception as e:
+            self.logger.error(f"Técnica: lote de {len(pendientes)} correos revertido: {e}")
             return False
+        self.logger.info(f"Técnica: notificaciones {len(pendientes)}/{total}")
+        if fallidos:
+            self.logger.warning(
+                f"Técnica: {len(fallidos)} técnicos omitidos por error: {', '.join(map(str, fallidos))}"
+            )
+        return not fallidos
+
+    def _tareas_transaction(self):
+        """Transacción sobre la BD de tareas (sin efecto si no hay conexión)."""
+        if self.db_tareas is None:
+            return nullcontext()
+        return self.db_tareas.transaction()
 
     # -------- Helpers técnicos (simplificados) --------
     def _get_tecnicos_con_nc_activas(
@@ -19,6 +19,7 @@ from typing import Optional
 
 try:  # Prefer prefijo 'src.' para compatibilidad
     from src.common import utils  # type: ignore
+    from src.common.db import frames  # type: ignore
     from src.common.db.database import AccessDatabase  # type: ignore
     from src.common.reporting.html_report_generator import HTMLReportGenerator  # type: ignore
     from src.common.utils import (  # type: ignore
@@ -34,6 +35,7 @@ try:  # Prefer prefijo 'src.' para compatibilidad
 except Exception:
     try:  # Fallback sin prefijo
         from common import utils  # type: ignore
+        from common.db import frames  # type: ignore
         from common.db.database import AccessDatabase  # type: ignore
         from common.reporting.html_report_generator import HTMLReportGenerator  # type: ignore
         from common.utils import (  # type: ignore
@@ -54,6 +56,7 @@ except Exception:
         if str(_PROJECT_ROOT) not in _sys.path:
             _sys.path.insert(0, str(_PROJECT_ROOT))
         from common import utils  # type: ignore
+        from common.db import frames  # type: ignore
         from common.db.database import AccessDatabase  # type: ignore
         from common.reporting.html_report_generator import HTMLReportGenerator  # type: ignore
         from common.utils import (  # type: ignore
@@ -205,8 +208,10 @@ class RiesgosManager:
     def connect_to_database(self):
         """Establece conexión con las bases de datos necesarias."""
         try:
-            # Conexión a BD de riesgos
-            self.db = AccessDatabase(self.config.get_db_riesgos_connection_string())
+            # Conexión a BD de riesgos (sólo lectura: copia local si hay snapshot)
+            self.db = AccessDatabase(
+                self.config.get_db_read_connection_string("riesgos")
+            )
             self.logger.info("Conexión establecida con BD de riesgos")
 
             # Conexión a BD de tareas
@@ -325,6 +330,33 @@ class RiesgosManager:
             self.logger.warning(f"Error calculando diferencia de días: {e}")
             return 0
 
+    def _add_days_column(
+        self, rows: list[dict], source_field: str, target_field: str = "Dias"
+    ) -> None:
+        """Añade ``target_field`` = días hasta ``source_field`` a todas las filas.
+
+        Equivale a ``_calculate_days_difference`` fila a fila, pero las fechas
+        que ya son ``datetime``/``date`` (lo habitual con pyodbc) se restan en
+        una sola operación vectorizada; el resto (textos, nulos) sigue el
+        camino fila a fila.
+        """
+        if not rows:
+            return
+        values = [row.get(source_field) for row in rows]
+        vectorizable = [isinstance(v, (datetime, date)) for v in values]
+        days = None
+        if frames.PANDAS_AVAILABLE and any(vectorizable):
+            days = frames.days_until(
+                [v if ok else None for v, ok in zip(values, vectorizable)]
+            ).tolist()
+        for i, row in enumerate(rows):
+            if days is not None and vectorizable[i]:
+                row[target_field] = days[i]
+            elif not values[i]:
+                row[target_field] = 0
+            else:
+                row[target_field] = self._calculate_days_difference(values[i])
+
     def get_last_execution_date(self, task_name: str) -> Optional[date]:
         """
         Obtiene la fecha de la última ejecución de una tarea.
@@ -1892,13 +1924,7 @@ class RiesgosManager:
 
             # Aplicar post-procesamiento si es necesario
             if query_config.get("post_process") == "calculate_days_from_fecha_max":
-                for row in result:
-                    if row.get("FechaMaxProximaPublicacion"):
-                        row["Dias"] = self._calculate_days_difference(
-                            row["FechaMaxProximaPublicacion"]
-                        )
-                    else:
-                        row["Dias"] = 0
+                self._add_days_column(result, "FechaMaxProximaPublicacion")
 
             return result
 
@@ -2009,14 +2035,8 @@ class RiesgosManager:
                 or []
             )
 
-            # Calcular días en Python para cada registro
-            for row in result:
-                if row.get("FechaMaxProximaPublicacion"):
-                    row["Dias"] = self._calculate_days_difference(
-                        row["FechaMaxProximaPublicacion"]
-                    )
-                else:
-                    row["Dias"] = 0
+            # Calcular días (vectorizado) para todos los registros
+            self._add_days_column(result, "FechaMaxProximaPublicacion")
 
             return result
         except Exception as e:
@@ -2056,10 +2076,7 @@ class RiesgosManager:
                 or []
             )
 
-            for row in result:
-                row["Dias"] = self._calculate_days_difference(
-                    row.get("FechaMaxProximaPublicacion")
-                )
+            self._add_days_column(result, "FechaMaxProximaPublicacion")
 
             return result
         except Exception as e:
@@ -2242,13 +2259,8 @@ class RiesgosManager:
             for row in result:
                 row["FechaAceptacion"] = row.get("FechaJustificacionAceptacionRiesgo")
                 row["UsuarioCalidad"] = row.get("ResponsableCalidad")
-                # Calcular días desde la fecha de aceptación
-                if row.get("FechaAceptacion"):
-                    row["Dias"] = self._calculate_days_difference(
-                        row["FechaAceptacion"]
-                    )
-                else:
-                    row["Dias"] = 0
+            # Calcular días desde la fecha de aceptación
+            self._add_days_column(result, "FechaAceptacion")
 
             return result
         except Exception as e:
@@ -2295,11 +2307,8 @@ class RiesgosManager:
             for row in result:
                 row["FechaRetirada"] = row.get("FechaJustificacionRetiroRiesgo")
                 row["UsuarioCalidad"] = row.get("ResponsableCalidad")
-                # Calcular días desde la fecha de retirada
-                if row.get("FechaRetirada"):
-                    row["Dias"] = self._calculate_days_difference(row["FechaRetirada"])
-                else:
-                    row["Dias"] = 0
+            # Calcular días desde la fecha de retirada
+            self._add_days_column(result, "FechaRetirada")
 
             return result
         except Exception as e:
@@ -2346,13 +2355,8 @@ class RiesgosManager:
             # Mapear campos para que coincidan con la configuración de tabla
             for row in result:
                 row["UsuarioCalidad"] = row.get("ResponsableCalidad")
-                # Calcular días desde la fecha de materialización
-                if row.get("FechaMaterializacion"):
-                    row["Dias"] = self._calculate_days_difference(
-                        row["FechaMaterializacion"]
-                    )
-                else:
-                    row["Dias"] = 0
+            # Calcular días desde la fecha de materialización
+            self._add_days_column(result, "FechaMaterializacion")
 
             return result
         except Exception as e:
@@ -2390,10 +2394,7 @@ class RiesgosManager:
                 )
                 or []
             )
-            for row in result:
-                row["Dias"] = self._calculate_days_difference(
-                    row.get("FechaMaxProximaPublicacion")
-                )
+            self._add_days_column(result, "FechaMaxProximaPublicacion")
 
             return result
         except Exception as e:
@@ -2422,10 +2423,7 @@ class RiesgosManager:
                 )
                 or []
             )
-            for row in result:
-                row["Días"] = self._calculate_days_difference(
-                    row.get("FechaMaxProximaPublicacion")
-                )
+            self._add_days_column(result, "FechaMaxProximaPublicacion", "Días")
 
             return result
         except Exception as e:
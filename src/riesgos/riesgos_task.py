@@ -37,6 +37,7 @@ class RiesgosTask(TareaDiaria):
                 "RiesgosMensualesCalidad",
             ],
             frequency_days=1,
+            databases=("riesgos",),
         )
         self.manager = manager  # Puede ser None (se creará on-demand)
 
@@ -13,6 +13,34 @@ if _SRC.is_dir() and str(_SRC) not in sys.path:
     sys.path.insert(0, str(_SRC))
 
 
+@pytest.fixture(autouse=True)
+def _clear_query_caches():
+    """Evita que resultados cacheados por BD se filtren entre tests."""
+    yield
+    try:
+        from common.db.query_cache import clear_query_caches
+    except Exception:  # pragma: no cover - import opcional
+        return
+    clear_query_caches()
+
+
+@pytest.fixture(autouse=True)
+def _reset_id_allocator():
+    """Evita que bloques de IDs reservados en un test se usen en otro."""
+    yield
+    try:
+        from common.db.id_allocator import id_allocator
+    except Exception:  # pragma: no cover - import opcional
+        return
+    id_allocator.reset()
+
+
+@pytest.fixture(autouse=True)
+def _slow_query_log_to_tmp(tmp_path, monkeypatch):
+    """Dirige el log de consultas lentas al directorio temporal del test."""
+    monkeypatch.setenv("DB_SLOW_QUERY_LOG", str(tmp_path / "slow_queries.jsonl"))
+
+
 @pytest.fixture
 def smtp_config():
     """Configuración SMTP para tests."""
@@ -0,0 +1,569 @@
+"""Tests unitarios para AccessConnectionPool (sin pyodbc real)."""
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from common.db import access_connection_pool as pool_mod
+from common.db.access_connection_pool import AccessConnectionPool
+
+
+@pytest.fixture
+def fake_pyodbc():
+    """Sustituye pyodbc por un mock que devuelve conexiones MagicMock nuevas."""
+    fake = MagicMock()
+    fake.connect.side_effect = lambda *a, **k: MagicMock()
+    with patch.object(pool_mod, "pyodbc", fake, create=True), patch.object(
+        pool_mod, "PYODBC_AVAILABLE", True
+    ):
+        yield fake
+
+
+def make_pool(**kwargs) -> AccessConnectionPool:
+    kwargs.setdefault("validation_interval", None)
+    return AccessConnectionPool("Driver=x;DBQ=test.accdb;", **kwargs)
+
+
+def test_return_connection_does_no_io(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    with pool.get_connection() as conn:
+        pass
+    # Sólo commit de la operación; nada de SELECT 1 al devolver
+    conn.cursor.assert_not_called()
+    assert pool.get_stats()["pool_size"] == 1
+
+
+def test_validator_checks_idle_connections(fake_pyodbc):
+    pool = make_pool(max_connections=2)
+    with pool.get_connection() as conn:
+        pass
+    summary = pool.validate_idle_connections()
+    assert summary["validated"] == 1
+    conn.cursor.return_value.execute.assert_called_once_with("SELECT 1")
+    stats = pool.get_stats()
+    assert stats["validations"] == 1
+    assert stats["pool_size"] == 1
+
+
+def test_validator_discards_broken_connection(fake_pyodbc):
+    pool = make_pool(max_connections=2)
+    with pool.get_connection() as conn:
+        pass
+    conn.cursor.side_effect = Exception("link down")
+    summary = pool.validate_idle_connections()
+    assert summary["failed"] == 1
+    stats = pool.get_stats()
+    assert stats["validation_failures"] == 1
+    assert stats["total_connections"] == 0
+    conn.close.assert_called_once()
+
+
+def test_validator_recycles_old_and_evicts_idle(fake_pyodbc):
+    pool = make_pool(max_connections=2, max_age=100, max_idle=10)
+    with patch.object(pool_mod.time, "monotonic", return_value=1000.0):
+        with pool.get_connection() as old_conn:
+            with pool.get_connection() as idle_conn:
+                pass
+    pool._conn_meta[id(old_conn)]["created_at"] = 850.0
+    with patch.object(pool_mod.time, "monotonic", return_value=1020.0):
+        summary = pool.validate_idle_connections()
+    assert summary == {"validated": 0, "failed": 0, "evicted": 1, "recycled": 1}
+    stats = pool.get_stats()
+    assert stats["recycled"] == 1
+    assert stats["evictions"] == 1
+    assert stats["total_connections"] == 0
+    old_conn.close.assert_called_once()
+    idle_conn.close.assert_called_once()
+
+
+def test_failed_rollback_discards_connection(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    with pytest.raises(RuntimeError):
+        with pool.get_connection() as conn:
+            conn.rollback.side_effect = Exception("dead")
+            raise RuntimeError("boom")
+    stats = pool.get_stats()
+    assert stats["total_connections"] == 0
+    assert stats["pool_size"] == 0
+
+
+def test_background_validator_starts_and_stops(fake_pyodbc):
+    pool = make_pool(max_connections=1, validation_interval=0.01)
+    with pool.get_connection():
+        pass
+    thread = pool._validator_thread
+    assert thread is not None and thread.is_alive()
+    pool.close_all()
+    assert not thread.is_alive()
+
+
+def test_statement_cache_reuses_cursor_per_sql(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    sql = "SELECT * FROM TbTareas WHERE Tarea = ?"
+    pool.execute_non_query(sql, ("A",))
+    pool.execute_non_query(sql, ("B",))
+    pool.execute_non_query("DELETE FROM TbTareas")  # sin params: no se cachea
+    conn = pool._all_connections[0]
+    assert conn.cursor.call_count == 2
+    stats = pool.get_stats()
+    assert stats["statement_cache_hits"] == 1
+    assert stats["statement_cache_misses"] == 1
+    assert stats["cached_statements"] == 1
+
+
+def test_statement_cache_lru_eviction_and_error(fake_pyodbc):
+    pool = make_pool(max_connections=1, statement_cache_size=1)
+    pool.execute_non_query("UPDATE T SET a = ?", (1,))
+    conn = pool._all_connections[0]
+    first = conn.cursor.return_value
+    pool.execute_non_query("UPDATE T SET b = ?", (1,))
+    first.close.assert_called()
+    assert list(pool._stmt_cache[id(conn)]) == ["UPDATE T SET b = ?"]
+
+    conn.cursor.return_value.execute.side_effect = Exception("syntax")
+    with pytest.raises(Exception):
+        pool.execute_non_query("UPDATE T SET c = ?", (1,))
+    assert "UPDATE T SET c = ?" not in pool._stmt_cache[id(conn)]
+
+
+def test_statement_cache_recreates_cursor_when_timeout_changes(fake_pyodbc):
+    fake_pyodbc.connect.side_effect = lambda *a, **k: MagicMock(timeout=0)
+    pool = make_pool(max_connections=1)
+    sql = "SELECT * FROM TbTareas WHERE Tarea = ?"
+    pool.execute_query(sql, ("A",))
+    conn = pool._all_connections[0]
+    created_with = []
+    conn.cursor.side_effect = lambda: created_with.append(conn.timeout) or MagicMock()
+    # Con timeout por llamada el cursor cacheado (timeout 0) no sirve
+    pool.execute_query(sql, ("B",), timeout=5)
+    pool.execute_query(sql, ("C",), timeout=5)
+    assert created_with == [5]
+    assert pool.get_stats()["statement_cache_hits"] == 1
+
+
+def test_statement_cache_is_safe_with_concurrent_get_stats(fake_pyodbc):
+    pool = make_pool(max_connections=1, statement_cache_size=8)
+    stop = threading.Event()
+    errors = []
+
+    def read_stats():
+        while not stop.is_set():
+            try:
+                pool.get_stats()
+            except Exception as e:  # pragma: no cover - lo que se comprueba
+                errors.append(e)
+
+    reader = threading.Thread(target=read_stats)
+    reader.start()
+    try:
+        for i in range(2000):
+            pool.execute_non_query(f"UPDATE T SET c{i % 50} = ?", (i,))
+    finally:
+        stop.set()
+        reader.join()
+    assert errors == []
+    assert pool.get_stats()["cached_statements"] == 8
+
+
+def test_insert_many_groups_by_columns_in_one_transaction(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    rows = [
+        {"ID": 1, "IDAR": 10, "IDCorreo15": 5},
+        {"ID": 2, "IDAR": 11, "IDCorreo7": 5},
+        {"ID": 3, "IDAR": 12, "IDCorreo15": 5},
+    ]
+    outcomes = pool.insert_many("TbNCARAvisos", rows)
+    assert outcomes == [True, True, True]
+    conn = pool._all_connections[0]
+    calls = conn.cursor.return_value.executemany.call_args_list
+    assert len(calls) == 2
+    sql, params = calls[0].args
+    assert sql == "INSERT INTO TbNCARAvisos (ID, IDAR, IDCorreo15) VALUES (?, ?, ?)"
+    assert params == [(1, 10, 5), (3, 12, 5)]
+    conn.commit.assert_called_once()
+
+
+def test_insert_many_falls_back_row_by_row(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    with pool.get_connection():
+        pass
+    cursor = pool._all_connections[0].cursor.return_value
+    cursor.executemany.side_effect = Exception("duplicate")
+    cursor.execute.side_effect = [None, Exception("duplicate"), None]
+    outcomes = pool.insert_many("T", [{"a": 1}, {"a": 2}, {"a": 3}])
+    assert outcomes == [True, False, True]
+
+
+def test_update_many_builds_where_from_keys(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    rows = [
+        {"IDCorreo": 1, "FechaEnvio": "x"},
+        {"IDCorreo": 2, "FechaEnvio": "y"},
+    ]
+    assert pool.update_many("TbCorreosEnviados", rows, ["IDCorreo"]) == [True, True]
+    cursor = pool._all_connections[0].cursor.return_value
+    sql, params = cursor.executemany.call_args.args
+    assert sql == "UPDATE TbCorreosEnviados SET FechaEnvio = ? WHERE IDCorreo = ?"
+    assert params == [("x", 1), ("y", 2)]
+    assert pool.update_many("T", [{"FechaEnvio": "x"}], ["IDCorreo"]) == [False]
+
+
+def test_execute_query_iter_streams_with_fetchmany(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    with pool.get_connection():
+        pass
+    conn = pool._all_connections[0]
+    cursor = conn.cursor.return_value
+    cursor.description = [("Id",), ("Nombre",)]
+    cursor.fetchmany.side_effect = [[(1, "a"), (2, "b")], [(3, "c")], []]
+
+    it = pool.execute_query_iter("SELECT Id, Nombre FROM T", batch_size=2)
+    assert next(it) == {"Id": 1, "Nombre": "a"}
+    # Mientras se itera la conexión sigue reservada
+    assert pool.get_stats()["pool_size"] == 0
+    assert [r["Id"] for r in it] == [2, 3]
+    cursor.fetchmany.assert_called_with(2)
+    assert pool.get_stats()["pool_size"] == 1
+
+
+def test_execute_query_iter_close_returns_connection(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    with pool.get_connection():
+        pass
+    cursor = pool._all_connections[0].cursor.return_value
+    cursor.description = [("Id",)]
+    cursor.fetchmany.return_value = [(1,), (2,)]
+    it = pool.execute_query_iter("SELECT Id FROM T")
+    next(it)
+    it.close()
+    cursor.close.assert_called()
+    assert pool.get_stats()["pool_size"] == 1
+
+
+def test_row_factory_on_pool(fake_pyodbc):
+    from common.db.row import Row
+
+    pool = make_pool(max_connections=1, row_factory=Row)
+    with pool.get_connection():
+        pass
+    cursor = pool._all_connections[0].cursor.return_value
+    cursor.description = [("Id",), ("Nombre",)]
+    cursor.fetchall.return_value = [(1, "a"), (2, "b")]
+    rows = pool.execute_query("SELECT Id, Nombre FROM T")
+    assert isinstance(rows[0], Row)
+    assert rows[1].Nombre == "b"
+    assert rows[0] == {"Id": 1, "Nombre": "a"}
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condición no alcanzada")
+        time.sleep(0.005)
+
+
+def _acquire_in_thread(pool, results, name):
+    def run():
+        with pool.get_connection() as conn:
+            results.append((name, conn))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_waiters_are_served_in_fifo_order(fake_pyodbc):
+    pool = make_pool(max_connections=1, timeout=2)
+    results = []
+    with pool.get_connection() as held:
+        first = _acquire_in_thread(pool, results, "first")
+        _wait_for(lambda: pool.get_stats()["current_waiters"] == 1)
+        second = _acquire_in_thread(pool, results, "second")
+        _wait_for(lambda: pool.get_stats()["current_waiters"] == 2)
+    first.join(2)
+    second.join(2)
+    assert [name for name, _ in results] == ["first", "second"]
+    assert all(conn is held for _, conn in results)
+    stats = pool.get_stats()
+    assert stats["waits"] == 2
+    assert stats["wait_time"]["count"] == 3
+    assert stats["connections_created"] == 1
+
+
+def test_stats_lock_is_free_while_waiting(fake_pyodbc):
+    pool = make_pool(max_connections=1, timeout=2)
+    results = []
+    with pool.get_connection():
+        waiter = _acquire_in_thread(pool, results, "waiter")
+        _wait_for(lambda: pool.get_stats()["current_waiters"] == 1)
+        # Con el lock de estadísticas libre, otras operaciones no se bloquean
+        assert pool._lock.acquire(timeout=0.5)
+        pool._lock.release()
+    waiter.join(2)
+    assert results
+
+
+def test_wait_timeout_raises_and_is_counted(fake_pyodbc):
+    pool = make_pool(max_connections=1, timeout=0.05)
+    with pool.get_connection():
+        with pytest.raises(TimeoutError):
+            pool._get_connection()
+    stats = pool.get_stats()
+    assert stats["wait_timeouts"] == 1
+    assert stats["current_waiters"] == 0
+    assert stats["wait_time"]["max_ms"] >= 50
+
+
+def test_discard_hands_free_slot_to_waiter(fake_pyodbc):
+    pool = make_pool(max_connections=1, timeout=2)
+    results = []
+    held = pool._get_connection()
+    waiter = _acquire_in_thread(pool, results, "waiter")
+    _wait_for(lambda: pool.get_stats()["current_waiters"] == 1)
+    pool._return_connection(held, discard=True)
+    waiter.join(2)
+    assert results and results[0][1] is not held
+    stats = pool.get_stats()
+    assert stats["total_connections"] == 1
+    assert stats["connections_created"] == 2
+
+
+def test_connection_returned_after_close_all_is_closed(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    conn = pool._get_connection()
+    pool.close_all()
+    pool._return_connection(conn)
+    assert pool.get_stats()["pool_size"] == 0
+    assert conn.close.call_count >= 2
+
+
+def test_pool_settings_from_env_per_db_overrides_global(monkeypatch):
+    monkeypatch.setenv("DB_POOL_MAX_CONNECTIONS", "4")
+    monkeypatch.setenv("DB_POOL_BRASS_MAX_CONNECTIONS", "1")
+    monkeypatch.setenv("DB_POOL_BRASS_TIMEOUT", "5")
+    monkeypatch.setenv("DB_POOL_RIESGOS_WARMUP", "abc")
+    assert pool_mod.pool_settings_from_env("brass")["max_connections"] == 1
+    assert pool_mod.pool_settings_from_env("brass")["timeout"] == 5.0
+    assert pool_mod.pool_settings_from_env("tareas")["max_connections"] == 4
+    assert pool_mod.pool_settings_from_env("riesgos")["warmup"] == 0
+
+
+def test_registry_creates_configured_pools_and_warms_up(fake_pyodbc, monkeypatch):
+    monkeypatch.setenv("DB_POOL_VALIDATION_INTERVAL", "0")
+    registry = pool_mod.PoolRegistry()
+    registry.configure("brass", max_connections=3, warmup=2)
+    brass = registry.get("brass", "DBQ=brass.accdb;")
+    assert registry.get("brass") is brass
+    assert brass.max_connections == 3
+    assert brass.get_stats()["pool_size"] == 2
+    registry.get("tareas", "DBQ=tareas.accdb;")
+    stats = registry.stats()
+    assert set(stats) == {"brass", "tareas"}
+    assert stats["tareas"]["max_connections"] == 2
+
+    registry.close_all()
+    assert registry.names() == []
+    assert fake_pyodbc.connect.call_count == 2
+
+
+def test_registry_requires_connection_string_and_known_settings():
+    registry = pool_mod.PoolRegistry()
+    with pytest.raises(ValueError):
+        registry.get("tareas")
+    with pytest.raises(ValueError):
+        registry.configure("tareas", max_conections=3)
+
+
+def test_module_getters_use_shared_registry(fake_pyodbc):
+    try:
+        pool = pool_mod.get_nc_connection_pool("DBQ=nc.accdb;")
+        assert pool_mod.pool_registry.get("no_conformidades") is pool
+        assert pool_mod.get_nc_connection_pool("otra") is pool
+    finally:
+        pool_mod.pool_registry.close("no_conformidades")
+
+
+def test_query_stats_by_fingerprint(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    with pool.get_connection() as conn:
+        pass
+    cursor = conn.cursor.return_value
+    cursor.description = [("ID",)]
+    cursor.fetchall.return_value = [(1,), (2,)]
+    cursor.rowcount = 3
+    pool.execute_query("SELECT ID FROM T WHERE A = 'x'")
+    pool.execute_query("SELECT ID FROM T WHERE A = 'y'")
+    pool.execute_non_query("UPDATE T SET B = 1 WHERE A = ?", ("z",))
+    cursor.execute.side_effect = Exception("boom")
+    with pytest.raises(Exception):
+        pool.execute_non_query("DELETE FROM T WHERE A = 5")
+
+    queries = {q["sql"]: q for q in pool.get_stats()["queries"]}
+    select = queries["SELECT ID FROM T WHERE A = ?"]
+    assert (select["calls"], select["rows"], select["errors"]) == (2, 4, 0)
+    assert select["latency"]["count"] == 2 and select["wait"]["count"] == 2
+    assert queries["UPDATE T SET B = ? WHERE A = ?"]["rows"] == 3
+    assert queries["DELETE FROM T WHERE A = ?"]["errors"] == 1
+
+
+def test_log_query_stats_emits_structured_events(fake_pyodbc, caplog):
+    pool = make_pool(max_connections=1)
+    with pool.get_connection() as conn:
+        pass
+    conn.cursor.return_value.rowcount = 1
+    pool.execute_non_query("DELETE FROM T WHERE A = 5")
+    with caplog.at_level("INFO", logger=pool_mod.logger.name):
+        summary = pool.log_query_stats(label="tareas")
+    events = [r for r in caplog.records if getattr(r, "event", None) == "db_query_stats"]
+    assert len(events) == len(summary) == 1
+    assert events[0].pool == "tareas"
+    assert events[0].calls == 1
+    assert "fp=" in events[0].getMessage()
+
+
+# Consulta sin fin: sólo termina si se cancela
+ENDLESS_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+
+
+def test_query_timeout_cancels_and_discards_connection(tmp_path):
+    pool = AccessConnectionPool(
+        str(tmp_path / "t.sqlite"), max_connections=1, validation_interval=None, query_timeout=0.2
+    )
+    try:
+        started = time.monotonic()
+        with pytest.raises(pool_mod.QueryTimeoutError):
+            pool.execute_query(ENDLESS_SQL)
+        assert time.monotonic() - started < 5
+        stats = pool.get_stats()
+        assert stats["query_timeouts"] == 1
+        assert stats["total_connections"] == 0
+        # El pool sigue operativo con una conexión nueva
+        assert pool.execute_query("SELECT 1 AS x") == [{"x": 1}]
+        # Timeout por llamada: 0 desactiva el del pool para esa sentencia
+        assert pool.execute_query("SELECT 2 AS x", timeout=0) == [{"x": 2}]
+    finally:
+        pool.close_all()
+
+
+def test_per_call_timeout_overrides_pool_default(tmp_path):
+    pool = AccessConnectionPool(str(tmp_path / "t.sqlite"), validation_interval=None)
+    try:
+        with pytest.raises(pool_mod.QueryTimeoutError):
+            pool.execute_non_query(f"CREATE TABLE t AS {ENDLESS_SQL}", timeout=0.2)
+        assert pool.get_stats()["query_timeouts"] == 1
+    finally:
+        pool.close_all()
+
+
+def test_driver_timeout_sqlstate_is_reported(fake_pyodbc):
+    pool = make_pool(max_connections=1, query_timeout=2.5)
+    seen = {}
+
+    def slow_execute(*args):
+        seen["timeout"] = conn.timeout
+        raise Exception("HYT00", "[HYT00] Query timeout expired")
+
+    with pool.get_connection() as conn:
+        conn.timeout = 0
+    conn.cursor.return_value.execute.side_effect = slow_execute
+    with pytest.raises(pool_mod.QueryTimeoutError):
+        pool.execute_query("SELECT * FROM TbRiesgos")
+    assert seen["timeout"] == 3
+    assert conn.timeout == 0  # restaurado
+    conn.close.assert_called_once()
+    assert pool.get_stats()["query_timeouts"] == 1
+
+
+def test_execute_query_iter_applies_timeout_and_discards_connection(tmp_path):
+    pool = AccessConnectionPool(
+        str(tmp_path / "t.sqlite"), max_connections=1, validation_interval=None, query_timeout=0.2
+    )
+    try:
+        with pytest.raises(pool_mod.QueryTimeoutError):
+            list(pool.execute_query_iter(ENDLESS_SQL))
+        stats = pool.get_stats()
+        assert stats["query_timeouts"] == 1 and stats["total_connections"] == 0
+        assert list(pool.execute_query_iter("SELECT 1 AS x", timeout=0)) == [{"x": 1}]
+    finally:
+        pool.close_all()
+
+
+def test_execute_query_iter_times_out_on_fetchmany(fake_pyodbc):
+    pool = make_pool(max_connections=1)
+    with pool.get_connection():
+        pass
+    conn = pool._all_connections[0]
+    cursor = conn.cursor.return_value
+    cursor.description = [("Id",)]
+    cursor.fetchmany.side_effect = [[(1,)], Exception("HYT00", "[HYT00] Query timeout expired")]
+    it = pool.execute_query_iter("SELECT Id FROM T", timeout=5)
+    assert next(it) == {"Id": 1}
+    with pytest.raises(pool_mod.QueryTimeoutError):
+        next(it)
+    conn.close.assert_called_once()
+    assert pool.get_stats()["query_timeouts"] == 1
+
+
+def test_registry_reads_query_timeout_from_env(fake_pyodbc, monkeypatch):
+    monkeypatch.setenv("DB_POOL_VALIDATION_INTERVAL", "0")
+    monkeypatch.setenv("DB_POOL_RIESGOS_QUERY_TIMEOUT", "45")
+    registry = pool_mod.PoolRegistry()
+    assert registry.get("riesgos", "DBQ=r.accdb;").query_timeout == 45.0
+    assert not registry.get("tareas", "DBQ=t.accdb;").query_timeout
+    registry.close_all()
+
+
+class _PartialConnection:
+    """Conexión falsa: ``executemany`` aplica filas hasta fallar en ``fail_at``."""
+
+    def __init__(self, fail_at, duplicates=()):
+        self.fail_at = fail_at
+        self.duplicates = set(duplicates)
+        self.committed = []
+        self.pending = []
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def execute(self, sql, values):
+                if values[0] in conn.duplicates or values in conn.pending:
+                    raise Exception("duplicate")
+                conn.pending.append(values)
+
+            def executemany(self, sql, rows):
+                for number, values in enumerate(rows):
+                    if number == conn.fail_at:
+                        raise Exception("duplicate")
+                    self.execute(sql, values)
+
+            def close(self):
+                pass
+
+        return Cursor()
+
+    def rollback(self):
+        self.pending.clear()
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending.clear()
+
+
+def test_execute_batches_rolls_back_partial_executemany():
+    conn = _PartialConnection(fail_at=2, duplicates={3})
+    batches = pool_mod._build_insert_batches("T", [{"a": i} for i in range(1, 6)])
+    outcomes = pool_mod._execute_batches(conn, batches, 5)
+    conn.commit()
+    # Las filas 1 y 2 ya aplicadas por executemany no se duplican
+    assert outcomes == [True, True, False, True, True]
+    assert conn.committed == [(1,), (2,), (4,), (5,)]
+
+
+def test_execute_batches_reraises_inside_caller_transaction():
+    conn = _PartialConnection(fail_at=1)
+    batches = pool_mod._build_insert_batches("T", [{"a": 1}, {"a": 2}])
+    with pytest.raises(Exception, match="duplicate"):
+        pool_mod._execute_batches(conn, batches, 2, owns_transaction=False)
@@ -107,3 +107,68 @@ def test_update_record_failure(tmp_db_path):
         with patch.object(db, "execute_non_query", side_effect=Exception("boom")):
             ok = db.update_record("MiTabla", {"Campo1": "X"}, "Id = 1")
             assert ok is False
+
+
+def test_insert_many_legacy_single_commit(tmp_db_path):
+    db = AccessDatabase(tmp_db_path)
+    mock_conn = Mock()
+    db._connection = mock_conn
+    outcomes = db.insert_many("MiTabla", [{"Id": 1}, {"Id": 2}])
+    assert outcomes == [True, True]
+    mock_conn.cursor.return_value.executemany.assert_called_once_with(
+        "INSERT INTO MiTabla (Id) VALUES (?)", [(1,), (2,)]
+    )
+    mock_conn.commit.assert_called_once()
+
+
+def test_update_many_delegates_to_pool(tmp_db_path):
+    pool = Mock()
+    pool.update_many.return_value = [True]
+    db = AccessDatabase(tmp_db_path, pool=pool)
+    assert db.update_many("MiTabla", [{"Id": 1, "X": 2}], ["Id"]) == [True]
+    pool.update_many.assert_called_once_with("MiTabla", [{"Id": 1, "X": 2}], ["Id"], True)
+
+
+def test_execute_query_iter_legacy_uses_fetchmany(tmp_db_path):
+    db = AccessDatabase(tmp_db_path)
+    mock_conn = Mock()
+    db._connection = mock_conn
+    cursor = mock_conn.cursor.return_value
+    cursor.description = [("Id",)]
+    cursor.fetchmany.side_effect = [[(1,), (2,)], []]
+    rows = list(db.execute_query_iter("SELECT Id FROM T", batch_size=10))
+    assert rows == [{"Id": 1}, {"Id": 2}]
+    cursor.fetchall.assert_not_called()
+    cursor.close.assert_called_once()
+
+
+def test_legacy_query_timeout_closes_connection(tmp_path):
+    from src.common.db import QueryTimeoutError
+
+    db = AccessDatabase(str(tmp_path / "legacy.sqlite"))
+    with pytest.raises(QueryTimeoutError):
+        db.execute_query(
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+            "SELECT count(*) FROM c",
+            timeout=0.2,
+        )
+    assert db._connection is None
+    assert db.execute_query("SELECT 1 AS x") == [{"x": 1}]
+    db.disconnect()
+
+
+def test_legacy_query_iter_timeout_closes_connection(tmp_path):
+    from src.common.db import QueryTimeoutError
+
+    db = AccessDatabase(str(tmp_path / "legacy.sqlite"))
+    with pytest.raises(QueryTimeoutError):
+        list(
+            db.execute_query_iter(
+                "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+                "SELECT count(*) FROM c",
+                timeout=0.2,
+            )
+        )
+    assert db._connection is None
+    assert list(db.execute_query_iter("SELECT 1 AS x")) == [{"x": 1}]
+    db.disconnect()
@@ -0,0 +1,72 @@
+"""Tests unitarios para la fachada asyncio de AccessDatabase."""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from common.db.async_database import AsyncAccessDatabase
+
+
+class SlowDB:
+    """BD falsa que mide cuántas consultas se solapan."""
+
+    def __init__(self, max_connections=None, delay=0.05):
+        self.pool = SimpleNamespace(max_connections=max_connections) if max_connections else None
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def execute_query(self, query, params=None, cache_tags=None):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return [{"q": query, "params": params, "tags": cache_tags}]
+
+    def execute_non_query(self, query, params=None):
+        return 3
+
+
+def test_gather_overlaps_up_to_pool_size():
+    db = SlowDB(max_connections=2)
+
+    async def main():
+        async with AsyncAccessDatabase(db) as adb:
+            return await asyncio.gather(
+                *(adb.execute_query(f"SELECT {i}") for i in range(4))
+            )
+
+    results = asyncio.run(main())
+    assert [r[0]["q"] for r in results] == [f"SELECT {i}" for i in range(4)]
+    assert db.peak == 2
+
+
+def test_legacy_mode_is_single_threaded_and_passes_kwargs():
+    db = SlowDB(max_connections=None, delay=0.01)
+
+    async def main():
+        adb = AsyncAccessDatabase(db, max_workers=8)
+        try:
+            rows = await adb.execute_query("SELECT 1", (1,), cache_tags=("T",))
+            affected = await adb.execute_non_query("DELETE FROM T")
+            await asyncio.gather(adb.execute_query("A"), adb.execute_query("B"))
+            return adb.max_workers, rows, affected
+        finally:
+            adb.close()
+
+    workers, rows, affected = asyncio.run(main())
+    assert workers == 1
+    assert rows == [{"q": "SELECT 1", "params": (1,), "tags": ("T",)}]
+    assert affected == 3
+    assert db.peak == 1
+
+
+def test_max_workers_never_exceeds_pool():
+    adb = AsyncAccessDatabase(SlowDB(max_connections=3), max_workers=10)
+    try:
+        assert adb.max_workers == 3
+    finally:
+        adb.close()
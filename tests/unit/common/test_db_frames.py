@@ -0,0 +1,96 @@
+"""Tests unitarios para execute_query_frame y los helpers vectorizados."""
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from common.db.access_connection_pool import AccessConnectionPool
+from common.db.database import AccessDatabase
+from common.db.frames import days_until, format_dates, frame_to_records
+from common.db.slow_query_log import SlowQueryLog
+from common.db.sqlite_backend import create_database
+
+
+@pytest.fixture
+def brass_path(tmp_path):
+    path = create_database(tmp_path / "brass.sqlite", "brass")
+    db = AccessDatabase(str(path))
+    db.insert_many(
+        "TbEquiposMedidaCalibraciones",
+        [
+            {"IDEquipoMedida": i, "FechaFinCalibracion": datetime(2024, 1, 1) + timedelta(days=i)}
+            for i in range(1, 8)
+        ]
+        + [{"IDEquipoMedida": 99, "FechaFinCalibracion": None}],
+    )
+    db.disconnect()
+    return path
+
+
+def test_execute_query_frame_legacy_reads_in_batches(brass_path):
+    db = AccessDatabase(str(brass_path))
+    frame = db.execute_query_frame(
+        "SELECT IDEquipoMedida, FechaFinCalibracion FROM TbEquiposMedidaCalibraciones "
+        "ORDER BY IDEquipoMedida",
+        batch_size=3,
+    )
+    db.disconnect()
+    assert list(frame.columns) == ["IDEquipoMedida", "FechaFinCalibracion"]
+    assert len(frame) == 8
+    assert frame["IDEquipoMedida"].tolist()[:3] == [1, 2, 3]
+    assert frame["FechaFinCalibracion"].iloc[0] == datetime(2024, 1, 2)
+
+
+def test_execute_query_frame_pool_records_stats(brass_path):
+    pool = AccessConnectionPool(str(brass_path), max_connections=1)
+    try:
+        db = AccessDatabase(str(brass_path), pool=pool)
+        frame = db.execute_query_frame(
+            "SELECT IDEquipoMedida FROM TbEquiposMedidaCalibraciones WHERE IDEquipoMedida > ?",
+            (5,),
+        )
+        assert sorted(frame["IDEquipoMedida"]) == [6, 7, 99]
+        assert pool.get_stats()["queries"][0]["rows"] == 3
+    finally:
+        pool.close_all()
+
+
+def test_execute_query_frame_empty_result_keeps_columns(brass_path):
+    db = AccessDatabase(str(brass_path))
+    frame = db.execute_query_frame("SELECT * FROM TbEquiposMedida")
+    db.disconnect()
+    assert frame.empty and "NOMBRE" in frame.columns
+
+
+def test_slow_log_counts_frame_rows(brass_path, tmp_path):
+    slow = SlowQueryLog(tmp_path / "slow.jsonl", threshold_ms=0)
+    db = AccessDatabase(str(brass_path), slow_query_log=slow)
+    db.execute_query_frame("SELECT * FROM TbEquiposMedidaCalibraciones")
+    db.disconnect()
+    assert '"rows": 8' in (tmp_path / "slow.jsonl").read_text()
+
+
+def test_days_until_matches_timedelta_days():
+    ref = datetime(2024, 3, 10, 12, 0)
+    values = [
+        datetime(2024, 3, 15, 13, 0),
+        datetime(2024, 3, 10, 6, 0),  # medio día antes -> -1 como timedelta.days
+        date(2024, 3, 11),
+        None,
+        "no es fecha",
+    ]
+    expected = [(v - ref).days for v in values[:2]] + [0, 0, 0]
+    assert days_until(values, ref).tolist() == expected
+    assert days_until(pd.Series(values[:2]), ref).tolist() == expected[:2]
+
+
+def test_format_dates_and_records_roundtrip():
+    frame = pd.DataFrame(
+        {"F": [datetime(2024, 1, 5), None], "N": [1.5, None], "T": ["a", None]}
+    )
+    assert format_dates(frame["F"]).tolist() == ["05/01/2024", ""]
+    assert format_dates(frame["F"], "%Y-%m", empty="-").tolist() == ["2024-01", "-"]
+    records = frame_to_records(frame)
+    assert records[0] == {"F": datetime(2024, 1, 5), "N": 1.5, "T": "a"}
+    assert records[1] == {"F": None, "N": None, "T": None}
+    assert type(records[0]["F"]) is datetime and type(records[0]["N"]) is float
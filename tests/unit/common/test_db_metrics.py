@@ -0,0 +1,48 @@
+"""Tests unitarios para el histograma de latencias de common.db."""
+from common.db.metrics import LatencyHistogram, QueryStats, fingerprint_sql
+
+
+def test_histogram_buckets_and_summary():
+    hist = LatencyHistogram(bounds_ms=(1, 10))
+    for seconds in (0.0005, 0.005, 0.02, 0.001):
+        hist.observe(seconds)
+    data = hist.to_dict()
+    assert data["count"] == 4
+    assert data["buckets"] == {"<=1ms": 2, "<=10ms": 1, ">10ms": 1}
+    assert data["max_ms"] == 20.0
+    assert data["avg_ms"] == round(26.5 / 4, 3)
+
+
+def test_empty_histogram():
+    data = LatencyHistogram().to_dict()
+    assert data["count"] == 0
+    assert data["avg_ms"] == 0.0
+
+
+def test_histogram_percentile_uses_bucket_bounds():
+    hist = LatencyHistogram(bounds_ms=(1, 10, 100))
+    for seconds in (0.0005,) * 8 + (0.05, 0.2):
+        hist.observe(seconds)
+    assert hist.percentile(0.5) == 1
+    assert hist.percentile(0.9) == 100
+    assert hist.percentile(1.0) == 200.0
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    sql = "SELECT *  FROM T\n WHERE A = 'O''Brien' AND B IN (1, 2, 3) AND F > #2024-01-01# AND C = ?"
+    assert fingerprint_sql(sql) == "SELECT * FROM T WHERE A = ? AND B IN (?+) AND F > ? AND C = ?"
+    # Los números dentro de identificadores se conservan
+    assert fingerprint_sql("SELECT IDCorreo0 FROM TbNCARAvisos") == "SELECT IDCorreo0 FROM TbNCARAvisos"
+
+
+def test_query_stats_groups_and_caps_fingerprints():
+    stats = QueryStats(max_fingerprints=2)
+    stats.observe("SELECT 1 FROM A WHERE X = 1", 0.01, wait=0.001, rows=3)
+    stats.observe("SELECT 1 FROM A WHERE X = 2", 0.03, rows=2)
+    stats.observe("SELECT * FROM B", 0.002, rows=None)
+    stats.observe("SELECT * FROM C", 0.001, rows=1)
+    top = stats.top()
+    assert top[0]["sql"] == "SELECT ? FROM A WHERE X = ?"
+    assert (top[0]["calls"], top[0]["rows"]) == (2, 5)
+    assert {t["sql"] for t in top} == {"SELECT ? FROM A WHERE X = ?", "SELECT * FROM B", QueryStats.OTHER}
+    assert len(stats) == 3
@@ -0,0 +1,73 @@
+"""Tests unitarios para run_parallel (reparto de consultas entre conexiones)."""
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from common.db.parallel import run_parallel
+
+
+class FakeDB:
+    def __init__(self, max_connections=None, delay=0.05):
+        self.pool = SimpleNamespace(max_connections=max_connections) if max_connections else None
+        self.delay = delay
+        self.calls = []
+        self.peak = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def execute_query(self, query, params=None):
+        with self._lock:
+            self._active += 1
+            self.peak = max(self.peak, self._active)
+            self.calls.append((query, params))
+        time.sleep(self.delay)
+        with self._lock:
+            self._active -= 1
+        if "FALLA" in query:
+            raise RuntimeError("syntax error")
+        return [{"q": query, "params": params}]
+
+
+def test_preserves_order_and_overlaps_queries():
+    db = FakeDB(max_connections=3)
+    run = run_parallel(db, ["SELECT 1", ("SELECT 2", (5,)), lambda: ["custom"]])
+    rows = run.rows()
+    assert rows[0] == [{"q": "SELECT 1", "params": None}]
+    assert rows[1] == [{"q": "SELECT 2", "params": (5,)}]
+    assert rows[2] == ["custom"]
+    assert run.workers == 3
+    assert db.peak == 2
+    assert run.wall_time < run.summed_time
+
+
+def test_errors_are_captured_per_query():
+    db = FakeDB(max_connections=2, delay=0)
+    run = run_parallel(db, ["SELECT FALLA", "SELECT ok"])
+    assert not run[0].ok and isinstance(run[0].error, RuntimeError)
+    assert run[1].ok
+    assert run.rows() == [[], [{"q": "SELECT ok", "params": None}]]
+    assert [i for i, _ in run.errors] == [0]
+
+
+def test_legacy_db_runs_sequentially_in_order():
+    db = FakeDB(max_connections=None, delay=0.01)
+    run = run_parallel(db, ["A", "B", "C"], max_workers=4)
+    assert run.workers == 1
+    assert db.peak == 1
+    assert [q for q, _ in db.calls] == ["A", "B", "C"]
+
+
+def test_mock_db_without_int_pool_size_is_sequential():
+    db = MagicMock()
+    db.execute_query.side_effect = [[1], [2]]
+    run = run_parallel(db, ["A", "B"])
+    assert run.workers == 1
+    assert run.rows() == [[1], [2]]
+
+
+def test_unsupported_query_type():
+    with pytest.raises(TypeError):
+        run_parallel(FakeDB(), [123])
@@ -0,0 +1,36 @@
+"""Tests unitarios para common.db.row (filas compactas)."""
+import pytest
+
+from common.db.row import Row, row_converter
+
+
+def test_row_access_styles():
+    convert = row_converter(["Id", "Nombre"], Row)
+    row = convert((1, "Alpha"))
+    assert row["Nombre"] == "Alpha"
+    assert row[0] == 1
+    assert row.Nombre == "Alpha"
+    assert row.get("Falta") is None
+    assert row.get("Falta", "x") == "x"
+    assert "Id" in row and "Falta" not in row
+    assert list(row.keys()) == ["Id", "Nombre"]
+    assert row.values() == [1, "Alpha"]
+    assert dict(row) == {"Id": 1, "Nombre": "Alpha"}
+    assert row == {"Id": 1, "Nombre": "Alpha"}
+    with pytest.raises(KeyError):
+        row["Falta"]
+    with pytest.raises(AttributeError):
+        row.Falta
+
+
+def test_rows_share_column_index_and_have_no_dict():
+    convert = row_converter(["A", "B"], Row)
+    r1, r2 = convert((1, 2)), convert((3, 4))
+    assert r1._index is r2._index
+    assert not hasattr(r1, "__dict__")
+
+
+def test_default_converter_keeps_dicts():
+    convert = row_converter(["A"])
+    assert convert((1,)) == {"A": 1}
+    assert type(convert((1,))) is dict
@@ -0,0 +1,171 @@
+"""Tests unitarios para las copias locales de lectura (snapshot)."""
+import json
+import logging
+import os
+from unittest.mock import patch
+
+from common.config import Config
+from common.db import snapshot as snapshot_mod
+from common.db.snapshot import MANIFEST_NAME, SnapshotCache
+
+
+def _master(tmp_path, content=b"v1"):
+    path = tmp_path / "red" / "Brass.accdb"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_first_call_copies_and_second_reuses(tmp_path, caplog):
+    master = _master(tmp_path)
+    cache = SnapshotCache(tmp_path / "cache")
+    with caplog.at_level(logging.INFO, logger="common.db.snapshot"):
+        first = cache.ensure("brass", master)
+        second = cache.ensure("brass", master)
+    assert first.copied and first.path == tmp_path / "cache" / "brass.accdb"
+    assert first.path.read_bytes() == b"v1"
+    assert not second.copied and second.taken_at == first.taken_at
+    events = [r for r in caplog.records if getattr(r, "event", None) == "db_snapshot"]
+    assert [e.copied for e in events] == [True, False]
+    assert all(hasattr(e, "age_s") and hasattr(e, "copy_ms") for e in events)
+
+
+def test_recopies_when_size_or_mtime_change(tmp_path):
+    master = _master(tmp_path)
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.ensure("brass", master)
+    master.write_bytes(b"version-2")
+    info = cache.ensure("brass", master)
+    assert info.copied and info.path.read_bytes() == b"version-2"
+
+    # Mismo tamaño, distinta fecha de modificación
+    master.write_bytes(b"version-3")
+    stat = master.stat()
+    os.utime(master, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    assert cache.ensure("brass", master).copied
+    manifest = json.loads((tmp_path / "cache" / MANIFEST_NAME).read_text())
+    assert manifest["brass"]["signature"][0] == len(b"version-3")
+
+
+def test_manifest_survives_new_instance(tmp_path):
+    master = _master(tmp_path)
+    SnapshotCache(tmp_path / "cache").ensure("brass", master)
+    assert not SnapshotCache(tmp_path / "cache").ensure("brass", master).copied
+
+
+def test_master_changing_during_copy_falls_back(tmp_path):
+    master = _master(tmp_path)
+    cache = SnapshotCache(tmp_path / "cache")
+    sizes = iter(range(100, 200))
+    real_signature = snapshot_mod._signature
+
+    def moving_signature(path):
+        return next(sizes), real_signature(path)[1]
+
+    with patch.object(snapshot_mod, "_signature", side_effect=moving_signature):
+        assert cache.ensure("brass", master) is None
+    assert not (tmp_path / "cache" / "brass.accdb").exists()
+    assert not list((tmp_path / "cache").glob("*.partial"))
+
+
+def test_missing_master_returns_none(tmp_path):
+    assert SnapshotCache(tmp_path / "cache").ensure("brass", tmp_path / "no.accdb") is None
+
+
+def test_config_read_connection_string(tmp_path):
+    master = _master(tmp_path)
+    env = {
+        "DB_SNAPSHOT_ENABLED": "true",
+        "DB_SNAPSHOT_DIR": str(tmp_path / "cache"),
+        "DB_SNAPSHOT_DATABASES": "brass",
+        "LOCAL_DB_BRASS": str(master),
+    }
+    with patch.dict(os.environ, env), patch("common.config.load_dotenv"):
+        config = Config()
+    config.db_paths["brass"] = master
+    read = config.get_db_read_connection_string("brass")
+    assert f"DBQ={tmp_path / 'cache' / 'brass.accdb'};" in read
+    # Escrituras y BD no listadas siguen usando el maestro
+    assert f"DBQ={master};" in config.get_db_connection_string("brass")
+    assert config.get_db_read_connection_string("tareas") == config.get_db_connection_string(
+        "tareas"
+    )
+
+
+def test_config_read_connection_string_disabled_or_failing(tmp_path):
+    with patch.dict(os.environ, {"DB_SNAPSHOT_ENABLED": "false"}), patch(
+        "common.config.load_dotenv"
+    ):
+        config = Config()
+    assert config.get_db_read_connection_string("riesgos") == config.get_db_connection_string(
+        "riesgos"
+    )
+    config.db_snapshot_enabled = True
+    config.db_snapshot_dir = tmp_path / "cache"
+    config.db_paths["riesgos"] = tmp_path / "inexistente.accdb"
+    assert "inexistente.accdb" in config.get_db_read_connection_string("riesgos")
+
+
+def test_replace_failure_returns_none_and_removes_partial(tmp_path):
+    master = _master(tmp_path)
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.ensure("brass", master)
+    master.write_bytes(b"version-2")
+    # Windows: la copia sigue abierta por una conexión del pool
+    with patch.object(snapshot_mod.os, "replace", side_effect=PermissionError("en uso")):
+        assert cache.ensure("brass", master) is None
+    assert not list((tmp_path / "cache").glob("*.partial"))
+    assert (tmp_path / "cache" / "brass.accdb").read_bytes() == b"v1"
+
+
+def test_refresh_recycles_pools_before_replacing_copy(tmp_path):
+    master = _master(tmp_path)
+    env = {
+        "DB_SNAPSHOT_ENABLED": "true",
+        "DB_SNAPSHOT_DIR": str(tmp_path / "cache"),
+        "DB_SNAPSHOT_DATABASES": "brass",
+    }
+    with patch.dict(os.environ, env), patch("common.config.load_dotenv"):
+        config = Config()
+    config.db_paths["brass"] = master
+    config.get_db_read_connection_string("brass")
+    snapshot = tmp_path / "cache" / "brass.accdb"
+    with patch(
+        "common.db.access_connection_pool.pool_registry.recycle_file"
+    ) as recycle:
+        assert not config.refresh_read_snapshots(["brass", "tareas"])["brass"].copied
+        recycle.assert_not_called()
+        master.write_bytes(b"version-2")
+        info = config.refresh_read_snapshots()["brass"]
+    assert info.copied and snapshot.read_bytes() == b"version-2"
+    recycle.assert_called_once_with(snapshot)
+
+
+def test_recycle_file_closes_only_pools_on_that_file(tmp_path):
+    from common.db.access_connection_pool import PoolRegistry
+    from common.db.sqlite_backend import create_database
+
+    registry = PoolRegistry()
+    paths = {n: create_database(tmp_path / f"{n}.sqlite", "tareas") for n in ("brass", "otra")}
+    pools = {n: registry.get(n, f"Driver=x;DBQ={p};") for n, p in paths.items()}
+    for pool in pools.values():
+        pool.execute_query("SELECT COUNT(*) AS n FROM TbTareas")
+    assert registry.recycle_file(paths["brass"]) == ["brass"]
+    assert pools["brass"].get_stats()["total_connections"] == 0
+    assert pools["otra"].get_stats()["total_connections"] == 1
+    # El pool reciclado sigue registrado y usable
+    assert registry.get("brass") is pools["brass"]
+    assert pools["brass"].execute_query("SELECT COUNT(*) AS n FROM TbTareas") == [{"n": 0}]
+    registry.close_all()
+
+
+def test_run_task_logic_refreshes_task_snapshots():
+    from unittest.mock import MagicMock
+
+    from common.base_task import run_task_logic
+
+    task = MagicMock(databases=("brass",))
+    task.debe_ejecutarse.return_value = True
+    assert run_task_logic(task)
+    task.config.refresh_read_snapshots.assert_called_once_with(("brass",))
+    task.execute_specific_logic.assert_called_once()
@@ -0,0 +1,177 @@
+"""Tests unitarios para la unidad de trabajo (db.transaction())."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from common.db import access_connection_pool as pool_mod
+from common.db.access_connection_pool import AccessConnectionPool
+from common.db.database import AccessDatabase
+from common.db.sqlite_backend import create_database
+from common.db.transaction import TransactionRollbackError
+
+
+@pytest.fixture
+def fake_pyodbc():
+    fake = MagicMock()
+    fake.connect.side_effect = lambda *a, **k: MagicMock()
+    with patch.object(pool_mod, "pyodbc", fake, create=True), patch.object(
+        pool_mod, "PYODBC_AVAILABLE", True
+    ):
+        yield fake
+
+
+@pytest.fixture
+def tareas_conn_str(tmp_path):
+    path = create_database(tmp_path / "tareas.sqlite", "tareas")
+    return f"Driver=x;DBQ={path};"
+
+
+def _count(db):
+    return db.execute_query("SELECT COUNT(*) AS n FROM TbTareas")[0]["n"]
+
+
+def test_pool_transaction_pins_one_connection_and_commits_once(fake_pyodbc):
+    pool = AccessConnectionPool("Driver=x;DBQ=t.accdb;", max_connections=2, validation_interval=None)
+    with pool.transaction() as conn:
+        assert pool.in_transaction()
+        conn.cursor.return_value.rowcount = 1
+        pool.execute_non_query("UPDATE TbTareas SET Realizado = 'Sí' WHERE Tarea = ?", ("A",))
+        pool.insert_record("TbTareas", {"Tarea": "B"})
+        pool.get_max_id("TbCorreosEnviados", "IDCorreo")
+        conn.commit.assert_not_called()
+    assert fake_pyodbc.connect.call_count == 1
+    conn.commit.assert_called_once()
+    assert not pool.in_transaction()
+    assert pool.get_stats()["operations_completed"] == 1
+
+
+def test_pool_transaction_rolls_back_on_error(fake_pyodbc):
+    pool = AccessConnectionPool("Driver=x;DBQ=t.accdb;", max_connections=1, validation_interval=None)
+    with pytest.raises(ValueError):
+        with pool.transaction() as conn:
+            pool.execute_non_query("DELETE FROM T")
+            raise ValueError("fallo")
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+
+
+def test_nested_failure_without_savepoints_rolls_back_everything(fake_pyodbc):
+    pool = AccessConnectionPool("Driver=x;DBQ=t.accdb;", max_connections=1, validation_interval=None)
+    with pytest.raises(TransactionRollbackError):
+        with pool.transaction() as conn:
+            # Access/Jet rechaza SAVEPOINT
+            conn.cursor.return_value.execute.side_effect = Exception("syntax error")
+            try:
+                with pool.transaction():
+                    raise KeyError("interno")
+            except KeyError:
+                pass
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+
+
+def test_sqlite_pool_transaction_with_real_savepoints(tareas_conn_str):
+    pool = AccessConnectionPool(tareas_conn_str, max_connections=2, validation_interval=None)
+    db = AccessDatabase(tareas_conn_str, pool=pool)
+    try:
+        with db.transaction():
+            db.insert_record("TbTareas", {"Tarea": "Externa"})
+            with pytest.raises(RuntimeError):
+                with db.transaction():
+                    db.insert_record("TbTareas", {"Tarea": "Interna"})
+                    raise RuntimeError("deshacer sólo el bloque interno")
+            with db.transaction():
+                db.insert_record("TbTareas", {"Tarea": "Interna2"})
+        rows = db.execute_query("SELECT Tarea FROM TbTareas ORDER BY Tarea")
+        assert [r["Tarea"] for r in rows] == ["Externa", "Interna2"]
+
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.insert_record("TbTareas", {"Tarea": "Perdida"})
+                raise RuntimeError("rollback total")
+        assert _count(db) == 2
+    finally:
+        pool.close_all()
+
+
+@pytest.mark.parametrize("pooled", [True, False])
+def test_outer_failure_undoes_nested_block_opened_before_any_write(tareas_conn_str, pooled):
+    pool = (
+        AccessConnectionPool(tareas_conn_str, max_connections=1, validation_interval=None)
+        if pooled
+        else None
+    )
+    db = AccessDatabase(tareas_conn_str, pool=pool)
+    try:
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                # Sin DML previo: el SAVEPOINT no debe abrir su propia transacción
+                with db.transaction():
+                    db.insert_record("TbTareas", {"Tarea": "Interna"})
+                raise RuntimeError("rollback total")
+        assert _count(db) == 0
+    finally:
+        if pool is not None:
+            pool.close_all()
+        db.disconnect()
+
+
+def test_legacy_transaction_defers_commit(tareas_conn_str):
+    db = AccessDatabase(tareas_conn_str)
+    with db.transaction() as conn:
+        db.execute_non_query("INSERT INTO TbTareas (Tarea) VALUES (?)", ("A",))
+        db.insert_many("TbTareas", [{"Tarea": "B"}, {"Tarea": "C"}])
+        db.disconnect()  # no cierra la conexión fijada
+        assert db._connection is conn
+        # Otra conexión no ve los cambios sin confirmar
+        other = AccessDatabase(tareas_conn_str)
+        assert _count(other) == 0
+        other.disconnect()
+    assert _count(db) == 3
+    db.disconnect()
+
+
+def test_insert_many_failure_inside_transaction_propagates(tareas_conn_str):
+    db = AccessDatabase(tareas_conn_str)
+    db.insert_record("TbTareas", {"Tarea": "A"})
+    with pytest.raises(Exception):
+        with db.transaction():
+            db.insert_record("TbTareas", {"Tarea": "B"})
+            db.insert_many("TbTareas", [{"Tarea": "C"}, {"Tarea": "A"}])
+    # Ni B ni la C que executemany llegó a aplicar quedan escritas
+    assert _count(db) == 1
+    # Fuera de una transacción se reintenta fila a fila sin duplicar C
+    assert db.insert_many("TbTareas", [{"Tarea": "C"}, {"Tarea": "A"}, {"Tarea": "D"}]) == [
+        True,
+        False,
+        True,
+    ]
+    assert _count(db) == 3
+
+
+@pytest.mark.parametrize("pooled", [True, False])
+def test_record_failure_inside_transaction_propagates(tareas_conn_str, pooled):
+    pool = (
+        AccessConnectionPool(tareas_conn_str, max_connections=1, validation_interval=None)
+        if pooled
+        else None
+    )
+    db = AccessDatabase(tareas_conn_str, pool=pool)
+    try:
+        db.insert_record("TbTareas", {"Tarea": "A"})
+        with pytest.raises(Exception):
+            with db.transaction():
+                db.insert_record("TbTareas", {"Tarea": "B"})
+                db.insert_record("TbTareas", {"Tarea": "A"})
+        with pytest.raises(Exception):
+            with db.transaction():
+                db.insert_record("TbTareas", {"Tarea": "C"})
+                db.update_record("TbTareas", {"NoExiste": 1}, "Tarea = ?", ["A"])
+        assert _count(db) == 1
+        # Fuera de una transacción se mantiene el False de siempre
+        assert db.insert_record("TbTareas", {"Tarea": "A"}) is False
+        assert db.update_record("TbTareas", {"NoExiste": 1}, "Tarea = ?", ["A"]) is False
+    finally:
+        if pool is not None:
+            pool.close_all()
+        db.disconnect()
@@ -0,0 +1,168 @@
+"""Tests unitarios para la asignación de IDs por bloques."""
+import sqlite3
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from common.db import id_allocator as alloc_mod
+from common.db.access_connection_pool import AccessConnectionPool
+from common.db.id_allocator import IdAllocator, db_scope, is_duplicate_key_error
+from common.db.sqlite_backend import create_database
+
+
+def test_one_max_query_per_block():
+    allocator = IdAllocator(block_size=3)
+    fetch_max = MagicMock(return_value=10)
+    ids = [allocator.next_id("db", "TbCorreosEnviados", "IDCorreo", fetch_max) for _ in range(4)]
+    assert ids == [11, 12, 13, 14]
+    assert fetch_max.call_count == 2
+    assert allocator.get_stats()["blocks_reserved"] == 2
+
+
+def test_new_block_never_goes_backwards():
+    allocator = IdAllocator(block_size=2)
+    assert allocator.next_id("db", "T", "ID", lambda: 5) == 6
+    allocator.next_id("db", "T", "ID", lambda: 5)
+    # Otro proceso insertó por encima: se respeta el MAX mayor
+    assert allocator.next_id("db", "T", "ID", lambda: 20) == 21
+    # MAX menor que lo ya entregado (p.ej. filas borradas): no se retrocede
+    allocator.next_id("db", "T", "ID", lambda: 20)
+    assert allocator.next_id("db", "T", "ID", lambda: 3) == 23
+
+
+def test_empty_table_starts_at_one_and_scopes_are_independent():
+    allocator = IdAllocator()
+    assert allocator.next_id("a", "T", "ID", lambda: None) == 1
+    assert allocator.next_id("b", "T", "ID", lambda: 100) == 101
+    assert allocator.next_id("a", "t", "id", lambda: 100) == 2
+
+
+def test_invalidate_and_stale_blocks_reread_max():
+    allocator = IdAllocator(block_size=50, max_block_age=60)
+    fetch_max = MagicMock(return_value=1)
+    with patch.object(alloc_mod.time, "monotonic", return_value=0.0):
+        allocator.next_id("db", "T", "ID", fetch_max)
+        allocator.invalidate("db", "T", "ID")
+        allocator.next_id("db", "T", "ID", fetch_max)
+    assert fetch_max.call_count == 2
+    with patch.object(alloc_mod.time, "monotonic", return_value=61.0):
+        allocator.next_id("db", "T", "ID", fetch_max)
+    assert fetch_max.call_count == 3
+    assert allocator.get_stats()["invalidations"] == 1
+
+
+def test_concurrent_allocation_has_no_duplicates():
+    allocator = IdAllocator(block_size=7)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            value = allocator.next_id("db", "T", "ID", lambda: 0)
+            with lock:
+                results.append(value)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == list(range(1, 201))
+
+
+def test_db_scope_uses_dbq_path():
+    pool = MagicMock(connection_string="DRIVER={x};DBQ=C:\\Datos\\Tareas.accdb;PWD=a;")
+    db = MagicMock(connection_string="dbq=c:\\datos\\tareas.accdb")
+    assert db_scope(pool) == db_scope(db) == "c:\\datos\\tareas.accdb"
+    other = object()
+    assert db_scope(other) == id(other)
+
+
+def test_next_id_for_uses_get_max_id():
+    allocator = IdAllocator()
+    db = MagicMock(connection_string="DBQ=x.accdb")
+    db.get_max_id.return_value = 41
+    assert allocator.next_id_for(db, "TbCorreosEnviados", "IDCorreo") == 42
+    db.get_max_id.assert_called_once_with("TbCorreosEnviados", "IDCorreo")
+
+
+def test_invalid_block_size():
+    with pytest.raises(ValueError):
+        IdAllocator(block_size=0)
+
+
+def _email_inserter(pool):
+    def insert(email_id):
+        pool.execute_non_query(
+            "INSERT INTO TbCorreosEnviados (IDCorreo, Aplicacion, FechaGrabacion) VALUES (?, ?, ?)",
+            (email_id, "App", datetime.now()),
+        )
+
+    return insert
+
+
+def test_two_allocators_sharing_database_retry_duplicates(tmp_path):
+    # Dos procesos: cada uno reserva su bloque desde el mismo MAX
+    path = str(create_database(tmp_path / "correos.sqlite", "correos"))
+    pool = AccessConnectionPool(path, max_connections=2, validation_interval=None)
+    first, second = IdAllocator(block_size=10), IdAllocator(block_size=10)
+    insert = _email_inserter(pool)
+    ids = []
+    for _ in range(15):
+        ids.append(first.insert_with_id_for(pool, "TbCorreosEnviados", "IDCorreo", insert))
+        ids.append(second.insert_with_id_for(pool, "TbCorreosEnviados", "IDCorreo", insert))
+    rows = pool.execute_query("SELECT IDCorreo FROM TbCorreosEnviados")
+    assert len(rows) == 30 and len(set(ids)) == 30
+    assert sorted(r["IDCorreo"] for r in rows) == sorted(ids)
+    assert first.get_stats()["collisions"] + second.get_stats()["collisions"] > 0
+    pool.close_all()
+
+
+def test_insert_with_id_gives_up_after_max_attempts():
+    allocator = IdAllocator(max_attempts=3)
+    insert = MagicMock(side_effect=sqlite3.IntegrityError("UNIQUE constraint failed: T.ID"))
+    with pytest.raises(sqlite3.IntegrityError):
+        allocator.insert_with_id("db", "T", "ID", lambda: 0, insert)
+    assert insert.call_count == 3
+    assert allocator.get_stats()["collisions"] == 2
+
+
+def test_insert_with_id_does_not_retry_other_errors():
+    allocator = IdAllocator()
+    insert = MagicMock(side_effect=RuntimeError("disco lleno"))
+    fetch_max = MagicMock(return_value=0)
+    with pytest.raises(RuntimeError):
+        allocator.insert_with_id("db", "T", "ID", fetch_max, insert)
+    assert insert.call_count == 1
+    # El bloque se descartó: el siguiente ID relee MAX
+    allocator.next_id("db", "T", "ID", fetch_max)
+    assert fetch_max.call_count == 2
+
+
+def test_is_duplicate_key_error():
+    access = Exception(
+        "23000",
+        "[23000] [Microsoft][ODBC Microsoft Access Driver] The changes you requested "
+        "to the table were not successful because they would create duplicate values (-1605)",
+    )
+    assert is_duplicate_key_error(access)
+    assert is_duplicate_key_error(sqlite3.IntegrityError("UNIQUE constraint failed: T.ID"))
+    assert not is_duplicate_key_error(RuntimeError("timeout"))
+    # Otras violaciones de integridad comparten SQLSTATE 23000 pero no se reintentan
+    null_key = Exception(
+        "23000",
+        "[23000] [Microsoft][ODBC Microsoft Access Driver] Index or primary key "
+        "cannot contain a Null value. (-1604)",
+    )
+    related = Exception(
+        "23000",
+        "[23000] [Microsoft][ODBC Microsoft Access Driver] You cannot add or change "
+        "a record because a related record is required in table 'TbExpedientes'. (-1613)",
+    )
+    assert not is_duplicate_key_error(null_key)
+    assert not is_duplicate_key_error(related)
+    assert not is_duplicate_key_error(sqlite3.IntegrityError("NOT NULL constraint failed: T.Nombre"))
+    assert not is_duplicate_key_error(sqlite3.IntegrityError("FOREIGN KEY constraint failed"))
+    assert not is_duplicate_key_error(None)
@@ -0,0 +1,111 @@
+"""Tests unitarios para la caché de consultas de AccessDatabase."""
+from unittest.mock import Mock, patch
+
+import pytest
+
+from common.db import query_cache as qc_mod
+from common.db.database import AccessDatabase
+from common.db.query_cache import QueryCache, written_table
+
+
+def test_written_table_detection():
+    assert written_table("INSERT INTO TbCorreosEnviados (A) VALUES (?)") == "TbCorreosEnviados"
+    assert written_table("  update [TbTareas] SET Fecha = ?") == "TbTareas"
+    assert written_table("DELETE FROM TbNCARAvisos WHERE ID = 1") == "TbNCARAvisos"
+    assert written_table("SELECT * FROM TbTareas") is None
+
+
+def test_lru_and_ttl():
+    cache = QueryCache(ttl=10, max_entries=2)
+    with patch.object(qc_mod.time, "monotonic", return_value=0.0):
+        for n in range(3):
+            cache.put(cache.make_key(f"SELECT {n}"), [n], ["T"])
+        assert cache.get(cache.make_key("SELECT 0")) is None
+        assert cache.get(cache.make_key("SELECT  2")) == [2]
+    with patch.object(qc_mod.time, "monotonic", return_value=11.0):
+        assert cache.get(cache.make_key("SELECT 2")) is None
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+
+@pytest.fixture
+def db_with_pool():
+    pool = Mock()
+    pool.execute_query.return_value = [{"CorreoUsuario": "a@x.com"}]
+    pool.execute_non_query.return_value = 1
+    return AccessDatabase("Driver=x;DBQ=cache_test.accdb;", pool=pool), pool
+
+
+def test_tagged_query_is_cached_and_returns_copies(db_with_pool):
+    db, pool = db_with_pool
+    sql = "SELECT CorreoUsuario FROM TbUsuariosAplicaciones WHERE UsuarioRed = ?"
+    first = db.execute_query(sql, ["u1"], cache_tags=("TbUsuariosAplicaciones",))
+    first[0]["CorreoUsuario"] = "mutado"
+    second = db.execute_query(sql, ["u1"], cache_tags=("TbUsuariosAplicaciones",))
+    assert second == [{"CorreoUsuario": "a@x.com"}]
+    assert pool.execute_query.call_count == 1
+    # Otra instancia sobre la misma BD comparte la caché
+    other = AccessDatabase("Driver=x;DBQ=cache_test.accdb;", pool=pool)
+    other.execute_query(sql, ["u1"], cache_tags=("TbUsuariosAplicaciones",))
+    assert pool.execute_query.call_count == 1
+    # Sin tags no se cachea
+    db.execute_query(sql, ["u1"])
+    assert pool.execute_query.call_count == 2
+
+
+def test_writes_invalidate_tagged_entries(db_with_pool):
+    db, pool = db_with_pool
+    sql = "SELECT * FROM TbUsuariosAplicaciones"
+    db.execute_query(sql, cache_tags=("TbUsuariosAplicaciones",))
+    db.execute_non_query("UPDATE TbUsuariosAplicaciones SET FechaBaja = ?", (None,))
+    db.execute_query(sql, cache_tags=("TbUsuariosAplicaciones",))
+    assert pool.execute_query.call_count == 2
+
+    db.update_record("TbUsuariosAplicaciones", {"Nombre": "X"}, "Id = 1")
+    db.execute_query(sql, cache_tags=("TbUsuariosAplicaciones",))
+    assert pool.execute_query.call_count == 3
+
+    db.insert_record("TbOtraTabla", {"A": 1})
+    db.execute_query(sql, cache_tags=("TbUsuariosAplicaciones",))
+    assert pool.execute_query.call_count == 3
+
+
+def test_cache_disabled_with_zero_ttl(monkeypatch):
+    monkeypatch.setenv("DB_QUERY_CACHE_TTL", "0")
+    db = AccessDatabase("Driver=x;DBQ=nocache.accdb;", pool=Mock())
+    assert db.query_cache is None
+
+
+def test_entry_ttl_shortens_but_never_extends_cache_ttl():
+    cache = QueryCache(ttl=300)
+    with patch.object(qc_mod.time, "monotonic", return_value=0.0):
+        cache.put(cache.make_key("SELECT usuarios"), [1], ["T"], ttl=60)
+        cache.put(cache.make_key("SELECT largo"), [2], ["T"], ttl=900)
+        cache.put(cache.make_key("SELECT nada"), [3], ["T"], ttl=0)
+    with patch.object(qc_mod.time, "monotonic", return_value=61.0):
+        assert cache.get(cache.make_key("SELECT usuarios")) is None
+        assert cache.get(cache.make_key("SELECT largo")) == [2]
+        assert cache.get(cache.make_key("SELECT nada")) is None
+    with patch.object(qc_mod.time, "monotonic", return_value=301.0):
+        assert cache.get(cache.make_key("SELECT largo")) is None
+
+
+def test_user_lists_expire_after_user_cache_ttl(db_with_pool, monkeypatch):
+    from common.user_adapter import get_technical_users_alternative
+
+    db, pool = db_with_pool
+    monkeypatch.setenv("DB_USER_CACHE_TTL", "60")
+
+    def users():
+        with patch("common.db.database.AccessDatabase", return_value=db):
+            return get_technical_users_alternative("1", Mock(), Mock())
+
+    # Cambio hecho por otra aplicación: ninguna escritura local invalida la caché
+    with patch.object(qc_mod.time, "monotonic", return_value=0.0):
+        assert users() == [{"CorreoUsuario": "a@x.com"}]
+    pool.execute_query.return_value = [{"CorreoUsuario": "nuevo@x.com"}]
+    with patch.object(qc_mod.time, "monotonic", return_value=30.0):
+        assert users() == [{"CorreoUsuario": "a@x.com"}]
+    with patch.object(qc_mod.time, "monotonic", return_value=61.0):
+        assert users() == [{"CorreoUsuario": "nuevo@x.com"}]
@@ -0,0 +1,120 @@
+"""Tests unitarios para la caché de planificación por ciclo (TbTareas en SQLite)."""
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from common.base_task import (
+    get_last_task_execution_date,
+    register_task_completion,
+    should_execute_task,
+)
+from common.db.database import AccessDatabase
+from common.db.sqlite_backend import create_database
+from common.schedule_cache import (
+    MISSING,
+    ScheduleCache,
+    active_schedule_cache,
+    schedule_cycle,
+)
+
+
+@pytest.fixture
+def tareas(tmp_path):
+    db = AccessDatabase(str(create_database(tmp_path / "tareas.sqlite", "tareas")))
+    hoy = date.today()
+    for tarea, dias in (("RiesgosDiario", 0), ("RiesgosSemanal", 3), ("BRASSDiario", 1)):
+        db.execute_non_query(
+            "INSERT INTO TbTareas (Tarea, Realizado, Fecha) VALUES (?, 'Sí', ?)",
+            [tarea, hoy - timedelta(days=dias)],
+        )
+    return db
+
+
+def _counting(db):
+    calls = []
+    original = db.execute_query
+
+    def execute_query(query, params=None):
+        calls.append(query)
+        return original(query, params)
+
+    db.execute_query = execute_query
+    return calls
+
+
+def test_cycle_answers_every_task_with_one_query(tareas):
+    calls = _counting(tareas)
+    with schedule_cycle() as cache:
+        assert should_execute_task(tareas, "RiesgosDiario", 1) is False
+        assert should_execute_task(tareas, "RiesgosSemanal", 7) is False
+        assert should_execute_task(tareas, "BRASSDiario", 1) is True
+        assert should_execute_task(tareas, "NoExiste", 1) is True
+    assert len(calls) == 1 and "GROUP BY Tarea" in calls[0]
+    assert cache.queries == 1
+    assert active_schedule_cache() is None
+
+
+def test_cached_dates_match_per_name_query(tareas):
+    fuera = {t: get_last_task_execution_date(tareas, t) for t in ("RiesgosDiario", "BRASSDiario", "X")}
+    with schedule_cycle():
+        dentro = {t: get_last_task_execution_date(tareas, t) for t in fuera}
+    assert dentro == fuera
+    assert dentro["X"] is None
+
+
+def test_register_task_completion_refreshes_cache_in_place(tareas):
+    with schedule_cycle() as cache:
+        assert should_execute_task(tareas, "BRASSDiario", 1) is True
+        assert register_task_completion(tareas, "BRASSDiario")
+        assert register_task_completion(tareas, "NuevaTarea")
+        calls = _counting(tareas)
+        assert should_execute_task(tareas, "BRASSDiario", 1) is False
+        assert should_execute_task(tareas, "NuevaTarea", 1) is False
+    assert calls == []
+    assert cache.queries == 1
+
+
+def test_outside_cycle_keeps_per_name_queries(tareas):
+    calls = _counting(tareas)
+    should_execute_task(tareas, "RiesgosDiario", 1)
+    should_execute_task(tareas, "BRASSDiario", 1)
+    assert len(calls) == 2 and all("WHERE Tarea = ?" in q for q in calls)
+
+
+def test_load_failure_falls_back_to_individual_queries():
+    db = MagicMock()
+    db.connection_string = "tareas"
+    db.execute_query.side_effect = [Exception("sin tabla"), [{"UltimaFecha": date.today()}]]
+    with schedule_cycle() as cache:
+        assert get_last_task_execution_date(db, "RiesgosDiario") == date.today()
+    assert cache.queries == 1
+    assert db.execute_query.call_count == 2
+
+
+def test_other_database_is_not_served_from_cache(tareas):
+    cache = ScheduleCache()
+    assert cache.lookup(tareas, "RiesgosDiario") == date.today()
+    otra = MagicMock(connection_string="otra")
+    assert cache.lookup(otra, "RiesgosDiario") is MISSING
+    assert cache.lookup(None, "RiesgosDiario") is MISSING
+
+
+def test_record_never_moves_date_backwards(tareas):
+    cache = ScheduleCache()
+    cache.lookup(tareas, "RiesgosDiario")
+    cache.record("RiesgosDiario", date.today() - timedelta(days=10))
+    assert cache.lookup(tareas, "RiesgosDiario") == date.today()
+
+
+def test_task_names_are_case_insensitive(tareas):
+    tareas.execute_non_query(
+        "INSERT INTO TbTareas (Tarea, Realizado, Fecha) VALUES (?, 'Sí', ?)",
+        ["brassdiario", date.today()],
+    )
+    cache = ScheduleCache()
+    # Dos filas que sólo difieren en mayúsculas: gana la fecha más reciente
+    assert cache.lookup(tareas, "BRASSDiario") == date.today()
+    assert cache.lookup(tareas, "riesgosdiario") == date.today()
+    cache.record("NUEVATAREA", date.today())
+    assert cache.lookup(tareas, "NuevaTarea") == date.today()
@@ -0,0 +1,80 @@
+"""Tests unitarios para el log JSONL de consultas lentas."""
+import json
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from common.db.database import AccessDatabase
+from common.db.slow_query_log import SlowQueryLog, get_slow_query_log, mask_param
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_mask_param_hides_pii_but_keeps_numbers_and_dates():
+    assert mask_param("juan.perez@empresa.com") == "j***@empresa.com"
+    assert mask_param("Juan Pérez") == "<str:10>"
+    assert mask_param(42) == 42
+    assert mask_param(datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02T03:04:05"
+    assert mask_param(None) is None
+
+
+def test_records_only_statements_above_threshold(tmp_path):
+    slow_log = SlowQueryLog(tmp_path / "slow.jsonl", threshold_ms=100)
+    assert slow_log.record("SELECT 1", None, 0.05, 1) is None
+    entry = slow_log.record(
+        "SELECT * FROM TbRiesgos WHERE CodigoRiesgo = 'R-1' AND Correo = ?",
+        ("ana@empresa.com",),
+        0.25,
+        3,
+        connection_string=r"Driver=x;DBQ=C:\datos\Gestion_Riesgos_Datos.accdb;PWD=s",
+        caller="riesgos.Manager.metodo",
+    )
+    assert entry is not None
+    lines = _read(tmp_path / "slow.jsonl")
+    assert len(lines) == 1
+    line = lines[0]
+    assert line["fingerprint"] == "SELECT * FROM TbRiesgos WHERE CodigoRiesgo = ? AND Correo = ?"
+    assert line["params"] == ["a***@empresa.com"]
+    assert line["duration_ms"] == 250.0
+    assert (line["rows"], line["ok"]) == (3, True)
+    assert line["caller"] == "riesgos.Manager.metodo"
+    assert line["db"] == "gestion_riesgos_datos.accdb"
+    assert "PWD" not in json.dumps(line)
+
+
+class _SlowReportManager:
+    def __init__(self, db):
+        self.db = db
+
+    def informe(self):
+        return self.db.execute_query("SELECT ID FROM TbProyectos WHERE ID > ?", (7,))
+
+
+def test_access_database_logs_calling_manager_method(tmp_path):
+    slow_log = SlowQueryLog(tmp_path / "slow.jsonl", threshold_ms=0)
+    pool = MagicMock()
+    pool.execute_query.return_value = [{"ID": 8}, {"ID": 9}]
+    pool.execute_non_query.side_effect = RuntimeError("bloqueo")
+    db = AccessDatabase("Driver=x;DBQ=a.accdb;", pool=pool, slow_query_log=slow_log)
+
+    assert _SlowReportManager(db).informe() == [{"ID": 8}, {"ID": 9}]
+    try:
+        db.execute_non_query("DELETE FROM T WHERE A = 1")
+    except RuntimeError:
+        pass
+
+    first, second = _read(tmp_path / "slow.jsonl")
+    assert first["caller"].endswith("_SlowReportManager.informe")
+    assert (first["rows"], first["params"]) == (2, [7])
+    assert (second["ok"], second["rows"]) == (False, None)
+
+
+def test_get_slow_query_log_can_be_disabled(monkeypatch, tmp_path):
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "0")
+    assert get_slow_query_log() is None
+    monkeypatch.setenv("DB_SLOW_QUERY_MS", "250")
+    monkeypatch.setenv("DB_SLOW_QUERY_LOG", str(tmp_path / "s.jsonl"))
+    slow_log = get_slow_query_log()
+    assert slow_log.threshold_ms == 250
+    assert slow_log is get_slow_query_log()
@@ -0,0 +1,222 @@
+"""Tests unitarios para el backend SQLite de desarrollo (shims de Access)."""
+import logging
+import os
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from brass.brass_manager import BrassManager
+from common.config import Config
+from common.db import sqlite_backend
+from common.db.access_connection_pool import AccessConnectionPool
+from common.db.database import AccessDatabase
+from common.db.sqlite_backend import (
+    SCHEMA_FILES,
+    create_database,
+    is_sqlite_target,
+    sqlite_path,
+    translate_access_sql,
+)
+from expedientes.expedientes_manager import ExpedientesManager
+
+
+def _conn_str(path):
+    return f"Driver={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={path};PWD=x;"
+
+
+@pytest.fixture
+def brass_db(tmp_path):
+    return create_database(tmp_path / "brass.sqlite", "brass")
+
+
+# --- Detección -------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("sqlite:///tmp/x.sqlite", "/tmp/x.sqlite"),
+        ("sqlite:///C:/datos/x.sqlite", "C:/datos/x.sqlite"),
+        ("sqlite:relativo.db", "relativo.db"),
+        (_conn_str(r"C:\datos\tareas.sqlite"), r"C:\datos\tareas.sqlite"),
+        (_conn_str(r"C:\datos\tareas.accdb"), None),
+        ("/tmp/fichero.sqlite3", "/tmp/fichero.sqlite3"),
+    ],
+)
+def test_sqlite_path_detection(value, expected):
+    assert sqlite_path(value) == expected
+    assert is_sqlite_target(value) is (expected is not None)
+
+
+# --- Traducción ------------------------------------------------------------
+
+
+def test_translate_brackets_functions_and_concat():
+    sql = "SELECT [Nombre] & ' ' & [Apellido] AS N FROM T WHERE F <= Date() AND G < Now()"
+    out = translate_access_sql(sql)
+    assert out == (
+        "SELECT \"Nombre\" || ' ' || \"Apellido\" AS N FROM T "
+        "WHERE F <= ACCESS_DATE() AND G < ACCESS_NOW()"
+    )
+
+
+def test_translate_leaves_literals_untouched():
+    out = translate_access_sql("SELECT * FROM T WHERE A = '[x] & Date()' AND B = True")
+    assert "'[x] & Date()'" in out
+    assert "B IN (1, -1, 'Sí', 'Si', 'True')" in out
+
+
+def test_translate_boolean_comparisons():
+    assert "NOT IN (1, -1" in translate_access_sql("SELECT 1 FROM T WHERE A <> True")
+    assert "A IN (0, 'No', 'False')" in translate_access_sql("SELECT 1 FROM T WHERE A = False")
+
+
+def test_translate_top_like_and_date_literal():
+    out = translate_access_sql(
+        "SELECT TOP 5 * FROM T WHERE N LIKE 'AB*?' AND F > #2024-01-31# ORDER BY F;"
+    )
+    assert out == (
+        "SELECT * FROM T WHERE N LIKE 'AB%_' AND F > '2024-01-31 00:00:00' "
+        "ORDER BY F LIMIT 5"
+    )
+
+
+def test_translate_distinctrow():
+    assert translate_access_sql("SELECT DISTINCTROW A FROM T") == "SELECT DISTINCT A FROM T"
+
+
+# --- Funciones y tipos -----------------------------------------------------
+
+
+def test_access_functions_and_date_roundtrip(tmp_path):
+    conn = sqlite_backend.connect(f"sqlite:///{tmp_path / 'f.sqlite'}")
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT DateDiff('d', ?, ?), DateDiff('m', #2024-01-31#, #2024-03-01#), "
+        "DateDiff('yyyy', '2023-12-31', '2024-01-01'), Date(), "
+        "Nz(NULL, 'x'), IIf('Sí', 'a', 'b'), Left('ABCDE', 2), Mid('ABCDE', 2, 3), "
+        "DateAdd('m', 1, '2024-01-31')",
+        (datetime(2024, 1, 1, 23, 0), date(2024, 1, 11)),
+    )
+    row = cur.fetchone()
+    assert row[:3] == (10, 2, 1)
+    assert row[3] == datetime.combine(date.today(), datetime.min.time())
+    assert row[4:8] == ("x", "a", "AB", "BCD")
+    assert row[8] == datetime(2024, 2, 29)
+    conn.close()
+
+
+def test_datediff_hours_counts_boundaries():
+    assert sqlite_backend._datediff("h", "2024-01-01 10:59:00", "2024-01-01 11:00:00") == 1
+    assert sqlite_backend._datediff("n", "2024-01-01 10:00:59", "2024-01-01 10:01:00") == 1
+    with pytest.raises(Exception):
+        sqlite_backend._datediff("zz", "2024-01-01", "2024-01-02")
+
+
+def test_boolean_and_si_values_match(tmp_path):
+    path = create_database(tmp_path / "tareas.sqlite", "tareas")
+    db = AccessDatabase(_conn_str(path))
+    db.insert_many(
+        "TbUsuariosAplicaciones",
+        [
+            {"Id": 1, "Nombre": "A", "ParaTareasProgramadas": True},
+            {"Id": 2, "Nombre": "B", "ParaTareasProgramadas": -1},
+            {"Id": 3, "Nombre": "C", "ParaTareasProgramadas": False},
+        ],
+    )
+    rows = db.execute_query(
+        "SELECT Nombre FROM TbUsuariosAplicaciones WHERE ParaTareasProgramadas = True ORDER BY Id"
+    )
+    assert [r["Nombre"] for r in rows] == ["A", "B"]
+    db.disconnect()
+
+
+# --- Integración con AccessDatabase / AccessConnectionPool -----------------
+
+
+def test_pool_uses_sqlite_without_pyodbc(brass_db):
+    pool = AccessConnectionPool(_conn_str(brass_db), max_connections=2)
+    try:
+        with patch("common.db.access_connection_pool.PYODBC_AVAILABLE", False):
+            assert pool.insert_record(
+                "TbEquiposMedida", {"IDEquipoMedida": 1, "NOMBRE": "Osciloscopio"}
+            )
+            assert pool.get_max_id("TbEquiposMedida", "IDEquipoMedida") == 1
+            rows = pool.execute_query("SELECT NOMBRE FROM TbEquiposMedida")
+        assert rows == [{"NOMBRE": "Osciloscopio"}]
+    finally:
+        pool.close_all()
+
+
+def test_legacy_database_writes_and_reads_dates(brass_db):
+    db = AccessDatabase(_conn_str(brass_db))
+    with patch("common.db.database.PYODBC_AVAILABLE", False):
+        assert db.is_sqlite
+        db.insert_record(
+            "TbEquiposMedidaCalibraciones",
+            {"IDEquipoMedida": 7, "FechaFinCalibracion": datetime(2024, 5, 1, 8, 30)},
+        )
+        rows = db.execute_query("SELECT FechaFinCalibracion FROM TbEquiposMedidaCalibraciones")
+    assert rows[0]["FechaFinCalibracion"] == datetime(2024, 5, 1, 8, 30)
+    db.disconnect()
+
+
+@pytest.mark.parametrize("db_name", sorted(SCHEMA_FILES))
+def test_create_database_for_every_schema(tmp_path, db_name):
+    path = create_database(tmp_path / f"{db_name}.sqlite", db_name)
+    # Idempotente: se puede aplicar sobre una BD existente
+    create_database(path, db_name)
+    db = AccessDatabase(_conn_str(path))
+    tables = db.execute_query("SELECT name FROM sqlite_master WHERE type = 'table'")
+    assert tables
+    db.disconnect()
+
+
+def test_real_manager_queries_run_on_sqlite(tmp_path, brass_db):
+    brass = AccessDatabase(_conn_str(brass_db))
+    vencida = datetime.now() - timedelta(days=3)
+    brass.insert_many(
+        "TbEquiposMedida",
+        [
+            {"IDEquipoMedida": 1, "NOMBRE": "Vencido"},
+            {"IDEquipoMedida": 2, "NOMBRE": "Al dia"},
+            {"IDEquipoMedida": 3, "NOMBRE": "Baja", "FechaFinServicio": vencida},
+        ],
+    )
+    brass.insert_many(
+        "TbEquiposMedidaCalibraciones",
+        [
+            {"IDEquipoMedida": 1, "FechaFinCalibracion": vencida},
+            {"IDEquipoMedida": 2, "FechaFinCalibracion": datetime.now() + timedelta(days=30)},
+        ],
+    )
+    manager = BrassManager(brass, db_tareas=None, logger=logging.getLogger("test"))
+    equipos = manager.get_equipment_out_of_calibration()
+    assert [e["NOMBRE"] for e in equipos] == ["Vencido"]
+    brass.disconnect()
+
+    exp = AccessDatabase(_conn_str(create_database(tmp_path / "exp.sqlite", "expedientes")))
+    exp.insert_record("TbExpedientes", {"IDExpediente": 1, "CodExp": "E1", "IDResponsableCalidad": 9})
+    exp.insert_record("TbUsuariosAplicaciones", {"Id": 9, "Nombre": "Calidad"})
+    exp.insert_many(
+        "TbExpedientesHitos",
+        [
+            {"IDExpediente": 1, "Descripcion": "Pronto", "FechaHito": date.today() + timedelta(days=5)},
+            {"IDExpediente": 1, "Descripcion": "Lejos", "FechaHito": date.today() + timedelta(days=40)},
+        ],
+    )
+    hitos = ExpedientesManager(exp, None).get_hitos_a_punto_finalizar()
+    assert [(h["Descripcion"], h["DiasParaFin"], h["ResponsableCalidad"]) for h in hitos] == [
+        ("Pronto", 5, "Calidad")
+    ]
+    exp.disconnect()
+
+
+def test_config_sqlite_backend_paths(tmp_path):
+    env = {"DB_BACKEND": "sqlite", "SQLITE_DB_DIR": str(tmp_path)}
+    with patch.dict(os.environ, env), patch("common.config.load_dotenv"):
+        config = Config()
+    assert config.db_backend == "sqlite"
+    assert config.get_database_path("riesgos") == tmp_path / "riesgos.sqlite"
+    assert is_sqlite_target(config.get_db_connection_string("riesgos"))
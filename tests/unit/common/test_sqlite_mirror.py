@@ -0,0 +1,177 @@
+"""Tests unitarios para la réplica Access -> SQLite (origen simulado con SQLite)."""
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from common.config import Config
+from common.db.database import AccessDatabase
+from common.db.sqlite_backend import create_database
+from common.db.sqlite_mirror import MIRROR_TABLES, MirrorTable, SQLiteMirror
+
+TABLES = (
+    MirrorTable("TbUsuariosAplicaciones", "Id", ("UsuarioRed",)),
+    MirrorTable("TbRiesgos", "IDRiesgo", ("IDEdicion",)),
+)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = create_database(tmp_path / "origen.sqlite", "riesgos")
+    raw = sqlite3.connect(path)
+    raw.execute("ALTER TABLE TbRiesgos ADD COLUMN FechaModificacion DATETIME")
+    raw.executemany(
+        "INSERT INTO TbUsuariosAplicaciones (Id, Nombre, UsuarioRed) VALUES (?, ?, ?)",
+        [(1, "Ana", "ana"), (2, "Luis", "luis")],
+    )
+    raw.executemany(
+        "INSERT INTO TbRiesgos (IDRiesgo, IDEdicion, CodigoRiesgo, FechaModificacion) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (1, 10, "R1", "2024-01-01 00:00:00"),
+            (2, 10, "R2", "2024-01-02 00:00:00"),
+            (3, 11, "R3", "2024-01-03 00:00:00"),
+        ],
+    )
+    raw.commit()
+    raw.close()
+    db = AccessDatabase(str(path))
+    yield db, path
+    db.disconnect()
+
+
+def _rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_full_build_copies_tables_and_creates_indexes(tmp_path, source):
+    db, _ = source
+    mirror_path = tmp_path / "mirror" / "riesgos.sqlite"
+    report = SQLiteMirror(db, mirror_path, TABLES).build(db_name="riesgos")
+    assert report.ok
+    assert [(t.table, t.mode, t.rows) for t in report.tables] == [
+        ("TbUsuariosAplicaciones", "full", 2),
+        ("TbRiesgos", "full", 3),
+    ]
+    indexes = {r[0] for r in _rows(mirror_path, "SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"ix_TbRiesgos_IDEdicion", "ix_TbRiesgos_IDRiesgo", "ix_TbUsuariosAplicaciones_UsuarioRed"} <= indexes
+    state = dict(_rows(mirror_path, "SELECT tabla, marca FROM _mirror_state"))
+    assert state == {"TbUsuariosAplicaciones": None, "TbRiesgos": "2024-01-03 00:00:00"}
+    assert "TbRiesgos" in report.format_text()
+
+
+def test_incremental_refresh_upserts_and_deletes(tmp_path, source):
+    db, path = source
+    mirror_path = tmp_path / "riesgos.sqlite"
+    mirror = SQLiteMirror(db, mirror_path, TABLES)
+    mirror.build()
+
+    raw = sqlite3.connect(path)
+    raw.execute(
+        "UPDATE TbRiesgos SET CodigoRiesgo = 'R2b', FechaModificacion = '2024-02-01 00:00:00' "
+        "WHERE IDRiesgo = 2"
+    )
+    raw.execute("DELETE FROM TbRiesgos WHERE IDRiesgo = 3")
+    raw.execute(
+        "INSERT INTO TbRiesgos (IDRiesgo, IDEdicion, CodigoRiesgo, FechaModificacion) "
+        "VALUES (4, 12, 'R4', '2024-02-02 00:00:00')"
+    )
+    raw.commit()
+    raw.close()
+
+    report = mirror.build()
+    riesgos = report.tables[1]
+    assert (riesgos.mode, riesgos.rows, riesgos.deleted) == ("incremental", 2, 1)
+    # Sin columna de modificación: refresco completo
+    assert report.tables[0].mode == "full"
+    assert _rows(mirror_path, "SELECT IDRiesgo, CodigoRiesgo FROM TbRiesgos ORDER BY IDRiesgo") == [
+        (1, "R1"),
+        (2, "R2b"),
+        (4, "R4"),
+    ]
+    marca = _rows(mirror_path, "SELECT marca FROM _mirror_state WHERE tabla = 'TbRiesgos'")
+    assert marca == [("2024-02-02 00:00:00",)]
+
+
+def test_incremental_refresh_includes_rows_at_watermark_and_without_date(tmp_path, source):
+    db, path = source
+    mirror_path = tmp_path / "riesgos.sqlite"
+    mirror = SQLiteMirror(db, mirror_path, TABLES)
+    mirror.build()
+
+    raw = sqlite3.connect(path)
+    # Misma marca que la última fila copiada y otra sin fecha de modificación
+    raw.executemany(
+        "INSERT INTO TbRiesgos (IDRiesgo, IDEdicion, CodigoRiesgo, FechaModificacion) "
+        "VALUES (?, ?, ?, ?)",
+        [(5, 12, "R5", "2024-01-03 00:00:00"), (6, 12, "R6", None)],
+    )
+    raw.commit()
+    raw.close()
+
+    report = mirror.build()
+    assert report.tables[1].mode == "incremental"
+    ids = _rows(mirror_path, "SELECT IDRiesgo FROM TbRiesgos ORDER BY IDRiesgo")
+    assert ids == [(1,), (2,), (3,), (5,), (6,)]
+    marca = _rows(mirror_path, "SELECT marca FROM _mirror_state WHERE tabla = 'TbRiesgos'")
+    assert marca == [("2024-01-03 00:00:00",)]
+
+
+def test_missing_source_table_is_reported_without_aborting(tmp_path, source):
+    db, _ = source
+    tables = (MirrorTable("TbNoExiste", "Id"),) + TABLES
+    report = SQLiteMirror(db, tmp_path / "m.sqlite", tables).build()
+    assert not report.ok
+    assert report.tables[0].error and report.tables[2].rows == 3
+
+
+def test_managers_sql_runs_on_mirror_and_compare_queries(tmp_path, source):
+    db, _ = source
+    mirror_path = tmp_path / "riesgos.sqlite"
+    mirror = SQLiteMirror(db, mirror_path, TABLES)
+    mirror.build()
+    mirror_db = AccessDatabase(str(mirror_path))
+    query = (
+        "SELECT TbRiesgos.CodigoRiesgo, TbUsuariosAplicaciones.Nombre FROM TbRiesgos "
+        "LEFT JOIN TbUsuariosAplicaciones ON TbRiesgos.IDEdicion = TbUsuariosAplicaciones.Id "
+        "WHERE TbRiesgos.FechaModificacion > #2024-01-01#"
+    )
+    results = mirror.compare_queries({"riesgos": query}, mirror_db, repeat=2)
+    mirror_db.disconnect()
+    assert results[0]["name"] == "riesgos"
+    assert results[0]["rows"] == 2 and results[0]["rows_match"]
+    assert results[0]["speedup"] is not None
+
+
+def test_mirror_tables_cover_read_only_managers():
+    assert {"riesgos", "agedys", "expedientes", "brass"} <= set(MIRROR_TABLES)
+    names = {t.name for t in MIRROR_TABLES["agedys"]}
+    assert {"TbNPedido", "TbFacturasDetalle", "TbVisadoFacturas_Nueva"} <= names
+
+
+def test_config_reads_from_mirror_when_built(tmp_path, caplog):
+    env = {
+        "DB_MIRROR_ENABLED": "true",
+        "DB_MIRROR_DIR": str(tmp_path),
+        "DB_MIRROR_DATABASES": "riesgos",
+    }
+    with patch.dict(os.environ, env), patch("common.config.load_dotenv"):
+        config = Config()
+    master = config.get_db_connection_string("riesgos")
+    with caplog.at_level("WARNING", logger="common.config"):
+        assert config.get_db_read_connection_string("riesgos") == master
+        assert config.get_db_read_connection_string("riesgos") == master
+    # Un único aviso por ruta aunque se resuelva la cadena en cada consulta
+    missing = [r for r in caplog.records if getattr(r, "event", None) == "db_mirror_missing"]
+    assert len(missing) == 1 and "riesgos" in missing[0].getMessage()
+    create_database(tmp_path / "riesgos.sqlite", "riesgos")
+    read = config.get_db_read_connection_string("riesgos")
+    assert f"DBQ={tmp_path / 'riesgos.sqlite'};" in read
+    assert config.get_db_read_connection_string("agedys") == config.get_db_connection_string(
+        "agedys"
+    )
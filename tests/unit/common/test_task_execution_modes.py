@@ -0,0 +1,148 @@
+"""Tests unitarios para los modos de ejecución de tareas (en proceso / aislado)."""
+import subprocess
+import time
+from unittest.mock import patch
+
+import pytest
+
+from common import base_task as base_task_mod
+from common import startup_costs
+from common.base_task import TareaDiaria
+from common.utils import execute_task_with_standard_boilerplate
+from common.task_registry import BrassTask, EmailServicesRegistryTask
+
+
+@pytest.fixture(autouse=True)
+def _clean_startup_costs():
+    startup_costs.reset_startup_costs()
+    yield
+    startup_costs.reset_startup_costs()
+
+
+class LogicTask(TareaDiaria):
+    def __init__(self, outcome=True):
+        super().__init__("Logica", "run_brass.py", ["LogicaDiaria"], databases=("brass",))
+        self.outcome = outcome
+        self.calls = 0
+
+    def execute_specific_logic(self):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def test_inprocess_runs_logic_without_spawning_processes(monkeypatch):
+    monkeypatch.delenv("MASTER_TASK_MODE", raising=False)
+    task = LogicTask()
+    with patch.object(base_task_mod.subprocess, "run") as run:
+        result = task.ejecutar()
+    run.assert_not_called()
+    assert task.calls == 1
+    assert result["success"] and result["mode"] == "inprocess"
+    # Sin ninguna medición de arranque aislado no se inventa el ahorro
+    assert result["startup_saved"] is None
+
+
+def test_inprocess_reports_startup_saved_from_measured_isolated_run(monkeypatch):
+    task = LogicTask()
+    completed = subprocess.CompletedProcess(
+        ["python"], 0, stdout="log\nTASK_STARTUP_S=2.500\nfin", stderr=""
+    )
+    monkeypatch.setenv("MASTER_TASK_MODE", "isolated")
+    with patch.object(base_task_mod.subprocess, "run", return_value=completed) as run:
+        isolated = task.ejecutar()
+    assert isolated["startup"] == 2.5
+    assert startup_costs.SPAWN_TIME_ENV in run.call_args.kwargs["env"]
+
+    monkeypatch.setenv("MASTER_TASK_MODE", "inprocess")
+    result = task.ejecutar()
+    assert 0 < result["startup_saved"] <= 2.5
+
+
+def test_inprocess_falls_back_to_worker_startup_cost(monkeypatch):
+    monkeypatch.delenv("MASTER_TASK_MODE", raising=False)
+    startup_costs.record_startup_cost(startup_costs.WORKER_KEY, 1.0)
+    assert 0 < LogicTask().ejecutar()["startup_saved"] <= 1.0
+
+
+def test_startup_marker_round_trip(monkeypatch, capsys):
+    assert startup_costs.emit_startup_marker() is None
+    monkeypatch.setenv(startup_costs.SPAWN_TIME_ENV, repr(time.time() - 1.5))
+    elapsed = startup_costs.emit_startup_marker()
+    assert elapsed >= 1.5
+    assert startup_costs.parse_startup_marker(capsys.readouterr().out) == pytest.approx(elapsed, abs=0.001)
+    assert startup_costs.parse_startup_marker("sin marcador") is None
+
+
+def test_inprocess_failures_are_reported(monkeypatch):
+    monkeypatch.delenv("MASTER_TASK_MODE", raising=False)
+    assert LogicTask(outcome=False).ejecutar()["return_code"] == 1
+    result = LogicTask(outcome=RuntimeError("boom")).ejecutar()
+    assert not result["success"] and result["error"] == "boom"
+
+
+def test_isolated_mode_globally_or_per_task(monkeypatch):
+    completed = subprocess.CompletedProcess(["python"], 0, stdout="ok", stderr="")
+    monkeypatch.setenv("MASTER_TASK_MODE", "isolated")
+    task = LogicTask()
+    with patch.object(base_task_mod.subprocess, "run", return_value=completed):
+        result = task.ejecutar()
+    assert result["mode"] == "isolated" and result["success"] and task.calls == 0
+
+    monkeypatch.setenv("MASTER_TASK_MODE", "inprocess")
+    monkeypatch.setenv("MASTER_ISOLATED_TASKS", "otra, logica")
+    assert task.execution_mode() == "isolated"
+
+
+def test_registry_tasks_resolve_real_logic_class():
+    assert BrassTask.logic_class == "brass.brass_task:BrassTask"
+    email = EmailServicesRegistryTask()
+    sentinel = object()
+    with patch("importlib.import_module") as import_module:
+        import_module.return_value.EmailServicesTask.return_value = sentinel
+        assert email._logic_target() is sentinel
+        assert email._logic_target() is sentinel
+    import_module.assert_called_once_with("email_services.email_task")
+
+
+
+class RecordingLogic:
+    """Lógica real con sus propios task_names (como NoConformidadesTask)."""
+
+    calls: list = []
+    due = True
+
+    def debe_ejecutarse(self):
+        self.calls.append("debe_ejecutarse")
+        return self.due
+
+    def execute_specific_logic(self):
+        self.calls.append("execute_specific_logic")
+        return True
+
+    def marcar_como_completada(self):
+        self.calls.append("marcar_como_completada")
+
+
+class WrapperTask(TareaDiaria):
+    logic_class = f"{__name__}:RecordingLogic"
+
+    def __init__(self):
+        super().__init__("Wrapper", "run_brass.py", ["WrapperDiario"])
+
+
+@pytest.mark.parametrize("due", [True, False])
+def test_inprocess_applies_same_sequence_as_isolated_runner(monkeypatch, due):
+    monkeypatch.delenv("MASTER_TASK_MODE", raising=False)
+    monkeypatch.setattr(RecordingLogic, "due", due)
+    monkeypatch.setattr(RecordingLogic, "calls", [])
+    assert WrapperTask().ejecutar()["success"]
+    inprocess = list(RecordingLogic.calls)
+
+    # Lo que ejecuta el script del modo aislado sobre la misma clase
+    RecordingLogic.calls.clear()
+    assert execute_task_with_standard_boilerplate("Wrapper", RecordingLogic()) == 0
+    assert inprocess == RecordingLogic.calls
+    expected = ["debe_ejecutarse", "execute_specific_logic", "marcar_como_completada"]
+    assert inprocess == (expected if due else expected[:1])
@@ -1,6 +1,8 @@
 """Tests para TaskRegistry"""
 
-from common.task_registry import TaskRegistry
+from common import task_registry as task_registry_module
+from common.config import Config
+from common.task_registry import TaskRegistry, get_task_registry, reset_task_registry
 
 
 def test_registry_default_counts():
@@ -49,3 +51,35 @@ def test_registry_with_extras():
     registry = TaskRegistry(extra_daily=[ExtraDaily()])
     names = [t.name for t in registry.get_daily_tasks()]
     assert "ExtraDaily" in names
+
+
+def test_registry_builds_lazily_once():
+    registry = TaskRegistry()
+    assert registry.get_stats()["builds"] == 0
+    continuous = registry.get_continuous_tasks()
+    stats = registry.get_stats()
+    assert stats["continuous_built"] and not stats["daily_built"]
+    daily = registry.get_daily_tasks()
+    assert registry.get_continuous_tasks()[0] is continuous[0]
+    assert registry.get_daily_tasks()[0] is daily[0]
+    assert registry.summary()["daily_count"] == len(daily)
+    assert registry.get_stats()["builds"] == 2
+    assert registry.get_stats()["build_s"] >= 0
+
+
+def test_registry_tasks_share_config():
+    config = Config()
+    registry = TaskRegistry(config=config)
+    assert all(t.config is config for t in registry.get_all_tasks())
+
+
+def test_get_task_registry_is_long_lived():
+    reset_task_registry()
+    try:
+        first = get_task_registry()
+        assert get_task_registry() is first
+        reset_task_registry()
+        assert get_task_registry() is not first
+    finally:
+        reset_task_registry()
+    assert task_registry_module._task_registry is None
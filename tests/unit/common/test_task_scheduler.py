@@ -0,0 +1,91 @@
+"""Tests unitarios para el planificador de tareas diarias en paralelo."""
+import threading
+import time
+
+from common.task_scheduler import DailyTaskScheduler, db_limits_from_env, task_databases
+
+
+class FakeTask:
+    def __init__(self, name, databases=(), duration=0.1):
+        self.name = name
+        self.databases = databases
+        self.duration = duration
+
+
+class Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active: dict[str, int] = {}
+        self.max_active: dict[str, int] = {}
+        self.max_total = 0
+
+    def __call__(self, task):
+        keys = list(task.databases) + ["*"]
+        with self.lock:
+            for key in keys:
+                self.active[key] = self.active.get(key, 0) + 1
+                self.max_active[key] = max(self.max_active.get(key, 0), self.active[key])
+        time.sleep(task.duration)
+        with self.lock:
+            for key in keys:
+                self.active[key] -= 1
+        return {"success": True}
+
+
+def test_independent_tasks_overlap_window_tends_to_longest():
+    tasks = [FakeTask(n, (n.lower(),), 0.2) for n in ("Riesgos", "BRASS", "AGEDYS")]
+    tracker = Tracker()
+    start = time.perf_counter()
+    runs = DailyTaskScheduler(max_workers=3).run(tasks, tracker)
+    assert time.perf_counter() - start < 0.5
+    assert tracker.max_active["*"] == 3
+    assert [r.name for r in runs] == ["Riesgos", "BRASS", "AGEDYS"]
+    assert all(r.result == {"success": True} and r.duration >= 0.2 for r in runs)
+    record = runs[0].to_dict()
+    assert record["start"] < record["end"] and record["databases"] == ["riesgos"]
+
+
+def test_per_database_limit_and_shared_tareas_db():
+    tasks = [
+        FakeTask("A", ("riesgos", "tareas")),
+        FakeTask("B", ("riesgos",)),
+        FakeTask("C", ("tareas",)),
+        FakeTask("D", ("tareas",)),
+    ]
+    tracker = Tracker()
+    DailyTaskScheduler(max_workers=4).run(tasks, tracker)
+    assert tracker.max_active["riesgos"] == 1
+    # Sólo comparten la BD de tareas: se solapan
+    assert tracker.max_active["tareas"] >= 2
+    assert task_databases(tasks[0]) == ("riesgos",)
+
+
+def test_max_workers_bounds_concurrency_and_errors_are_isolated():
+    tasks = [FakeTask(str(i), (f"db{i}",), 0.05) for i in range(5)]
+    tracker = Tracker()
+
+    def run_one(task):
+        if task.name == "2":
+            raise RuntimeError("fallo")
+        return tracker(task)
+
+    scheduler = DailyTaskScheduler(max_workers=2, db_limits={"db0": 3})
+    runs = scheduler.run(tasks, run_one)
+    assert tracker.max_active["*"] <= 2
+    assert runs[2].error == "fallo" and runs[2].result is None
+    assert all(r.finished is not None for r in runs)
+
+
+def test_db_limits_from_env():
+    assert db_limits_from_env("riesgos=2, agedys=1,malo=x,sinvalor") == {
+        "riesgos": 2,
+        "agedys": 1,
+    }
+
+
+def test_explicit_tareas_limit_serializes_all_tasks():
+    tasks = [FakeTask(n, (n.lower(),), 0.05) for n in ("Riesgos", "BRASS", "AGEDYS")]
+    tracker = Tracker()
+    runs = DailyTaskScheduler(max_workers=3, db_limits={"tareas": 1}).run(tasks, tracker)
+    assert tracker.max_active["*"] == 1
+    assert runs[0].to_dict()["databases"] == ["riesgos", "tareas"]
@@ -0,0 +1,170 @@
+"""Tests unitarios para el pool de procesos trabajadores precalentados."""
+import textwrap
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from common import base_task as base_task_mod
+from common import task_workers as task_workers_mod
+from common.startup_costs import WORKER_KEY, startup_cost
+from common.task_workers import TaskWorkerPool, isolation_configured, worker_pool_from_env
+
+LOGIC = textwrap.dedent(
+    """
+    import os
+    import time
+
+    class Ok:
+        def __init__(self):
+            self.calls = 0
+
+        def execute_specific_logic(self):
+            self.calls += 1
+            return self.calls == 1 or os.getpid()
+
+    class Fails:
+        def execute_specific_logic(self):
+            return False
+
+    class NotDue:
+        def debe_ejecutarse(self):
+            return False
+
+        def execute_specific_logic(self):
+            raise AssertionError("no debía ejecutarse")
+
+    class Boom:
+        def execute_specific_logic(self):
+            raise ValueError("boom")
+
+    class Hangs:
+        def execute_specific_logic(self):
+            time.sleep(30)
+
+    class Crashes:
+        def execute_specific_logic(self):
+            os._exit(3)
+    """
+)
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    (tmp_path / "worker_logic.py").write_text(LOGIC, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    workers = TaskWorkerPool(size=1, max_tasks=3, preload=["worker_logic"]).start()
+    yield workers
+    workers.shutdown()
+
+
+def test_runs_are_dispatched_to_the_same_warm_worker(pool):
+    first = pool.run("worker_logic:Ok")
+    second = pool.run("worker_logic:Ok")
+    assert first["success"] and first["mode"] == "worker" and first["return_code"] == 0
+    # La instancia se reutiliza: la segunda llamada devuelve el pid (no False)
+    assert second["success"]
+    assert pool.get_stats()["started"] == 1
+    # El arranque del trabajador queda medido para el modo en proceso
+    assert pool.get_stats()["startup_s"] > 0
+    assert startup_cost(WORKER_KEY) is not None
+
+
+def test_worker_checks_debe_ejecutarse_like_the_script_runner(pool):
+    result = pool.run("worker_logic:NotDue")
+    assert result["success"] and result["return_code"] == 0
+
+
+def test_failures_and_exceptions_keep_worker(pool):
+    assert pool.run("worker_logic:Fails")["return_code"] == 1
+    result = pool.run("worker_logic:Boom")
+    assert not result["success"] and "ValueError: boom" in result["error"]
+    # Tercera tarea: se recicla tras max_tasks=3
+    assert pool.run("worker_logic:Ok")["success"]
+    stats = pool.get_stats()
+    assert stats["recycled"] == 1 and stats["started"] == 2 and stats["workers"] == 1
+
+
+def test_timeout_kills_and_replaces_worker(pool):
+    result = pool.run("worker_logic:Hangs", timeout=0.5)
+    assert result["return_code"] == -1 and "Timeout" in result["error"]
+    assert pool.get_stats()["timeouts"] == 1
+    assert pool.run("worker_logic:Ok")["success"]
+
+
+def test_crashed_worker_is_replaced(pool):
+    result = pool.run("worker_logic:Crashes")
+    assert result["return_code"] == -3
+    assert pool.run("worker_logic:Ok")["success"]
+    assert pool.get_stats()["crashes"] == 1
+
+
+def test_isolated_task_uses_active_pool(monkeypatch):
+    from common.task_registry import BrassTask
+
+    monkeypatch.setenv("MASTER_TASK_MODE", "isolated")
+    fake = type("FakePool", (), {})()
+    fake.run = lambda logic_class: {"success": True, "mode": "worker", "error": "", "lc": logic_class}
+    with patch.object(base_task_mod, "get_task_worker_pool", return_value=fake), patch.object(
+        base_task_mod.subprocess, "run"
+    ) as run:
+        result = BrassTask().ejecutar()
+    run.assert_not_called()
+    assert result["lc"] == "brass.brass_task:BrassTask"
+
+
+def test_worker_pool_from_env(monkeypatch):
+    monkeypatch.delenv("MASTER_WORKER_POOL_SIZE", raising=False)
+    assert worker_pool_from_env() is None
+    monkeypatch.setenv("MASTER_WORKER_POOL_SIZE", "2")
+    monkeypatch.setenv("MASTER_WORKER_MAX_MEMORY_MB", "0")
+    monkeypatch.setenv("MASTER_WORKER_TASK_TIMEOUT", "60")
+    pool = worker_pool_from_env(preload=["x"])
+    assert (pool.size, pool.max_memory_mb, pool.timeout, pool.preload) == (2, None, 60.0, ["x"])
+
+
+@pytest.mark.parametrize(
+    "mode, isolated, expected",
+    [
+        ("inprocess", "", False),
+        ("inprocess", " , ", False),
+        ("isolated", "", True),
+        ("subprocess", "", True),
+        ("inprocess", "BRASS", True),
+    ],
+)
+def test_isolation_configured(monkeypatch, mode, isolated, expected):
+    monkeypatch.setenv("MASTER_TASK_MODE", mode)
+    monkeypatch.setenv("MASTER_ISOLATED_TASKS", isolated)
+    assert isolation_configured() is expected
+
+
+def test_spawn_timeout_closes_pipe_and_terminates_process():
+    pool = TaskWorkerPool(size=1, start_timeout=0.01)
+    parent, child = MagicMock(), MagicMock()
+    parent.poll.return_value = False
+    process = MagicMock()
+    process.is_alive.return_value = False
+    pool._context = MagicMock()
+    pool._context.Pipe.return_value = (parent, child)
+    pool._context.Process.return_value = process
+    with pytest.raises(RuntimeError, match="no arrancó"):
+        pool._spawn()
+    child.close.assert_called_once()
+    parent.close.assert_called_once()
+    process.terminate.assert_called_once()
+    parent.recv.assert_not_called()
+    assert pool.get_stats()["started"] == 0
+
+
+def test_memory_without_psutil_reads_current_rss_from_statm(tmp_path, monkeypatch):
+    statm = tmp_path / "statm"
+    statm.write_text("50000 2560 300 10 0 900 0\n", encoding="ascii")
+    monkeypatch.setattr(task_workers_mod, "PSUTIL_AVAILABLE", False)
+    monkeypatch.setattr(task_workers_mod, "_STATM_PATH", str(statm))
+    monkeypatch.setattr(task_workers_mod.os, "sysconf", lambda name: 4096, raising=False)
+    # Páginas residentes actuales (segundo campo), no el pico del proceso
+    assert task_workers_mod._memory_mb() == 10.0
+
+    pytest.importorskip("resource")
+    monkeypatch.setattr(task_workers_mod, "_STATM_PATH", str(tmp_path / "no_existe"))
+    assert task_workers_mod._memory_mb() > 0  # pico de resource
@@ -0,0 +1,144 @@
+"""Tests unitarios para la cola de escrituras diferidas (SQLite como backend)."""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from common.db.access_connection_pool import AccessConnectionPool
+from common.db.sqlite_backend import create_database
+from common.db.write_queue import (
+    WriteBehindQueue,
+    WriteQueueRegistry,
+    get_write_queue,
+    write_behind_enabled,
+)
+
+
+@pytest.fixture
+def correos(tmp_path):
+    return str(create_database(tmp_path / "correos.sqlite", "correos"))
+
+
+def _rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def _email(i):
+    return {"IDCorreo": i, "Aplicacion": "App", "Asunto": f"A{i}", "FechaGrabacion": datetime.now()}
+
+
+def test_inserts_are_batched_and_flush_makes_them_durable(correos):
+    queue = WriteBehindQueue(correos, name="correos", linger=0.2)
+    futures = [queue.insert("TbCorreosEnviados", _email(i)) for i in range(1, 51)]
+    assert queue.flush(timeout=10)
+    assert all(f.result() for f in futures)
+    assert _rows(correos, "SELECT COUNT(*) FROM TbCorreosEnviados") == [(50,)]
+    stats = queue.get_stats()
+    assert stats["statements"] == 50 and stats["pending"] == 0
+    assert stats["batches"] < 50
+    queue.close()
+
+
+def test_keyed_updates_coalesce_last_value_wins(correos):
+    queue = WriteBehindQueue(correos, name="correos", linger=0.2)
+    queue.insert("TbCorreosEnviados", _email(1))
+    gate = threading.Event()
+    # Retener al escritor para que las actualizaciones sigan pendientes
+    with patch.object(queue, "_write", side_effect=lambda b: (gate.wait(5), WriteBehindQueue._write(queue, b))):
+        queue.flush(timeout=0.01)
+        first = queue.update("TbCorreosEnviados", {"Notas": "uno"}, "IDCorreo = ?", [1], key=1)
+        second = queue.update("TbCorreosEnviados", {"Notas": "dos"}, "IDCorreo = ?", [1], key=1)
+        gate.set()
+        assert queue.flush(timeout=10)
+    assert first is second and second.result() is True
+    assert queue.get_stats()["coalesced"] == 1
+    assert _rows(correos, "SELECT Notas FROM TbCorreosEnviados") == [("dos",)]
+    queue.close()
+
+
+def test_keyed_update_after_other_write_keeps_fifo_order(correos):
+    queue = WriteBehindQueue(correos, name="correos", linger=0.2)
+    queue.insert("TbCorreosEnviados", _email(1))
+    queue.insert("TbCorreosEnviados", _email(2))
+    queue.flush(timeout=10)
+    gate = threading.Event()
+    written = []
+
+    def hold(batch):
+        gate.wait(5)
+        written.extend(op.params[0] for op in batch)
+        WriteBehindQueue._write(queue, batch)
+
+    with patch.object(queue, "_write", side_effect=hold):
+        queue.update("TbCorreosEnviados", {"Notas": "uno"}, "IDCorreo = ?", [1], key=1)
+        queue.flush(timeout=0.01)
+        first = queue.update("TbCorreosEnviados", {"Notas": "a"}, "IDCorreo = ?", [1], key=1)
+        queue.update("TbCorreosEnviados", {"Notas": "b"}, "IDCorreo = ?", [2], key=2)
+        last = queue.update("TbCorreosEnviados", {"Notas": "c"}, "IDCorreo = ?", [1], key=1)
+        gate.set()
+        assert queue.flush(timeout=10)
+    assert first is not last
+    assert written == ["uno", "a", "b", "c"]
+    assert queue.get_stats()["coalesced"] == 0
+    assert _rows(correos, "SELECT Notas FROM TbCorreosEnviados ORDER BY IDCorreo") == [("c",), ("b",)]
+    queue.close()
+
+
+def test_close_is_bounded_and_logs_dropped_statements(correos, caplog):
+    queue = WriteBehindQueue(correos, name="correos", linger=0.2)
+    gate = threading.Event()
+    with patch.object(queue, "_write", side_effect=lambda b: (gate.wait(5), WriteBehindQueue._write(queue, b))):
+        queue.insert("TbCorreosEnviados", _email(1))
+        queue.flush(timeout=0.01)  # el escritor queda retenido con el primer lote
+        dropped = queue.insert("TbCorreosEnviados", _email(2))
+        with caplog.at_level("WARNING", logger="common.db.write_queue"):
+            assert queue.close(timeout=0.2) is False
+        gate.set()
+    with pytest.raises(RuntimeError):
+        dropped.result(timeout=1)
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("1 sentencias descartadas sin escribir (INSERT INTO TbCorreosEnviados x1)" in m for m in messages)
+    assert any("no terminó en 0.2s" in m for m in messages)
+
+
+def test_failed_statement_only_fails_its_future(correos):
+    queue = WriteBehindQueue(correos, name="correos", linger=0.2)
+    ok = queue.insert("TbCorreosEnviados", _email(1))
+    duplicated = queue.insert("TbCorreosEnviados", _email(1))
+    other = queue.insert("TbCorreosEnviados", _email(2))
+    queue.flush(timeout=10)
+    assert (ok.result(), duplicated.result(), other.result()) == (True, False, True)
+    assert queue.get_stats()["failed"] == 1
+    queue.close()
+
+
+def test_readers_see_writes_after_flush_and_close_rejects_new(correos):
+    queue = WriteBehindQueue(correos, name="correos")
+    reader = AccessConnectionPool(correos, max_connections=1, validation_interval=None)
+    queue.insert("TbCorreosEnviados", _email(7))
+    queue.flush()
+    assert reader.execute_query("SELECT IDCorreo FROM TbCorreosEnviados") == [{"IDCorreo": 7}]
+    reader.close_all()
+    assert queue.close()
+    with pytest.raises(RuntimeError):
+        queue.insert("TbCorreosEnviados", _email(8))
+
+
+def test_get_write_queue_respects_env(correos):
+    with patch.dict(os.environ, {"DB_WRITE_BEHIND_ENABLED": "false"}):
+        assert get_write_queue("correos", correos) is None
+    env = {"DB_WRITE_BEHIND_ENABLED": "true", "DB_WRITE_BEHIND_DATABASES": "correos"}
+    with patch.dict(os.environ, env):
+        assert write_behind_enabled("correos") and not write_behind_enabled("tareas")
+        registry = WriteQueueRegistry()
+        assert registry.get("correos", correos) is registry.get("correos", correos)
+        registry.get("correos", correos).insert("TbCorreosEnviados", _email(3))
+        registry.close_all()
+    assert _rows(correos, "SELECT IDCorreo FROM TbCorreosEnviados") == [(3,)]
@@ -1,3 +1,4 @@
+from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -296,3 +297,91 @@ def test_process_pending_emails_sends_email_if_attachment_not_found(
     assert found_warning, "No se registró warning de adjunto faltante"
     # 5) No se intentó abrir el adjunto (Path().open no usado)
     path_instance.open.assert_not_called()
+
+
+def test_register_email_write_behind_and_flush(tmp_path):
+    from common.db.access_connection_pool import AccessConnectionPool
+    from common.db.sqlite_backend import create_database
+    from common.db.write_queue import WriteBehindQueue
+
+    path = str(create_database(tmp_path / "correos.sqlite", "correos"))
+    pool = AccessConnectionPool(path, max_connections=1, validation_interval=None)
+    queue = WriteBehindQueue(path, name="correos")
+    with patch("email_services.email_manager.config") as cfg, patch(
+        "email_services.email_manager.get_correos_connection_pool", return_value=pool
+    ), patch("email_services.email_manager.get_write_queue", return_value=queue):
+        cfg.get_db_correos_connection_string.return_value = path
+        manager = EmailManager("correos")
+    assert manager.register_email("App", "Asunto", "Cuerpo", "a@example.com")
+    assert manager.flush_writes(timeout=10)
+    manager._marcar_correo_enviado(1, datetime(2024, 1, 2))
+    assert manager.flush_writes(timeout=10)
+    rows = pool.execute_query("SELECT IDCorreo, Destinatarios, FechaEnvio FROM TbCorreosEnviados")
+    assert [(r["IDCorreo"], r["Destinatarios"]) for r in rows] == [(1, "a@example.com")]
+    assert rows[0]["FechaEnvio"] is not None
+    queue.close()
+    pool.close_all()
+
+
+def _sqlite_manager(tmp_path, queue_factory=None):
+    from common.db.access_connection_pool import AccessConnectionPool
+    from common.db.sqlite_backend import create_database
+
+    path = str(create_database(tmp_path / "correos.sqlite", "correos"))
+    pool = AccessConnectionPool(path, max_connections=2, validation_interval=None)
+    queue = queue_factory(path) if queue_factory else None
+    with patch("email_services.email_manager.config") as cfg, patch(
+        "email_services.email_manager.get_correos_connection_pool", return_value=pool
+    ), patch("email_services.email_manager.get_write_queue", return_value=queue):
+        cfg.get_db_correos_connection_string.return_value = path
+        manager = EmailManager("correos")
+    return manager, pool, queue
+
+
+def _other_process_insert(pool, email_id):
+    pool.execute_non_query(
+        "INSERT INTO TbCorreosEnviados (IDCorreo, Aplicacion, FechaGrabacion) VALUES (?, ?, ?)",
+        (email_id, "OtroProceso", datetime.now()),
+    )
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_register_email_retries_id_used_by_other_process(tmp_path, write_behind):
+    from common.db.write_queue import WriteBehindQueue
+
+    factory = (lambda path: WriteBehindQueue(path, name="correos")) if write_behind else None
+    manager, pool, queue = _sqlite_manager(tmp_path, factory)
+    assert manager.register_email("App", "Uno", "Cuerpo", "a@example.com")
+    assert manager.flush_writes(timeout=10)
+    # Otro proceso reservó el mismo bloque e insertó el siguiente ID
+    _other_process_insert(pool, 2)
+    assert manager.register_email("App", "Dos", "Cuerpo", "a@example.com")
+    assert manager.flush_writes(timeout=10)
+    rows = pool.execute_query(
+        "SELECT IDCorreo, Asunto FROM TbCorreosEnviados WHERE Aplicacion = 'App' ORDER BY IDCorreo"
+    )
+    assert [(r["IDCorreo"], r["Asunto"]) for r in rows] == [(1, "Uno"), (3, "Dos")]
+    if queue is not None:
+        queue.close()
+    pool.close_all()
+
+
+def test_register_email_bypasses_write_queue_inside_transaction(tmp_path):
+    from common.db.write_queue import WriteBehindQueue
+
+    manager, pool, queue = _sqlite_manager(
+        tmp_path, lambda path: WriteBehindQueue(path, name="correos")
+    )
+    with pytest.raises(RuntimeError):
+        with pool.transaction():
+            assert manager.register_email("App", "Uno", "Cuerpo", "a@example.com")
+            raise RuntimeError("revertir el lote")
+    assert manager.flush_writes(timeout=10)
+    assert queue.get_stats()["submitted"] == 0
+    assert pool.execute_query("SELECT COUNT(*) AS n FROM TbCorreosEnviados")[0]["n"] == 0
+    # Fuera de la transacción sigue usando la cola
+    assert manager.register_email("App", "Dos", "Cuerpo", "a@example.com")
+    assert manager.flush_writes(timeout=10)
+    assert queue.get_stats()["submitted"] == 1
+    queue.close()
+    pool.close_all()
@@ -56,5 +56,72 @@ class TestNoConformidadesTask(unittest.TestCase):
         db_mock.disconnect.assert_called_once()
 
 
+class TestLogicaTecnicaLote(unittest.TestCase):
+    """Correos técnicos: lecturas fuera de la transacción y sólo escrituras dentro."""
+
+    def setUp(self):
+        self.task = NoConformidadesTask()
+        self.events = []
+        self.tx = MagicMock()
+        self.tx.__enter__.side_effect = lambda: self.events.append("begin")
+        self.tx.__exit__.side_effect = lambda *exc: self.events.append(
+            "rollback" if exc[0] else "commit"
+        ) or False
+        self.manager = MagicMock()
+        self.manager._get_tecnicos_con_nc_activas.return_value = ["TEC1", "TEC2", "TEC3"]
+        self.manager.get_technical_report_data_for_user.return_value = {"ars": [1]}
+
+    def _run(self, emails, registered):
+        def lookup(tecnico, *_args):
+            self.events.append(f"lookup {tecnico}")
+            result = emails[tecnico]
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        em = MagicMock()
+        em.register_email.side_effect = registered
+        with patch(
+            "no_conformidades.no_conformidades_manager.NoConformidadesManager",
+            return_value=self.manager,
+        ), patch.object(self.task, "_tareas_transaction", return_value=self.tx), patch(
+            "no_conformidades.no_conformidades_task.get_user_email", side_effect=lookup
+        ), patch(
+            "no_conformidades.no_conformidades_task.EmailManager", return_value=em
+        ), patch(
+            "no_conformidades.no_conformidades_task.register_task_completion", return_value=True
+        ) as completion:
+            result = self.task.ejecutar_logica_tecnica()
+        self.manager.close_connections.assert_called_once()
+        return result, em, completion
+
+    def test_lookups_run_before_the_transaction(self):
+        emails = {"TEC1": "a@x", "TEC2": None, "TEC3": "c@x"}
+        result, em, completion = self._run(emails, [True, True])
+        self.assertTrue(result)
+        self.assertEqual(
+            self.events, ["lookup TEC1", "lookup TEC2", "lookup TEC3", "begin", "commit"]
+        )
+        self.assertEqual(em.register_email.call_count, 2)
+        completion.assert_called_once_with(self.task.db_tareas, "NoConformidadesTecnica")
+
+    def test_preparation_failure_skips_only_that_technician(self):
+        emails = {"TEC1": "a@x", "TEC2": RuntimeError("sin LDAP"), "TEC3": "c@x"}
+        result, em, completion = self._run(emails, [True, True])
+        self.assertFalse(result)
+        self.assertEqual(self.events[-2:], ["begin", "commit"])
+        recipients = [c.kwargs["recipients"] for c in em.register_email.call_args_list]
+        self.assertEqual(recipients, ["a@x", "c@x"])
+        completion.assert_called_once_with(self.task.db_tareas, "NoConformidadesTecnica")
+
+    def test_registration_failure_rolls_back_whole_batch(self):
+        emails = {"TEC1": "a@x", "TEC2": "b@x", "TEC3": "c@x"}
+        result, em, completion = self._run(emails, [True, False, True])
+        self.assertFalse(result)
+        self.assertEqual(self.events[-2:], ["begin", "rollback"])
+        self.assertEqual(em.register_email.call_count, 2)
+        completion.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
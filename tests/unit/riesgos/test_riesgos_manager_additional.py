@@ -192,3 +192,22 @@ def test_generate_monthly_quality_report_html_sections(manager, monkeypatch):
     # Debe contener partes de varios datasets
     for token in ["P1", "P2", "P3", "P4"]:
         assert token in html
+
+
+def test_add_days_column_matches_row_by_row(manager):
+    now = datetime.now()
+    from datetime import date, timedelta
+
+    values = [
+        now + timedelta(days=5, hours=1),
+        now - timedelta(days=2, hours=3),
+        date.today() + timedelta(days=1),
+        None,
+        "2000-01-01",
+    ]
+    rows = [{"Fecha": v} for v in values]
+    manager._add_days_column(rows, "Fecha")
+    assert [r["Dias"] for r in rows] == [
+        manager._calculate_days_difference(v) for v in values
+    ]
+    assert all(type(r["Dias"]) is int for r in rows)